@@ -6,8 +6,9 @@
 import numpy as np
 
 from .interpolator import Interpolator, InterpTypes, interpolate
+from .interpolator import _vinterpolate_jacobian
 
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.error import FinError
 from ...utils.global_vars import gDaysInYear, gSmall
 from ...utils.frequency import annual_frequency, FrequencyTypes
@@ -31,7 +32,7 @@ class DiscountCurve:
 
     def __init__(self,
                  value_date: Date,
-                 df_dates: list,
+                 df_dates: (list, DateArray),
                  df_values: np.ndarray,
                  interp_type: InterpTypes = InterpTypes.FLAT_FWD_RATES):
         """ Create the discount curve from a vector of times and discount
@@ -283,11 +284,13 @@ class DiscountCurve:
     ###########################################################################
 
     def df(self,
-           dt: (list, Date),
+           dt: (list, Date, np.ndarray),
            day_count=DayCountTypes.ACT_ACT_ISDA):
         ''' Function to calculate a discount factor from a date or a
         vector of dates. The day count determines how dates get converted to
-        years. I allow this to default to ACT_ACT_ISDA unless specified. '''
+        years. I allow this to default to ACT_ACT_ISDA unless specified. The
+        dates can also be passed as a Numpy array of integer Excel serial
+        dates in which case the calculation is fully vectorised. '''
 
         times = times_from_dates(dt, self._value_date, day_count)
         dfs = self._df(times)
@@ -321,6 +324,156 @@ class DiscountCurve:
 
     ###########################################################################
 
+    def df_jacobian(self,
+                    dt: (list, Date, np.ndarray),
+                    day_count=DayCountTypes.ACT_ACT_ISDA):
+        ''' Return the matrix of derivatives of the discount factors on a date
+        or vector of dates with respect to the discount factors at the curve
+        nodes. There is one row per date and one column per node. The dates
+        are converted to times in the same way as in the df function. '''
+
+        times = times_from_dates(dt, self._value_date, day_count)
+        return self._df_jacobian(times)
+
+    ###########################################################################
+
+    def _df_jacobian(self,
+                     t: (float, np.ndarray)):
+        """ Hidden function to calculate the derivatives of the discount
+        factors at a time or vector of times with respect to the node
+        discount factors. This is analytic for the local interpolation schemes
+        and uses central differences of the fitted interpolator otherwise. """
+
+        t = np.atleast_1d(np.array(t, dtype=np.float64))
+
+        if np.any(t < 0.0):
+            raise FinError("Interpolate times must all be >= 0")
+
+        if self._interp_type is InterpTypes.FLAT_FWD_RATES or \
+                self._interp_type is InterpTypes.LINEAR_ZERO_RATES or \
+                self._interp_type is InterpTypes.LINEAR_FWD_RATES:
+
+            return _vinterpolate_jacobian(t,
+                                          np.array(self._times, dtype=float),
+                                          np.array(self._dfs, dtype=float),
+                                          self._interp_type.value)
+
+        num_nodes = len(self._dfs)
+        jac = np.zeros((len(t), num_nodes))
+
+        dfs = np.array(self._dfs, dtype=float)
+        interpolator = Interpolator(self._interp_type)
+
+        for k in range(0, num_nodes):
+
+            h = 1e-6 * dfs[k]
+
+            bumped_dfs = dfs.copy()
+            bumped_dfs[k] = dfs[k] + h
+            interpolator.fit(self._times, bumped_dfs)
+            df_up = interpolator.interpolate(t)
+
+            bumped_dfs[k] = dfs[k] - h
+            interpolator.fit(self._times, bumped_dfs)
+            df_down = interpolator.interpolate(t)
+
+            jac[:, k] = (df_up - df_down) / (2.0 * h)
+
+        return jac
+
+    ###########################################################################
+
+    def node_sensitivities(self,
+                           sensitivities: list):
+        """ Convert the sensitivities of a list of values to the discount
+        factors on a set of dates into their sensitivities to the discount
+        factors at the nodes of this curve. Each element of the list is in the
+        form returned by the df_sensitivities functions of the products, which
+        is a list of tuples of a curve, an array of Excel serial dates and the
+        derivatives of the value with respect to the discount factors on these
+        dates. Sensitivities to other curves are ignored. This returns a matrix
+        with one row per value and one column per curve node. """
+
+        serials = []
+        dv_ddfs = []
+        rows = []
+
+        for i, value_sensitivities in enumerate(sensitivities):
+            for (curve, dates, dv_ddf) in value_sensitivities:
+                if curve is self and len(dates) > 0:
+                    serials.append(dates)
+                    dv_ddfs.append(dv_ddf)
+                    rows.append(np.full(len(dates), i))
+
+        grad = np.zeros((len(sensitivities), len(self._dfs)))
+
+        if len(serials) == 0:
+            return grad
+
+        # The derivatives on all of the dates are found in one call
+        jac = self.df_jacobian(np.concatenate(serials))
+        dv_ddfs = np.concatenate(dv_ddfs)
+        rows = np.concatenate(rows)
+
+        np.add.at(grad, rows, dv_ddfs[:, np.newaxis] * jac)
+        return grad
+
+    ###########################################################################
+
+    def _quote_jacobian(self,
+                        residual_jacobian: np.ndarray,
+                        quote_derivatives: np.ndarray):
+        """ Return the derivatives of the node discount factors with respect
+        to the market quotes of the calibration instruments. The residual
+        Jacobian holds the derivatives of the calibration residuals with
+        respect to the node discount factors and the quote derivatives hold
+        the derivative of each residual with respect to its own quote. As the
+        residuals stay at zero when a quote moves, the node discount factors
+        move by minus the inverse of the residual Jacobian times the quote
+        derivatives. The first node has a discount factor of one and so its
+        row is zero. """
+
+        num_nodes = len(self._dfs)
+        num_quotes = len(quote_derivatives)
+
+        jac = np.zeros((num_nodes, num_quotes))
+        jac[1:, :] = -np.linalg.solve(residual_jacobian[:, 1:],
+                                      np.diag(quote_derivatives))
+        return jac
+
+    ###########################################################################
+
+    def _solve_nodes_by_newton(self,
+                               residuals,
+                               tol: float = 1e-12,
+                               max_iter: int = 50):
+        """ Solve for the discount factors at all of the curve nodes after the
+        first so that the calibration residuals are zero. The function
+        residuals returns the vector of residuals and their Jacobian with
+        respect to the node discount factors, so that all of the nodes are
+        updated together in each Newton step. The current node discount
+        factors are the starting point. Returns the number of iterations. """
+
+        for num_iter in range(0, max_iter):
+
+            self._interpolator.fit(self._times, self._dfs)
+            (r, jac) = residuals()
+
+            if np.max(np.abs(r)) < tol:
+                return num_iter
+
+            step = np.linalg.solve(jac[:, 1:], r)
+
+            # Halve the step until the discount factors stay positive
+            while np.any(self._dfs[1:] - step <= 0.0):
+                step = step * 0.5
+
+            self._dfs[1:] = self._dfs[1:] - step
+
+        raise FinError("Curve Newton solver did not converge.")
+
+    ###########################################################################
+
     def survival_prob(self,
                       dt: Date):
         """ This returns a survival probability to a specified date based on
@@ -413,7 +566,7 @@ class DiscountCurve:
         if isinstance(start_date, Date):
             start_dates = []
             start_dates.append(start_date)
-        elif isinstance(start_date, list):
+        elif isinstance(start_date, (list, DateArray)):
             start_dates = start_date
         else:
             raise FinError("Start date and end date must be same types.")
@@ -429,7 +582,7 @@ class DiscountCurve:
                 dt2 = dt1.add_tenor(date_or_tenor)
             elif isinstance(date_or_tenor, Date):
                 dt2 = date_or_tenor
-            elif isinstance(date_or_tenor, list):
+            elif isinstance(date_or_tenor, (list, DateArray)):
                 dt2 = date_or_tenor[i]
 
             year_frac = day_count.year_frac(dt1, dt2)[0]
@@ -113,7 +113,7 @@ class DiscountCurveNS(DiscountCurve):
     ###############################################################################
 
     def df(self,
-           dates: (Date, list)):
+           dates: (Date, list, np.ndarray)):
         """ Return discount factors given a single or vector of dates. The
         discount factor depends on the rate and this in turn depends on its
         compounding frequency and it defaults to continuous compounding. It
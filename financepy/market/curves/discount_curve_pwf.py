@@ -4,7 +4,7 @@
 
 import numpy as np
 
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.error import FinError
 from ...utils.global_vars import gSmall
 from ...utils.math import test_monotonicity
@@ -26,7 +26,7 @@ class DiscountCurvePWF(DiscountCurve):
 
     def __init__(self,
                  value_date: Date,
-                 zero_dates: list,
+                 zero_dates: (list, DateArray),
                  zero_rates: (list, np.ndarray),
                  freq_type: FrequencyTypes = FrequencyTypes.CONTINUOUS,
                  day_count_type: DayCountTypes = DayCountTypes.ACT_ACT_ISDA):
@@ -121,7 +121,7 @@ class DiscountCurvePWF(DiscountCurve):
     ###########################################################################
 
     def df(self,
-           dates: (Date, list)):
+           dates: (Date, list, np.ndarray)):
         """ Return discount factors given a single or vector of dates. The
         discount factor depends on the rate and this in turn depends on its
         compounding frequency and it defaults to continuous compounding. It
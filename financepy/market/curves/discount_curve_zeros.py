@@ -6,7 +6,7 @@ import numpy as np
 
 from ...utils.frequency import FrequencyTypes
 from ...utils.error import FinError
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.day_count import DayCountTypes
 from ...utils.math import test_monotonicity
 from ...utils.helpers import label_to_string
@@ -33,7 +33,7 @@ class DiscountCurveZeros(DiscountCurve):
 
     def __init__(self,
                  value_date: Date,
-                 zero_dates: list,
+                 zero_dates: (list, DateArray),
                  zero_rates: (list, np.ndarray),
                  freq_type: FrequencyTypes = FrequencyTypes.ANNUAL,
                  dc_type: DayCountTypes = DayCountTypes.ACT_ACT_ISDA,
@@ -194,6 +194,95 @@ def _vinterpolate(xValues,
 ###############################################################################
 
 
+@njit(float64[:, :](float64[:], float64[:], float64[:], int64),
+      fastmath=True, cache=True, nogil=True)
+def _vinterpolate_jacobian(xValues,
+                           xvector,
+                           dfs,
+                           method):
+    """ Return the matrix of derivatives of the interpolated discount factors
+    at times xValues with respect to the discount factors at the grid times.
+    This follows the branches of _uinterpolate exactly for the schemes which
+    are local in the grid discount factors. """
+
+    small = 1e-10
+    num_points = xvector.size
+    n = xValues.size
+    jac = np.zeros((n, num_points))
+
+    for j in range(0, n):
+
+        t = xValues[j]
+
+        if t == xvector[0]:
+            jac[j, 0] = 1.0
+            continue
+
+        i = 0
+        while xvector[i] < t and i < num_points - 1:
+            i = i + 1
+
+        if t > xvector[i]:
+            i = num_points
+
+        y = _uinterpolate(t, xvector, dfs, method)
+
+        if method == InterpTypes.LINEAR_ZERO_RATES.value:
+
+            if i == 1:
+                jac[j, i] = y * t / xvector[i] / dfs[i]
+            elif i < num_points:
+                dt = xvector[i] - xvector[i - 1]
+                w1 = (xvector[i] - t) / dt
+                w2 = (t - xvector[i - 1]) / dt
+                jac[j, i - 1] = y * t * w1 / xvector[i - 1] / dfs[i - 1]
+                jac[j, i] = y * t * w2 / xvector[i] / dfs[i]
+            else:
+                jac[j, i - 1] = y * t / xvector[i - 1] / dfs[i - 1]
+
+        elif method == InterpTypes.FLAT_FWD_RATES.value:
+
+            if i < num_points:
+                k = i
+            else:
+                k = num_points - 1
+
+            dt = xvector[k] - xvector[k - 1]
+            w1 = (xvector[k] - t) / dt
+            w2 = (t - xvector[k - 1]) / dt
+            jac[j, k - 1] = y * w1 / dfs[k - 1]
+            jac[j, k] = y * w2 / dfs[k]
+
+        elif method == InterpTypes.LINEAR_FWD_RATES.value:
+
+            if i == 1:
+                jac[j, i] = y * t / (xvector[i] + small) / (dfs[i] + small)
+            elif i < num_points:
+                h1 = xvector[i - 1] - xvector[i - 2]
+                h2 = xvector[i] - xvector[i - 1]
+                w1 = (xvector[i] - t) / h2
+                w2 = (t - xvector[i - 1]) / h2
+                tau = t - xvector[i - 1]
+                # Derivatives of log(y) with respect to the log dfs
+                jac[j, i - 2] = -tau * w1 / h1 * y / dfs[i - 2]
+                jac[j, i - 1] = (1.0 + tau * w1 / h1 - tau * w2 / h2) * \
+                    y / dfs[i - 1]
+                jac[j, i] = tau * w2 / h2 * y / dfs[i]
+            else:
+                h = xvector[i - 1] - xvector[i - 2]
+                tau = t - xvector[i - 1]
+                jac[j, i - 2] = -tau / h * y / dfs[i - 2]
+                jac[j, i - 1] = (1.0 + tau / h) * y / dfs[i - 1]
+
+        else:
+            raise FinError("Invalid interpolation scheme.")
+
+    return jac
+
+
+###############################################################################
+
+
 class Interpolator():
 
     def __init__(self,
@@ -2,6 +2,8 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import time
+
 import numpy as np
 from scipy.optimize import minimize
 
@@ -9,7 +11,7 @@ import matplotlib.pyplot as plt
 from numba import njit, float64, int64
 
 from ...utils.error import FinError
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.global_vars import gDaysInYear
 from ...utils.global_types import OptionTypes
 from ...models.option_implied_dbn import option_implied_dbn
@@ -35,6 +37,10 @@ from ...utils.solver_1d import newton_secant
 from ...utils.solver_nm import nelder_mead
 from ...utils.global_types import FinSolverTypes
 
+from .vol_calibration import calibrate_vol_smiles
+from .vol_calibration import initial_vol_parameters
+from .vol_interpolation import interpolate_vols
+
 ###############################################################################
 # ISSUES
 ###############################################################################
@@ -228,14 +234,17 @@ class EquityVolSurface:
     prices of equity options at different strikes and expiry tenors. There is0 
     a choice of volatility function from cubic in delta to full SABR and SSVI. 
     Check out VolFuncTypes. Visualising the volatility curve is useful.
-    Also, there is no guarantee that the implied pdf will be positive."""
+    Also, there is no guarantee that the implied pdf will be positive.
+    The LEVENBERG_MARQUARDT solver fits all of the expiries in parallel using
+    the analytical derivatives of the volatility function. The time taken by
+    the last build of the surface is held in _build_time."""
 
     def __init__(self,
                  value_date: Date,
                  stock_price: float,
                  discount_curve: DiscountCurve,
                  dividend_curve: DiscountCurve,
-                 expiry_dates: (list),
+                 expiry_dates: (list, DateArray),
                  strikes: (list, np.ndarray),
                  volatility_grid: (list, np.ndarray),
                  volatility_function_type: VolFuncTypes = VolFuncTypes.CLARK,
@@ -273,6 +282,37 @@ class EquityVolSurface:
 
         self._build_vol_surface(finSolverType=finSolverType)
 
+###############################################################################
+
+    def recalibrate(self,
+                    stock_price: float = None,
+                    volatility_grid: (list, np.ndarray) = None,
+                    finSolverType: FinSolverTypes = None):
+        """ Refit the surface to a new stock price and/or grid of market vols
+        starting each expiry from its parameters in the current calibration.
+        When the market has moved a little since the last build this takes
+        far fewer iterations than a build from scratch. The solver used for
+        the last build is used unless another is given. """
+
+        if stock_price is not None:
+            self._stock_price = stock_price
+
+        if volatility_grid is not None:
+
+            if len(volatility_grid) != self._numExpiryDates:
+                raise FinError("1st dimension of vol grid is not nExpiryDates")
+
+            if len(volatility_grid[0]) != self._num_strikes:
+                raise FinError("2nd dimension of the vol matrix is not nStrikes")
+
+            self._volatility_grid = volatility_grid
+
+        if finSolverType is None:
+            finSolverType = self._finSolverType
+
+        self._build_vol_surface(finSolverType=finSolverType,
+                                x_inits=self._parameters.copy())
+
 ###############################################################################
 
     def volatility_from_strike_date(self, K, expiry_date):
@@ -357,6 +397,24 @@ class EquityVolSurface:
 
         return volt
 
+###############################################################################
+
+    def volatility_from_strike_date_array(self, strikes, expiry_dates):
+        """ Interpolate the Black-Scholes volatilities for arrays of strikes
+        and expiry dates in one call. The expiry dates can be a Date, a list of
+        Dates or a DateArray and are broadcast against the strikes. The values
+        are the same as those given by volatility_from_strike_date but each
+        distinct expiry is bracketed once and the volatility function is
+        evaluated for all of the strikes in compiled code. """
+
+        return interpolate_vols(self._volatility_function_type,
+                                self._parameters,
+                                self._F0T,
+                                self._t_exp,
+                                self._value_date,
+                                strikes,
+                                expiry_dates)
+
 ###############################################################################
 
     # def delta_to_strike(self, call_delta, expiry_date, delta_method):
@@ -563,8 +621,12 @@ class EquityVolSurface:
 
 ###############################################################################
 
-    def _build_vol_surface(self, finSolverType=FinSolverTypes.NELDER_MEAD):
-        """ Main function to construct the vol surface. """
+    def _build_vol_surface(self, finSolverType=FinSolverTypes.NELDER_MEAD,
+                           x_inits=None):
+        """ Main function to construct the vol surface. If x_inits is given it
+        holds the starting parameters for each expiry. """
+
+        start = time.time()
 
         s = self._stock_price
 
@@ -635,9 +697,37 @@ class EquityVolSurface:
 
         vol_type_value = self._volatility_function_type.value
 
-        x_inits = []
-        x_init = np.zeros(num_parameters)
-        x_inits.append(x_init)
+        self._finSolverType = finSolverType
+
+        if finSolverType == FinSolverTypes.LEVENBERG_MARQUARDT:
+
+            strikes = np.array(self._strikes, dtype=np.float64)
+            volatility_grid = np.array(self._volatility_grid,
+                                       dtype=np.float64)
+
+            if x_inits is None:
+                x_inits = np.zeros([numExpiryDates, num_parameters])
+                for i in range(0, numExpiryDates):
+                    f = self._F0T[i]
+                    atm_vol = np.interp(f, strikes, volatility_grid[i])
+                    x_inits[i] = initial_vol_parameters(
+                        self._volatility_function_type, num_parameters,
+                        f, self._t_exp[i], atm_vol)
+
+            strikes = np.tile(strikes, (numExpiryDates, 1))
+
+            self._parameters = calibrate_vol_smiles(
+                self._volatility_function_type, x_inits, self._F0T,
+                self._t_exp, strikes, volatility_grid)
+
+            self._build_time = time.time() - start
+            return
+
+        if x_inits is None:
+            x_inits = [np.zeros(num_parameters)]
+            warm_start = False
+        else:
+            warm_start = True
 
         for i in range(0, numExpiryDates):
 
@@ -655,8 +745,10 @@ class EquityVolSurface:
 
             self._parameters[i, :] = res
 
-            x_init = res
-            x_inits.append(x_init)
+            if warm_start is False:
+                x_inits.append(res)
+
+        self._build_time = time.time() - start
 
 ###############################################################################
 
@@ -797,6 +889,7 @@ class EquityVolSurface:
             s += label_to_string("STRIKE", self._strikes[i])
 
         s += label_to_string("EQUITY VOL GRID", self._volatility_grid)
+        s += label_to_string("BUILD TIME", self._build_time)
 
         return s
 
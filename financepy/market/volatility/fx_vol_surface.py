@@ -2,16 +2,19 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane, Saeed Amen
 ##############################################################################
 
+import time
+
 import numpy as np
 from scipy.optimize import minimize
 
 import matplotlib.pyplot as plt
-from numba import njit, float64, int64
+from numba import njit, prange, float64, int64
 
 from ...utils.error import FinError
 from ...utils.date import Date
 from ...utils.global_vars import gDaysInYear
 from ...utils.global_types import OptionTypes
+from ...utils.global_types import FinSolverTypes
 from ...products.fx.fx_vanilla_option import FXVanillaOption
 from ...models.option_implied_dbn import option_implied_dbn
 from ...products.fx.fx_mkt_conventions import FinFXATMMethod
@@ -31,11 +34,18 @@ from ...models.sabr import vol_function_sabr_beta_half
 from ...utils.math import norminvcdf
 
 from ...models.black_scholes_analytic import bs_value
+from ...models.black_scholes_analytic import bs_vega
 from ...products.fx.fx_vanilla_option import fast_delta
 from ...utils.distribution import FinDistribution
 
 from ...utils.solver_1d import newton_secant
 
+from .vol_calibration import vol_function_grad
+from .vol_calibration import valid_vol_parameters
+from .vol_calibration import lm_step
+from .vol_calibration import LM_TOLERANCE, LM_MAX_ITERATIONS
+from .vol_interpolation import interpolate_vols
+
 ###############################################################################
 # TODO: Speed up search for strike by providing derivative function to go with
 #       delta fit.
@@ -157,29 +167,8 @@ def solve_to_horizon_fast(s, t,
     # Determine the price of a market strangle from market strangle
     # Need to price a call and put that agree with market strangle
 
-    vol_25D_MS = atm_vol + ms25DVol
-
-    K_25D_C_MS = solve_for_strike(s, t, rd, rf,
-                                  OptionTypes.EUROPEAN_CALL.value,
-                                  +0.2500,
-                                  delta_method_value,
-                                  vol_25D_MS)
-
-    K_25D_P_MS = solve_for_strike(s, t, rd, rf,
-                                  OptionTypes.EUROPEAN_PUT.value,
-                                  -0.2500,
-                                  delta_method_value,
-                                  vol_25D_MS)
-
-    # USE MARKET STRANGLE VOL TO DETERMINE PRICE OF A MARKET STRANGLE
-    V_25D_C_MS = bs_value(s, t, K_25D_C_MS, rd, rf, vol_25D_MS,
-                          OptionTypes.EUROPEAN_CALL.value)
-
-    V_25D_P_MS = bs_value(s, t, K_25D_P_MS, rd, rf, vol_25D_MS,
-                          OptionTypes.EUROPEAN_PUT.value)
-
-    # Market price of strangle in the domestic currency
-    V_25D_MS = V_25D_C_MS + V_25D_P_MS
+    K_25D_C_MS, K_25D_P_MS, V_25D_MS = \
+        _market_strangle(s, t, rd, rf, atm_vol, ms25DVol, delta_method_value)
 
     # Determine parameters of vol surface using minimisation
     tol = 1e-8
@@ -385,12 +374,258 @@ def solve_for_strike(spot_fx_rate,
 ###############################################################################
 
 
+def _market_strangle(s, t, rd, rf, atm_vol, ms25DVol, delta_method_value):
+    """ Return the strikes of the 25 delta call and put priced at the market
+    strangle volatility and the price of the market strangle. """
+
+    vol_25D_MS = atm_vol + ms25DVol
+
+    K_25D_C_MS = solve_for_strike(s, t, rd, rf,
+                                  OptionTypes.EUROPEAN_CALL.value,
+                                  +0.2500,
+                                  delta_method_value,
+                                  vol_25D_MS)
+
+    K_25D_P_MS = solve_for_strike(s, t, rd, rf,
+                                  OptionTypes.EUROPEAN_PUT.value,
+                                  -0.2500,
+                                  delta_method_value,
+                                  vol_25D_MS)
+
+    # USE MARKET STRANGLE VOL TO DETERMINE PRICE OF A MARKET STRANGLE
+    V_25D_C_MS = bs_value(s, t, K_25D_C_MS, rd, rf, vol_25D_MS,
+                          OptionTypes.EUROPEAN_CALL.value)
+
+    V_25D_P_MS = bs_value(s, t, K_25D_P_MS, rd, rf, vol_25D_MS,
+                          OptionTypes.EUROPEAN_PUT.value)
+
+    # Market price of strangle in the domestic currency
+    V_25D_MS = V_25D_C_MS + V_25D_P_MS
+
+    return K_25D_C_MS, K_25D_P_MS, V_25D_MS
+
+###############################################################################
+
+
+@njit(cache=True)
+def _smile_strike(s, t, rd, rf, option_type_value, vol_type_value,
+                  delta_target, delta_method_value, initialGuess, params):
+    """ Secant search for the strike at which the smile gives the target
+    delta. This is solver_for_smile_strike_fast with delta_fit called directly
+    rather than passed to newton_secant so that the calibration functions
+    that use it can be cached. Returns NaN if the search fails. """
+
+    inverseDeltaTarget = norminvcdf(np.abs(delta_target))
+
+    k0 = initialGuess
+    k1 = initialGuess * (1.0 + 1e-4) + 1e-4
+
+    q0 = delta_fit(k0, vol_type_value, s, t, rd, rf, option_type_value,
+                   delta_method_value, inverseDeltaTarget, params)
+    q1 = delta_fit(k1, vol_type_value, s, t, rd, rf, option_type_value,
+                   delta_method_value, inverseDeltaTarget, params)
+
+    for _ in range(0, 50):
+
+        if q1 == q0:
+            return (k0 + k1) / 2.0
+
+        k = k1 - q1 * (k1 - k0) / (q1 - q0)
+
+        if np.abs(k - k1) < 1e-8:
+            return k
+
+        k0, q0 = k1, q1
+        k1 = k
+        q1 = delta_fit(k1, vol_type_value, s, t, rd, rf, option_type_value,
+                       delta_method_value, inverseDeltaTarget, params)
+
+    return np.nan
+
+###############################################################################
+
+
+@njit(cache=True)
+def _rr_vol(params, s, t, rd, rf, f, K_25D_C_MS, K_25D_P_MS,
+            delta_method_value, vol_type_value):
+    """ Return the 25 delta risk reversal volatility of the smile. The
+    strikes are those at which the smile gives a delta of 25%. """
+
+    K_25D_C = _smile_strike(s, t, rd, rf, OptionTypes.EUROPEAN_CALL.value,
+                            vol_type_value, +0.2500, delta_method_value,
+                            K_25D_C_MS, params)
+
+    K_25D_P = _smile_strike(s, t, rd, rf, OptionTypes.EUROPEAN_PUT.value,
+                            vol_type_value, -0.2500, delta_method_value,
+                            K_25D_P_MS, params)
+
+    sigma_K_25D_C = vol_function(vol_type_value, params, f, K_25D_C, t)
+    sigma_K_25D_P = vol_function(vol_type_value, params, f, K_25D_P, t)
+
+    return sigma_K_25D_C - sigma_K_25D_P
+
+###############################################################################
+
+
+@njit(cache=True)
+def _fx_residuals(params, s, t, rd, rf, K_ATM, atm_vol,
+                  K_25D_C_MS, K_25D_P_MS, V_25D_MS_target,
+                  delta_method_value, targetRRVol, vol_type_value,
+                  res, jac):
+    """ Fill res with the ATM volatility, market strangle price and risk
+    reversal volatility errors which are the terms of obj_fast, and jac with
+    their derivatives. The first two use the analytical derivatives of the
+    volatility function. The risk reversal strikes move with the smile so
+    its derivatives are found by bumping the parameters. Return the sum of
+    the squared errors. """
+
+    f = s * np.exp((rd-rf)*t)
+    grad = np.zeros(len(params))
+
+    atm_curve_vol = vol_function_grad(vol_type_value, params, f, K_ATM, t,
+                                      jac[0])
+    res[0] = atm_curve_vol - atm_vol
+
+    sigma_K_25D_C_MS = vol_function_grad(vol_type_value, params, f,
+                                         K_25D_C_MS, t, jac[1])
+
+    sigma_K_25D_P_MS = vol_function_grad(vol_type_value, params, f,
+                                         K_25D_P_MS, t, grad)
+
+    V_25D_C_MS = bs_value(s, t, K_25D_C_MS, rd, rf, sigma_K_25D_C_MS,
+                          OptionTypes.EUROPEAN_CALL.value)
+
+    V_25D_P_MS = bs_value(s, t, K_25D_P_MS, rd, rf, sigma_K_25D_P_MS,
+                          OptionTypes.EUROPEAN_PUT.value)
+
+    vega_C = bs_vega(s, t, K_25D_C_MS, rd, rf, sigma_K_25D_C_MS,
+                     OptionTypes.EUROPEAN_CALL.value)
+
+    vega_P = bs_vega(s, t, K_25D_P_MS, rd, rf, sigma_K_25D_P_MS,
+                     OptionTypes.EUROPEAN_PUT.value)
+
+    res[1] = V_25D_C_MS + V_25D_P_MS - V_25D_MS_target
+    jac[1] = vega_C * jac[1] + vega_P * grad
+
+    rr_vol = _rr_vol(params, s, t, rd, rf, f, K_25D_C_MS, K_25D_P_MS,
+                     delta_method_value, vol_type_value)
+
+    res[2] = rr_vol - targetRRVol
+
+    bumped = params.copy()
+
+    for j in range(0, len(params)):
+        h = 1e-6 * (1.0 + abs(params[j]))
+        bumped[j] = params[j] + h
+        bumped_rr_vol = _rr_vol(bumped, s, t, rd, rf, f,
+                                K_25D_C_MS, K_25D_P_MS,
+                                delta_method_value, vol_type_value)
+        jac[2, j] = (bumped_rr_vol - rr_vol) / h
+        bumped[j] = params[j]
+
+    return res[0]**2 + res[1]**2 + res[2]**2
+
+###############################################################################
+
+
+@njit(cache=True)
+def _fit_fx_smile(x_init, s, t, rd, rf, K_ATM, atm_vol,
+                  K_25D_C_MS, K_25D_P_MS, V_25D_MS,
+                  delta_method_value, rr25DVol, vol_type_value,
+                  tol, max_iter):
+    """ Fit the smile at one tenor to the ATM, market strangle and risk
+    reversal quotes by Levenberg-Marquardt starting from x_init. """
+
+    num_params = len(x_init)
+
+    params = x_init.copy()
+    res = np.zeros(3)
+    jac = np.zeros((3, num_params))
+    trial_res = np.zeros(3)
+    trial_jac = np.zeros((3, num_params))
+
+    f = s * np.exp((rd-rf)*t)
+    strikes = np.array([K_ATM, K_25D_C_MS, K_25D_P_MS])
+
+    cost = _fx_residuals(params, s, t, rd, rf, K_ATM, atm_vol,
+                         K_25D_C_MS, K_25D_P_MS, V_25D_MS,
+                         delta_method_value, rr25DVol, vol_type_value,
+                         res, jac)
+
+    if not np.isfinite(cost):
+        raise FinError("Volatility function undefined at initial parameters")
+
+    lam = 1e-3
+
+    for _ in range(0, max_iter):
+
+        step = lm_step(jac, res, lam)
+        trial = params + step
+
+        if valid_vol_parameters(vol_type_value, trial, f, t, strikes):
+            trial_cost = _fx_residuals(trial, s, t, rd, rf, K_ATM, atm_vol,
+                                       K_25D_C_MS, K_25D_P_MS, V_25D_MS,
+                                       delta_method_value, rr25DVol,
+                                       vol_type_value, trial_res, trial_jac)
+        else:
+            trial_cost = np.inf
+
+        if np.isfinite(trial_cost) and trial_cost < cost:
+
+            converged = (cost - trial_cost <= tol * cost) or \
+                np.max(np.abs(step)) <= tol * (1.0 + np.max(np.abs(params)))
+
+            params[:] = trial
+            res[:] = trial_res
+            jac[:, :] = trial_jac
+            cost = trial_cost
+            lam = max(lam / 3.0, 1e-12)
+
+            if converged:
+                break
+
+        else:
+
+            lam *= 10.0
+            if lam > 1e10:
+                break
+
+    return params
+
+###############################################################################
+
+
+@njit(cache=True, parallel=True)
+def _fit_fx_smiles(x_inits, s, t_exps, rds, rfs, K_ATMs, atm_vols,
+                   K_25D_C_MSs, K_25D_P_MSs, V_25D_MSs,
+                   delta_method_value, rr25DVols, vol_type_value,
+                   tol, max_iter):
+    """ Fit the smile at each tenor. The tenors are fitted in parallel. """
+
+    num_tenors = len(t_exps)
+    params = np.zeros(x_inits.shape)
+
+    for i in prange(num_tenors):
+        params[i, :] = _fit_fx_smile(x_inits[i], s, t_exps[i], rds[i], rfs[i],
+                                     K_ATMs[i], atm_vols[i],
+                                     K_25D_C_MSs[i], K_25D_P_MSs[i],
+                                     V_25D_MSs[i], delta_method_value,
+                                     rr25DVols[i], vol_type_value,
+                                     tol, max_iter)
+
+    return params
+
+###############################################################################
+
+
 class FXVolSurface():
     """ Class to perform a calibration of a chosen parametrised surface to the
     prices of FX options at different strikes and expiry tenors. The 
     calibration inputs are the ATM and 25 Delta volatilities given in terms of
     the market strangle amd risk reversals. There is a choice of volatility
-    function ranging from polynomial in delta to a limited version of SABR. """
+    function ranging from polynomial in delta to a limited version of SABR.
+    The LEVENBERG_MARQUARDT solver fits all of the tenors in parallel. The
+    time taken by the last build of the surface is held in _build_time. """
 
     def __init__(self,
                  value_date: Date,
@@ -405,7 +640,8 @@ class FXVolSurface():
                  riskReversal25DeltaVols: (list, np.ndarray),
                  atmMethod: FinFXATMMethod = FinFXATMMethod.FWD_DELTA_NEUTRAL,
                  delta_method: FinFXDeltaMethod = FinFXDeltaMethod.SPOT_DELTA,
-                 volatility_function_type: VolFuncTypes = VolFuncTypes.CLARK):
+                 volatility_function_type: VolFuncTypes = VolFuncTypes.CLARK,
+                 finSolverType: FinSolverTypes = FinSolverTypes.CONJUGATE_GRADIENT):
         """ Create the FinFXVolSurface object by passing in market vol data
         for ATM and 25 Delta Market Strangles and Risk Reversals. """
 
@@ -465,7 +701,48 @@ class FXVolSurface():
             expiry_date = value_date.add_tenor(tenors[i])
             self._expiry_dates.append(expiry_date)
 
-        self.build_vol_surface()
+        self.build_vol_surface(finSolverType=finSolverType)
+
+###############################################################################
+
+    def recalibrate(self,
+                    spot_fx_rate: float = None,
+                    atm_vols: (list, np.ndarray) = None,
+                    mktStrangle25DeltaVols: (list, np.ndarray) = None,
+                    riskReversal25DeltaVols: (list, np.ndarray) = None,
+                    finSolverType: FinSolverTypes = None):
+        """ Refit the surface to a new spot FX rate and/or market quotes,
+        which are in percent as in the constructor, starting each tenor from
+        its parameters in the current calibration. This is quicker than a
+        build from scratch when the market has moved a little such as on a
+        spot tick. The solver used for the last build is used unless another
+        is given. """
+
+        if spot_fx_rate is not None:
+            self._spot_fx_rate = spot_fx_rate
+
+        if atm_vols is not None:
+            if len(atm_vols) != self._num_vol_curves:
+                raise FinError("Number ATM vols must equal number of tenors")
+            self._atm_vols = np.array(atm_vols)/100.0
+
+        if mktStrangle25DeltaVols is not None:
+            if len(mktStrangle25DeltaVols) != self._num_vol_curves:
+                raise FinError("Number MS25D vols must equal number of tenors")
+            self._mktStrangle25DeltaVols = \
+                np.array(mktStrangle25DeltaVols)/100.0
+
+        if riskReversal25DeltaVols is not None:
+            if len(riskReversal25DeltaVols) != self._num_vol_curves:
+                raise FinError("Number RR25D vols must equal number of tenors")
+            self._riskReversal25DeltaVols = \
+                np.array(riskReversal25DeltaVols)/100.0
+
+        if finSolverType is None:
+            finSolverType = self._finSolverType
+
+        self.build_vol_surface(finSolverType=finSolverType,
+                               x_inits=self._parameters.copy())
 
 ###############################################################################
 
@@ -539,7 +816,40 @@ class FXVolSurface():
 
 ###############################################################################
 
-    def build_vol_surface(self):
+    def volatility_array(self, strikes, expiry_dates):
+        """ Interpolate the Black-Scholes volatilities for arrays of strikes
+        and expiry dates in one call. The expiry dates can be a Date, a list of
+        Dates or a DateArray and are broadcast against the strikes. The values
+        are the same as those given by volatility but each
+        distinct expiry is bracketed once and the volatility function is
+        evaluated for all of the strikes in compiled code. """
+
+        return interpolate_vols(self._volatility_function_type,
+                                self._parameters,
+                                self._F0T,
+                                self._t_exp,
+                                self._value_date,
+                                strikes,
+                                expiry_dates)
+
+###############################################################################
+
+    def build_vol_surface(self,
+                          finSolverType=FinSolverTypes.CONJUGATE_GRADIENT,
+                          x_inits=None):
+        """ Fit the smile at each tenor. If x_inits is given it holds the
+        starting parameters for each tenor. The CONJUGATE_GRADIENT solver
+        fits each tenor in turn and the LEVENBERG_MARQUARDT solver fits the
+        tenors in parallel. """
+
+        start = time.time()
+
+        if finSolverType not in (FinSolverTypes.CONJUGATE_GRADIENT,
+                                 FinSolverTypes.LEVENBERG_MARQUARDT):
+            raise FinError("FX vol surface solver must be CONJUGATE_GRADIENT"
+                           " or LEVENBERG_MARQUARDT")
+
+        self._finSolverType = finSolverType
 
         s = self._spot_fx_rate
         num_vol_curves = self._num_vol_curves
@@ -612,9 +922,83 @@ class FXVolSurface():
         # THE ACTUAL COMPUTATION LOOP STARTS HERE
         #######################################################################
 
-        x_inits = []
+        if x_inits is None:
+            x_inits = self._initial_parameters()
+
+        delta_method_value = self._delta_method.value
+        vol_type_value = self._volatility_function_type.value
+
+        if finSolverType == FinSolverTypes.LEVENBERG_MARQUARDT:
+
+            for i in range(0, num_vol_curves):
+
+                (self._K_25D_C_MS[i], self._K_25D_P_MS[i],
+                 self._V_25D_MS[i]) = \
+                    _market_strangle(s, self._t_exp[i],
+                                     self._rd[i], self._rf[i],
+                                     self._atm_vols[i],
+                                     self._mktStrangle25DeltaVols[i],
+                                     delta_method_value)
+
+            self._parameters = _fit_fx_smiles(
+                np.array(x_inits, dtype=np.float64), s, self._t_exp,
+                self._rd, self._rf, self._K_ATM, self._atm_vols,
+                self._K_25D_C_MS, self._K_25D_P_MS, self._V_25D_MS,
+                delta_method_value, self._riskReversal25DeltaVols,
+                vol_type_value, LM_TOLERANCE, LM_MAX_ITERATIONS)
+
+            for i in range(0, num_vol_curves):
+
+                t = self._t_exp[i]
+                rd = self._rd[i]
+                rf = self._rf[i]
+                params = self._parameters[i]
+
+                self._K_25D_C[i] = solver_for_smile_strike_fast(
+                    s, t, rd, rf, OptionTypes.EUROPEAN_CALL.value,
+                    vol_type_value, +0.2500, delta_method_value,
+                    self._K_25D_C_MS[i], params)
+
+                self._K_25D_P[i] = solver_for_smile_strike_fast(
+                    s, t, rd, rf, OptionTypes.EUROPEAN_PUT.value,
+                    vol_type_value, -0.2500, delta_method_value,
+                    self._K_25D_P_MS[i], params)
+
+            self._build_time = time.time() - start
+            return
+
         for i in range(0, num_vol_curves):
 
+            t = self._t_exp[i]
+            rd = self._rd[i]
+            rf = self._rf[i]
+            K_ATM = self._K_ATM[i]
+            atm_vol = self._atm_vols[i]
+            ms25DVol = self._mktStrangle25DeltaVols[i]
+            rr25DVol = self._riskReversal25DeltaVols[i]
+
+#            print(t, rd, rf, K_ATM, atm_vol, ms25DVol, rr25DVol)
+
+            res = solve_to_horizon_fast(s, t, rd, rf, K_ATM,
+                                        atm_vol, ms25DVol, rr25DVol,
+                                        delta_method_value, vol_type_value,
+                                        x_inits[i])
+
+            (self._parameters[i, :],
+             self._K_25D_C_MS[i], self._K_25D_P_MS[i],
+             self._K_25D_C[i], self._K_25D_P[i]) = res
+
+        self._build_time = time.time() - start
+
+###############################################################################
+
+    def _initial_parameters(self):
+        """ Starting parameters for each tenor found from the ATM, 25 delta
+        market strangle and risk reversal quotes. """
+
+        x_inits = []
+        for i in range(0, self._num_vol_curves):
+
             atm_vol = self._atm_vols[i]
             ms25 = self._mktStrangle25DeltaVols[i]
             rr25 = self._riskReversal25DeltaVols[i]
@@ -676,29 +1060,7 @@ class FXVolSurface():
 
             x_inits.append(x_init)
 
-        delta_method_value = self._delta_method.value
-        vol_type_value = self._volatility_function_type.value
-
-        for i in range(0, num_vol_curves):
-
-            t = self._t_exp[i]
-            rd = self._rd[i]
-            rf = self._rf[i]
-            K_ATM = self._K_ATM[i]
-            atm_vol = self._atm_vols[i]
-            ms25DVol = self._mktStrangle25DeltaVols[i]
-            rr25DVol = self._riskReversal25DeltaVols[i]
-
-#            print(t, rd, rf, K_ATM, atm_vol, ms25DVol, rr25DVol)
-
-            res = solve_to_horizon_fast(s, t, rd, rf, K_ATM,
-                                        atm_vol, ms25DVol, rr25DVol,
-                                        delta_method_value, vol_type_value,
-                                        x_inits[i])
-
-            (self._parameters[i, :],
-             self._K_25D_C_MS[i], self._K_25D_P_MS[i],
-             self._K_25D_C[i], self._K_25D_P[i]) = res
+        return x_inits
 
 ###############################################################################
 
@@ -1135,6 +1497,7 @@ class FXVolSurface():
         s += label_to_string("ATM METHOD", self._atmMethod)
         s += label_to_string("DELTA METHOD", self._delta_method)
         s += label_to_string("VOL FUNCTION", self._volatility_function_type)
+        s += label_to_string("BUILD TIME", self._build_time)
 
         for i in range(0, self._num_vol_curves):
 
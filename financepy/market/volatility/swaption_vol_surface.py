@@ -2,6 +2,8 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import time
+
 import numpy as np
 from scipy.optimize import minimize
 
@@ -9,7 +11,7 @@ import matplotlib.pyplot as plt
 from numba import jit, njit, float64, int64
 
 from ...utils.error import FinError
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.global_vars import gDaysInYear
 from ...utils.global_types import OptionTypes
 from ...products.fx.fx_vanilla_option import FXVanillaOption
@@ -42,6 +44,10 @@ from ...utils.solver_1d import newton_secant
 from ...utils.solver_nm import nelder_mead
 from ...utils.global_types import FinSolverTypes
 
+from .vol_calibration import calibrate_vol_smiles
+from .vol_calibration import initial_vol_parameters
+from .vol_interpolation import interpolate_vols
+
 ###############################################################################
 # ISSUES
 # sabr does not fit inverted skew discount like eurjpy
@@ -388,11 +394,14 @@ class SwaptionVolSurface():
     prices of swaptions at different expiry dates and swap tenors. There is a 
     choice of volatility function from cubic in delta to full SABR and SSVI. 
     Check out VolFuncTypes. Visualising the volatility curve is useful.
-    Also, there is no guarantee that the implied pdf will be positive."""
+    Also, there is no guarantee that the implied pdf will be positive.
+    The LEVENBERG_MARQUARDT solver fits all of the expiries in parallel using
+    the analytical derivatives of the volatility function. The time taken by
+    the last build of the surface is held in _build_time."""
 
     def __init__(self,
                  value_date: Date,
-                 expiry_dates: (list),
+                 expiry_dates: (list, DateArray),
                  fwd_swap_rates: (list, np.ndarray),
                  strike_grid: (np.ndarray),
                  volatility_grid: (np.ndarray),
@@ -435,6 +444,46 @@ class SwaptionVolSurface():
 
         self._build_vol_surface(finSolverType=finSolverType)
 
+###############################################################################
+
+    def recalibrate(self,
+                    fwd_swap_rates: (list, np.ndarray) = None,
+                    strike_grid: (np.ndarray) = None,
+                    volatility_grid: (np.ndarray) = None,
+                    finSolverType: FinSolverTypes = None):
+        """ Refit the surface to new forward swap rates and/or market strikes
+        and vols starting each expiry from its parameters in the current
+        calibration. When the market has moved a little since the last build
+        this takes far fewer iterations than a build from scratch. The solver
+        used for the last build is used unless another is given. """
+
+        if fwd_swap_rates is not None:
+
+            if len(fwd_swap_rates) != self._numExpiryDates:
+                raise FinError("Forward swap rates not same size as expiries")
+
+            self._fwd_swap_rates = fwd_swap_rates
+
+        if strike_grid is not None:
+
+            if strike_grid.shape != self._strike_grid.shape:
+                raise FinError("Strike grid has changed shape")
+
+            self._strike_grid = strike_grid
+
+        if volatility_grid is not None:
+
+            if volatility_grid.shape != self._volatility_grid.shape:
+                raise FinError("Volatility grid has changed shape")
+
+            self._volatility_grid = volatility_grid
+
+        if finSolverType is None:
+            finSolverType = self._finSolverType
+
+        self._build_vol_surface(finSolverType=finSolverType,
+                                x_inits=self._parameters.copy())
+
 ###############################################################################
 
     def volatility_from_strike_date(self, K, expiry_date):
@@ -519,6 +568,24 @@ class SwaptionVolSurface():
 
         return volt
 
+###############################################################################
+
+    def volatility_from_strike_date_array(self, strikes, expiry_dates):
+        """ Interpolate the Black-Scholes volatilities for arrays of strikes
+        and expiry dates in one call. The expiry dates can be a Date, a list of
+        Dates or a DateArray and are broadcast against the strikes. The values
+        are the same as those given by volatility_from_strike_date but each
+        distinct expiry is bracketed once and the volatility function is
+        evaluated for all of the strikes in compiled code. """
+
+        return interpolate_vols(self._volatility_function_type,
+                                self._parameters,
+                                self._fwd_swap_rates,
+                                self._t_exp,
+                                self._value_date,
+                                strikes,
+                                expiry_dates)
+
 ###############################################################################
 
     # def delta_to_strike(self, call_delta, expiry_date, delta_method):
@@ -734,8 +801,12 @@ class SwaptionVolSurface():
 
 ###############################################################################
 
-    def _build_vol_surface(self, finSolverType=FinSolverTypes.NELDER_MEAD):
-        """ Main function to construct the vol surface. """
+    def _build_vol_surface(self, finSolverType=FinSolverTypes.NELDER_MEAD,
+                           x_inits=None):
+        """ Main function to construct the vol surface. If x_inits is given it
+        holds the starting parameters for each expiry. """
+
+        start = time.time()
 
         if self._volatility_function_type == VolFuncTypes.CLARK:
             num_parameters = 3
@@ -778,9 +849,36 @@ class SwaptionVolSurface():
 
         vol_type_value = self._volatility_function_type.value
 
-        x_inits = []
-        x_init = np.zeros(num_parameters)
-        x_inits.append(x_init)
+        self._finSolverType = finSolverType
+
+        if finSolverType == FinSolverTypes.LEVENBERG_MARQUARDT:
+
+            # The grids are indexed by strike and then expiry
+            strikes = np.array(self._strike_grid, dtype=np.float64).T
+            volatility_grid = np.array(self._volatility_grid,
+                                       dtype=np.float64).T
+
+            if x_inits is None:
+                x_inits = np.zeros([numExpiryDates, num_parameters])
+                for i in range(0, numExpiryDates):
+                    f = self._fwd_swap_rates[i]
+                    atm_vol = np.interp(f, strikes[i], volatility_grid[i])
+                    x_inits[i] = initial_vol_parameters(
+                        self._volatility_function_type, num_parameters,
+                        f, self._t_exp[i], atm_vol)
+
+            self._parameters = calibrate_vol_smiles(
+                self._volatility_function_type, x_inits,
+                self._fwd_swap_rates, self._t_exp, strikes, volatility_grid)
+
+            self._build_time = time.time() - start
+            return
+
+        if x_inits is None:
+            x_inits = [np.zeros(num_parameters)]
+            warm_start = False
+        else:
+            warm_start = True
 
         for i in range(0, numExpiryDates):
 
@@ -797,8 +895,10 @@ class SwaptionVolSurface():
 
             self._parameters[i, :] = res
 
-            x_init = res
-            x_inits.append(x_init)
+            if warm_start is False:
+                x_inits.append(res)
+
+        self._build_time = time.time() - start
 
 ###############################################################################
 
@@ -941,6 +1041,7 @@ class SwaptionVolSurface():
         s += label_to_string("ATM METHOD", self._atmMethod)
         s += label_to_string("DELTA METHOD", self._delta_method)
         s += label_to_string("VOL FUNCTION", self._volatility_function_type)
+        s += label_to_string("BUILD TIME", self._build_time)
 
         for i in range(0, self._numExpiryDates):
 
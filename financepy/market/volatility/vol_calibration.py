@@ -0,0 +1,277 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit, prange, float64, int64
+
+from ...utils.error import FinError
+from ...models.volatility_fns import VolFuncTypes
+from ...models.volatility_fns import vol_function_clark_grad
+from ...models.volatility_fns import vol_function_bloomberg_grad
+from ...models.volatility_fns import vol_function_svi_grad
+from ...models.sabr import vol_function_sabr_grad
+from ...models.sabr import vol_function_sabr_beta_one_grad
+from ...models.sabr import vol_function_sabr_beta_half_grad
+
+###############################################################################
+# The vol surfaces fit a parametric smile to each expiry by minimising the
+# squared differences between the fitted and market volatilities. The smiles
+# at different expiries do not depend on each other so they are fitted in
+# parallel. Each fit is a Levenberg-Marquardt least squares search that uses
+# the analytical derivatives of the volatility function with respect to its
+# parameters. The fitting functions and the gradient functions that they call
+# are not compiled with fastmath as a trial step that takes the volatility
+# function outside its domain produces a NaN which must be detected so that
+# the step can be rejected. With fastmath the compiler may assume that there
+# are no NaNs.
+###############################################################################
+
+LM_TOLERANCE = 1e-10
+LM_MAX_ITERATIONS = 200
+
+###############################################################################
+
+
+def vol_function_grad_supported(vol_function_type):
+    """ Return True if the volatility function has analytical parameter
+    derivatives so that it can be fitted with the Levenberg-Marquardt
+    calibration. """
+
+    return vol_function_type in (VolFuncTypes.CLARK,
+                                 VolFuncTypes.CLARK5,
+                                 VolFuncTypes.BBG,
+                                 VolFuncTypes.SVI,
+                                 VolFuncTypes.SABR,
+                                 VolFuncTypes.SABR_BETA_HALF,
+                                 VolFuncTypes.SABR_BETA_ONE)
+
+###############################################################################
+
+
+@njit(float64(int64, float64[:], float64, float64, float64, float64[:]),
+      cache=True)
+def vol_function_grad(vol_function_type_value, params, f, k, t, grad):
+    """ Return the volatility for a strike and write its derivatives with
+    respect to the parameters of the volatility function into grad. """
+
+    if vol_function_type_value == VolFuncTypes.CLARK.value:
+        return vol_function_clark_grad(params, f, k, t, grad)
+    elif vol_function_type_value == VolFuncTypes.SABR_BETA_ONE.value:
+        return vol_function_sabr_beta_one_grad(params, f, k, t, grad)
+    elif vol_function_type_value == VolFuncTypes.SABR_BETA_HALF.value:
+        return vol_function_sabr_beta_half_grad(params, f, k, t, grad)
+    elif vol_function_type_value == VolFuncTypes.BBG.value:
+        return vol_function_bloomberg_grad(params, f, k, t, grad)
+    elif vol_function_type_value == VolFuncTypes.SABR.value:
+        return vol_function_sabr_grad(params, f, k, t, grad)
+    elif vol_function_type_value == VolFuncTypes.CLARK5.value:
+        return vol_function_clark_grad(params, f, k, t, grad)
+    elif vol_function_type_value == VolFuncTypes.SVI.value:
+        return vol_function_svi_grad(params, f, k, t, grad)
+    else:
+        raise FinError("No analytical gradient for this volatility function")
+
+###############################################################################
+
+
+def initial_vol_parameters(vol_function_type, num_parameters, f, t, atm_vol):
+    """ Return a starting point for the parameters of a volatility function
+    which gives a flat smile at the at-the-money volatility. It is used when
+    there is no previous calibration from which to start. """
+
+    x_init = np.zeros(num_parameters)
+
+    if vol_function_type in (VolFuncTypes.CLARK, VolFuncTypes.CLARK5):
+        x_init[0] = np.log(atm_vol)
+    elif vol_function_type == VolFuncTypes.BBG:
+        x_init[-1] = atm_vol
+    elif vol_function_type == VolFuncTypes.SABR:
+        x_init[0] = atm_vol * np.sqrt(f)
+        x_init[1] = 0.50
+        x_init[3] = 0.50
+    elif vol_function_type == VolFuncTypes.SABR_BETA_HALF:
+        x_init[0] = atm_vol * np.sqrt(f)
+        x_init[2] = 0.50
+    elif vol_function_type == VolFuncTypes.SABR_BETA_ONE:
+        x_init[0] = atm_vol
+        x_init[2] = 0.50
+    elif vol_function_type == VolFuncTypes.SVI:
+        # The total variance at the money is a + b * sigma and the smile
+        # width in log strike is scaled by the ATM standard deviation
+        x_init[0] = 0.5 * atm_vol * atm_vol * t
+        x_init[1] = 0.5 * atm_vol * np.sqrt(t)
+        x_init[4] = atm_vol * np.sqrt(t)
+    else:
+        raise FinError("No analytical gradient for this volatility function")
+
+    return x_init
+
+###############################################################################
+
+
+@njit(cache=True)
+def lm_step(jac, res, lam):
+    """ Return the Levenberg-Marquardt step for the residuals res with the
+    Jacobian jac. The diagonal of the normal equations is scaled by 1 + lam
+    with a floor so that a parameter that does not move the residuals
+    does not make the system singular. """
+
+    num_params = jac.shape[1]
+
+    a = jac.T @ jac
+    g = jac.T @ res
+
+    for i in range(0, num_params):
+        a[i, i] += lam * max(a[i, i], 1e-12)
+
+    return -np.linalg.solve(a, g)
+
+###############################################################################
+
+
+@njit(cache=True)
+def valid_vol_parameters(vol_type_value, params, f, t, strikes):
+    """ Return False if the parameters are outside the region in which the
+    volatility function is defined at the strikes. The fit rejects any step
+    that leaves it. """
+
+    if vol_type_value == VolFuncTypes.SABR.value:
+        return params[0] > 0.0 and abs(params[2]) < 1.0 and params[3] != 0.0
+    elif vol_type_value == VolFuncTypes.SABR_BETA_HALF.value or \
+            vol_type_value == VolFuncTypes.SABR_BETA_ONE.value:
+        return params[0] > 0.0 and abs(params[1]) < 1.0 and params[2] != 0.0
+    elif vol_type_value == VolFuncTypes.SVI.value:
+        # The total variance must be positive at each strike
+        a, b, rho, m, sigma = params[0], params[1], params[2], params[3], \
+            params[4]
+        if sigma == 0.0:
+            return False
+        for k in strikes:
+            xm = np.log(f/k) - m
+            if a + b * (rho * xm + np.sqrt(xm * xm + sigma * sigma)) <= 0.0:
+                return False
+
+    return True
+
+###############################################################################
+
+
+@njit(cache=True)
+def _smile_residuals(vol_type_value, params, f, t, strikes, mkt_vols,
+                     res, jac):
+    """ Fill res with the fitted less the market volatilities and jac with
+    their derivatives. Return the sum of squared residuals. """
+
+    cost = 0.0
+    for j in range(0, len(strikes)):
+        res[j] = vol_function_grad(vol_type_value, params, f, strikes[j], t,
+                                   jac[j]) - mkt_vols[j]
+        cost += res[j] * res[j]
+
+    return cost
+
+###############################################################################
+
+
+@njit(cache=True)
+def fit_smile(vol_type_value, x_init, f, t, strikes, mkt_vols,
+              tol, max_iter):
+    """ Fit the parameters of a volatility function to the market volatility
+    smile at one expiry using Levenberg-Marquardt starting from x_init. """
+
+    num_strikes = len(strikes)
+    num_params = len(x_init)
+
+    params = x_init.copy()
+    res = np.zeros(num_strikes)
+    jac = np.zeros((num_strikes, num_params))
+    trial_res = np.zeros(num_strikes)
+    trial_jac = np.zeros((num_strikes, num_params))
+
+    cost = _smile_residuals(vol_type_value, params, f, t, strikes, mkt_vols,
+                            res, jac)
+
+    if not np.isfinite(cost):
+        raise FinError("Volatility function undefined at initial parameters")
+
+    lam = 1e-3
+
+    for _ in range(0, max_iter):
+
+        step = lm_step(jac, res, lam)
+        trial = params + step
+
+        if valid_vol_parameters(vol_type_value, trial, f, t, strikes):
+            trial_cost = _smile_residuals(vol_type_value, trial, f, t,
+                                          strikes, mkt_vols,
+                                          trial_res, trial_jac)
+        else:
+            trial_cost = np.inf
+
+        if np.isfinite(trial_cost) and trial_cost < cost:
+
+            converged = (cost - trial_cost <= tol * cost) or \
+                np.max(np.abs(step)) <= tol * (1.0 + np.max(np.abs(params)))
+
+            params[:] = trial
+            res[:] = trial_res
+            jac[:, :] = trial_jac
+            cost = trial_cost
+            lam = max(lam / 3.0, 1e-12)
+
+            if converged:
+                break
+
+        else:
+
+            lam *= 10.0
+            if lam > 1e10:
+                break
+
+    return params
+
+###############################################################################
+
+
+@njit(cache=True, parallel=True)
+def fit_smiles(vol_type_value, x_inits, fwds, t_exps, strikes, mkt_vols,
+               tol, max_iter):
+    """ Fit the parameters of a volatility function to the market volatility
+    smile at each expiry. The strikes and market volatilities are indexed by
+    expiry and then strike. The expiries are fitted in parallel. """
+
+    num_expiries = len(t_exps)
+    params = np.zeros(x_inits.shape)
+
+    for i in prange(num_expiries):
+        params[i, :] = fit_smile(vol_type_value, x_inits[i], fwds[i],
+                                 t_exps[i], strikes[i], mkt_vols[i],
+                                 tol, max_iter)
+
+    return params
+
+###############################################################################
+
+
+def calibrate_vol_smiles(vol_function_type, x_inits, fwds, t_exps,
+                         strikes, mkt_vols,
+                         tol=LM_TOLERANCE, max_iter=LM_MAX_ITERATIONS):
+    """ Calibrate a volatility surface one smile per expiry and return the
+    parameters with one row per expiry. The strikes and market volatilities
+    are two-dimensional arrays indexed by expiry and then strike. The starting
+    parameters x_inits have one row per expiry and are either the result of a
+    previous calibration or given by initial_vol_parameters. """
+
+    if vol_function_grad_supported(vol_function_type) is False:
+        raise FinError("Levenberg-Marquardt calibration is not available for "
+                       + str(vol_function_type))
+
+    x_inits = np.array(x_inits, dtype=np.float64)
+    fwds = np.array(fwds, dtype=np.float64)
+    t_exps = np.array(t_exps, dtype=np.float64)
+    strikes = np.array(strikes, dtype=np.float64)
+    mkt_vols = np.array(mkt_vols, dtype=np.float64)
+
+    return fit_smiles(vol_function_type.value, x_inits, fwds, t_exps,
+                      strikes, mkt_vols, tol, max_iter)
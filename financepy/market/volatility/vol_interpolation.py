@@ -0,0 +1,191 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit, prange, float64, int64
+
+from ...utils.error import FinError
+from ...utils.date import Date, DateArray
+from ...utils.global_vars import gDaysInYear
+
+from ...models.volatility_fns import VolFuncTypes
+from ...models.volatility_fns import vol_function_clark
+from ...models.volatility_fns import vol_function_bloomberg
+from ...models.volatility_fns import vol_function_svi
+from ...models.volatility_fns import vol_function_ssvi
+from ...models.sabr import vol_function_sabr
+from ...models.sabr import vol_function_sabr_beta_one
+from ...models.sabr import vol_function_sabr_beta_half
+
+###############################################################################
+# Looking up the volatilities of a book of options one at a time on a vol
+# surface repeats the search for the bracketing expiries and the dispatch to
+# the volatility function for every option. Here the expiry times are
+# bracketed once for each distinct expiry and the volatility function is then
+# evaluated for all of the strikes in a single compiled loop. The result is
+# interpolated linearly in variance x time between the bracketing expiries as
+# is done by the scalar lookups on the vol surfaces.
+###############################################################################
+
+NEGATIVE_VARIANCE = -1.0
+
+###############################################################################
+
+
+@njit(float64(int64, float64[:], float64, float64, float64),
+      cache=True, fastmath=True)
+def vol_function(vol_function_type_value, params, f, k, t):
+    """ Return the volatility for a strike using the parametric volatility
+    function given by its type value. """
+
+    if vol_function_type_value == VolFuncTypes.CLARK.value:
+        vol = vol_function_clark(params, f, k, t)
+        return vol
+    elif vol_function_type_value == VolFuncTypes.SABR_BETA_ONE.value:
+        vol = vol_function_sabr_beta_one(params, f, k, t)
+        return vol
+    elif vol_function_type_value == VolFuncTypes.SABR_BETA_HALF.value:
+        vol = vol_function_sabr_beta_half(params, f, k, t)
+        return vol
+    elif vol_function_type_value == VolFuncTypes.BBG.value:
+        vol = vol_function_bloomberg(params, f, k, t)
+        return vol
+    elif vol_function_type_value == VolFuncTypes.SABR.value:
+        vol = vol_function_sabr(params, f, k, t)
+        return vol
+    elif vol_function_type_value == VolFuncTypes.CLARK5.value:
+        vol = vol_function_clark(params, f, k, t)
+        return vol
+    elif vol_function_type_value == VolFuncTypes.SVI.value:
+        vol = vol_function_svi(params, f, k, t)
+        return vol
+    elif vol_function_type_value == VolFuncTypes.SSVI.value:
+        vol = vol_function_ssvi(params, f, k, t)
+        return vol
+    else:
+        return 0.0
+
+###############################################################################
+
+
+def bracket_expiries(t_exps, times):
+    """ Return the indices of the expiries that bracket each time. Times
+    before the first expiry or after the last expiry are given the same
+    index for both so that the volatility is flat in time there. """
+
+    num_curves = len(t_exps)
+
+    if num_curves == 1:
+        index0s = np.zeros(len(times), dtype=np.int64)
+        return index0s, index0s.copy()
+
+    # For t_exps[i-1] < t <= t_exps[i] this returns i
+    index1s = np.searchsorted(t_exps, times, side='left').astype(np.int64)
+    index0s = index1s - 1
+
+    below = times <= t_exps[0]
+    index0s[below] = 0
+    index1s[below] = 0
+
+    above = times >= t_exps[-1]
+    index0s[above] = num_curves - 1
+    index1s[above] = num_curves - 1
+
+    return index0s, index1s
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _interpolate_vols(vol_type_value, parameters, fwds, t_exps,
+                      strikes, times, time_index, index0s, index1s):
+    """ Return the volatility for each strike and time. The times are the
+    distinct expiry times and time_index maps each strike to its time. A
+    negative variance is flagged by returning NEGATIVE_VARIANCE. """
+
+    num_options = len(strikes)
+    vols = np.zeros(num_options)
+
+    for j in prange(num_options):
+
+        i = time_index[j]
+        t = times[i]
+        index0 = index0s[i]
+        index1 = index1s[i]
+        k = strikes[j]
+
+        t0 = t_exps[index0]
+        t1 = t_exps[index1]
+
+        vol0 = vol_function(vol_type_value, parameters[index0],
+                            fwds[index0], k, t0)
+
+        if index1 != index0:
+            vol1 = vol_function(vol_type_value, parameters[index1],
+                                fwds[index1], k, t1)
+        else:
+            vol1 = vol0
+
+        if abs(t1 - t0) > 1e-6:
+
+            vart0 = vol0 * vol0 * t0
+            vart1 = vol1 * vol1 * t1
+            vart = ((t - t0) * vart1 + (t1 - t) * vart0) / (t1 - t0)
+
+            if vart < 0.0:
+                vols[j] = NEGATIVE_VARIANCE
+            else:
+                vols[j] = np.sqrt(vart / t)
+
+        else:
+            vols[j] = vol1
+
+    return vols
+
+###############################################################################
+
+
+def interpolate_vols(vol_function_type, parameters, fwds, t_exps,
+                     value_date, strikes, expiry_dates):
+    """ Return the Black-Scholes volatilities for arrays of strikes and expiry
+    dates from the calibrated smiles of a vol surface. The parameters have one
+    row per expiry and fwds and t_exps give the forward and the time of each
+    expiry. The expiry dates can be a Date, a list of Dates or a DateArray.
+    The strikes and expiry times are broadcast against each other so a column
+    of strikes and a list of expiry dates gives a grid of volatilities. """
+
+    if isinstance(expiry_dates, Date):
+        times = np.array([(expiry_dates - value_date) / gDaysInYear])
+    else:
+        times = (DateArray(expiry_dates) - value_date) / gDaysInYear
+
+    strikes = np.asarray(strikes, dtype=np.float64)
+
+    if strikes.ndim == 0:
+        strikes = strikes.reshape(1)
+
+    strikes, times = np.broadcast_arrays(strikes, times)
+    shape = strikes.shape
+
+    unique_times, time_index = np.unique(times.ravel(), return_inverse=True)
+
+    t_exps = np.asarray(t_exps, dtype=np.float64)
+    index0s, index1s = bracket_expiries(t_exps, unique_times)
+
+    vols = _interpolate_vols(vol_function_type.value,
+                             np.ascontiguousarray(parameters,
+                                                  dtype=np.float64),
+                             np.asarray(fwds, dtype=np.float64),
+                             t_exps,
+                             np.ascontiguousarray(strikes.ravel()),
+                             unique_times,
+                             time_index.astype(np.int64),
+                             index0s, index1s)
+
+    if np.any(vols == NEGATIVE_VARIANCE):
+        raise FinError("Negative variance.")
+
+    return vols.reshape(shape)
+
+###############################################################################
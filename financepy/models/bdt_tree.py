@@ -8,9 +8,12 @@ from numba import njit, float64, int64
 from ..utils.error import FinError
 from ..utils.math import accrued_interpolator
 from ..market.curves.interpolator import InterpTypes, _uinterpolate
-from ..utils.helpers import label_to_string
+from ..utils.helpers import label_to_string, stack_ragged
 from ..utils.global_types import FinExerciseTypes
 from ..utils.global_vars import gSmall
+from .tree_cache import TreeCache
+from .tree_portfolio_flows import bermudan_swaption_portfolio_flows
+from .tree_portfolio_flows import callable_puttable_bond_portfolio_flows
 
 INTERP_TYPE = InterpTypes.FLAT_FWD_RATES.value
 
@@ -572,6 +575,180 @@ def callable_puttable_bond_tree_fast(cpn_times, cpn_flows,
 ###############################################################################
 
 
+###############################################################################
+# The portfolio versions below value many trades on the same tree with a
+# single backward induction. The values of all of the trades at one time
+# step are held with a row for each node and a column for each trade so that
+# the trades are rolled back together.
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def bermudan_swaption_portfolio_tree_fast(face_amounts,
+                                          fixed_leg_flows, float_leg_values,
+                                          accrued, exercise_masks,
+                                          maturity_steps,
+                                          _Q, _rt, _dt):
+    """ Value a portfolio of Bermudan swaptions mapped onto the tree by
+    bermudan_swaption_portfolio_flows in one backward induction. Each trade
+    starts at its own maturity step and can be exercised at the tree steps
+    where its exercise mask is True. The payer and receiver values of the
+    trades are returned as two vectors. """
+
+    pu = 0.50
+    pd = 0.50
+
+    num_trades = len(maturity_steps)
+    _, num_nodes = _Q.shape
+
+    # The values at this time step and at the next one with a row per node
+    fixed_leg_values = np.zeros((num_nodes, num_trades))
+    pay_values = np.zeros((num_nodes, num_trades))
+    rec_values = np.zeros((num_nodes, num_trades))
+    next_fixed_leg_values = np.zeros((num_nodes, num_trades))
+    next_pay_values = np.zeros((num_nodes, num_trades))
+    next_rec_values = np.zeros((num_nodes, num_trades))
+
+    for m in range(np.max(maturity_steps), -1, -1):
+
+        nm = m
+
+        for k in range(0, nm+1):
+            rt = _rt[m, k]
+            df = np.exp(- rt * _dt)
+
+            for j in range(0, num_trades):
+
+                if m >= maturity_steps[j]:
+                    continue
+
+                flow = fixed_leg_flows[j, m] * face_amounts[j]
+
+                vu = next_fixed_leg_values[k+1, j]
+                vd = next_fixed_leg_values[k, j]
+                v = (pu*vu + pd*vd) * df
+                fixed_leg_values[k, j] = v + flow
+
+                vu = next_pay_values[k+1, j]
+                vd = next_pay_values[k, j]
+                hold_pay = (pu*vu + pd*vd) * df
+
+                vu = next_rec_values[k+1, j]
+                vd = next_rec_values[k, j]
+                hold_rec = (pu*vu + pd*vd) * df
+
+                pay_values[k, j] = hold_pay
+                rec_values[k, j] = hold_rec
+
+                if exercise_masks[j, m]:
+
+                    # The floating value is clean and so must be the fixed
+                    fixed_leg_value = fixed_leg_values[k, j] - accrued[j, m]
+                    float_leg_value = float_leg_values[j, m]
+
+                    pay_exercise = max(float_leg_value - fixed_leg_value, 0.0)
+                    rec_exercise = max(fixed_leg_value - float_leg_value, 0.0)
+
+                    pay_values[k, j] = max(pay_exercise, hold_pay)
+                    rec_values[k, j] = max(rec_exercise, hold_rec)
+
+        # Trades start with the value of the fixed leg at their maturity
+        for j in range(0, num_trades):
+            if m == maturity_steps[j]:
+                flow = 1.0 + fixed_leg_flows[j, m]
+                for k in range(0, num_nodes):
+                    fixed_leg_values[k, j] = flow * face_amounts[j]
+                    pay_values[k, j] = 0.0
+                    rec_values[k, j] = 0.0
+
+        fixed_leg_values, next_fixed_leg_values = \
+            next_fixed_leg_values, fixed_leg_values
+        pay_values, next_pay_values = next_pay_values, pay_values
+        rec_values, next_rec_values = next_rec_values, rec_values
+
+    return next_pay_values[0, :].copy(), next_rec_values[0, :].copy()
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def callable_puttable_bond_portfolio_tree_fast(face_amounts, tree_flows,
+                                               accrued, tree_call_values,
+                                               tree_put_values,
+                                               maturity_steps,
+                                               _Q, _rt, _dt):
+    """ Value a portfolio of bonds with embedded puts and calls mapped onto
+    the tree by callable_puttable_bond_portfolio_flows in one backward
+    induction. The values of the bonds with and without the options are
+    returned as two vectors. """
+
+    pu = 0.50
+    pd = 0.50
+
+    num_trades = len(maturity_steps)
+    _, num_nodes = _Q.shape
+    dt = _dt
+
+    # The values at this time step and at the next one with a row per node
+    bond_values = np.zeros((num_nodes, num_trades))
+    call_put_bond_values = np.zeros((num_nodes, num_trades))
+    next_bond_values = np.zeros((num_nodes, num_trades))
+    next_call_put_bond_values = np.zeros((num_nodes, num_trades))
+
+    for m in range(np.max(maturity_steps), -1, -1):
+
+        nm = m
+
+        for k in range(0, nm+1):
+            rt = _rt[m, k]
+            df = np.exp(-rt*dt)
+
+            for j in range(0, num_trades):
+
+                if m >= maturity_steps[j]:
+                    continue
+
+                flow = tree_flows[j, m] * face_amounts[j]
+                vcall = tree_call_values[j, m]
+                vput = tree_put_values[j, m]
+
+                vu = next_bond_values[k+1, j]
+                vd = next_bond_values[k, j]
+                v = (pu*vu + pd*vd) * df
+                bond_values[k, j] = v + flow
+
+                vu = next_call_put_bond_values[k+1, j]
+                vd = next_call_put_bond_values[k, j]
+                vhold = (pu*vu + pd*vd) * df
+                # Need to make add on coupons paid if we hold
+                vhold = vhold + flow
+                value = min(max(vhold - accrued[j, m], vput), vcall) \
+                    + accrued[j, m]
+                call_put_bond_values[k, j] = value
+
+        # Bonds start with their value at maturity
+        for j in range(0, num_trades):
+            if m == maturity_steps[j]:
+                vcall = tree_call_values[j, m]
+                vput = tree_put_values[j, m]
+                vhold = (1.0 + tree_flows[j, m]) * face_amounts[j]
+                vclean = vhold - accrued[j, m]
+                value = min(max(vclean, vput), vcall) + accrued[j, m]
+
+                for k in range(0, num_nodes):
+                    bond_values[k, j] = vhold
+                    call_put_bond_values[k, j] = value
+
+        bond_values, next_bond_values = next_bond_values, bond_values
+        call_put_bond_values, next_call_put_bond_values = \
+            next_call_put_bond_values, call_put_bond_values
+
+    return (next_call_put_bond_values[0, :].copy(),
+            next_bond_values[0, :].copy())
+
+###############################################################################
+
+
 @njit(cache=True, fastmath=True)
 def build_tree_fast(sigma, tree_times, num_time_steps, discount_factors):
     # Unlike the BK and HW Trinomial trees, this Tree is packed into the lower
@@ -642,12 +819,20 @@ def build_tree_fast(sigma, tree_times, num_time_steps, discount_factors):
 
 class BDTTree():
 
+    # Attributes which determine the tree and which hold the built tree
+    _tree_param_names = ('_sigma',)
+    _tree_state_names = ('_tree_times', '_df_times', '_dfs', '_Q', '_rt',
+                         '_dt')
+
     def __init__(self,
                  sigma: float,
-                 num_time_steps: int = 100):
+                 num_time_steps: int = 100,
+                 tree_cache: TreeCache = None):
         """ Constructs the Black-Derman-Toy rate model in the case when the
         volatility is assumed to be constant. The short rate process simplifies
-        and is given by d(log(r)) = theta(t) * dt + sigma * dW. Althopugh """
+        and is given by d(log(r)) = theta(t) * dt + sigma * dW. If a TreeCache
+        is passed in, trees are taken from it when the same tree has already
+        been built. """
 
         if sigma < 0.0:
             raise FinError("Negative volatility not allowed.")
@@ -665,6 +850,7 @@ class BDTTree():
         self._pu = 0.50
         self._pd = 0.50
         self._discount_curve = None
+        self._tree_cache = tree_cache
 
 ###############################################################################
 
@@ -676,6 +862,15 @@ class BDTTree():
         if isinstance(df_values, np.ndarray) is False:
             raise FinError("DF VALUES must be a numpy vector")
 
+        if self._tree_cache is None:
+            self._build_tree(treeMat, df_times, df_values)
+        else:
+            self._tree_cache.build_tree(self, treeMat, df_times, df_values)
+
+###############################################################################
+
+    def _build_tree(self, treeMat, df_times, df_values):
+
         interp = InterpTypes.FLAT_FWD_RATES.value
 
         treeMaturity = treeMat * (self._num_time_steps+1)/self._num_time_steps
@@ -790,6 +985,117 @@ class BDTTree():
         return {'bondwithoption': v['bondwithoption'],
                 'bondpure': v['bondpure']}
 
+###############################################################################
+
+    def bermudan_swaption_portfolio(self, t_exps, strike_prices,
+                                    face_amounts, cpn_times, cpn_flows,
+                                    exercise_types):
+        """ Value a portfolio of Bermudan swaptions on the tree using a single
+        backward induction. There is one entry per trade in each argument
+        with cpn_times and cpn_flows holding a vector of coupon times and
+        flows for each trade. The tree must be built out to the last swap
+        maturity. The payer and receiver values are returned as vectors. """
+
+        t_exps = np.array(t_exps, dtype=np.float64)
+        strike_prices = np.array(strike_prices, dtype=np.float64)
+        face_amounts = np.array(face_amounts, dtype=np.float64)
+        exercise_type_ints = np.array([option_exercise_types_to_int(e)
+                                      for e in exercise_types],
+                                     dtype=np.int64)
+
+        cpn_times, num_cpns = stack_ragged(cpn_times)
+        cpn_flows, _ = stack_ragged(cpn_flows)
+
+        tmats = cpn_times[np.arange(len(num_cpns)), num_cpns-1]
+
+        if np.any(t_exps > tmats):
+            raise FinError("Option expiry after bond matures.")
+
+        if np.any(t_exps < 0.0):
+            raise FinError("Option expiry time negative.")
+
+        if np.any(tmats > self._tree_times[-1]):
+            raise FinError("Swap maturity after the end of the tree.")
+
+        #######################################################################
+
+        fixed_leg_flows, float_leg_values, accrued, exercise_masks, \
+            maturity_steps \
+            = bermudan_swaption_portfolio_flows(t_exps, strike_prices,
+                                                face_amounts,
+                                                cpn_times, cpn_flows,
+                                                num_cpns,
+                                                exercise_type_ints,
+                                                self._df_times, self._dfs,
+                                                self._tree_times, self._dt,
+                                                False)
+
+        pay_values, rec_values \
+            = bermudan_swaption_portfolio_tree_fast(face_amounts,
+                                                    fixed_leg_flows,
+                                                    float_leg_values,
+                                                    accrued, exercise_masks,
+                                                    maturity_steps,
+                                                    self._Q, self._rt,
+                                                    self._dt)
+
+        return {'pay': pay_values, 'rec': rec_values}
+
+###############################################################################
+
+    def callable_puttable_bond_portfolio(self,
+                                         cpn_times,
+                                         cpn_flows,
+                                         call_times,
+                                         call_prices,
+                                         put_times,
+                                         put_prices,
+                                         face_amounts):
+        """ Value a portfolio of bonds with embedded puts and calls on the
+        tree using a single backward induction. Each argument holds a vector
+        for each bond, apart from face_amounts which holds one value per
+        bond. The tree must be built out to the last bond maturity. The values
+        with and without the options are returned as vectors. """
+
+        face_amounts = np.array(face_amounts, dtype=np.float64)
+
+        cpn_times, num_cpns = stack_ragged(cpn_times)
+        cpn_flows, _ = stack_ragged(cpn_flows)
+        call_times, num_calls = stack_ragged(call_times)
+        call_prices, _ = stack_ragged(call_prices)
+        put_times, num_puts = stack_ragged(put_times)
+        put_prices, _ = stack_ragged(put_prices)
+
+        tmats = cpn_times[np.arange(len(num_cpns)), num_cpns-1]
+
+        if np.any(tmats > self._tree_times[-1]):
+            raise FinError("Bond maturity after the end of the tree.")
+
+        tree_flows, accrued, tree_call_values, tree_put_values, \
+            maturity_steps \
+            = callable_puttable_bond_portfolio_flows(cpn_times, cpn_flows,
+                                                     num_cpns,
+                                                     call_times, call_prices,
+                                                     num_calls,
+                                                     put_times, put_prices,
+                                                     num_puts,
+                                                     face_amounts,
+                                                     self._df_times,
+                                                     self._dfs,
+                                                     self._tree_times,
+                                                     self._dt)
+
+        v, vpure \
+            = callable_puttable_bond_portfolio_tree_fast(face_amounts,
+                                                         tree_flows, accrued,
+                                                         tree_call_values,
+                                                         tree_put_values,
+                                                         maturity_steps,
+                                                         self._Q, self._rt,
+                                                         self._dt)
+
+        return {'bondwithoption': v, 'bondpure': vpure}
+
 ###############################################################################
 
     def __repr__(self):
@@ -22,6 +22,7 @@ from .black_scholes_analytic import (
 )
 from .finite_difference import black_scholes_fd
 from .finite_difference_PSOR import black_scholes_fd_PSOR
+from .black_scholes_pde import black_scholes_pde
 
 
 from enum import Enum
@@ -36,6 +37,7 @@ class BlackScholesTypes(Enum):
     Bjerksund_Stensland = 5
     FINITE_DIFFERENCE = 6
     PSOR = 7
+    PDE = 8
 
 ###############################################################################
 
@@ -130,6 +132,14 @@ class BlackScholes(Model):
 
                 return v
 
+            elif self._bs_type == BlackScholesTypes.PDE:
+
+                v = self._value_pde(spot_price, time_to_expiry, strike_price,
+                                    risk_free_rate, dividend_rate,
+                                    option_type)
+
+                return v
+
             elif self._bs_type == BlackScholesTypes.LSMC:
 
                 print("LSMC Model", self)
@@ -245,6 +255,14 @@ class BlackScholes(Model):
                                           )
                 return v
 
+            elif self._bs_type == BlackScholesTypes.PDE:
+
+                v = self._value_pde(spot_price, time_to_expiry, strike_price,
+                                    risk_free_rate, dividend_rate,
+                                    option_type)
+
+                return v
+
             else:
 
                 raise FinError("Implementation not available for this product")
@@ -253,4 +271,30 @@ class BlackScholes(Model):
 
             raise FinError("Should not be here")
 
+###############################################################################
+
+    def _value_pde(self,
+                   spot_price: float,
+                   time_to_expiry: float,
+                   strike_price: (float, np.ndarray),
+                   risk_free_rate: float,
+                   dividend_rate: float,
+                   option_type: OptionTypes):
+        """ Value using the theta scheme PDE solver. All of the strikes are
+        valued in the same pass over the time steps. """
+
+        v = black_scholes_pde(spot_price=spot_price,
+                              time_to_expiry=time_to_expiry,
+                              strike_prices=strike_price,
+                              risk_free_rate=risk_free_rate,
+                              dividend_yield=dividend_rate,
+                              volatility=self._volatility,
+                              option_type_values=option_type.value,
+                              **self._params)['value']
+
+        if np.ndim(strike_price) == 0:
+            return v[0]
+
+        return v
+
 ###############################################################################
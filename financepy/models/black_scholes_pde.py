@@ -0,0 +1,400 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit
+
+from ..utils.error import FinError
+from ..utils.global_types import OptionTypes
+
+###############################################################################
+# This module solves the Black-Scholes PDE in the log of the stock price with
+# the theta scheme. The grid can be concentrated around the strikes, the spot
+# and the barriers, the first time steps can be replaced by implicit half steps
+# (Rannacher smoothing) to damp the oscillations caused by the kink in the
+# payoff, and many payoff vectors that share a grid are rolled back together
+# so that a whole ladder of strikes costs one pass over the time steps. The
+# tridiagonal systems are solved with the Thomas algorithm which is factored
+# once and then applied to all of the payoff vectors.
+###############################################################################
+
+
+def pde_log_grid(x_min, x_max, num_samples, critical_points, width,
+                 concentration):
+    """ Return a grid of num_samples+1 points in log stock price from x_min to
+    x_max which is denser around each of the critical points. The density is
+    1 + concentration * sum_i 1/sqrt(1 + ((x-c_i)/width)^2) / num_points
+    which integrates analytically using asinh and so can be inverted. A
+    concentration of zero gives a uniform grid. """
+
+    if x_max <= x_min:
+        raise FinError("Grid upper limit must be above lower limit.")
+
+    if num_samples < 4:
+        raise FinError("Number of grid samples must be at least 4.")
+
+    critical_points = np.atleast_1d(np.asarray(critical_points, dtype=float))
+    num_points = len(critical_points)
+
+    def cumulative_density(x):
+        f = x - x_min
+        if concentration > 0.0 and num_points > 0:
+            for c in critical_points:
+                f = f + concentration * width / num_points * \
+                    (np.arcsinh((x - c) / width) -
+                     np.arcsinh((x_min - c) / width))
+        return f
+
+    f_max = cumulative_density(x_max)
+    targets = np.linspace(0.0, f_max, num_samples + 1)
+
+    # The cumulative density is increasing so bisection always converges
+    lo = np.full(num_samples + 1, x_min)
+    hi = np.full(num_samples + 1, x_max)
+
+    for _ in range(0, 60):
+        mid = 0.5 * (lo + hi)
+        below = cumulative_density(mid) < targets
+        lo = np.where(below, mid, lo)
+        hi = np.where(below, hi, mid)
+
+    x = 0.5 * (lo + hi)
+    x[0] = x_min
+    x[-1] = x_max
+    return x
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _pde_operator(x, r, q, sigma, lower_fixed, upper_fixed):
+    """ Tridiagonal coefficients of the Black-Scholes operator in log stock
+    price on a non-uniform grid. Fixed boundaries, such as knock-out
+    barriers, have a zero row so that their values do not change. Other
+    boundaries assume the value is linear in the stock price. """
+
+    n = len(x)
+    lower = np.zeros(n)
+    diag = np.zeros(n)
+    upper = np.zeros(n)
+
+    mu = r - q - 0.5 * sigma * sigma
+    half_var = 0.5 * sigma * sigma
+
+    for i in range(1, n-1):
+        hl = x[i] - x[i-1]
+        hu = x[i+1] - x[i]
+        hs = hl + hu
+
+        lower[i] = -mu * hu / (hl * hs) + 2.0 * half_var / (hl * hs)
+        diag[i] = mu * (hu - hl) / (hl * hu) - 2.0 * half_var / (hl * hu) - r
+        upper[i] = mu * hl / (hu * hs) + 2.0 * half_var / (hu * hs)
+
+    if not lower_fixed:
+        h = x[1] - x[0]
+        diag[0] = -(r - q) / h - r
+        upper[0] = (r - q) / h
+
+    if not upper_fixed:
+        h = x[n-1] - x[n-2]
+        lower[n-1] = -(r - q) / h
+        diag[n-1] = (r - q) / h - r
+
+    return lower, diag, upper
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _thomas_factor(lower, diag, upper):
+    """ Factor the tridiagonal matrix with the given diagonals for use by
+    _thomas_solve. """
+
+    n = len(diag)
+    c = np.zeros(n)
+    inv_denom = np.zeros(n)
+
+    inv_denom[0] = 1.0 / diag[0]
+    c[0] = upper[0] * inv_denom[0]
+
+    for i in range(1, n):
+        inv_denom[i] = 1.0 / (diag[i] - lower[i] * c[i-1])
+        c[i] = upper[i] * inv_denom[i]
+
+    return c, inv_denom
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _thomas_solve(lower, c, inv_denom, rhs):
+    """ Solve the factored tridiagonal system in place for every column of
+    rhs. """
+
+    n, m = rhs.shape
+
+    for j in range(0, m):
+        rhs[0, j] = rhs[0, j] * inv_denom[0]
+
+    for i in range(1, n):
+        for j in range(0, m):
+            rhs[i, j] = (rhs[i, j] - lower[i] * rhs[i-1, j]) * inv_denom[i]
+
+    for i in range(n-2, -1, -1):
+        for j in range(0, m):
+            rhs[i, j] = rhs[i, j] - c[i] * rhs[i+1, j]
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _pde_step(values, work, lower, diag, upper, dt, theta, solve_lower, c,
+              inv_denom):
+    """ Roll the values back one time step of length dt with the theta scheme
+    where the implicit matrix has already been factored. """
+
+    n, m = values.shape
+    a = (1.0 - theta) * dt
+
+    if theta < 1.0:
+        for j in range(0, m):
+            work[0, j] = values[0, j] + a * (diag[0] * values[0, j] +
+                                             upper[0] * values[1, j])
+            work[n-1, j] = values[n-1, j] + \
+                a * (lower[n-1] * values[n-2, j] + diag[n-1] * values[n-1, j])
+
+        for i in range(1, n-1):
+            for j in range(0, m):
+                work[i, j] = values[i, j] + a * (lower[i] * values[i-1, j] +
+                                                 diag[i] * values[i, j] +
+                                                 upper[i] * values[i+1, j])
+    else:
+        work[:, :] = values
+
+    _thomas_solve(solve_lower, c, inv_denom, work)
+    values[:, :] = work
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _pde_exercise(values, payoffs, american):
+    """ Apply the early exercise condition to the American columns. """
+
+    n, m = values.shape
+
+    for i in range(0, n):
+        for j in range(0, m):
+            if american[j] and payoffs[i, j] > values[i, j]:
+                values[i, j] = payoffs[i, j]
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _pde_rollback(payoffs, american, lower, diag, upper, dt, theta,
+                  num_time_steps, num_rannacher_steps):
+    """ Roll the payoffs back from expiry to today. Each of the first
+    num_rannacher_steps time steps is made as two fully implicit half steps.
+    Returns the values today and one and two time steps later. """
+
+    values = payoffs.copy()
+    work = np.zeros_like(payoffs)
+    next_values = payoffs.copy()
+    next_next_values = payoffs.copy()
+
+    cn_lower = -theta * dt * lower
+    c, inv_denom = _thomas_factor(cn_lower, 1.0 - theta * dt * diag,
+                                  -theta * dt * upper)
+
+    half_dt = 0.5 * dt
+    ri_lower = -half_dt * lower
+    ri_c, ri_inv_denom = _thomas_factor(ri_lower, 1.0 - half_dt * diag,
+                                        -half_dt * upper)
+
+    for step in range(0, num_time_steps):
+
+        if step == num_time_steps - 2:
+            next_next_values[:, :] = values
+        elif step == num_time_steps - 1:
+            next_values[:, :] = values
+
+        if step < num_rannacher_steps:
+            for _ in range(0, 2):
+                _pde_step(values, work, lower, diag, upper, half_dt, 1.0,
+                          ri_lower, ri_c, ri_inv_denom)
+                _pde_exercise(values, payoffs, american)
+        else:
+            _pde_step(values, work, lower, diag, upper, dt, theta,
+                      cn_lower, c, inv_denom)
+            _pde_exercise(values, payoffs, american)
+
+    return values, next_values, next_next_values
+
+###############################################################################
+
+
+def _pde_option_flags(option_type_values):
+    """ Whether each option is a call and whether it is American. """
+
+    num_options = len(option_type_values)
+    is_call = np.zeros(num_options, dtype=np.bool_)
+    american = np.zeros(num_options, dtype=np.bool_)
+
+    for i, option_type_value in enumerate(option_type_values):
+        if option_type_value == OptionTypes.EUROPEAN_CALL.value:
+            is_call[i] = True
+        elif option_type_value == OptionTypes.EUROPEAN_PUT.value:
+            pass
+        elif option_type_value == OptionTypes.AMERICAN_CALL.value:
+            is_call[i] = True
+            american[i] = True
+        elif option_type_value == OptionTypes.AMERICAN_PUT.value:
+            american[i] = True
+        else:
+            raise FinError("Unknown option type value " +
+                           str(option_type_value))
+
+    return is_call, american
+
+###############################################################################
+
+
+def _pde_quadratic(s_nodes, v_nodes, s):
+    """ Value and first and second derivatives at s of the quadratic through
+    three nodes. """
+
+    s0, s1, s2 = s_nodes
+    v0, v1, v2 = v_nodes
+
+    d01 = (v1 - v0) / (s1 - s0)
+    d12 = (v2 - v1) / (s2 - s1)
+    d012 = (d12 - d01) / (s2 - s0)
+
+    value = v0 + d01 * (s - s0) + d012 * (s - s0) * (s - s1)
+    first = d01 + d012 * (2.0 * s - s0 - s1)
+    second = 2.0 * d012
+    return value, first, second
+
+###############################################################################
+
+
+def black_scholes_pde(spot_price,
+                      time_to_expiry,
+                      strike_prices,
+                      risk_free_rate,
+                      dividend_yield,
+                      volatility,
+                      option_type_values,
+                      lower_barrier=None,
+                      upper_barrier=None,
+                      num_samples=400,
+                      num_time_steps=200,
+                      theta=0.5,
+                      num_rannacher_steps=2,
+                      num_std=5.0,
+                      concentration=5.0):
+    """ Value a set of European and American calls and puts that share an
+    expiry with the Black-Scholes PDE in one backward pass over the time
+    steps. The strikes and option type values can be scalars or vectors and
+    are broadcast together. If a lower or upper barrier is given the options
+    are knocked out when the stock price reaches it, with the grid ending at
+    the barrier. The grid is concentrated around the spot, the strikes and
+    the barriers. Returns a dictionary with vectors of the value, delta, gamma
+    and theta of each option taken from the grid. """
+
+    if spot_price <= 0.0:
+        raise FinError("Stock price must be greater than zero.")
+
+    if time_to_expiry <= 0.0:
+        raise FinError("Time to expiry must be positive.")
+
+    if volatility <= 0.0:
+        raise FinError("Volatility must be positive.")
+
+    if theta < 0.5 or theta > 1.0:
+        raise FinError("Theta must be between 0.5 and 1.")
+
+    if num_time_steps < 1:
+        raise FinError("Number of time steps must be at least 1.")
+
+    strike_prices, option_type_values = \
+        np.broadcast_arrays(np.atleast_1d(np.asarray(strike_prices, float)),
+                            np.atleast_1d(np.asarray(option_type_values)))
+
+    if np.any(strike_prices <= 0.0):
+        raise FinError("Strike prices must be greater than zero.")
+
+    is_call, american = _pde_option_flags(option_type_values)
+
+    x_spot = np.log(spot_price)
+    x_strikes = np.log(strike_prices)
+    std = volatility * np.sqrt(time_to_expiry)
+
+    x_min = min(x_spot, np.min(x_strikes)) - num_std * std
+    x_max = max(x_spot, np.max(x_strikes)) + num_std * std
+    critical_points = [x_spot] + list(x_strikes)
+
+    lower_fixed = lower_barrier is not None
+    upper_fixed = upper_barrier is not None
+
+    if lower_fixed:
+        if spot_price <= lower_barrier:
+            raise FinError("Stock price must be above the lower barrier.")
+        x_min = np.log(lower_barrier)
+        critical_points.append(x_min)
+
+    if upper_fixed:
+        if spot_price >= upper_barrier:
+            raise FinError("Stock price must be below the upper barrier.")
+        x_max = np.log(upper_barrier)
+        critical_points.append(x_max)
+
+    x = pde_log_grid(x_min, x_max, num_samples, critical_points, 0.25 * std,
+                     concentration)
+    s = np.exp(x)
+
+    payoffs = np.where(is_call[np.newaxis, :],
+                       s[:, np.newaxis] - strike_prices[np.newaxis, :],
+                       strike_prices[np.newaxis, :] - s[:, np.newaxis])
+    payoffs = np.maximum(payoffs, 0.0)
+
+    # Knocked out on the barrier
+    if lower_fixed:
+        payoffs[0, :] = 0.0
+
+    if upper_fixed:
+        payoffs[-1, :] = 0.0
+
+    lower, diag, upper = _pde_operator(x, risk_free_rate, dividend_yield,
+                                       volatility, lower_fixed, upper_fixed)
+
+    dt = time_to_expiry / num_time_steps
+
+    values, next_values, next_next_values = \
+        _pde_rollback(payoffs, american, lower, diag, upper, dt, theta,
+                      num_time_steps, min(num_rannacher_steps,
+                                          num_time_steps))
+
+    # The three nodes around the spot used for the value and the Greeks
+    i = int(np.clip(np.searchsorted(s, spot_price), 1, len(s) - 2))
+    nodes = slice(i - 1, i + 2)
+
+    value, delta, gamma = _pde_quadratic(s[nodes], values[nodes], spot_price)
+    v1, _, _ = _pde_quadratic(s[nodes], next_values[nodes], spot_price)
+
+    # Second order one sided difference in time when there are enough steps
+    if num_time_steps > 1:
+        v2, _, _ = _pde_quadratic(s[nodes], next_next_values[nodes],
+                                  spot_price)
+        theta_value = (-3.0 * value + 4.0 * v1 - v2) / (2.0 * dt)
+    else:
+        theta_value = (v1 - value) / dt
+
+    return {'value': value,
+            'delta': delta,
+            'gamma': gamma,
+            'theta': theta_value}
+
+###############################################################################
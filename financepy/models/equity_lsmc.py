@@ -7,13 +7,18 @@ import sys
 # https://people.math.ethz.ch/~hjfurrer/teaching/LongstaffSchwartzAmericanOptionsLeastSquareMonteCarlo.pdf
 
 import numpy as np
-from numba import jit, njit, float64, int64
+from numba import jit, njit, prange, float64, int64
 
 from enum import Enum, auto
 
+from ..utils.error import FinError
 from ..utils.global_types import OptionTypes
+from ..utils.math import norminvcdf
 from ..utils.polyfit import fit_poly, eval_polynomial
 from ..models.finite_difference import option_payoff
+from ..models.sobol import sobol_direction_numbers, sobol_shifted_point
+from ..models.sobol import sobol_digital_shifts
+from ..models.sobol import sobol_max_dimension
 
 # This is a first implementation of American Monte Carlo using the method of
 # Longstaff and Schwartz. Work is needed to add laguerre Polynomials and
@@ -145,3 +150,529 @@ def equity_lsmc(spot_price,
     return value
 
 ###############################################################################
+
+###############################################################################
+# The functions below are a memory-lean and parallel version of the method.
+# Rather than storing the num_times x num_paths matrix of stock prices, the
+# Brownian motion is generated backwards in time from its terminal value using
+# a Brownian bridge. At each time step only the current stock prices and the
+# discounted path values are held, so memory is O(num_paths). The paths are
+# split into blocks that are shared across threads, both to generate the
+# prices and to build the normal equations of the regression.
+###############################################################################
+
+NUM_PATHS_PER_BLOCK = 1024
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _lsmc_block_seed(seed, step, block):
+    """ Seed of the random number stream used for a block of paths at one
+    time step. """
+    return (seed * 1000003 + step * 7919 + block) % 4294967296
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _lsmc_payoff(s, strike_price, is_call):
+    """ Intrinsic value of the call or put option. """
+
+    if is_call:
+        return max(s - strike_price, 0.0)
+    else:
+        return max(strike_price - s, 0.0)
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _lsmc_basis(x, basis, fit_type_value):
+    """ Fill basis with the polynomials up to degree len(basis)-1 of the
+    chosen family evaluated at x using their three term recurrences. """
+
+    n = len(basis)
+    basis[0] = 1.0
+
+    if n == 1:
+        return
+
+    if fit_type_value == FIT_TYPES.LAGUERRE.value:
+        basis[1] = 1.0 - x
+        for k in range(1, n-1):
+            basis[k+1] = ((2*k+1-x) * basis[k] - k * basis[k-1]) / (k+1)
+    elif fit_type_value == FIT_TYPES.HERMITE_E.value:
+        basis[1] = x
+        for k in range(1, n-1):
+            basis[k+1] = x * basis[k] - k * basis[k-1]
+    elif fit_type_value == FIT_TYPES.HERMITE.value:
+        basis[1] = 2.0 * x
+        for k in range(1, n-1):
+            basis[k+1] = 2.0 * x * basis[k] - 2.0 * k * basis[k-1]
+    elif fit_type_value == FIT_TYPES.LEGENDRE.value:
+        basis[1] = x
+        for k in range(1, n-1):
+            basis[k+1] = ((2*k+1) * x * basis[k] - k * basis[k-1]) / (k+1)
+    elif fit_type_value == FIT_TYPES.CHEBYCHEV.value:
+        basis[1] = x
+        for k in range(1, n-1):
+            basis[k+1] = 2.0 * x * basis[k] - basis[k-1]
+    else:
+        for k in range(1, n):
+            basis[k] = x * basis[k-1]
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _lsmc_normal(i_path, v, shift, use_sobol):
+    """ Gaussian draw for a path at a time step. With Sobol numbers v holds
+    the direction numbers of the dimension used at this step and shift is
+    its random digital shift. Otherwise the draw is taken from the random
+    number stream which must already be seeded. """
+
+    if use_sobol:
+        return norminvcdf(sobol_shifted_point(i_path, v, shift))
+    else:
+        return np.random.normal()
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _lsmc_bridge_step(w, st, step, times, spot_price, mu, sigma,
+                      num_draws, v, shift, use_sobol, seed):
+    """ Move the Brownian motion w of every path from times[step+1] back to
+    times[step] using the Brownian bridge to zero at time zero, or set its
+    terminal value if step is the last one. The stock prices at the time are
+    written to st and the sum of the prices in each block is returned. If
+    there are more paths than draws the remaining paths are antithetic. """
+
+    num_blocks = (num_draws + NUM_PATHS_PER_BLOCK - 1) // NUM_PATHS_PER_BLOCK
+    block_sums = np.zeros(num_blocks)
+    antithetic = len(w) > num_draws
+
+    t = times[step]
+    num_times = len(times)
+
+    if step == num_times - 1:
+        w_weight = 0.0
+        z_weight = np.sqrt(t)
+    else:
+        t_next = times[step+1]
+        w_weight = t / t_next
+        z_weight = np.sqrt(t * (t_next - t) / t_next)
+
+    for i_block in prange(0, num_blocks):
+
+        if not use_sobol:
+            np.random.seed(_lsmc_block_seed(seed, step, i_block))
+
+        block_start = i_block * NUM_PATHS_PER_BLOCK
+        block_end = min(block_start + NUM_PATHS_PER_BLOCK, num_draws)
+        block_sum = 0.0
+
+        for i_path in range(block_start, block_end):
+
+            z = _lsmc_normal(i_path, v, shift, use_sobol)
+            w[i_path] = w[i_path] * w_weight + z * z_weight
+            st[i_path] = spot_price * np.exp(mu * t + sigma * w[i_path])
+            block_sum += st[i_path]
+
+            if antithetic:
+                j_path = i_path + num_draws
+                w[j_path] = -w[i_path]
+                st[j_path] = spot_price * np.exp(mu * t + sigma * w[j_path])
+                block_sum += st[j_path]
+
+        block_sums[i_block] = block_sum
+
+    return block_sums
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _lsmc_regression_sums(st, values, scale, df, strike_price, is_call,
+                          poly_degree, fit_type_value):
+    """ Rescale the stock prices, discount the path values back one time step
+    and return the normal equations of the regression of the path values on
+    the basis functions of the in the money paths, summed within each block.
+    """
+
+    num_paths = len(st)
+    num_blocks = (num_paths + NUM_PATHS_PER_BLOCK - 1) // NUM_PATHS_PER_BLOCK
+    num_basis = poly_degree + 1
+
+    ata = np.zeros((num_blocks, num_basis, num_basis))
+    atb = np.zeros((num_blocks, num_basis))
+    counts = np.zeros(num_blocks, dtype=np.int64)
+
+    for i_block in prange(0, num_blocks):
+
+        basis = np.zeros(num_basis)
+
+        block_start = i_block * NUM_PATHS_PER_BLOCK
+        block_end = min(block_start + NUM_PATHS_PER_BLOCK, num_paths)
+
+        for i_path in range(block_start, block_end):
+
+            st[i_path] = st[i_path] * scale
+            values[i_path] = values[i_path] * df
+
+            if _lsmc_payoff(st[i_path], strike_price, is_call) > 0.0:
+
+                _lsmc_basis(st[i_path] / strike_price, basis, fit_type_value)
+
+                for j in range(0, num_basis):
+                    atb[i_block, j] += basis[j] * values[i_path]
+                    for k in range(0, num_basis):
+                        ata[i_block, j, k] += basis[j] * basis[k]
+
+                counts[i_block] += 1
+
+    return ata, atb, counts
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _lsmc_exercise(st, values, coeffs, strike_price, is_call,
+                   fit_type_value):
+    """ Replace the path value by the exercise value on every in the money
+    path where this exceeds the fitted continuation value. The boundary, the
+    highest exercised stock price for a put and the lowest for a call, is
+    returned for each block together with whether any path in the block was
+    exercised. """
+
+    num_paths = len(st)
+    num_blocks = (num_paths + NUM_PATHS_PER_BLOCK - 1) // NUM_PATHS_PER_BLOCK
+    num_basis = len(coeffs)
+
+    boundaries = np.zeros(num_blocks)
+    exercised = np.zeros(num_blocks, dtype=np.bool_)
+
+    for i_block in prange(0, num_blocks):
+
+        basis = np.zeros(num_basis)
+
+        block_start = i_block * NUM_PATHS_PER_BLOCK
+        block_end = min(block_start + NUM_PATHS_PER_BLOCK, num_paths)
+
+        for i_path in range(block_start, block_end):
+
+            payoff = _lsmc_payoff(st[i_path], strike_price, is_call)
+
+            if payoff > 0.0:
+
+                _lsmc_basis(st[i_path] / strike_price, basis, fit_type_value)
+
+                cont_value = 0.0
+                for j in range(0, num_basis):
+                    cont_value += coeffs[j] * basis[j]
+
+                if payoff > cont_value:
+                    values[i_path] = payoff
+
+                    if not exercised[i_block]:
+                        boundaries[i_block] = st[i_path]
+                        exercised[i_block] = True
+                    elif is_call:
+                        boundaries[i_block] = min(boundaries[i_block],
+                                                  st[i_path])
+                    else:
+                        boundaries[i_block] = max(boundaries[i_block],
+                                                  st[i_path])
+
+    return boundaries, exercised
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _lsmc_terminal_values(st, values, scale, strike_price, is_call):
+    """ Rescale the stock prices at expiry and set the path values to the
+    option payoff. """
+
+    for i_path in prange(0, len(st)):
+        st[i_path] = st[i_path] * scale
+        values[i_path] = _lsmc_payoff(st[i_path], strike_price, is_call)
+
+###############################################################################
+
+
+def _lsmc_option_flags(option_type_value):
+    """ Whether the option is a call and whether it is American. """
+
+    if option_type_value == OptionTypes.EUROPEAN_CALL.value:
+        return True, False
+    elif option_type_value == OptionTypes.EUROPEAN_PUT.value:
+        return False, False
+    elif option_type_value == OptionTypes.AMERICAN_CALL.value:
+        return True, True
+    elif option_type_value == OptionTypes.AMERICAN_PUT.value:
+        return False, True
+    else:
+        raise FinError("Unknown option type value " + str(option_type_value))
+
+###############################################################################
+
+
+def _lsmc_num_draws(num_paths, num_steps, use_sobol):
+    """ Number of paths drawn from the random numbers. With pseudo-random
+    numbers the other half of the paths are antithetic. """
+
+    if num_paths < 2:
+        raise FinError("Number of paths must be at least 2.")
+
+    if use_sobol:
+        if num_steps > sobol_max_dimension():
+            raise FinError("Too many time steps for the Sobol dimensions.")
+        return num_paths, num_paths
+
+    if num_paths % 2 == 1:
+        num_paths = num_paths + 1
+
+    return num_paths, num_paths // 2
+
+###############################################################################
+
+
+def _lsmc_sobol_shifts(num_steps, use_sobol, seed):
+    """ Random digital shifts of the Sobol dimensions used at each time step.
+    These randomise the Sobol points so that estimates with different seeds
+    are independent, as they are with pseudo-random numbers. """
+
+    if not use_sobol:
+        return np.zeros(num_steps, dtype=np.int64)
+
+    return sobol_digital_shifts(num_steps, seed)
+
+###############################################################################
+
+
+def equity_lsmc_bridge(spot_price,
+                       risk_free_rate,
+                       dividend_yield,
+                       sigma,
+                       num_paths,
+                       num_steps_per_year,
+                       time_to_expiry,
+                       option_type_value,
+                       strike_price,
+                       poly_degree,
+                       fit_type_value,
+                       use_sobol,
+                       seed):
+    """ Value an American or European option with the Longstaff-Schwartz
+    method, generating the paths backwards in time with a Brownian bridge so
+    that only O(num_paths) memory is used. Paths are simulated and regressed
+    in parallel. The continuation value is regressed on polynomials of the
+    stock price divided by the strike for in the money paths only. With Sobol
+    numbers, the first dimension sets the terminal value of each path and
+    later dimensions fill in the earlier times. The Sobol points are given a
+    random digital shift which depends on the seed. Returns a dictionary with
+    the value, the times and the estimated early exercise boundary at each
+    time, which is NaN where no path was exercised. """
+
+    is_call, is_american = _lsmc_option_flags(option_type_value)
+
+    num_steps = max(1, int(num_steps_per_year * time_to_expiry))
+    num_times = num_steps + 1
+
+    num_paths, num_draws = _lsmc_num_draws(num_paths, num_steps, use_sobol)
+
+    times = np.linspace(0.0, time_to_expiry, num_times)
+    dt = time_to_expiry / num_steps
+    df = np.exp(-risk_free_rate * dt)
+    mu = risk_free_rate - dividend_yield - 0.5 * sigma ** 2
+
+    w = np.zeros(num_paths)
+    st = np.zeros(num_paths)
+    values = np.zeros(num_paths)
+    exercise_boundary = np.full(num_times, np.nan)
+    v = np.zeros(33, dtype=np.int64)
+    shifts = _lsmc_sobol_shifts(num_steps, use_sobol, seed)
+
+    for step in range(num_steps, 0, -1):
+
+        if use_sobol:
+            v = sobol_direction_numbers(num_steps - step)
+
+        block_sums = _lsmc_bridge_step(w, st, step, times, spot_price, mu,
+                                       sigma, num_draws, v,
+                                       shifts[num_steps - step], use_sobol,
+                                       seed)
+
+        # ensure forward price is recovered exactly
+        fexact = spot_price * \
+            np.exp((risk_free_rate - dividend_yield) * times[step])
+        scale = fexact * num_paths / np.sum(block_sums)
+
+        if step == num_steps:
+            _lsmc_terminal_values(st, values, scale, strike_price, is_call)
+            continue
+
+        ata, atb, counts = _lsmc_regression_sums(st, values, scale, df,
+                                                 strike_price, is_call,
+                                                 poly_degree, fit_type_value)
+
+        if is_american is False or np.sum(counts) <= poly_degree:
+            continue
+
+        coeffs = np.linalg.lstsq(np.sum(ata, axis=0), np.sum(atb, axis=0),
+                                 rcond=None)[0]
+
+        boundaries, exercised = _lsmc_exercise(st, values, coeffs,
+                                               strike_price, is_call,
+                                               fit_type_value)
+
+        if not np.any(exercised):
+            continue
+
+        if is_call:
+            exercise_boundary[step] = np.min(boundaries[exercised])
+        else:
+            exercise_boundary[step] = np.max(boundaries[exercised])
+
+    value = np.mean(values) * df
+
+    if is_american:
+        value = max(value, _lsmc_payoff(spot_price, strike_price, is_call))
+
+    return {'value': value,
+            'times': times,
+            'exercise_boundary': exercise_boundary}
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _lsmc_boundary_paths(spot_price, risk_free_rate, mu, sigma, times,
+                         exercise_boundary, can_exercise, strike_price,
+                         is_call, num_paths, num_draws, directions,
+                         shifts, use_sobol, seed):
+    """ Sum over the paths of the discounted payoff when each path is
+    exercised the first time it crosses the exercise boundary at a time where
+    can_exercise is True. Each path is built backwards with the same Brownian
+    bridge as equity_lsmc_bridge and then walked forwards in time. """
+
+    num_times = len(times)
+    num_steps = num_times - 1
+    num_blocks = (num_draws + NUM_PATHS_PER_BLOCK - 1) // NUM_PATHS_PER_BLOCK
+    block_sums = np.zeros(num_blocks)
+    antithetic = num_paths > num_draws
+
+    for i_block in prange(0, num_blocks):
+
+        if not use_sobol:
+            np.random.seed(_lsmc_block_seed(seed, 0, i_block))
+
+        w = np.zeros(num_times)
+        block_start = i_block * NUM_PATHS_PER_BLOCK
+        block_end = min(block_start + NUM_PATHS_PER_BLOCK, num_draws)
+        block_sum = 0.0
+
+        for i_path in range(block_start, block_end):
+
+            for step in range(num_steps, 0, -1):
+
+                z = _lsmc_normal(i_path, directions[num_steps - step],
+                                 shifts[num_steps - step], use_sobol)
+
+                if step == num_steps:
+                    w[step] = z * np.sqrt(times[step])
+                else:
+                    t = times[step]
+                    t_next = times[step+1]
+                    w[step] = w[step+1] * t / t_next \
+                        + z * np.sqrt(t * (t_next - t) / t_next)
+
+            for sign in range(0, 2 if antithetic else 1):
+
+                phi = 1.0 - 2.0 * sign
+
+                for step in range(1, num_times):
+
+                    t = times[step]
+                    s = spot_price * np.exp(mu * t + sigma * phi * w[step])
+                    payoff = _lsmc_payoff(s, strike_price, is_call)
+                    boundary = exercise_boundary[step]
+
+                    if step == num_steps:
+                        exercise = True
+                    elif payoff <= 0.0 or not can_exercise[step]:
+                        exercise = False
+                    elif is_call:
+                        exercise = s >= boundary
+                    else:
+                        exercise = s <= boundary
+
+                    if exercise:
+                        block_sum += payoff * np.exp(-risk_free_rate * t)
+                        break
+
+        block_sums[i_block] = block_sum
+
+    return np.sum(block_sums)
+
+###############################################################################
+
+
+def equity_lsmc_boundary_value(spot_price,
+                               risk_free_rate,
+                               dividend_yield,
+                               sigma,
+                               num_paths,
+                               times,
+                               exercise_boundary,
+                               option_type_value,
+                               strike_price,
+                               use_sobol,
+                               seed):
+    """ Value an American option by simulating paths forward in time and
+    exercising each path the first time it crosses an exercise boundary such
+    as the one returned by equity_lsmc_bridge. With a different seed to the
+    one used to estimate the boundary this gives a low biased estimate of the
+    value. This holds for Sobol numbers too as their random digital shifts
+    depend on the seed. The boundary can also be reused to value the option
+    for bumped market inputs without repeating the regressions. """
+
+    is_call, _ = _lsmc_option_flags(option_type_value)
+
+    times = np.asarray(times, dtype=np.float64)
+    exercise_boundary = np.asarray(exercise_boundary, dtype=np.float64)
+
+    if len(times) != len(exercise_boundary):
+        raise FinError("Times and exercise boundary must have same length.")
+
+    if len(times) < 2:
+        raise FinError("At least two times are needed.")
+
+    num_steps = len(times) - 1
+    num_paths, num_draws = _lsmc_num_draws(num_paths, num_steps, use_sobol)
+
+    directions = np.zeros((num_steps, 33), dtype=np.int64)
+
+    if use_sobol:
+        for i in range(0, num_steps):
+            directions[i] = sobol_direction_numbers(i)
+
+    shifts = _lsmc_sobol_shifts(num_steps, use_sobol, seed)
+
+    # The kernel is compiled with fastmath so cannot test for NaN itself
+    can_exercise = np.logical_not(np.isnan(exercise_boundary))
+    exercise_boundary = np.where(can_exercise, exercise_boundary, 0.0)
+
+    mu = risk_free_rate - dividend_yield - 0.5 * sigma ** 2
+
+    total = _lsmc_boundary_paths(spot_price, risk_free_rate, mu, sigma,
+                                 times, exercise_boundary, can_exercise,
+                                 strike_price, is_call, num_paths,
+                                 num_draws, directions, shifts, use_sobol,
+                                 seed)
+
+    return total / num_paths
+
+###############################################################################
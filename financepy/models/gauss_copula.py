@@ -2,15 +2,94 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-# TODO: Use Numba to speed this up more.
-
 import numpy as np
+from numba import njit, prange
 
-from ..utils.math import N
+from ..utils.error import FinError
+from ..utils.math import N, norminvcdf, student_t_cdf
 from ..utils.helpers import uniform_to_default_time
+from ..models.sobol import sobol_direction_numbers, sobol_shifted_point
+from ..models.sobol import sobol_digital_shifts
+from ..models.sobol import sobol_max_dimension
+
+###############################################################################
+# The default times of a basket are simulated one trial at a time in compiled
+# code. Storing the default time of every credit in every trial takes too
+# much memory for large baskets so the nth-to-default engine only keeps the
+# time and the identity of the nth default in each trial. The trials are
+# simulated in chunks and each chunk is split into blocks of trials which are
+# shared across threads. Each block draws from its own random number stream
+# seeded using the seed and the block number so that the results do not
+# depend on the number of threads. Each draw gives two trials as the
+# antithetic uniform is also used.
+###############################################################################
+
+NUM_TRIALS_PER_BLOCK = 1024
+NUM_BLOCKS_PER_CHUNK = 64
+
+###############################################################################
+
+
+def survival_curve_arrays(issuer_curves):
+    """ Pack the times and survival probabilities of the issuer curves into
+    two dimensional arrays with one row per issuer. The rows are padded to
+    the longest curve and the number of points in each curve is returned. """
+
+    num_credits = len(issuer_curves)
+    num_points = np.array([len(c._times) for c in issuer_curves],
+                          dtype=np.int64)
+
+    max_points = np.max(num_points)
+    curve_times = np.zeros((num_credits, max_points))
+    curve_values = np.zeros((num_credits, max_points))
+
+    for i_credit in range(0, num_credits):
+        n = num_points[i_credit]
+        curve_times[i_credit, 0:n] = issuer_curves[i_credit]._times
+        curve_values[i_credit, 0:n] = issuer_curves[i_credit]._values
+
+    return curve_times, curve_values, num_points
 
 ###############################################################################
-# TODO:
+
+
+@njit(cache=True, fastmath=True)
+def _uniforms_to_default_times(u, curve_times, curve_values, num_points):
+    """ Map a matrix of uniforms indexed by credit and trial to default times
+    using the survival curve of each credit. """
+
+    num_credits, num_trials = u.shape
+    default_times = np.empty((num_credits, 2 * num_trials))
+
+    for i_credit in range(0, num_credits):
+        n = num_points[i_credit]
+        times = curve_times[i_credit, 0:n]
+        values = curve_values[i_credit, 0:n]
+        for i_trial in range(0, num_trials):
+            u1 = u[i_credit, i_trial]
+            u2 = 1.0 - u1
+            t1 = uniform_to_default_time(u1, times, values)
+            t2 = uniform_to_default_time(u2, times, values)
+            default_times[i_credit, i_trial] = t1
+            default_times[i_credit, num_trials + i_trial] = t2
+
+    return default_times
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _gaussian_uniforms(y):
+    """ Uniforms 1 - N(y) for a matrix of correlated Gaussians. """
+
+    u = np.empty(y.shape)
+
+    for i in range(0, y.shape[0]):
+        for j in range(0, y.shape[1]):
+            u[i, j] = 1.0 - N(y[i, j])
+
+    return u
+
 ###############################################################################
 
 
@@ -27,21 +106,217 @@ def default_times_gc(issuer_curves,
     c = np.linalg.cholesky(correlation_matrix)
     y = np.dot(c, x)
 
-    corrTimes = np.empty(shape=(num_credits, 2 * num_trials))
+    curve_times, curve_values, num_points = \
+        survival_curve_arrays(issuer_curves)
 
-    for i_credit in range(0, num_credits):
-        issuer_curve = issuer_curves[i_credit]
-        for i_trial in range(0, num_trials):
-            g = y[i_credit, i_trial]
-            u1 = 1.0 - N(g)
-            u2 = 1.0 - u1
-            times = issuer_curve._times
-            values = issuer_curve._values
-            t1 = uniform_to_default_time(u1, times, values)
-            t2 = uniform_to_default_time(u2, times, values)
-            corrTimes[i_credit, i_trial] = t1
-            corrTimes[i_credit, num_trials + i_trial] = t2
+    corrTimes = _uniforms_to_default_times(_gaussian_uniforms(y),
+                                           curve_times, curve_values,
+                                           num_points)
 
     return corrTimes
 
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _block_seed(seed, block):
+    """ Seed of the random number stream used for a block of trials. """
+    return (seed * 1000003 + block) % 4294967296
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _nth_default(taus, n_to_default, work):
+    """ Return the nth smallest default time and the index of the credit that
+    defaults then. If several credits default at that time the first one is
+    returned. """
+
+    work[:] = taus
+    work.sort()
+    tau = work[n_to_default - 1]
+
+    for i_credit in range(0, len(taus)):
+        if taus[i_credit] == tau:
+            return tau, i_credit
+
+    return tau, 0
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def nth_default_times(default_times, n_to_default):
+    """ Return the time of the nth default and the credit that defaults then
+    in each trial of a matrix of default times indexed by credit and trial.
+    """
+
+    num_credits, num_trials = default_times.shape
+
+    nth_times = np.empty(num_trials)
+    nth_credits = np.empty(num_trials, dtype=np.int64)
+
+    num_blocks = (num_trials + NUM_TRIALS_PER_BLOCK - 1) // \
+        NUM_TRIALS_PER_BLOCK
+
+    for i_block in prange(num_blocks):
+
+        taus = np.empty(num_credits)
+        work = np.empty(num_credits)
+
+        start = i_block * NUM_TRIALS_PER_BLOCK
+        end = min(start + NUM_TRIALS_PER_BLOCK, num_trials)
+
+        for i_trial in range(start, end):
+            for i_credit in range(0, num_credits):
+                taus[i_credit] = default_times[i_credit, i_trial]
+
+            tau, i_nth = _nth_default(taus, n_to_default, work)
+            nth_times[i_trial] = tau
+            nth_credits[i_trial] = i_nth
+
+    return nth_times, nth_credits
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _nth_default_times_copula(chol, curve_times, curve_values, num_points,
+                              n_to_default, degrees_of_freedom,
+                              first_block, end_block, num_draws,
+                              directions, shifts, use_sobol, seed):
+    """ Simulate the draws in the blocks from first_block up to but not
+    including end_block and return the time and the credit of the nth
+    default in each trial. The antithetic trials follow all of the others.
+    The copula is Gaussian if degrees_of_freedom is zero and otherwise it is
+    a Student-t copula. With Sobol numbers the Gaussians are taken from the
+    Sobol sequence with one dimension per credit and a random digital shift
+    per credit, while the chi-squared variable of the Student-t copula is
+    drawn from the block stream. """
+
+    num_credits = len(num_points)
+
+    start_draw = first_block * NUM_TRIALS_PER_BLOCK
+    end_draw = min(end_block * NUM_TRIALS_PER_BLOCK, num_draws)
+    num_chunk_draws = end_draw - start_draw
+
+    nth_times = np.empty(2 * num_chunk_draws)
+    nth_credits = np.empty(2 * num_chunk_draws, dtype=np.int64)
+
+    for i_block in prange(first_block, end_block):
+
+        np.random.seed(_block_seed(seed, i_block))
+
+        x = np.empty(num_credits)
+        taus1 = np.empty(num_credits)
+        taus2 = np.empty(num_credits)
+        work = np.empty(num_credits)
+
+        block_start = i_block * NUM_TRIALS_PER_BLOCK
+        block_end = min(block_start + NUM_TRIALS_PER_BLOCK, end_draw)
+
+        for i_draw in range(block_start, block_end):
+
+            for i_credit in range(0, num_credits):
+                if use_sobol:
+                    x[i_credit] = norminvcdf(
+                        sobol_shifted_point(i_draw, directions[i_credit],
+                                            shifts[i_credit]))
+                else:
+                    x[i_credit] = np.random.normal()
+
+            scale = 1.0
+            if degrees_of_freedom > 0.0:
+                chi2 = np.random.chisquare(degrees_of_freedom)
+                scale = np.sqrt(chi2 / degrees_of_freedom)
+
+            for i_credit in range(0, num_credits):
+
+                g = 0.0
+                for j in range(0, i_credit + 1):
+                    g += chol[i_credit, j] * x[j]
+
+                if degrees_of_freedom > 0.0:
+                    u1 = student_t_cdf(g / scale, degrees_of_freedom)
+                else:
+                    u1 = 1.0 - N(g)
+
+                u2 = 1.0 - u1
+
+                n = num_points[i_credit]
+                times = curve_times[i_credit, 0:n]
+                values = curve_values[i_credit, 0:n]
+                taus1[i_credit] = uniform_to_default_time(u1, times, values)
+                taus2[i_credit] = uniform_to_default_time(u2, times, values)
+
+            i_out = i_draw - start_draw
+
+            tau, i_nth = _nth_default(taus1, n_to_default, work)
+            nth_times[i_out] = tau
+            nth_credits[i_out] = i_nth
+
+            tau, i_nth = _nth_default(taus2, n_to_default, work)
+            nth_times[num_chunk_draws + i_out] = tau
+            nth_credits[num_chunk_draws + i_out] = i_nth
+
+    return nth_times, nth_credits
+
+###############################################################################
+
+
+def nth_default_times_copula(issuer_curves,
+                             correlation_matrix,
+                             n_to_default,
+                             num_trials,
+                             seed,
+                             degrees_of_freedom=0.0,
+                             use_sobol=False):
+    """ Generator which simulates the nth-to-default time of a basket in a
+    Gaussian copula, or a Student-t copula if degrees_of_freedom is positive,
+    and yields it in chunks. Each chunk is a tuple of an array of the nth
+    default times and an array of the credits which default at those times.
+    Each of the num_trials draws gives a trial and its antithetic so there
+    are 2 x num_trials trials in total. The default times of the whole basket
+    are never stored. """
+
+    num_credits = len(issuer_curves)
+
+    if n_to_default > num_credits or n_to_default < 1:
+        raise FinError("n_to_default must be 1 to num_credits")
+
+    if num_trials < 1:
+        raise FinError("Number of trials must be at least 1.")
+
+    if degrees_of_freedom < 0.0:
+        raise FinError("Degrees of freedom must be positive.")
+
+    chol = np.linalg.cholesky(np.array(correlation_matrix, dtype=np.float64))
+
+    curve_times, curve_values, num_points = \
+        survival_curve_arrays(issuer_curves)
+
+    if use_sobol:
+        if num_credits > sobol_max_dimension():
+            raise FinError("Too many credits for the Sobol dimensions.")
+        directions = np.array([sobol_direction_numbers(i)
+                               for i in range(0, num_credits)])
+        shifts = sobol_digital_shifts(num_credits, seed)
+    else:
+        directions = np.zeros((num_credits, 1), dtype=np.int64)
+        shifts = np.zeros(num_credits, dtype=np.int64)
+
+    num_blocks = (num_trials + NUM_TRIALS_PER_BLOCK - 1) // \
+        NUM_TRIALS_PER_BLOCK
+
+    for first_block in range(0, num_blocks, NUM_BLOCKS_PER_CHUNK):
+
+        end_block = min(first_block + NUM_BLOCKS_PER_CHUNK, num_blocks)
+
+        yield _nth_default_times_copula(chol, curve_times, curve_values,
+                                        num_points, n_to_default,
+                                        float(degrees_of_freedom),
+                                        first_block, end_block, num_trials,
+                                        directions, shifts, use_sobol,
+                                        seed)
+
 ##########################################################################
@@ -2,7 +2,7 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-from numba import njit, float64, int64
+from numba import njit, prange, float64, int64
 import numpy as np
 
 ##########################################################################
@@ -131,6 +131,113 @@ def homog_basket_loss_dbn(survival_probabilities,
 ###############################################################################
 
 
+@njit(cache=True, fastmath=True)
+def loss_units_gcd(num_credits, recovery_rates):
+    """ Return the loss unit used by the recursion which is the greatest
+    common divisor of the credit losses, the loss of each credit in units and
+    the number of points in the loss distribution including the zero loss. """
+
+    commonRecoveryFlag = 1
+
+    lossAmounts = np.zeros(num_credits)
+    for i_credit in range(0, num_credits):
+        lossAmounts[i_credit] = (1.0 - recovery_rates[i_credit]) / num_credits
+        if lossAmounts[i_credit] != lossAmounts[0]:
+            commonRecoveryFlag = 0
+
+    if commonRecoveryFlag == 1:
+        gcd = lossAmounts[0]
+    else:
+        gcd = portfolio_gcd(lossAmounts)
+
+    loss_units = np.zeros(num_credits)
+    num_loss_units = 1.0  # this is the zero loss
+
+    for i_credit in range(0, num_credits):
+        loss_units[i_credit] = lossAmounts[i_credit] / gcd
+        num_loss_units = num_loss_units + loss_units[i_credit]
+
+    return gcd, loss_units, int(num_loss_units)
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def adj_binomial_loss_ratios(num_credits, recovery_rates):
+    """ Return the average credit loss which is the loss unit used by the
+    adjusted binomial approximation and the loss of each credit relative to
+    it. """
+
+    totalLoss = 0.0
+    for i_credit in range(0, num_credits):
+        totalLoss += (1.0 - recovery_rates[i_credit])
+    totalLoss /= num_credits
+
+    avgLoss = totalLoss / num_credits
+
+    loss_ratio = np.zeros(num_credits)
+    for i_credit in range(0, num_credits):
+        loss_ratio[i_credit] = (
+            1.0 - recovery_rates[i_credit]) / num_credits / avgLoss
+
+    return avgLoss, loss_ratio
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def tranche_surv_prob_from_dbn(k1, k2, lossDbn, loss_unit, num_loss_units):
+    """ Return the tranche survival probability given the portfolio loss
+    distribution on a grid of losses spaced by the loss unit. """
+
+    trancheEL = 0.0
+    for i_loss_unit in range(0, num_loss_units):
+        loss = i_loss_unit * loss_unit
+        trancheLoss = min(loss, k2) - min(loss, k1)
+        trancheEL = trancheEL + trancheLoss * lossDbn[i_loss_unit]
+
+    q = 1.0 - trancheEL / (k2 - k1)
+    return q
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def loss_dbns_recursion_gcd(default_probs,
+                            loss_units,
+                            num_loss_units,
+                            betas,
+                            num_integration_steps):
+    """ Loss distributions built by recursion for a set of horizons and
+    correlations. Each row of default_probs holds the default probabilities
+    of the credits to a horizon and is paired with the beta of the same row
+    in betas. The loss distributions are returned one per row and are built
+    in parallel. The number of integration steps is doubled for a beta above
+    0.8 as in tranche_surv_prob_recursion. """
+
+    num_dbns, num_credits = default_probs.shape
+    dbns = np.zeros((num_dbns, num_loss_units))
+
+    for i_dbn in prange(num_dbns):
+
+        beta = betas[i_dbn]
+        beta_vector = np.full(num_credits, beta)
+
+        num_steps = num_integration_steps
+        if beta > 0.8:
+            num_steps *= 2
+
+        dbns[i_dbn, :] = loss_dbn_recursion_gcd(num_credits,
+                                                default_probs[i_dbn],
+                                                loss_units,
+                                                beta_vector,
+                                                num_steps)
+
+    return dbns
+
+###############################################################################
+
+
 @njit(float64(float64, float64, int64, float64[:], float64[:], float64[:],
               int64), fastmath=True)
 def tranche_surv_prob_recursion(k1,
@@ -150,16 +257,6 @@ def tranche_surv_prob_recursion(k1,
     if k1 >= k2:
         raise FinError("K1 >= K2")
 
-    commonRecoveryFlag = 1
-
-    lossAmounts = np.zeros(num_credits)
-    for i_credit in range(0, num_credits):
-        lossAmounts[i_credit] = (1.0 - recovery_rates[i_credit]) / num_credits
-        if lossAmounts[i_credit] != lossAmounts[0]:
-            commonRecoveryFlag = 0
-
-    gcd = 0.0
-
     m = 0.0
     for i in range(0, len(beta_vector)):
         m += beta_vector[i]
@@ -168,17 +265,8 @@ def tranche_surv_prob_recursion(k1,
     if m > 0.8:
         num_integration_steps *= 2
 
-    if commonRecoveryFlag == 1:
-        gcd = lossAmounts[0]
-    else:
-        gcd = portfolio_gcd(lossAmounts)
-
-    loss_units = np.zeros(num_credits)
-    num_loss_units = 1  # this is the zero loss
-
-    for i_credit in range(0, num_credits):
-        loss_units[i_credit] = lossAmounts[i_credit] / gcd
-        num_loss_units = num_loss_units + loss_units[i_credit]
+    gcd, loss_units, num_loss_units = loss_units_gcd(num_credits,
+                                                     recovery_rates)
 
     default_probs = np.zeros(num_credits)
 
@@ -191,14 +279,7 @@ def tranche_surv_prob_recursion(k1,
                                      beta_vector,
                                      num_integration_steps)
 
-    trancheEL = 0.0
-    for i_loss_unit in range(0, int(num_loss_units)):
-        loss = i_loss_unit * gcd
-        trancheLoss = min(loss, k2) - min(loss, k1)
-        trancheEL = trancheEL + trancheLoss * lossDbn[i_loss_unit]
-
-    q = 1.0 - trancheEL / (k2 - k1)
-    return q
+    return tranche_surv_prob_from_dbn(k1, k2, lossDbn, gcd, num_loss_units)
 
 ###############################################################################
 
@@ -363,31 +444,45 @@ def tranche_surv_prob_adj_binomial(k1,
     for i_credit in range(0, num_credits):
         default_probs[i_credit] = 1.0 - survival_probabilities[i_credit]
 
-    totalLoss = 0.0
-    for i_credit in range(0, num_credits):
-        totalLoss += (1.0 - recovery_rates[i_credit])
-    totalLoss /= num_credits
-
-    avgLoss = totalLoss / num_credits
-
-    loss_ratio = np.zeros(num_credits)
-    for i_credit in range(0, num_credits):
-        loss_ratio[i_credit] = (
-            1.0 - recovery_rates[i_credit]) / num_credits / avgLoss
+    avgLoss, loss_ratio = adj_binomial_loss_ratios(num_credits,
+                                                   recovery_rates)
 
     lossDbn = loss_dbn_hetero_adj_binomial(num_credits,
                                            default_probs,
                                            loss_ratio,
                                            beta_vector,
                                            num_integration_steps)
-    trancheEL = 0.0
+
     num_loss_units = num_credits + 1
-    for i_loss_unit in range(0, num_loss_units):
-        loss = i_loss_unit * avgLoss
-        trancheLoss = min(loss, k2) - min(loss, k1)
-        trancheEL += trancheLoss * lossDbn[i_loss_unit]
+    return tranche_surv_prob_from_dbn(k1, k2, lossDbn, avgLoss,
+                                      num_loss_units)
 
-    q = 1.0 - trancheEL / (k2 - k1)
-    return q
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def loss_dbns_adj_binomial(default_probs,
+                           loss_ratio,
+                           betas,
+                           num_integration_steps):
+    """ Loss distributions from the adjusted binomial approximation for a
+    set of horizons and correlations. Each row of default_probs is paired
+    with the beta of the same row in betas and the loss distributions are
+    built in parallel. """
+
+    num_dbns, num_credits = default_probs.shape
+    dbns = np.zeros((num_dbns, num_credits + 1))
+
+    for i_dbn in prange(num_dbns):
+
+        beta_vector = np.full(num_credits, betas[i_dbn])
+
+        dbns[i_dbn, :] = loss_dbn_hetero_adj_binomial(num_credits,
+                                                      default_probs[i_dbn],
+                                                      loss_ratio,
+                                                      beta_vector,
+                                                      num_integration_steps)
+
+    return dbns
 
 ###############################################################################
@@ -11,9 +11,12 @@ from math import ceil
 from ..utils.error import FinError
 from ..utils.math import N, accrued_interpolator
 from ..market.curves.interpolator import InterpTypes, _uinterpolate
-from ..utils.helpers import label_to_string
+from ..utils.helpers import label_to_string, stack_ragged
 from ..utils.global_types import FinExerciseTypes
 from ..utils.global_vars import gSmall
+from .tree_cache import TreeCache
+from .tree_portfolio_flows import bermudan_swaption_portfolio_flows
+from .tree_portfolio_flows import callable_puttable_bond_portfolio_flows
 
 interp = InterpTypes.FLAT_FWD_RATES.value
 
@@ -781,6 +784,205 @@ def callable_puttable_bond_tree_fast(cpn_times, cpn_flows,
 
 ###############################################################################
 
+###############################################################################
+# The portfolio versions below value many trades on the same tree with a
+# single backward induction. The values of all of the trades at one time
+# step are held with a row for each node and a column for each trade so that
+# the trades are rolled back together.
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def bermudan_swaption_portfolio_tree_fast(face_amounts,
+                                          fixed_leg_flows, float_leg_values,
+                                          accrued, exercise_masks,
+                                          maturity_steps,
+                                          _Q, _pu, _pm, _pd, _rt, _dt, _a):
+    """ Value a portfolio of Bermudan swaptions mapped onto the tree by
+    bermudan_swaption_portfolio_flows in one backward induction. Each trade
+    starts at its own maturity step and can be exercised at the tree steps
+    where its exercise mask is True. The payer and receiver values of the
+    trades are returned as two vectors. """
+
+    num_trades = len(maturity_steps)
+    _, num_nodes = _Q.shape
+    jmax = ceil(0.1835/(_a * _dt))
+
+    # The values at this time step and at the next one with a row per node
+    fixed_leg_values = np.zeros((num_nodes, num_trades))
+    pay_values = np.zeros((num_nodes, num_trades))
+    rec_values = np.zeros((num_nodes, num_trades))
+    next_fixed_leg_values = np.zeros((num_nodes, num_trades))
+    next_pay_values = np.zeros((num_nodes, num_trades))
+    next_rec_values = np.zeros((num_nodes, num_trades))
+
+    N = jmax
+
+    for m in range(np.max(maturity_steps), -1, -1):
+
+        nm = min(m, jmax)
+
+        for k in range(-nm, nm+1):
+            kN = k + N
+            rt = _rt[m, kN]
+            df = np.exp(-rt * _dt)
+            pu = _pu[kN]
+            pm = _pm[kN]
+            pd = _pd[kN]
+
+            if k == jmax:
+                ku, km, kd = kN, kN-1, kN-2
+            elif k == -jmax:
+                ku, km, kd = kN+2, kN+1, kN
+            else:
+                ku, km, kd = kN+1, kN, kN-1
+
+            for j in range(0, num_trades):
+
+                if m >= maturity_steps[j]:
+                    continue
+
+                flow = fixed_leg_flows[j, m] * face_amounts[j]
+
+                vu = next_fixed_leg_values[ku, j]
+                vm = next_fixed_leg_values[km, j]
+                vd = next_fixed_leg_values[kd, j]
+                v = (pu*vu + pm*vm + pd*vd) * df
+                fixed_leg_values[kN, j] = v + flow
+
+                vu = next_pay_values[ku, j]
+                vm = next_pay_values[km, j]
+                vd = next_pay_values[kd, j]
+                holdPay = (pu*vu + pm*vm + pd*vd) * df
+
+                vu = next_rec_values[ku, j]
+                vm = next_rec_values[km, j]
+                vd = next_rec_values[kd, j]
+                holdRec = (pu*vu + pm*vm + pd*vd) * df
+
+                pay_values[kN, j] = holdPay
+                rec_values[kN, j] = holdRec
+
+                if exercise_masks[j, m]:
+
+                    # The floating value is clean and so must be the fixed
+                    fixed_leg_value = fixed_leg_values[kN, j] - accrued[j, m]
+                    float_leg_value = float_leg_values[j, m]
+
+                    payExercise = max(float_leg_value - fixed_leg_value, 0.0)
+                    recExercise = max(fixed_leg_value - float_leg_value, 0.0)
+
+                    pay_values[kN, j] = max(payExercise, holdPay)
+                    rec_values[kN, j] = max(recExercise, holdRec)
+
+        # Trades start with the value of the fixed leg at their maturity
+        for j in range(0, num_trades):
+            if m == maturity_steps[j]:
+                flow = 1.0 + fixed_leg_flows[j, m]
+                for k in range(0, num_nodes):
+                    fixed_leg_values[k, j] = flow * face_amounts[j]
+                    pay_values[k, j] = 0.0
+                    rec_values[k, j] = 0.0
+
+        fixed_leg_values, next_fixed_leg_values = \
+            next_fixed_leg_values, fixed_leg_values
+        pay_values, next_pay_values = next_pay_values, pay_values
+        rec_values, next_rec_values = next_rec_values, rec_values
+
+    return next_pay_values[jmax, :].copy(), next_rec_values[jmax, :].copy()
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def callable_puttable_bond_portfolio_tree_fast(face_amounts, tree_flows,
+                                               accrued, tree_call_values,
+                                               tree_put_values,
+                                               maturity_steps,
+                                               _Q, _pu, _pm, _pd, _rt, _dt,
+                                               _a):
+    """ Value a portfolio of bonds with embedded puts and calls mapped onto
+    the tree by callable_puttable_bond_portfolio_flows in one backward
+    induction. The values of the bonds with and without the options are
+    returned as two vectors. """
+
+    num_trades = len(maturity_steps)
+    _, num_nodes = _Q.shape
+    dt = _dt
+    jmax = ceil(0.1835/(_a * dt))
+
+    # The values at this time step and at the next one with a row per node
+    bond_values = np.zeros((num_nodes, num_trades))
+    callPutBondValues = np.zeros((num_nodes, num_trades))
+    next_bond_values = np.zeros((num_nodes, num_trades))
+    next_callPutBondValues = np.zeros((num_nodes, num_trades))
+
+    for m in range(np.max(maturity_steps), -1, -1):
+
+        nm = min(m, jmax)
+
+        for k in range(-nm, nm+1):
+            kN = k + jmax
+            rt = _rt[m, kN]
+            df = np.exp(-rt*dt)
+            pu = _pu[kN]
+            pm = _pm[kN]
+            pd = _pd[kN]
+
+            if k == jmax:
+                ku, km, kd = kN, kN-1, kN-2
+            elif k == -jmax:
+                ku, km, kd = kN+2, kN+1, kN
+            else:
+                ku, km, kd = kN+1, kN, kN-1
+
+            for j in range(0, num_trades):
+
+                if m >= maturity_steps[j]:
+                    continue
+
+                flow = tree_flows[j, m] * face_amounts[j]
+                vcall = tree_call_values[j, m]
+                vput = tree_put_values[j, m]
+
+                vu = next_bond_values[ku, j]
+                vm = next_bond_values[km, j]
+                vd = next_bond_values[kd, j]
+                v = (pu*vu + pm*vm + pd*vd) * df
+                bond_values[kN, j] = v + flow
+
+                vu = next_callPutBondValues[ku, j]
+                vm = next_callPutBondValues[km, j]
+                vd = next_callPutBondValues[kd, j]
+                vhold = (pu*vu + pm*vm + pd*vd) * df
+                # Need to make add on coupons paid if we hold
+                vhold = vhold + flow
+                value = min(max(vhold - accrued[j, m], vput), vcall) \
+                    + accrued[j, m]
+                callPutBondValues[kN, j] = value
+
+        # Bonds start with their value at maturity
+        for j in range(0, num_trades):
+            if m == maturity_steps[j]:
+                vcall = tree_call_values[j, m]
+                vput = tree_put_values[j, m]
+                vhold = (1.0 + tree_flows[j, m]) * face_amounts[j]
+                vclean = vhold - accrued[j, m]
+                value = min(max(vclean, vput), vcall) + accrued[j, m]
+
+                for k in range(0, num_nodes):
+                    bond_values[k, j] = vhold
+                    callPutBondValues[k, j] = value
+
+        bond_values, next_bond_values = next_bond_values, bond_values
+        callPutBondValues, next_callPutBondValues = \
+            next_callPutBondValues, callPutBondValues
+
+    return (next_callPutBondValues[jmax, :].copy(),
+            next_bond_values[jmax, :].copy())
+
+###############################################################################
+
 
 def fwd_dirty_bond_price(rt, *args):
     """ Price a coupon bearing bond on the option expiry date and return
@@ -842,16 +1044,24 @@ def fwd_dirty_bond_price(rt, *args):
 
 class HWTree():
 
+    # Attributes which determine the tree and which hold the built tree
+    _tree_param_names = ('_sigma', '_a')
+    _tree_state_names = ('_tree_times', '_df_times', '_dfs', '_Q',
+                         '_pu', '_pm', '_pd', '_rt', '_dt')
+
     def __init__(self,
                  sigma,
                  a,
                  num_time_steps=100,
-                 europeanCalcType=FinHWEuropeanCalcType.EXPIRY_TREE):
+                 europeanCalcType=FinHWEuropeanCalcType.EXPIRY_TREE,
+                 tree_cache: TreeCache = None):
         """ Constructs the Hull-White rate model. The speed of mean reversion
         a and volatility are passed in. The short rate process is given by
         dr = (theta(t) - ar) * dt  + sigma * dW. The model will switch to use
         Jamshidian's approach where possible unless the useJamshidian flag is
-        set to false in which case it uses the trinomial Tree. """
+        set to false in which case it uses the trinomial Tree. If a TreeCache
+        is passed in, trees are taken from it when the same tree has already
+        been built. """
 
         if sigma < 0.0:
             raise FinError("Negative volatility not allowed.")
@@ -872,6 +1082,7 @@ class HWTree():
         self._pd = None
         self._discount_curve = None
         self._treeBuilt = False
+        self._tree_cache = tree_cache
 
 ###############################################################################
 
@@ -1240,6 +1451,121 @@ class HWTree():
         return {'bondwithoption': v['bondwithoption'],
                 'bondpure': v['bondpure']}
 
+###############################################################################
+
+    def bermudan_swaption_portfolio(self, t_exps, strike_prices,
+                                    face_amounts, cpn_times, cpn_flows,
+                                    exercise_types):
+        """ Value a portfolio of Bermudan swaptions on the tree using a single
+        backward induction. There is one entry per trade in each argument
+        with cpn_times and cpn_flows holding a vector of coupon times and
+        flows for each trade. The tree must be built out to the last swap
+        maturity. The payer and receiver values are returned as vectors. """
+
+        t_exps = np.array(t_exps, dtype=np.float64)
+        strike_prices = np.array(strike_prices, dtype=np.float64)
+        face_amounts = np.array(face_amounts, dtype=np.float64)
+        exercise_typeInts = np.array([option_exercise_types_to_int(e)
+                                      for e in exercise_types],
+                                     dtype=np.int64)
+
+        cpn_times, num_cpns = stack_ragged(cpn_times)
+        cpn_flows, _ = stack_ragged(cpn_flows)
+
+        tmats = cpn_times[np.arange(len(num_cpns)), num_cpns-1]
+
+        if np.any(t_exps > tmats):
+            raise FinError("Option expiry after bond matures.")
+
+        if np.any(t_exps < 0.0):
+            raise FinError("Option expiry time negative.")
+
+        if np.any(tmats > self._tree_times[-1]):
+            raise FinError("Swap maturity after the end of the tree.")
+
+        #######################################################################
+
+        fixed_leg_flows, float_leg_values, accrued, exercise_masks, \
+            maturity_steps \
+            = bermudan_swaption_portfolio_flows(t_exps, strike_prices,
+                                                face_amounts,
+                                                cpn_times, cpn_flows,
+                                                num_cpns,
+                                                exercise_typeInts,
+                                                self._df_times, self._dfs,
+                                                self._tree_times, self._dt,
+                                                True)
+
+        payValues, recValues \
+            = bermudan_swaption_portfolio_tree_fast(face_amounts,
+                                                    fixed_leg_flows,
+                                                    float_leg_values,
+                                                    accrued, exercise_masks,
+                                                    maturity_steps,
+                                                    self._Q,
+                                                    self._pu, self._pm,
+                                                    self._pd, self._rt,
+                                                    self._dt, self._a)
+
+        return {'pay': payValues, 'rec': recValues}
+
+###############################################################################
+
+    def callable_puttable_bond_portfolio(self,
+                                         cpn_times,
+                                         cpn_flows,
+                                         call_times,
+                                         call_prices,
+                                         put_times,
+                                         put_prices,
+                                         face_amounts):
+        """ Value a portfolio of bonds with embedded puts and calls on the
+        tree using a single backward induction. Each argument holds a vector
+        for each bond, apart from face_amounts which holds one value per
+        bond. The tree must be built out to the last bond maturity. The values
+        with and without the options are returned as vectors. """
+
+        face_amounts = np.array(face_amounts, dtype=np.float64)
+
+        cpn_times, num_cpns = stack_ragged(cpn_times)
+        cpn_flows, _ = stack_ragged(cpn_flows)
+        call_times, num_calls = stack_ragged(call_times)
+        call_prices, _ = stack_ragged(call_prices)
+        put_times, num_puts = stack_ragged(put_times)
+        put_prices, _ = stack_ragged(put_prices)
+
+        tmats = cpn_times[np.arange(len(num_cpns)), num_cpns-1]
+
+        if np.any(tmats > self._tree_times[-1]):
+            raise FinError("Bond maturity after the end of the tree.")
+
+        tree_flows, accrued, tree_call_values, tree_put_values, \
+            maturity_steps \
+            = callable_puttable_bond_portfolio_flows(cpn_times, cpn_flows,
+                                                     num_cpns,
+                                                     call_times, call_prices,
+                                                     num_calls,
+                                                     put_times, put_prices,
+                                                     num_puts,
+                                                     face_amounts,
+                                                     self._df_times,
+                                                     self._dfs,
+                                                     self._tree_times,
+                                                     self._dt)
+
+        v, vpure \
+            = callable_puttable_bond_portfolio_tree_fast(face_amounts,
+                                                         tree_flows, accrued,
+                                                         tree_call_values,
+                                                         tree_put_values,
+                                                         maturity_steps,
+                                                         self._Q,
+                                                         self._pu, self._pm,
+                                                         self._pd, self._rt,
+                                                         self._dt, self._a)
+
+        return {'bondwithoption': v, 'bondpure': vpure}
+
 ###############################################################################
 
     def df_tree(self, tmat):
@@ -1267,7 +1593,7 @@ class HWTree():
 ###############################################################################
 
     def build_tree(self, treeMat, df_times, df_values):
-        """ Build the trinomial tree. """
+        """ Build the trinomial tree or take it from the tree cache. """
 
         if isinstance(df_times, np.ndarray) is False:
             raise FinError("DF TIMES must be a numpy vector")
@@ -1275,6 +1601,16 @@ class HWTree():
         if isinstance(df_values, np.ndarray) is False:
             raise FinError("DF VALUES must be a numpy vector")
 
+        if self._tree_cache is None:
+            self._build_tree(treeMat, df_times, df_values)
+        else:
+            self._tree_cache.build_tree(self, treeMat, df_times, df_values)
+
+###############################################################################
+
+    def _build_tree(self, treeMat, df_times, df_values):
+        """ Build the trinomial tree. """
+
         # I wish to add on an additional time to the tree so that the second
         # last time corresponds to a maturity treeMat. For this reason I scale
         # up the maturity date of the tree as follows
@@ -4,7 +4,7 @@
 
 from enum import Enum
 import numpy as np
-from numba import njit, float64, int64  # , prange DOES NOT WORK ON GITHUB
+from numba import njit, prange, float64, int64
 
 from ..utils.error import FinError
 from ..utils.math import N
@@ -17,6 +17,11 @@ from ..models.sobol import get_uniform_sobol
 
 useParallel = False
 
+# The parallel simulations split the paths into blocks of this size. Each
+# block has its own random number stream seeded from the user seed and the
+# block number, so the results do not depend on the number of threads.
+NUM_PATHS_PER_BLOCK = 1024
+
 ###############################################################################
 
 """ This module manages the Ibor Market Model and so stores a specific MC
@@ -137,6 +142,55 @@ def lmm_swaption_vol_approx(a, b, fwd0, taus, zetas, rho):
 ###############################################################################
 
 
+@njit(float64(float64[:, :, :], int64, int64, int64, float64[:]),
+      cache=True, fastmath=True)
+def _lmm_path_fwd_swap_rate(fwds, i_path, a, b, taus):
+    """ Forward swap rate at time index a for a swap maturing at the end of
+    period b on a single simulated path. """
+
+    pv01 = 0.0
+    df = 1.0
+
+    for k in range(a, b):
+        f = fwds[i_path, a, k]
+        tau = taus[k]
+        df = df / (1.0 + tau * f)
+        pv01 = pv01 + tau * df
+
+    fwdSwapRate = (1.0 - df) / pv01
+    return fwdSwapRate
+
+###############################################################################
+
+
+@njit(float64(int64, float64[:], float64[:]), cache=True, fastmath=True)
+def _lmm_swap_rate_vol(a, fwdSwapRates, taus):
+    """ Volatility of the simulated forward swap rates expiring at the end
+    of period a. """
+
+    num_paths = len(fwdSwapRates)
+
+    fwdSwapRateMean = 0.0
+    fwdSwapRateVar = 0.0
+
+    for i_path in range(0, num_paths):
+        fwdSwapRate = fwdSwapRates[i_path]
+        fwdSwapRateMean += fwdSwapRate
+        fwdSwapRateVar += fwdSwapRate**2
+
+    taua = 0.0
+    for i in range(0, a):
+        taua += taus[i]
+
+    fwdSwapRateMean /= num_paths
+    fwdSwapRateVar = fwdSwapRateVar/num_paths - fwdSwapRateMean**2
+    fwdSwapRateVol = np.sqrt(fwdSwapRateVar/taua)
+    fwdSwapRateVol /= fwdSwapRateMean
+    return fwdSwapRateVol
+
+###############################################################################
+
+
 @njit(float64(int64, int64, float64[:], float64[:, :, :], float64[:]),
       cache=True, fastmath=True)
 def lmm_sim_swaption_vol(a, b, fwd0, fwds, taus):
@@ -152,39 +206,79 @@ def lmm_sim_swaption_vol(a, b, fwd0, fwds, taus):
     if a >= b:
         raise FinError("Swap maturity is before expiry date")
 
-    fwdSwapRateMean = 0.0
-    fwdSwapRateVar = 0.0
+    fwdSwapRates = np.empty(num_paths)
 
-    for i_path in range(0, num_paths):  # changed from prange
+    for i_path in range(0, num_paths):
+        fwdSwapRates[i_path] = _lmm_path_fwd_swap_rate(fwds, i_path, a, b,
+                                                       taus)
 
-        numeraire = 1.0
+    return _lmm_swap_rate_vol(a, fwdSwapRates, taus)
 
-        for k in range(0, a):
-            numeraire *= (1.0 + taus[k] * fwds[i_path, k, k])
+###############################################################################
 
-        pv01 = 0.0
-        df = 1.0
 
-        for k in range(a, b):
-            f = fwds[i_path, a, k]
-            tau = taus[k]
-            df = df / (1.0 + tau * f)
-            pv01 = pv01 + tau * df
+@njit(float64(int64, int64, float64[:], float64[:, :, :], float64[:]),
+      cache=True, fastmath=True, parallel=True)
+def lmm_sim_swaption_vol_parallel(a, b, fwd0, fwds, taus):
+    """ Parallel version of lmm_sim_swaption_vol in which the paths are
+    shared across threads. The swap rates are stored by path and summed in
+    order so the result does not depend on the number of threads. """
 
-        fwdSwapRate = (1.0 - df) / pv01
+    num_paths = len(fwds)
+    numForwards = len(fwds[0])
 
-        fwdSwapRateMean += fwdSwapRate
-        fwdSwapRateVar += fwdSwapRate**2
+    if a > numForwards:
+        raise FinError("NumPeriods > numForwards")
 
-    taua = 0.0
-    for i in range(0, a):
-        taua += taus[i]
+    if a >= b:
+        raise FinError("Swap maturity is before expiry date")
 
-    fwdSwapRateMean /= num_paths
-    fwdSwapRateVar = fwdSwapRateVar/num_paths - fwdSwapRateMean**2
-    fwdSwapRateVol = np.sqrt(fwdSwapRateVar/taua)
-    fwdSwapRateVol /= fwdSwapRateMean
-    return fwdSwapRateVol
+    fwdSwapRates = np.empty(num_paths)
+
+    for i_path in prange(0, num_paths):
+        fwdSwapRates[i_path] = _lmm_path_fwd_swap_rate(fwds, i_path, a, b,
+                                                       taus)
+
+    return _lmm_swap_rate_vol(a, fwdSwapRates, taus)
+
+###############################################################################
+
+
+@njit(float64(int64, int64, int64, int64, float64[:, :, :]),
+      cache=True, fastmath=True)
+def _lmm_fwd_fwd_corr(num_paths, iTime, iFwd, jFwd, fwds):
+    """ Correlation across the paths of the changes in two forwards over the
+    time step that ends at time index iTime. """
+
+    sumfwdi = 0.0
+    sumfwdj = 0.0
+    sumfwdifwdi = 0.0
+    sumfwdifwdj = 0.0
+    sumfwdjfwdj = 0.0
+
+    for p in range(0, num_paths):
+        dfwdi = fwds[p, iTime, iFwd] - fwds[p, iTime-1, iFwd]
+        dfwdj = fwds[p, iTime, jFwd] - fwds[p, iTime-1, jFwd]
+        sumfwdi += dfwdi
+        sumfwdj += dfwdj
+        sumfwdifwdi += dfwdi * dfwdi
+        sumfwdifwdj += dfwdi * dfwdj
+        sumfwdjfwdj += dfwdj * dfwdj
+
+    avgfwdi = sumfwdi / num_paths
+    avgfwdj = sumfwdj / num_paths
+    avgfwdifwdi = sumfwdifwdi / num_paths
+    avgfwdifwdj = sumfwdifwdj / num_paths
+    avgfwdjfwdj = sumfwdjfwdj / num_paths
+
+    covii = avgfwdifwdi - avgfwdi * avgfwdi
+    covjj = avgfwdjfwdj - avgfwdj * avgfwdj
+    covij = avgfwdifwdj - avgfwdi * avgfwdj
+
+    if abs(covii*covjj) > 1e-20:
+        return covij / np.sqrt(covii*covjj)
+    else:
+        return 0.0
 
 ###############################################################################
 
@@ -200,39 +294,30 @@ def lmm_fwd_fwd_correlation(numForwards, num_paths, iTime, fwds):
 
     for iFwd in range(iTime, numForwards):
         for jFwd in range(iFwd, numForwards):
+            corr = _lmm_fwd_fwd_corr(num_paths, iTime, iFwd, jFwd, fwds)
+            fwdCorr[iFwd-iTime][jFwd-iTime] = corr
+            fwdCorr[jFwd-iTime][iFwd-iTime] = corr
+
+    return fwdCorr
+
+###############################################################################
 
-            sumfwdi = 0.0
-            sumfwdj = 0.0
-            sumfwdifwdi = 0.0
-            sumfwdifwdj = 0.0
-            sumfwdjfwdj = 0.0
-
-            for p in range(0, num_paths):  # changed from prange
-                dfwdi = fwds[p, iTime, iFwd] - fwds[p, iTime-1, iFwd]
-                dfwdj = fwds[p, iTime, jFwd] - fwds[p, iTime-1, jFwd]
-                sumfwdi += dfwdi
-                sumfwdj += dfwdj
-                sumfwdifwdi += dfwdi * dfwdi
-                sumfwdifwdj += dfwdi * dfwdj
-                sumfwdjfwdj += dfwdj * dfwdj
-
-            avgfwdi = sumfwdi / num_paths
-            avgfwdj = sumfwdj / num_paths
-            avgfwdifwdi = sumfwdifwdi / num_paths
-            avgfwdifwdj = sumfwdifwdj / num_paths
-            avgfwdjfwdj = sumfwdjfwdj / num_paths
-
-            covii = avgfwdifwdi - avgfwdi * avgfwdi
-            covjj = avgfwdjfwdj - avgfwdj * avgfwdj
-            covij = avgfwdifwdj - avgfwdi * avgfwdj
-            corr = covij / np.sqrt(covii*covjj)
-
-            if abs(covii*covjj) > 1e-20:
-                fwdCorr[iFwd-iTime][jFwd-iTime] = corr
-                fwdCorr[jFwd-iTime][iFwd-iTime] = corr
-            else:
-                fwdCorr[iFwd-iTime][jFwd-iTime] = 0.0
-                fwdCorr[jFwd-iTime][iFwd-iTime] = 0.0
+
+@njit(float64[:, :](int64, int64, int64, float64[:, :, :]),
+      cache=True, fastmath=True, parallel=True)
+def lmm_fwd_fwd_correlation_parallel(numForwards, num_paths, iTime, fwds):
+    """ Parallel version of lmm_fwd_fwd_correlation in which the rows of the
+    correlation matrix are shared across threads. Each element is found by
+    one thread so the result does not depend on the number of threads. """
+
+    size = numForwards - iTime
+    fwdCorr = np.zeros((size, size))
+
+    for iFwd in prange(iTime, numForwards):
+        for jFwd in range(iFwd, numForwards):
+            corr = _lmm_fwd_fwd_corr(num_paths, iTime, iFwd, jFwd, fwds)
+            fwdCorr[iFwd-iTime][jFwd-iTime] = corr
+            fwdCorr[jFwd-iTime][iFwd-iTime] = corr
 
     return fwdCorr
 
@@ -300,6 +385,109 @@ def cholesky_np(rho):
 ###############################################################################
 
 
+@njit(cache=True, fastmath=True)
+def _lmm_block_seed(seed, block):
+    """ Seed of the random number stream used for a block of paths in the
+    parallel simulations. """
+    return (seed * 1000003 + block) % 4294967296
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _lmm_num_blocks(halfNumPaths):
+    """ Number of blocks of paths needed to hold the non-antithetic paths. """
+    return (halfNumPaths + NUM_PATHS_PER_BLOCK - 1) // NUM_PATHS_PER_BLOCK
+
+###############################################################################
+
+
+def _lmm_num_blocks_per_batch(numPathsPerBatch):
+    """ Number of blocks of paths in each batch of the streaming simulations.
+    Each block also holds its antithetic paths and every batch holds at least
+    one block. """
+
+    if numPathsPerBatch < 2:
+        raise FinError("Number of paths per batch must be at least 2")
+
+    return max(1, numPathsPerBatch // (2 * NUM_PATHS_PER_BLOCK))
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _lmm_nf_factors(num_fwds, correl):
+    """ Correlation submatrices and their Cholesky factors for each time step
+    of the N-factor simulation stored in 3D arrays indexed by the time step.
+    """
+
+    size = len(correl)
+    corr = np.zeros((num_fwds, size, size))
+    factors = np.zeros((num_fwds, size, size))
+
+    for ix in range(1, num_fwds):  # from 1 to p-1
+        matrix = sub_matrix(correl, ix - 1)
+        n = len(matrix)
+        corr[ix, 0:n, 0:n] = matrix
+        factors[ix, 0:n, 0:n] = cholesky_np(matrix)
+
+    return corr, factors
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _lmm_evolve_path_nf(fwd, i_path, g, fwd0, zetas, corr, factors, taus,
+                        fwdB):
+    """ Evolve the forward curve along one path of the N-factor simulation
+    using the matrix g of Gaussian draws indexed by time step and factor. """
+
+    num_fwds = fwd.shape[1]
+
+    # Initial value of forward curve at time 0
+    for iFwd in range(0, num_fwds):
+        fwd[i_path, 0, iFwd] = fwd0[iFwd]
+
+    for j in range(1, num_fwds):  # TIME LOOP
+
+        dt = taus[j]
+        sqrt_dt = np.sqrt(dt)
+
+        for i in range(j, num_fwds):  # FORWARDS LOOP
+
+            zi = zetas[i]
+
+            muA = 0.0
+            for k in range(j, i+1):
+                rho = corr[j, k-j, i-j]
+                fk = fwd[i_path, j-1, k]
+                zk = zetas[k]
+                tk = taus[k]
+                muA += zi * fk * tk * zk * rho / (1.0 + fk * tk)
+
+            w = 0.0
+            for k in range(0, num_fwds-j):
+                f = factors[j, i-j, k]
+                w = w + f * g[j, k]
+
+            fwdB[i] = fwd[i_path, j-1, i] \
+                * np.exp(muA * dt - 0.5 * (zi**2) * dt + zi * w * sqrt_dt)
+
+            muB = 0.0
+            for k in range(j, i+1):
+                rho = corr[j, k-j, i-j]
+                fk = fwdB[k]
+                zk = zetas[k]
+                tk = taus[k]
+                muB += zi * fk * tk * zk * rho / (1.0 + fk * tk)
+
+            muAvg = 0.5*(muA + muB)
+            x = np.exp(muAvg * dt - 0.5 * (zi**2) * dt + zi * w * sqrt_dt)
+            fwd[i_path, j, i] = fwd[i_path, j-1, i] * x
+
+###############################################################################
+
+
 @njit(float64[:, :, :](int64, int64, float64[:], float64[:], float64[:, :],
                        float64[:], int64), cache=True, fastmath=True)
 def lmm_simulate_fwds_nf(num_fwds, num_paths, fwd0, zetas, correl, taus, seed):
@@ -320,91 +508,168 @@ def lmm_simulate_fwds_nf(num_fwds, num_paths, fwd0, zetas, correl, taus, seed):
     fwd = np.empty((num_paths, num_fwds, num_fwds))
     fwdB = np.zeros(num_fwds)
 
-    discFwd = np.zeros(num_fwds)
-
-    # Set up initial term structure
-    discFwd[0] = 1.0 / (1.0 + fwd0[0] * taus[0])
-    for ix in range(1, num_fwds):
-        discFwd[ix] = discFwd[ix-1] / (1.0 + fwd0[ix] * taus[ix])
-
-    corr = [None]  # from 0 to p-1
-    factors = [None]  # from 0 to p-1
-
-    for ix in range(1, num_fwds):  # from 1 to p-1
-        matrix = sub_matrix(correl, ix - 1)
-        corr.append(matrix)
-        chol = cholesky_np(matrix)
-        factors.append(chol)
+    corr, factors = _lmm_nf_factors(num_fwds, correl)
 
     ###########################################################################
     # I HAVE PROBLEMS AS THE PARALLELISATION CHANGES THE OUTPUT IF RANDS ARE
     # CALCULATED INSIDE THE MAIN LOOP SO I CALCULATE THEM NOW
     ###########################################################################
 
-    if 1 == 1:
-        gMatrix = np.empty((num_paths, num_fwds, num_fwds))
-        for i_path in range(0, halfNumPaths):
-            for j in range(1, num_fwds):
-                for k in range(0, num_fwds-j):
-                    g = np.random.normal()
-                    # ANTITHETICS
-                    gMatrix[i_path, j, k] = g
-                    gMatrix[i_path + halfNumPaths, j, k] = -g
-
-    avgg = 0.0
-    stdg = 0.0
+    gMatrix = np.empty((num_paths, num_fwds, num_fwds))
+    for i_path in range(0, halfNumPaths):
+        for j in range(1, num_fwds):
+            for k in range(0, num_fwds-j):
+                g = np.random.normal()
+                # ANTITHETICS
+                gMatrix[i_path, j, k] = g
+                gMatrix[i_path + halfNumPaths, j, k] = -g
 
     for i_path in range(0, num_paths):
+        _lmm_evolve_path_nf(fwd, i_path, gMatrix[i_path], fwd0, zetas, corr,
+                            factors, taus, fwdB)
 
-        # Initial value of forward curve at time 0
-        for iFwd in range(0, num_fwds):
-            fwd[i_path, 0, iFwd] = fwd0[iFwd]
+    return fwd
+
+###############################################################################
 
-        for j in range(1, num_fwds):  # TIME LOOP
 
-            dt = taus[j]
-            sqrt_dt = np.sqrt(dt)
+@njit(cache=True, fastmath=True, parallel=True)
+def _lmm_simulate_blocks_nf(num_fwds, halfNumPaths, firstBlock, endBlock,
+                            fwd0, zetas, corr, factors, taus, seed):
+    """ Simulate the paths of the N-factor model that belong to the blocks
+    from firstBlock up to but not including endBlock, sharing the blocks
+    across threads. The antithetic paths follow all of the other paths. """
 
-            for i in range(j, num_fwds):  # FORWARDS LOOP
+    startPath = firstBlock * NUM_PATHS_PER_BLOCK
+    endPath = min(endBlock * NUM_PATHS_PER_BLOCK, halfNumPaths)
+    numBlockPaths = endPath - startPath
 
-                zi = zetas[i]
+    fwd = np.empty((2 * numBlockPaths, num_fwds, num_fwds))
 
-                muA = 0.0
-                for k in range(j, i+1):
-                    rho = corr[j][k-j, i-j]
-                    fk = fwd[i_path, j-1, k]
-                    zk = zetas[k]
-                    tk = taus[k]
-                    muA += zi * fk * tk * zk * rho / (1.0 + fk * tk)
+    for iBlock in prange(firstBlock, endBlock):
 
-                w = 0.0
+        np.random.seed(_lmm_block_seed(seed, iBlock))
+
+        fwdB = np.zeros(num_fwds)
+        gPath = np.zeros((num_fwds, num_fwds))
+
+        blockStart = iBlock * NUM_PATHS_PER_BLOCK
+        blockEnd = min(blockStart + NUM_PATHS_PER_BLOCK, endPath)
+
+        for i_path in range(blockStart, blockEnd):
+
+            for j in range(1, num_fwds):
                 for k in range(0, num_fwds-j):
-                    f = factors[j][i-j, k]
-                    w = w + f * gMatrix[i_path, j, k]
+                    gPath[j, k] = np.random.normal()
+
+            i_out = i_path - startPath
+
+            _lmm_evolve_path_nf(fwd, i_out, gPath, fwd0, zetas, corr,
+                                factors, taus, fwdB)
+
+            # ANTITHETICS
+            gPath = -gPath
+            _lmm_evolve_path_nf(fwd, i_out + numBlockPaths, gPath, fwd0,
+                                zetas, corr, factors, taus, fwdB)
+
+    return fwd
 
-                avgg += w
-                stdg += w*w
+###############################################################################
 
-                fwdB[i] = fwd[i_path, j-1, i] \
-                    * np.exp(muA * dt - 0.5 * (zi**2) * dt + zi * w * sqrt_dt)
 
-                muB = 0.0
-                for k in range(j, i+1):
-                    rho = corr[j][k-j, i-j]
-                    fk = fwdB[k]
-                    zk = zetas[k]
-                    tk = taus[k]
-                    muB += zi * fk * tk * zk * rho / (1.0 + fk * tk)
+@njit(float64[:, :, :](int64, int64, float64[:], float64[:], float64[:, :],
+                       float64[:], int64), cache=True, fastmath=True)
+def lmm_simulate_fwds_nf_parallel(num_fwds, num_paths, fwd0, zetas, correl,
+                                  taus, seed):
+    """ Parallel version of lmm_simulate_fwds_nf. The paths are split into
+    blocks which are simulated on different threads. Each block draws its
+    Gaussians from its own random number stream seeded using the seed and
+    the block number, so the forwards do not depend on the number of threads
+    but differ from those of the serial simulation for the same seed. """
 
-                muAvg = 0.5*(muA + muB)
-                x = np.exp(muAvg * dt - 0.5 * (zi**2) * dt + zi * w * sqrt_dt)
-                fwd[i_path, j, i] = fwd[i_path, j-1, i] * x
+    # Even number of paths for antithetics
+    num_paths = 2 * int(num_paths/2)
+    halfNumPaths = int(num_paths/2)
+
+    corr, factors = _lmm_nf_factors(num_fwds, correl)
+
+    numBlocks = _lmm_num_blocks(halfNumPaths)
+
+    fwd = _lmm_simulate_blocks_nf(num_fwds, halfNumPaths, 0, numBlocks, fwd0,
+                                  zetas, corr, factors, taus, seed)
 
     return fwd
 
 ###############################################################################
 
 
+def lmm_simulate_fwds_nf_batches(num_fwds, num_paths, fwd0, zetas, correl,
+                                 taus, seed, numPathsPerBatch):
+    """ Streaming version of lmm_simulate_fwds_nf_parallel which yields the
+    forward rates for successive batches of about numPathsPerBatch paths as
+    in lmm_simulate_fwds_1f_batches. """
+
+    halfNumPaths = int(num_paths/2)
+
+    corr, factors = _lmm_nf_factors(num_fwds, correl)
+
+    numBlocks = _lmm_num_blocks(halfNumPaths)
+    numBlocksPerBatch = _lmm_num_blocks_per_batch(numPathsPerBatch)
+
+    for firstBlock in range(0, numBlocks, numBlocksPerBatch):
+        endBlock = min(firstBlock + numBlocksPerBatch, numBlocks)
+        yield _lmm_simulate_blocks_nf(num_fwds, halfNumPaths, firstBlock,
+                                      endBlock, fwd0, zetas, corr, factors,
+                                      taus, seed)
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _lmm_evolve_path_1f(fwd, i_path, g, fwd0, gammas, taus, fwdB):
+    """ Evolve the forward curve along one path of the one factor simulation
+    using the vector g of Gaussian draws indexed by time step. """
+
+    num_fwds = fwd.shape[1]
+
+    # Initial value of forward curve at time 0
+    for iFwd in range(0, num_fwds):
+        fwd[i_path, 0, iFwd] = fwd0[iFwd]
+
+    for j in range(0, num_fwds-1):  # TIME LOOP
+        dtj = taus[j]
+        sqrt_dtj = np.sqrt(dtj)
+        w = g[j]
+
+        for k in range(j, num_fwds):  # FORWARDS LOOP
+            zkj = gammas[k-j]
+            muA = 0.0
+
+            for i in range(j+1, k+1):
+                fi = fwd[i_path, j, i]
+                zij = gammas[i-j]
+                ti = taus[i]
+                muA += zkj * fi * ti * zij / (1.0 + fi * ti)
+
+            # predictor corrector
+            x = np.exp(muA * dtj - 0.5*(zkj**2) * dtj + zkj * w * sqrt_dtj)
+            fwdB[k] = fwd[i_path, j, k] * x
+
+            muB = 0.0
+            for i in range(j+1, k+1):
+                fi = fwdB[k]
+                zij = gammas[i-j]
+                ti = taus[i]
+                muB += zkj * fi * ti * zij / (1.0 + fi * ti)
+
+            muC = 0.5*(muA+muB)
+
+            x = np.exp(muC*dtj - 0.5 * (zkj**2) * dtj + zkj * w * sqrt_dtj)
+            fwd[i_path, j+1, k] = fwd[i_path, j, k] * x
+
+###############################################################################
+
+
 @njit(float64[:, :, :](int64, int64, int64, float64[:], float64[:], float64[:],
                        int64, int64), cache=True, fastmath=True)
 def lmm_simulate_fwds_1f(num_fwds, num_paths, numeraireIndex, fwd0, gammas,
@@ -466,47 +731,214 @@ def lmm_simulate_fwds_1f(num_fwds, num_paths, numeraireIndex, fwd0, gammas,
     else:
         raise FinError("Use Sobol must be 0 or 1")
 
-    for i_path in range(0, num_paths):  # changed from prange
-        # Initial value of forward curve at time 0
-        for iFwd in range(0, num_fwds):
-            fwd[i_path, 0, iFwd] = fwd0[iFwd]
+    for i_path in range(0, num_paths):
+        _lmm_evolve_path_1f(fwd, i_path, gMatrix[i_path], fwd0, gammas, taus,
+                            fwdB)
+
+    return fwd
 
-        for j in range(0, num_fwds-1):  # TIME LOOP
-            dtj = taus[j]
-            sqrt_dtj = np.sqrt(dtj)
-            w = gMatrix[i_path, j]
+###############################################################################
 
-            for k in range(j, num_fwds):  # FORWARDS LOOP
-                zkj = gammas[k-j]
-                muA = 0.0
 
-                for i in range(j+1, k+1):
-                    fi = fwd[i_path, j, i]
-                    zij = gammas[i-j]
-                    ti = taus[i]
-                    muA += zkj * fi * ti * zij / (1.0 + fi * ti)
+@njit(cache=True, fastmath=True, parallel=True)
+def _lmm_simulate_blocks_1f(num_fwds, halfNumPaths, firstBlock, endBlock,
+                            fwd0, gammas, taus, rands, useSobol, seed):
+    """ Simulate the paths of the one factor model that belong to the blocks
+    from firstBlock up to but not including endBlock, sharing the blocks
+    across threads. The Sobol uniforms are indexed by the path number. The
+    antithetic paths follow all of the other paths. """
 
-                # predictor corrector
-                x = np.exp(muA * dtj - 0.5*(zkj**2) * dtj + zkj * w * sqrt_dtj)
-                fwdB[k] = fwd[i_path, j, k] * x
+    num_times = num_fwds
 
-                muB = 0.0
-                for i in range(j+1, k+1):
-                    fi = fwdB[k]
-                    zij = gammas[i-j]
-                    ti = taus[i]
-                    muB += zkj * fi * ti * zij / (1.0 + fi * ti)
+    startPath = firstBlock * NUM_PATHS_PER_BLOCK
+    endPath = min(endBlock * NUM_PATHS_PER_BLOCK, halfNumPaths)
+    numBlockPaths = endPath - startPath
 
-                muC = 0.5*(muA+muB)
+    fwd = np.empty((2 * numBlockPaths, num_fwds, num_fwds))
 
-                x = np.exp(muC*dtj - 0.5 * (zkj**2) * dtj + zkj * w * sqrt_dtj)
-                fwd[i_path, j+1, k] = fwd[i_path, j, k] * x
+    for iBlock in prange(firstBlock, endBlock):
+
+        if useSobol == 0:
+            np.random.seed(_lmm_block_seed(seed, iBlock))
+
+        fwdB = np.zeros(num_fwds)
+        gPath = np.zeros(num_times)
+
+        blockStart = iBlock * NUM_PATHS_PER_BLOCK
+        blockEnd = min(blockStart + NUM_PATHS_PER_BLOCK, endPath)
+
+        for i_path in range(blockStart, blockEnd):
+
+            for j in range(0, num_times):
+                if useSobol == 1:
+                    gPath[j] = norminvcdf(rands[i_path, j])
+                else:
+                    gPath[j] = np.random.normal()
+
+            i_out = i_path - startPath
+
+            _lmm_evolve_path_1f(fwd, i_out, gPath, fwd0, gammas, taus, fwdB)
+
+            # ANTITHETICS
+            gPath = -gPath
+            _lmm_evolve_path_1f(fwd, i_out + numBlockPaths, gPath, fwd0,
+                                gammas, taus, fwdB)
 
     return fwd
 
 ###############################################################################
 
 
+@njit(float64[:, :, :](int64, int64, int64, float64[:], float64[:], float64[:],
+                       int64, int64), cache=True, fastmath=True)
+def lmm_simulate_fwds_1f_parallel(num_fwds, num_paths, numeraireIndex, fwd0,
+                                  gammas, taus, useSobol, seed):
+    """ Parallel version of lmm_simulate_fwds_1f. The paths are split into
+    blocks which are simulated on different threads. With Sobol numbers the
+    forwards are the same as those of the serial simulation. Otherwise each
+    block draws its Gaussians from its own random number stream seeded using
+    the seed and the block number, so the forwards do not depend on the
+    number of threads but differ from those of the serial simulation. """
+
+    if len(gammas) != num_fwds:
+        raise FinError("Gamma vector does not have right number of forwards")
+
+    if len(fwd0) != num_fwds:
+        raise FinError("The length of fwd0 is not equal to numForwards")
+
+    if len(taus) != num_fwds:
+        raise FinError("The length of Taus is not equal to numForwards")
+
+    if useSobol != 0 and useSobol != 1:
+        raise FinError("Use Sobol must be 0 or 1")
+
+    # Even number of paths for antithetics
+    num_paths = 2 * int(num_paths/2)
+    halfNumPaths = int(num_paths/2)
+
+    num_times = num_fwds
+
+    if useSobol == 1:
+        rands = get_uniform_sobol(halfNumPaths, num_times)
+    else:
+        rands = np.zeros((0, num_times))
+
+    numBlocks = _lmm_num_blocks(halfNumPaths)
+
+    fwd = _lmm_simulate_blocks_1f(num_fwds, halfNumPaths, 0, numBlocks, fwd0,
+                                  gammas, taus, rands, useSobol, seed)
+
+    return fwd
+
+###############################################################################
+
+
+def lmm_simulate_fwds_1f_batches(num_fwds, num_paths, numeraireIndex, fwd0,
+                                 gammas, taus, useSobol, seed,
+                                 numPathsPerBatch):
+    """ Streaming version of lmm_simulate_fwds_1f_parallel. This is a
+    generator which yields the 3D matrix of forward rates for successive
+    batches of about numPathsPerBatch paths so that the full matrix is never
+    held in memory. Together the batches contain the same paths as the
+    parallel simulation with the same seed, each batch holding its own
+    antithetic paths. With Sobol numbers the uniforms for all of the paths
+    are generated once at the start. """
+
+    if len(gammas) != num_fwds:
+        raise FinError("Gamma vector does not have right number of forwards")
+
+    if len(fwd0) != num_fwds:
+        raise FinError("The length of fwd0 is not equal to numForwards")
+
+    if len(taus) != num_fwds:
+        raise FinError("The length of Taus is not equal to numForwards")
+
+    if useSobol != 0 and useSobol != 1:
+        raise FinError("Use Sobol must be 0 or 1")
+
+    halfNumPaths = int(num_paths/2)
+
+    num_times = num_fwds
+
+    if useSobol == 1:
+        rands = get_uniform_sobol(halfNumPaths, num_times)
+    else:
+        rands = np.zeros((0, num_times))
+
+    numBlocks = _lmm_num_blocks(halfNumPaths)
+    numBlocksPerBatch = _lmm_num_blocks_per_batch(numPathsPerBatch)
+
+    for firstBlock in range(0, numBlocks, numBlocksPerBatch):
+        endBlock = min(firstBlock + numBlocksPerBatch, numBlocks)
+        yield _lmm_simulate_blocks_1f(num_fwds, halfNumPaths, firstBlock,
+                                      endBlock, fwd0, gammas, taus, rands,
+                                      useSobol, seed)
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _lmm_evolve_path_mf(fwd, i_path, g, fwd0, lambdas, taus, fwdB):
+    """ Evolve the forward curve along one path of the multi-factor
+    simulation using the matrix g of Gaussian draws indexed by time step and
+    factor. """
+
+    num_fwds = fwd.shape[1]
+    numFactors = len(lambdas)
+
+    # Initial value of forward curve at time 0
+    for iFwd in range(0, num_fwds):
+        fwd[i_path, 0, iFwd] = fwd0[iFwd]
+
+    for j in range(0, num_fwds-1):  # TIME LOOP
+        dtj = taus[j]
+        sqrt_dtj = np.sqrt(dtj)
+
+        for k in range(j, num_fwds):  # FORWARDS LOOP
+
+            muA = 0.0
+            for i in range(j+1, k+1):
+                fi = fwd[i_path, j, i]
+                ti = taus[i]
+                zz = 0.0
+                for q in range(0, numFactors):
+                    zij = lambdas[q][i-j]
+                    zkj = lambdas[q][k-j]
+                    zz += zij * zkj
+                muA += fi * ti * zz / (1.0 + fi * ti)
+
+            itoTerm = 0.0
+            for q in range(0, numFactors):
+                itoTerm += lambdas[q][k-j] * lambdas[q][k-j]
+
+            randomTerm = 0.0
+            for q in range(0, numFactors):
+                wq = g[j, q]
+                randomTerm += lambdas[q][k-j] * wq
+            randomTerm *= sqrt_dtj
+
+            x = np.exp(muA * dtj - 0.5 * itoTerm * dtj + randomTerm)
+            fwdB[k] = fwd[i_path, j, k] * x
+
+            muB = 0.0
+            for i in range(j+1, k+1):
+                fi = fwdB[k]
+                ti = taus[i]
+                zz = 0.0
+                for q in range(0, numFactors):
+                    zij = lambdas[q][i-j]
+                    zkj = lambdas[q][k-j]
+                    zz += zij * zkj
+                muB += fi * ti * zz / (1.0 + fi * ti)
+
+            muC = 0.5 * (muA + muB)
+
+            x = np.exp(muC * dtj - 0.5 * itoTerm * dtj + randomTerm)
+            fwd[i_path, j+1, k] = fwd[i_path, j, k] * x
+
+###############################################################################
+
+
 @njit(float64[:, :, :](int64, int64, int64, int64, float64[:], float64[:, :],
                        float64[:], int64, int64), cache=True, fastmath=True)
 def lmm_simulate_fwds_mf(num_fwds, numFactors, num_paths, numeraireIndex,
@@ -556,61 +988,145 @@ def lmm_simulate_fwds_mf(num_fwds, numFactors, num_paths, numeraireIndex,
         raise FinError("Use Sobol must be 0 or 1.")
 
     for i_path in range(0, num_paths):
-        # Initial value of forward curve at time 0
-        for iFwd in range(0, num_fwds):
-            fwd[i_path, 0, iFwd] = fwd0[iFwd]
-
-        for j in range(0, num_fwds-1):  # TIME LOOP
-            dtj = taus[j]
-            sqrt_dtj = np.sqrt(dtj)
-
-            for k in range(j, num_fwds):  # FORWARDS LOOP
-
-                muA = 0.0
-                for i in range(j+1, k+1):
-                    fi = fwd[i_path, j, i]
-                    ti = taus[i]
-                    zz = 0.0
-                    for q in range(0, numFactors):
-                        zij = lambdas[q][i-j]
-                        zkj = lambdas[q][k-j]
-                        zz += zij * zkj
-                    muA += fi * ti * zz / (1.0 + fi * ti)
-
-                itoTerm = 0.0
-                for q in range(0, numFactors):
-                    itoTerm += lambdas[q][k-j] * lambdas[q][k-j]
+        _lmm_evolve_path_mf(fwd, i_path, gMatrix[i_path], fwd0, lambdas, taus,
+                            fwdB)
+
+    return fwd
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _lmm_simulate_blocks_mf(num_fwds, halfNumPaths, firstBlock, endBlock,
+                            fwd0, lambdas, taus, rands, useSobol, seed):
+    """ Simulate the paths of the multi-factor model that belong to the
+    blocks from firstBlock up to but not including endBlock, sharing the
+    blocks across threads. The Sobol uniforms are indexed by the path number.
+    The antithetic paths follow all of the other paths. """
+
+    num_times = num_fwds
+    numFactors = len(lambdas)
+
+    startPath = firstBlock * NUM_PATHS_PER_BLOCK
+    endPath = min(endBlock * NUM_PATHS_PER_BLOCK, halfNumPaths)
+    numBlockPaths = endPath - startPath
+
+    fwd = np.empty((2 * numBlockPaths, num_fwds, num_fwds))
 
-                randomTerm = 0.0
+    for iBlock in prange(firstBlock, endBlock):
+
+        if useSobol == 0:
+            np.random.seed(_lmm_block_seed(seed, iBlock))
+
+        fwdB = np.zeros(num_fwds)
+        gPath = np.zeros((num_times, numFactors))
+
+        blockStart = iBlock * NUM_PATHS_PER_BLOCK
+        blockEnd = min(blockStart + NUM_PATHS_PER_BLOCK, endPath)
+
+        for i_path in range(blockStart, blockEnd):
+
+            for j in range(0, num_times):
                 for q in range(0, numFactors):
-                    wq = gMatrix[i_path, j, q]
-                    randomTerm += lambdas[q][k-j] * wq
-                randomTerm *= sqrt_dtj
+                    if useSobol == 1:
+                        col = j*numFactors + q
+                        gPath[j, q] = norminvcdf(rands[i_path, col])
+                    else:
+                        gPath[j, q] = np.random.normal()
 
-                x = np.exp(muA * dtj - 0.5 * itoTerm * dtj + randomTerm)
-                fwdB[k] = fwd[i_path, j, k] * x
+            i_out = i_path - startPath
 
-                muB = 0.0
-                for i in range(j+1, k+1):
-                    fi = fwdB[k]
-                    ti = taus[i]
-                    zz = 0.0
-                    for q in range(0, numFactors):
-                        zij = lambdas[q][i-j]
-                        zkj = lambdas[q][k-j]
-                        zz += zij * zkj
-                    muB += fi * ti * zz / (1.0 + fi * ti)
+            _lmm_evolve_path_mf(fwd, i_out, gPath, fwd0, lambdas, taus, fwdB)
+
+            # ANTITHETICS
+            gPath = -gPath
+            _lmm_evolve_path_mf(fwd, i_out + numBlockPaths, gPath, fwd0,
+                                lambdas, taus, fwdB)
+
+    return fwd
+
+###############################################################################
 
-                muC = 0.5 * (muA + muB)
 
-                x = np.exp(muC * dtj - 0.5 * itoTerm * dtj + randomTerm)
-                fwd[i_path, j+1, k] = fwd[i_path, j, k] * x
+@njit(float64[:, :, :](int64, int64, int64, int64, float64[:], float64[:, :],
+                       float64[:], int64, int64), cache=True, fastmath=True)
+def lmm_simulate_fwds_mf_parallel(num_fwds, numFactors, num_paths,
+                                  numeraireIndex, fwd0, lambdas, taus,
+                                  useSobol, seed):
+    """ Parallel version of lmm_simulate_fwds_mf. The paths are split into
+    blocks which are simulated on different threads. With Sobol numbers the
+    forwards are the same as those of the serial simulation. Otherwise each
+    block draws its Gaussians from its own random number stream seeded using
+    the seed and the block number, so the forwards do not depend on the
+    number of threads but differ from those of the serial simulation. """
+
+    if len(lambdas) != numFactors:
+        raise FinError("Lambda does not have the right number of factors")
+
+    if len(lambdas[0]) != num_fwds:
+        raise FinError("Lambda does not have the right number of forwards")
+
+    if useSobol != 0 and useSobol != 1:
+        raise FinError("Use Sobol must be 0 or 1.")
+
+    # Even number of paths for antithetics
+    num_paths = 2 * int(num_paths/2)
+    halfNumPaths = int(num_paths/2)
+
+    num_times = num_fwds
+
+    if useSobol == 1:
+        rands = get_uniform_sobol(halfNumPaths, num_times * numFactors)
+    else:
+        rands = np.zeros((0, num_times * numFactors))
+
+    numBlocks = _lmm_num_blocks(halfNumPaths)
+
+    fwd = _lmm_simulate_blocks_mf(num_fwds, halfNumPaths, 0, numBlocks, fwd0,
+                                  lambdas, taus, rands, useSobol, seed)
 
     return fwd
 
 ###############################################################################
 
 
+def lmm_simulate_fwds_mf_batches(num_fwds, numFactors, num_paths,
+                                 numeraireIndex, fwd0, lambdas, taus,
+                                 useSobol, seed, numPathsPerBatch):
+    """ Streaming version of lmm_simulate_fwds_mf_parallel which yields the
+    forward rates for successive batches of about numPathsPerBatch paths as
+    in lmm_simulate_fwds_1f_batches. """
+
+    if len(lambdas) != numFactors:
+        raise FinError("Lambda does not have the right number of factors")
+
+    if len(lambdas[0]) != num_fwds:
+        raise FinError("Lambda does not have the right number of forwards")
+
+    if useSobol != 0 and useSobol != 1:
+        raise FinError("Use Sobol must be 0 or 1.")
+
+    halfNumPaths = int(num_paths/2)
+
+    num_times = num_fwds
+
+    if useSobol == 1:
+        rands = get_uniform_sobol(halfNumPaths, num_times * numFactors)
+    else:
+        rands = np.zeros((0, num_times * numFactors))
+
+    numBlocks = _lmm_num_blocks(halfNumPaths)
+    numBlocksPerBatch = _lmm_num_blocks_per_batch(numPathsPerBatch)
+
+    for firstBlock in range(0, numBlocks, numBlocksPerBatch):
+        endBlock = min(firstBlock + numBlocksPerBatch, numBlocks)
+        yield _lmm_simulate_blocks_mf(num_fwds, halfNumPaths, firstBlock,
+                                      endBlock, fwd0, lambdas, taus, rands,
+                                      useSobol, seed)
+
+###############################################################################
+
+
 @njit(float64[:](int64, int64, float64, float64[:], float64[:, :, :],
                  float64[:], int64),
       cache=True, fastmath=True)
@@ -978,3 +1494,30 @@ def lmm_sticky_caplet_pricer(spread, num_periods, num_paths, fwd0, fwds, taus):
     return stickyCapletValues
 
 ###############################################################################
+
+
+def lmm_stream_pricer(fwdBatches, batchPricer):
+    """ Price a product from batches of simulated forward rates without
+    holding all of the paths in memory. The batchPricer is called with each
+    batch of forwards and the number of paths in it and must return the value
+    averaged over these paths, for example
+
+        lambda fwds, n: lmm_swaption_pricer(K, a, b, n, fwd0, fwds, taus, 1)
+
+    The batch values, which may be arrays, are accumulated weighted by their
+    number of paths to give the value averaged over all of the paths. """
+
+    value = 0.0
+    num_paths = 0
+
+    for fwds in fwdBatches:
+        numBatchPaths = len(fwds)
+        value = value + batchPricer(fwds, numBatchPaths) * numBatchPaths
+        num_paths += numBatchPaths
+
+    if num_paths == 0:
+        raise FinError("No simulated paths to price with")
+
+    return value / num_paths
+
+###############################################################################
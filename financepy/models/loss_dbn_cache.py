@@ -0,0 +1,271 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import time
+from enum import Enum
+from collections import OrderedDict
+
+import numpy as np
+from numba import njit, prange
+
+from ..utils.error import FinError
+from ..utils.helpers import label_to_string
+from .gauss_copula_onefactor import loss_units_gcd
+from .gauss_copula_onefactor import adj_binomial_loss_ratios
+from .gauss_copula_onefactor import tranche_surv_prob_from_dbn
+from .gauss_copula_onefactor import loss_dbns_recursion_gcd
+from .gauss_copula_onefactor import loss_dbns_adj_binomial
+from .gauss_copula_onefactor import tranch_surv_prob_gaussian
+from .gauss_copula_lhp import tr_surv_prob_lhp
+
+###############################################################################
+
+
+class FinLossDistributionBuilder(Enum):
+    RECURSION = 1
+    ADJUSTED_BINOMIAL = 2
+    GAUSSIAN = 3
+    LHP = 4
+
+###############################################################################
+# In the one-factor Gaussian copula a tranche is priced from the survival
+# probabilities of the base tranches at its attachment and detachment points.
+# These are all expected losses of the same portfolio loss distribution at
+# a payment date and correlation. Valuing the tranches of a capital structure
+# one at a time rebuilds this distribution for every tranche and every
+# payment date, and a base correlation bootstrap rebuilds the distribution
+# at the attachment point of each tranche while it solves for the
+# correlation at the detachment point. The LossDbnCache keeps the loss
+# distributions so that they are built once and shared.
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _base_tranche_surv_probs_direct(model_value, survival_probs,
+                                    recovery_rates, attachments, betas,
+                                    num_points):
+    """ Survival probabilities of the base tranches for the models which do
+    not build a loss distribution. The horizons are shared across threads.
+    """
+
+    num_times, num_credits = survival_probs.shape
+    num_attachments = len(attachments)
+    probs = np.zeros((num_times, num_attachments))
+
+    for i_time in prange(num_times):
+
+        q_vector = survival_probs[i_time]
+
+        for i_k in range(0, num_attachments):
+
+            k = attachments[i_k]
+            beta = betas[i_k]
+
+            if model_value == FinLossDistributionBuilder.GAUSSIAN.value:
+                beta_vector = np.full(num_credits, beta)
+                probs[i_time, i_k] = tranch_surv_prob_gaussian(
+                    0.0, k, num_credits, q_vector, recovery_rates,
+                    beta_vector, num_points)
+            else:
+                probs[i_time, i_k] = tr_surv_prob_lhp(
+                    0.0, k, num_credits, q_vector, recovery_rates, beta)
+
+    return probs
+
+###############################################################################
+
+
+class LossDbnCache():
+    """ Least recently used cache of the portfolio loss distributions of the
+    one-factor Gaussian copula model that can be shared by the valuations of
+    CDS tranches on the same portfolio. A loss distribution is keyed on the
+    model, the number of integration points, the recovery rates, the
+    correlation and the survival probabilities of the credits to the horizon.
+    The base tranche survival probabilities at every attachment point are
+    then found from the cached distributions. The GAUSSIAN and LHP models do
+    not build a loss distribution so nothing is cached for them. """
+
+    def __init__(self,
+                 max_size: int = 10000):
+        """ Create a cache that holds at most max_size loss distributions. """
+
+        if max_size < 1:
+            raise FinError("Loss distribution cache size must be at least 1.")
+
+        self._max_size = max_size
+        self._dbns = OrderedDict()
+
+        self._num_hits = 0
+        self._num_misses = 0
+        self._num_evictions = 0
+        self._build_time = 0.0
+
+###############################################################################
+
+    def base_tranche_surv_probs(self,
+                                survival_probs: np.ndarray,
+                                recovery_rates: np.ndarray,
+                                attachments: np.ndarray,
+                                correlations: np.ndarray,
+                                num_points: int = 50,
+                                model=FinLossDistributionBuilder.RECURSION):
+        """ Return the survival probabilities of the base tranches from zero
+        to each attachment point with one row per horizon and one column per
+        attachment point. The survival probabilities of the credits have one
+        row per horizon. Each attachment point has its own correlation as in
+        the base correlation approach. The loss distributions which are not
+        in the cache are built in parallel. """
+
+        survival_probs = np.ascontiguousarray(survival_probs,
+                                              dtype=np.float64)
+        recovery_rates = np.ascontiguousarray(recovery_rates,
+                                              dtype=np.float64)
+        attachments = np.asarray(attachments, dtype=np.float64)
+        correlations = np.asarray(correlations, dtype=np.float64)
+
+        if len(attachments) != len(correlations):
+            raise FinError("Need one correlation per attachment point.")
+
+        num_times, num_credits = survival_probs.shape
+        betas = np.sqrt(correlations)
+
+        if model == FinLossDistributionBuilder.GAUSSIAN or \
+                model == FinLossDistributionBuilder.LHP:
+
+            return _base_tranche_surv_probs_direct(model.value,
+                                                   survival_probs,
+                                                   recovery_rates,
+                                                   attachments, betas,
+                                                   num_points)
+
+        if model == FinLossDistributionBuilder.RECURSION:
+            loss_unit, loss_units, num_loss_units = \
+                loss_units_gcd(num_credits, recovery_rates)
+        elif model == FinLossDistributionBuilder.ADJUSTED_BINOMIAL:
+            loss_unit, loss_ratio = adj_binomial_loss_ratios(num_credits,
+                                                             recovery_rates)
+            num_loss_units = num_credits + 1
+        else:
+            raise FinError("Unknown loss distribution model " + str(model))
+
+        base_key = (model.value, num_points, recovery_rates.tobytes())
+
+        unique_betas = np.unique(betas)
+        keys = {}
+        missing = []
+        missing_keys = set()
+
+        for i_time in range(0, num_times):
+            row_key = survival_probs[i_time].tobytes()
+            for beta in unique_betas:
+                key = (base_key, beta, row_key)
+                keys[(i_time, beta)] = key
+                if key in self._dbns:
+                    self._dbns.move_to_end(key)
+                    self._num_hits += 1
+                elif key not in missing_keys:
+                    missing_keys.add(key)
+                    missing.append((key, i_time, beta))
+
+        if len(missing) > 0:
+
+            self._num_misses += len(missing)
+
+            default_probs = np.array([1.0 - survival_probs[i_time]
+                                      for _, i_time, _ in missing])
+            missing_betas = np.array([beta for _, _, beta in missing])
+
+            start = time.time()
+
+            if model == FinLossDistributionBuilder.RECURSION:
+                dbns = loss_dbns_recursion_gcd(default_probs, loss_units,
+                                               num_loss_units, missing_betas,
+                                               num_points)
+            else:
+                dbns = loss_dbns_adj_binomial(default_probs, loss_ratio,
+                                              missing_betas, num_points)
+
+            self._build_time += time.time() - start
+
+            for i_dbn, (key, _, _) in enumerate(missing):
+                self._dbns[key] = dbns[i_dbn]
+
+        probs = np.zeros((num_times, len(attachments)))
+
+        for i_time in range(0, num_times):
+            for i_k in range(0, len(attachments)):
+
+                k = attachments[i_k]
+
+                if k == 0.0:
+                    continue
+
+                dbn = self._dbns[keys[(i_time, betas[i_k])]]
+                probs[i_time, i_k] = tranche_surv_prob_from_dbn(
+                    0.0, k, dbn, loss_unit, num_loss_units)
+
+        while len(self._dbns) > self._max_size:
+            self._dbns.popitem(last=False)
+            self._num_evictions += 1
+
+        return probs
+
+###############################################################################
+
+    def clear(self):
+        """ Remove all of the loss distributions from the cache and reset the
+        statistics. """
+
+        self._dbns.clear()
+        self._num_hits = 0
+        self._num_misses = 0
+        self._num_evictions = 0
+        self._build_time = 0.0
+
+###############################################################################
+
+    def hit_rate(self):
+        """ Fraction of loss distribution requests met from the cache. """
+
+        num_requests = self._num_hits + self._num_misses
+
+        if num_requests == 0:
+            return 0.0
+
+        return self._num_hits / num_requests
+
+###############################################################################
+
+    def stats(self):
+        """ Return a dictionary of the cache statistics. The build time is the
+        total time in seconds spent building the loss distributions that
+        were not found in the cache. """
+
+        return {'size': len(self._dbns),
+                'hits': self._num_hits,
+                'misses': self._num_misses,
+                'evictions': self._num_evictions,
+                'hit_rate': self.hit_rate(),
+                'build_time': self._build_time}
+
+###############################################################################
+
+    def __len__(self):
+        return len(self._dbns)
+
+###############################################################################
+
+    def __repr__(self):
+        """ Return string with class details. """
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("MAX SIZE", self._max_size)
+        s += label_to_string("SIZE", len(self._dbns))
+        s += label_to_string("HITS", self._num_hits)
+        s += label_to_string("MISSES", self._num_misses)
+        s += label_to_string("EVICTIONS", self._num_evictions)
+        s += label_to_string("BUILD TIME", self._build_time)
+        return s
+
+###############################################################################
@@ -159,6 +159,208 @@ def vol_function_sabr_beta_half(params, f, k, t):
 ###############################################################################
 
 
+@njit(cache=True)
+def _vol_sabr_grad(alpha, beta, rho, nu, f, k, t):
+    """ Return the SABR Black volatility of vol_function_sabr and its
+    derivatives with respect to alpha, beta, rho and nu. This follows the
+    calculation in vol_function_sabr term by term. """
+
+    dalpha = 1.0
+
+    if alpha < 1e-10:
+        alpha = 1e-10
+        dalpha = 0.0
+
+    if k <= 0:
+        raise FinError("Strike must be positive")
+
+    if f <= 0:
+        raise FinError("Forward must be positive")
+
+    logfk = np.log(f / k)
+    logfk2 = np.log(f * k)
+
+    b = 1.0 - beta
+    fkb = (f*k)**b
+    d = fkb**0.5
+
+    # Each quantity is followed by its derivatives in the order alpha, beta,
+    # rho and nu. The derivative of fkb with respect to beta is -fkb*logfk2.
+    a = b**2 * alpha**2 / (24.0 * fkb)
+    a_a = 2.0 * b**2 * alpha * dalpha / (24.0 * fkb)
+    a_b = (-2.0 * b + b**2 * logfk2) * alpha**2 / (24.0 * fkb)
+
+    e = 0.25 * rho * beta * nu * alpha / d
+    e_a = 0.25 * rho * beta * nu * dalpha / d
+    e_b = 0.25 * rho * nu * alpha / d + 0.5 * e * logfk2
+    e_r = 0.25 * beta * nu * alpha / d
+    e_n = 0.25 * rho * beta * alpha / d
+
+    c = (2.0 - 3.0*rho**2.0) * nu**2.0 / 24
+    c_r = -rho * nu**2 / 4.0
+    c_n = (2.0 - 3.0*rho**2.0) * nu / 12.0
+
+    d_b = -0.5 * d * logfk2
+
+    vw_e = e * logfk**2 / 12.0 + e**3 * logfk**4 / 480.0
+    v = e**2 * logfk**2 / 24.0
+    w = e**4 * logfk**4 / 1920.0
+
+    num = 1.0 + (a + e + c) * t
+    num_a = (a_a + e_a) * t
+    num_b = (a_b + e_b) * t
+    num_r = (e_r + c_r) * t
+    num_n = (e_n + c_n) * t
+
+    den = d * (1.0 + v + w)
+    den_a = d * vw_e * e_a
+    den_b = d_b * (1.0 + v + w) + d * vw_e * e_b
+    den_r = d * vw_e * e_r
+    den_n = d * vw_e * e_n
+
+    z = nu * d * logfk / alpha
+
+    eps = 1e-07
+
+    if abs(z) > eps:
+
+        z_a = -z * dalpha / alpha
+        z_b = nu * d_b * logfk / alpha
+        z_n = d * logfk / alpha
+
+        root = np.sqrt(1.0 - 2.0*rho*z + z**2)
+        x = np.log((root + z - rho) / (1.0 - rho))
+        x_z = 1.0 / root
+        x_r = (-z / root - 1.0) / (root + z - rho) + 1.0 / (1.0 - rho)
+
+        # Ratio zx = z / x and its derivatives
+        zx = z / x
+        zx_z = (x - z * x_z) / x**2
+        zx_r = -z * x_r / x**2
+
+        ratio_a = zx_z * z_a
+        ratio_b = zx_z * z_b
+        ratio_r = zx_r
+        ratio_n = zx_z * z_n
+
+    else:
+
+        zx = 1.0
+        ratio_a = 0.0
+        ratio_b = 0.0
+        ratio_r = 0.0
+        ratio_n = 0.0
+
+    vol = alpha * zx * num / den
+
+    vol_a = vol * (dalpha / alpha + ratio_a / zx + num_a / num - den_a / den)
+    vol_b = vol * (ratio_b / zx + num_b / num - den_b / den)
+    vol_r = vol * (ratio_r / zx + num_r / num - den_r / den)
+    vol_n = vol * (ratio_n / zx + num_n / num - den_n / den)
+
+    return vol, vol_a, vol_b, vol_r, vol_n
+
+###############################################################################
+
+
+@njit(float64(float64[:], float64, float64, float64, float64[:]),
+      cache=True)
+def vol_function_sabr_grad(params, f, k, t, grad):
+    """ Return the SABR Black volatility and write its derivatives with
+    respect to alpha, beta, rho and nu into grad. """
+
+    vol, vol_a, vol_b, vol_r, vol_n = \
+        _vol_sabr_grad(params[0], params[1], params[2], params[3], f, k, t)
+
+    grad[0] = vol_a
+    grad[1] = vol_b
+    grad[2] = vol_r
+    grad[3] = vol_n
+
+    return vol
+
+###############################################################################
+
+
+@njit(float64(float64[:], float64, float64, float64, float64[:]),
+      cache=True)
+def vol_function_sabr_beta_half_grad(params, f, k, t, grad):
+    """ Return the SABR Black volatility with beta equal to one half and write
+    its derivatives with respect to alpha, rho and nu into grad. """
+
+    vol, vol_a, _, vol_r, vol_n = \
+        _vol_sabr_grad(params[0], 0.50, params[1], params[2], f, k, t)
+
+    grad[0] = vol_a
+    grad[1] = vol_r
+    grad[2] = vol_n
+
+    return vol
+
+###############################################################################
+
+
+@njit(float64(float64[:], float64, float64, float64, float64[:]),
+      cache=True)
+def vol_function_sabr_beta_one_grad(params, f, k, t, grad):
+    """ Return the SABR volatility with beta equal to one and write its
+    derivatives with respect to alpha, rho and nu into grad. """
+
+    alpha = params[0]
+    rho = params[1]
+    nu = params[2]
+
+    drho = 1.0
+
+    if rho > 1.0:
+        rho = 0.99
+        drho = 0.0
+
+    if rho < -1.0:
+        rho = -0.99
+        drho = 0.0
+
+    m = f / k
+
+    numTerm2 = rho * nu * alpha / 4.0
+    numTerm3 = nu * nu * ((2.0 - 3.0 * (rho**2.0)) / 24.0)
+    num = alpha * (1.0 + (numTerm2 + numTerm3) * t)
+    num_a = 1.0 + (numTerm2 + numTerm3) * t + alpha * t * rho * nu / 4.0
+    num_r = alpha * t * (nu * alpha / 4.0 - rho * nu * nu / 4.0) * drho
+    num_n = alpha * t * (rho * alpha / 4.0 + nu * (2.0 - 3.0 * rho**2) / 12.0)
+
+    if abs(m - 1.0) > 1e-6:
+
+        logM = np.log(m)
+        z = nu / alpha * logM
+        z_a = -z / alpha
+        z_n = logM / alpha
+
+        root = np.sqrt(1.0 - 2.0*rho*z + z**2.0)
+        x = np.log((root + z - rho)/(1.0 - rho))
+        x_z = 1.0 / root
+        x_r = ((-z / root - 1.0) / (root + z - rho) + 1.0 / (1.0 - rho)) * drho
+
+        zx = z / x
+        zx_z = (x - z * x_z) / x**2
+
+        sigma = num * zx
+        grad[0] = num_a * zx + num * zx_z * z_a
+        grad[1] = num_r * zx - num * z * x_r / x**2
+        grad[2] = num_n * zx + num * zx_z * z_n
+
+    else:
+
+        sigma = num
+        grad[0] = num_a
+        grad[1] = num_r
+        grad[2] = num_n
+
+    return sigma
+
+###############################################################################
+
+
 class SABR():
     """ SABR - Stochastic alpha beta rho model by Hagan et al. which is a
     stochastic volatility model where alpha controls the implied volatility,
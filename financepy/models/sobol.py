@@ -141,3 +141,94 @@ def get_uniform_sobol(num_points, dimension):
     return points
 
 ###############################################################################
+
+###############################################################################
+# The functions below give the value of a single Sobol point in one dimension
+# using its index in the gray code ordering of get_uniform_sobol. As each
+# point is computed directly, ranges of points can be generated in parallel
+# and one dimension at a time, without storing the whole matrix of points.
+###############################################################################
+
+
+def sobol_max_dimension():
+    """ The number of dimensions for which there are Sobol coefficients. """
+    return len(sArr) + 1
+
+###############################################################################
+
+
+@njit(cache=True)
+def sobol_direction_numbers(dimension, num_bits=32):
+    """ Direction numbers v[1] to v[num_bits] of the Sobol sequence for the
+    zero-based dimension, scaled by 2**32. These are the same direction
+    numbers as used by get_uniform_sobol. """
+
+    v = np.zeros(num_bits+1, dtype=np.int64)
+
+    if dimension == 0:
+        for i in range(1, num_bits+1):
+            v[i] = 1 << (32-i)
+        return v
+
+    s = sArr[dimension-1]
+    a = aArr[dimension-1]
+    mm = m_i[dimension-1]
+
+    for i in range(1, min(s, num_bits)+1):
+        v[i] = mm[i-1] << (32-i)
+
+    for i in range(s+1, num_bits+1):
+        v[i] = v[i-s] ^ (v[i-s] >> s)
+        for k in range(1, s):
+            v[i] = v[i] ^ (((a >> (s-1-k)) & 1) * v[i-k])
+
+    return v
+
+###############################################################################
+
+
+@njit(cache=True)
+def sobol_point(index, v):
+    """ Uniform value of the Sobol point with this zero-based index for the
+    dimension with direction numbers v. This is row index of the matrix of
+    points returned by get_uniform_sobol. """
+
+    gray = (index + 1) ^ ((index + 1) >> 1)
+
+    x = 0
+    i = 1
+    while gray > 0:
+        if gray & 1:
+            x = x ^ v[i]
+        gray >>= 1
+        i += 1
+
+    return x / 4294967296.0
+
+###############################################################################
+
+
+@njit(cache=True)
+def sobol_shifted_point(index, v, shift):
+    """ Uniform value of the Sobol point with this zero-based index for the
+    dimension with direction numbers v after a digital shift. The shift is a
+    32 bit integer which is XOR-ed with the point so that a random shift
+    gives a randomised Sobol sequence with the same uniformity. The value is
+    in the middle of its interval of width 2**-32 so it is never zero. """
+
+    x = int(sobol_point(index, v) * 4294967296.0)
+    return ((x ^ shift) + 0.5) / 4294967296.0
+
+###############################################################################
+
+
+def sobol_digital_shifts(num_dimensions, seed):
+    """ Random 32 bit digital shifts, one per dimension, for use with
+    sobol_shifted_point. These are drawn from the seed so that Sobol
+    estimates with different seeds are independent. """
+
+    np.random.seed(seed)
+    return np.random.randint(0, 4294967296, size=num_dimensions,
+                             dtype=np.int64)
+
+###############################################################################
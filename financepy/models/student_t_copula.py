@@ -4,9 +4,27 @@
 
 from math import sqrt
 import numpy as np
-from scipy.stats import t as student
+from numba import njit
 
-from ..utils.helpers import uniform_to_default_time
+from ..utils.math import student_t_cdf
+from ..models.gauss_copula import survival_curve_arrays
+from ..models.gauss_copula import _uniforms_to_default_times
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _student_t_uniforms(y, scales, degreesOfFreedom):
+    """ Uniforms for a matrix of correlated Gaussians indexed by credit and
+    trial where the Gaussians of each trial are divided by its scale. """
+
+    u = np.empty(y.shape)
+
+    for i in range(0, y.shape[0]):
+        for j in range(0, y.shape[1]):
+            u[i, j] = student_t_cdf(y[i, j] / scales[j], degreesOfFreedom)
+
+    return u
 
 ###############################################################################
 
@@ -26,22 +44,18 @@ class StudentTCopula():
         c = np.linalg.cholesky(correlation_matrix)
         y = np.dot(c, x)
 
-        corrTimes = np.empty(shape=(num_credits, 2 * num_trials))
+        scales = np.empty(num_trials)
 
         for i_trial in range(0, num_trials):
             chi2 = np.random.chisquare(degreesOfFreedom)
-            c = sqrt(chi2 / degreesOfFreedom)
-            for iCredit in range(0, num_credits):
-                issuer_curve = issuer_curves[iCredit]
-                g = y[iCredit, i_trial] / c
-                u1 = student.cdf(g, degreesOfFreedom)
-                u2 = 1.0 - u1
-                times = issuer_curve._times
-                values = issuer_curve._values
-                t1 = uniform_to_default_time(u1, times, values)
-                t2 = uniform_to_default_time(u2, times, values)
-                corrTimes[iCredit, i_trial] = t1
-                corrTimes[iCredit, i_trial + num_trials] = t2
+            scales[i_trial] = sqrt(chi2 / degreesOfFreedom)
+
+        curve_times, curve_values, num_points = \
+            survival_curve_arrays(issuer_curves)
+
+        corrTimes = _uniforms_to_default_times(
+            _student_t_uniforms(y, scales, float(degreesOfFreedom)),
+            curve_times, curve_values, num_points)
 
         return corrTimes
 
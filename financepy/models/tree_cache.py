@@ -0,0 +1,178 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import time
+from collections import OrderedDict
+
+from ..utils.error import FinError
+from ..utils.helpers import label_to_string
+
+###############################################################################
+# A calibrated short rate tree depends only on the model parameters, the
+# number of time steps, the tree maturity and the discount curve. Products
+# such as Bermudan swaptions, callable bonds and bond options rebuild the
+# tree each time they are valued so pricing many trades off one curve spends
+# most of its time fitting identical trees. The TreeCache keeps the most
+# recently used trees so that they can be reused.
+###############################################################################
+
+
+class TreeCache():
+    """ Least recently used cache of calibrated short rate trees that can be
+    shared by HWTree, BKTree and BDTTree models. A tree is keyed on the model
+    type and parameters, the number of time steps, the tree maturity and the
+    discount factors used to fit it. If reuse_longer_trees is True, a request
+    for a tree is also met by the shortest cached tree with a longer maturity
+    and the same time step which is otherwise identical. The trees are built
+    forward one step at a time so the steps of this tree up to the requested
+    maturity are those of the tree built to that maturity and values are the
+    same to round-off. To share trees, the number of time steps of a model
+    should be in proportion to the tree maturity. """
+
+    def __init__(self,
+                 max_size: int = 32,
+                 reuse_longer_trees: bool = False):
+        """ Create a cache that holds at most max_size trees. """
+
+        if max_size < 1:
+            raise FinError("Tree cache size must be at least 1.")
+
+        self._max_size = max_size
+        self._reuse_longer_trees = reuse_longer_trees
+        self._trees = OrderedDict()
+
+        self._num_hits = 0
+        self._num_misses = 0
+        self._num_evictions = 0
+        self._build_time = 0.0
+
+###############################################################################
+
+    def build_tree(self, model, tree_mat, df_times, df_values):
+        """ Set the tree of the model to a cached tree if one matches and
+        otherwise build the tree using the model and add it to the cache. The
+        model must define _num_time_steps, _tree_param_names, the names of the
+        other attributes that determine the tree, _tree_state_names, the
+        names of the attributes that hold it, and _build_tree which builds
+        it. """
+
+        base_key = (type(model).__name__,
+                    tuple(getattr(model, name)
+                          for name in model._tree_param_names),
+                    df_times.tobytes(),
+                    df_values.tobytes())
+
+        num_time_steps = model._num_time_steps
+
+        key = self._find(base_key, tree_mat, num_time_steps)
+
+        if key is not None:
+            self._trees.move_to_end(key)
+            self._num_hits += 1
+            for name, value in self._trees[key].items():
+                setattr(model, name, value)
+            return
+
+        self._num_misses += 1
+
+        start = time.time()
+        model._build_tree(tree_mat, df_times, df_values)
+        self._build_time += time.time() - start
+
+        self._trees[(base_key, tree_mat, num_time_steps)] = \
+            {name: getattr(model, name) for name in model._tree_state_names}
+
+        while len(self._trees) > self._max_size:
+            self._trees.popitem(last=False)
+            self._num_evictions += 1
+
+###############################################################################
+
+    def _find(self, base_key, tree_mat, num_time_steps):
+        """ Return the key of the cached tree to use or None if there is no
+        suitable tree in the cache. """
+
+        key = (base_key, tree_mat, num_time_steps)
+
+        if key in self._trees:
+            return key
+
+        if self._reuse_longer_trees is False:
+            return None
+
+        # The time step of the trees is the tree maturity over the number of
+        # time steps and must match to round-off
+        dt = tree_mat / num_time_steps
+
+        best_key = None
+
+        for cached_key in self._trees:
+            cached_base_key, cached_mat, cached_steps = cached_key
+            if cached_base_key == base_key and cached_mat > tree_mat:
+                cached_dt = cached_mat / cached_steps
+                if abs(cached_dt - dt) <= 1e-12 * dt:
+                    if best_key is None or cached_mat < best_key[1]:
+                        best_key = cached_key
+
+        return best_key
+
+###############################################################################
+
+    def clear(self):
+        """ Remove all of the trees from the cache and reset the statistics.
+        """
+
+        self._trees.clear()
+        self._num_hits = 0
+        self._num_misses = 0
+        self._num_evictions = 0
+        self._build_time = 0.0
+
+###############################################################################
+
+    def hit_rate(self):
+        """ Fraction of tree requests that were met from the cache. """
+
+        num_requests = self._num_hits + self._num_misses
+
+        if num_requests == 0:
+            return 0.0
+
+        return self._num_hits / num_requests
+
+###############################################################################
+
+    def stats(self):
+        """ Return a dictionary of the cache statistics. The build time is the
+        total time in seconds spent building the trees that were not found in
+        the cache. """
+
+        return {'size': len(self._trees),
+                'hits': self._num_hits,
+                'misses': self._num_misses,
+                'evictions': self._num_evictions,
+                'hit_rate': self.hit_rate(),
+                'build_time': self._build_time}
+
+###############################################################################
+
+    def __len__(self):
+        return len(self._trees)
+
+###############################################################################
+
+    def __repr__(self):
+        """ Return string with class details. """
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("MAX SIZE", self._max_size)
+        s += label_to_string("REUSE LONGER TREES", self._reuse_longer_trees)
+        s += label_to_string("SIZE", len(self._trees))
+        s += label_to_string("HITS", self._num_hits)
+        s += label_to_string("MISSES", self._num_misses)
+        s += label_to_string("EVICTIONS", self._num_evictions)
+        s += label_to_string("BUILD TIME", self._build_time)
+        return s
+
+###############################################################################
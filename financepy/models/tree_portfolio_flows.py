@@ -0,0 +1,187 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit
+
+from ..utils.error import FinError
+from ..utils.math import accrued_interpolator
+from ..market.curves.interpolator import InterpTypes, _uinterpolate
+from ..utils.global_vars import gSmall
+
+INTERP_TYPE = InterpTypes.FLAT_FWD_RATES.value
+
+###############################################################################
+# The Hull-White, Black-Karasinski and Black-Derman-Toy trees value
+# portfolios of Bermudan swaptions and of callable and puttable bonds in a
+# single backward induction. The functions below map the schedules of the
+# trades onto the time grid of the tree, which does not depend on the model.
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def bermudan_swaption_portfolio_flows(t_exps, strike_prices, face_amounts,
+                                      cpn_times, cpn_flows, num_cpns,
+                                      exercise_typeInts,
+                                      _df_times, _df_values,
+                                      _tree_times, _dt,
+                                      discount_strikes):
+    """ Map a portfolio of Bermudan swaptions onto the tree time grid. Row i
+    of cpn_times and cpn_flows holds the num_cpns[i] coupons of trade i. The
+    fixed leg flows, floating leg values, accrued interest and exercise masks
+    are returned with a row for each trade and a column for each tree step,
+    together with the maturity step of each trade. The grid mapping is the
+    same for all of the short rate trees. If discount_strikes is True the
+    strike on each coupon step is moved from the coupon time to the tree time
+    using the discount curve as in the Hull-White tree, otherwise it is used
+    as it is as in the Black-Karasinski and Black-Derman-Toy trees. """
+
+    num_trades = len(t_exps)
+    num_time_steps = len(_tree_times)
+
+    fixed_leg_flows = np.zeros((num_trades, num_time_steps))
+    float_leg_values = np.zeros((num_trades, num_time_steps))
+    accrued = np.zeros((num_trades, num_time_steps))
+    exercise_masks = np.zeros((num_trades, num_time_steps), dtype=np.bool_)
+    maturity_steps = np.zeros(num_trades, dtype=np.int64)
+
+    for j in range(0, num_trades):
+
+        t_exp = t_exps[j]
+        tmat = cpn_times[j, num_cpns[j]-1]
+        expiryStep = int(t_exp/_dt + 0.50)
+        maturityStep = int(tmat/_dt + 0.50)
+        maturity_steps[j] = maturityStep
+
+        for i in range(0, num_cpns[j]):
+            tcpn = cpn_times[j, i]
+            n = int(tcpn/_dt + 0.50)
+            ttree = _tree_times[n]
+            df_flow = _uinterpolate(tcpn, _df_times, _df_values, INTERP_TYPE)
+            df_tree = _uinterpolate(ttree, _df_times, _df_values, INTERP_TYPE)
+            fixed_leg_flows[j, n] += cpn_flows[j, i] * 1.0 * df_flow / df_tree
+
+            if discount_strikes:
+                float_leg_values[j, n] = strike_prices[j] * df_flow / df_tree
+            else:
+                float_leg_values[j, n] = strike_prices[j]
+
+        mapped_times = np.array([0.0])
+        mapped_amounts = np.array([0.0])
+
+        for n in range(1, len(_tree_times)):
+
+            accdAtExpiry = 0.0
+            if _tree_times[n-1] < t_exp and _tree_times[n] >= t_exp:
+                mapped_times = np.append(mapped_times, t_exp)
+                mapped_amounts = np.append(mapped_amounts, accdAtExpiry)
+
+            if fixed_leg_flows[j, n] > 0.0:
+                mapped_times = np.append(mapped_times, _tree_times[n])
+                mapped_amounts = np.append(mapped_amounts,
+                                           fixed_leg_flows[j, n])
+
+        for m in range(0, maturityStep+1):
+            ttree = _tree_times[m]
+            accrued[j, m] = accrued_interpolator(ttree, mapped_times,
+                                                 mapped_amounts)
+            accrued[j, m] *= face_amounts[j]
+
+            if fixed_leg_flows[j, m] > gSmall:
+                accrued[j, m] = fixed_leg_flows[j, m] * face_amounts[j]
+
+        for m in range(0, maturityStep):
+
+            flow = fixed_leg_flows[j, m] * face_amounts[j]
+
+            if m == expiryStep:
+                exercise_masks[j, m] = True
+            elif exercise_typeInts[j] == 2 and flow > gSmall \
+                    and m >= expiryStep:
+                exercise_masks[j, m] = True
+            elif exercise_typeInts[j] == 3 and m >= expiryStep:
+                raise FinError("American optionality not tested.")
+
+    return (fixed_leg_flows, float_leg_values, accrued, exercise_masks,
+            maturity_steps)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def callable_puttable_bond_portfolio_flows(cpn_times, cpn_flows, num_cpns,
+                                           call_times, call_prices,
+                                           num_calls,
+                                           put_times, put_prices, num_puts,
+                                           face_amounts,
+                                           _df_times, _df_values,
+                                           _tree_times, _dt):
+    """ Map a portfolio of bonds with embedded puts and calls onto the tree
+    time grid. Row i of each of the coupon, call and put arrays holds the
+    schedule of bond i and its length is given by num_cpns, num_calls and
+    num_puts. The coupon flows, accrued interest, call prices and put prices
+    are returned with a row for each bond and a column for each tree step,
+    together with the maturity step of each bond. A call price above the
+    face amount by a large margin means the bond cannot be called at that
+    step and a put price of zero that it cannot be put. """
+
+    if np.any(cpn_times < 0.0):
+        raise FinError("No coupon times can be before the value date.")
+
+    num_trades = len(face_amounts)
+    num_time_steps = len(_tree_times)
+    dt = _dt
+
+    tree_flows = np.zeros((num_trades, num_time_steps))
+    accrued = np.zeros((num_trades, num_time_steps))
+    tree_call_values = np.zeros((num_trades, num_time_steps))
+    tree_put_values = np.zeros((num_trades, num_time_steps))
+    maturity_steps = np.zeros(num_trades, dtype=np.int64)
+
+    for j in range(0, num_trades):
+
+        face = face_amounts[j]
+        tmat = cpn_times[j, num_cpns[j]-1]
+        maturity_steps[j] = int(tmat/dt + 0.50)
+
+        for i in range(0, num_cpns[j]):
+            tcpn = cpn_times[j, i]
+            n = int(tcpn/dt + 0.50)
+            ttree = _tree_times[n]
+            df_flow = _uinterpolate(tcpn, _df_times, _df_values, INTERP_TYPE)
+            df_tree = _uinterpolate(ttree, _df_times, _df_values, INTERP_TYPE)
+            tree_flows[j, n] += cpn_flows[j, i] * 1.0 * df_flow / df_tree
+
+        mapped_times = np.array([0.0])
+        mapped_amounts = np.array([0.0])
+
+        for n in range(1, len(_tree_times)):
+            if tree_flows[j, n] > 0.0:
+                mapped_times = np.append(mapped_times, _tree_times[n])
+                mapped_amounts = np.append(mapped_amounts, tree_flows[j, n])
+
+        for m in range(0, num_time_steps):
+            ttree = _tree_times[m]
+            accrued[j, m] = accrued_interpolator(ttree, mapped_times,
+                                                 mapped_amounts)
+            accrued[j, m] *= face
+
+            if tree_flows[j, m] > 0.0:
+                accrued[j, m] = tree_flows[j, m] * face
+
+        for m in range(0, num_time_steps):
+            tree_call_values[j, m] = face * 1000.0
+
+        for i in range(0, num_calls[j]):
+            n = int(call_times[j, i]/dt + 0.50)
+            tree_call_values[j, n] = call_prices[j, i]
+
+        for i in range(0, num_puts[j]):
+            n = int(put_times[j, i]/dt + 0.50)
+            tree_put_values[j, n] = put_prices[j, i]
+
+    return (tree_flows, accrued, tree_call_values, tree_put_values,
+            maturity_steps)
+
+###############################################################################
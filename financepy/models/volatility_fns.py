@@ -5,7 +5,7 @@
 import numpy as np
 from numba import njit, float64
 
-from ..utils.math import N
+from ..utils.math import N, nprime
 from ..utils.error import FinError
 
 ###############################################################################
@@ -58,6 +58,40 @@ def vol_function_clark(params, f, k, t):
 ###############################################################################
 
 
+@njit(float64(float64[:], float64, float64, float64, float64[:]),
+      cache=True)
+def vol_function_clark_grad(params, f, k, t, grad):
+    """ Return the Clark volatility and write its derivatives with respect to
+    each of the parameters into grad. The first parameter also sets the delta
+    so it enters both through the polynomial and through the delta. """
+
+    x = np.log(f/k)
+    sigma0 = np.exp(params[0])
+    arg = x / (sigma0 * np.sqrt(t))
+    deltax = N(arg) - 0.50
+
+    # Derivative of the delta with respect to the first parameter
+    ddeltax = -arg * nprime(arg)
+
+    poly = 0.0
+    dfddeltax = 0.0
+    for i in range(0, len(params)):
+        poly += params[i] * (deltax ** i)
+        if i > 0:
+            dfddeltax += i * params[i] * (deltax ** (i - 1))
+
+    vol = np.exp(poly)
+
+    for i in range(0, len(params)):
+        grad[i] = vol * (deltax ** i)
+
+    grad[0] += vol * dfddeltax * ddeltax
+
+    return vol
+
+###############################################################################
+
+
 @njit(float64(float64[:], float64, float64, float64),
       fastmath=True, cache=True)
 def vol_function_bloomberg(params, f, k, t):
@@ -89,6 +123,47 @@ def vol_function_bloomberg(params, f, k, t):
     return v
 
 ###############################################################################
+
+
+@njit(float64(float64[:], float64, float64, float64, float64[:]),
+      cache=True)
+def vol_function_bloomberg_grad(params, f, k, t, grad):
+    """ Return the Bloomberg volatility and write its derivatives with
+    respect to each of the parameters into grad. The parameters change the
+    delta at which the quadratic is evaluated through the ATM volatility. """
+
+    num_params = len(params)
+
+    sigma = 0.0
+    for i in range(0, len(params)):
+        pwr = num_params - i - 1
+        sigma += params[i] * ((0.50) ** pwr)
+
+    sqrtt = np.sqrt(t)
+    vsqrtt = sigma * sqrtt
+    logfk = np.log(f/k)
+
+    d1 = logfk / vsqrtt + vsqrtt/2.0
+    delta = N(d1)
+
+    # Derivative of the delta with respect to the ATM volatility
+    ddelta = nprime(d1) * sqrtt * (0.5 - logfk / vsqrtt / vsqrtt)
+
+    v = 0.0
+    dvddelta = 0.0
+    for i in range(0, len(params)):
+        pwr = num_params - i - 1
+        v += params[i] * (delta ** pwr)
+        if pwr > 0:
+            dvddelta += pwr * params[i] * (delta ** (pwr - 1))
+
+    for i in range(0, len(params)):
+        pwr = num_params - i - 1
+        grad[i] = delta ** pwr + dvddelta * ddelta * (0.50 ** pwr)
+
+    return v
+
+###############################################################################
 # I do not jit this so it can be called from a notebook with a vector of strike
 # Also, if I vectorise it it fails as it cannot handle a numpy array as input
 ###############################################################################
@@ -118,6 +193,38 @@ def vol_function_svi(params, f, k, t):
     return v
 
 ###############################################################################
+
+
+@njit(float64(float64[:], float64, float64, float64, float64[:]),
+      cache=True)
+def vol_function_svi_grad(params, f, k, t, grad):
+    """ Return the SVI volatility and write its derivatives with respect to
+    the parameters a, b, rho, m and sigma into grad. """
+
+    x = np.log(f/k)
+
+    a = params[0]
+    b = params[1]
+    rho = params[2]
+    m = params[3]
+    sigma = params[4]
+
+    xm = x - m
+    root = np.sqrt(xm**2 + sigma*sigma)
+    vart = a + b*(rho*xm + root)
+    v = np.sqrt(vart/t)
+
+    # The derivative of the vol is that of the total variance / (2 v t)
+    scale = 1.0 / (2.0 * v * t)
+    grad[0] = scale
+    grad[1] = scale * (rho*xm + root)
+    grad[2] = scale * b * xm
+    grad[3] = -scale * b * (rho + xm / root)
+    grad[4] = scale * b * sigma / root
+
+    return v
+
+###############################################################################
 ###############################################################################
 # Gatheral SSVI surface SVI and equivalent local volatility
 # Code from https://wwwf.imperial.ac.uk/~ajacquie/IC_AMDP/IC_AMDP_Docs/Code/SSVI.pdf
@@ -11,3 +11,4 @@ from .bond_option import *
 from .yield_curve import *
 from .yield_curve_model import *
 from .bond_mortgage import *
+from .bond_universe import *
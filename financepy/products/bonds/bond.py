@@ -24,7 +24,7 @@
 import numpy as np
 from scipy import optimize
 
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.error import FinError
 from ...utils.frequency import annual_frequency, FrequencyTypes
 from ...utils.global_vars import gDaysInYear, gSmall
@@ -86,6 +86,176 @@ def _g(oas, *args):
     return obj_fn
 
 ###############################################################################
+# The key rate durations of a bond are its sensitivities to the yields of par
+# bonds at a set of tenors from which a zero curve is bootstrapped with linear
+# interpolation of the zero rates. Each zero rate on this curve is a tent
+# function weighted sum of the zero rates at the par bond maturities so the
+# derivatives of the bond price with respect to these node zero rates are
+# found in one pass over its cash flows. The node zero rates depend on the
+# par yields only through the bootstrap so the same derivatives of the par
+# bonds give the Jacobian of the node zero rates with respect to the par
+# yields by the implicit function theorem. This is shared by all bonds with
+# the same coupon frequency and day count.
+###############################################################################
+
+KEY_RATE_TENORS = np.array([0.5, 1, 2, 3, 5, 7, 10, 20, 30])
+
+###############################################################################
+
+
+def key_rate_weights(times: np.ndarray,
+                     key_rate_tenors: np.ndarray):
+    """ Return the matrix of the weights of the key rate shifts at a vector of
+    times with one row per time and one column per key rate tenor. Each key
+    rate shift is a tent function which is one at its tenor and falls
+    linearly to zero at the neighbouring tenors. The first and last shifts
+    are flat before the first and after the last tenor so that the weights at
+    each time add up to one. """
+
+    times = np.asarray(times, dtype=np.float64)
+    tenors = np.asarray(key_rate_tenors, dtype=np.float64)
+    num_tenors = len(tenors)
+
+    if num_tenors == 0:
+        raise FinError("Need at least one key rate tenor.")
+
+    if np.any(np.diff(tenors) <= 0.0):
+        raise FinError("Key rate tenors must be increasing.")
+
+    weights = np.zeros((len(times), num_tenors))
+
+    if num_tenors == 1:
+        weights[:, 0] = 1.0
+        return weights
+
+    t = np.clip(times, tenors[0], tenors[-1])
+    k = np.searchsorted(tenors, t, side='right') - 1
+    k = np.clip(k, 0, num_tenors - 2)
+
+    w = (t - tenors[k]) / (tenors[k + 1] - tenors[k])
+    rows = np.arange(len(times))
+    weights[rows, k] = 1.0 - w
+    weights[rows, k + 1] += w
+
+    return weights
+
+###############################################################################
+
+
+def _zero_rate_sensitivities(bonds: list,
+                             settle_date: Date,
+                             zero_curve: BondZeroCurve):
+    """ Return the dirty prices of the bonds from a zero curve with linear
+    interpolation of the zero rates and the derivatives of these prices with
+    respect to the continuously compounded zero rates at the curve nodes as a
+    matrix with one row per bond and one column per node. The cash flows of
+    all of the bonds are weighted in one pass. """
+
+    serials = []
+    flows = []
+    rows = []
+
+    for i, bond in enumerate(bonds):
+        bond_serials, bond_flows = bond._remaining_flows(settle_date)
+        serials.append(bond_serials)
+        flows.append(bond_flows * bond._par)
+        rows.append(np.full(len(bond_serials), i))
+
+    serials = np.concatenate(serials)
+    flows = np.concatenate(flows)
+    rows = np.concatenate(rows)
+
+    times = (serials - settle_date._excel_date) / gDaysInYear
+    dfs = zero_curve.df(times)
+
+    node_times = zero_curve._times[1:]
+    weights = key_rate_weights(times, node_times)
+
+    prices = np.zeros(len(bonds))
+    np.add.at(prices, rows, flows * dfs)
+
+    derivs = np.zeros((len(bonds), len(node_times)))
+    np.add.at(derivs, rows, -(flows * times * dfs)[:, np.newaxis] * weights)
+
+    return prices, derivs
+
+###############################################################################
+
+
+def bond_key_rate_durations(bonds: list,
+                            settle_date: Date,
+                            ytm: float,
+                            key_rate_tenors: list = None,
+                            rates: list = None):
+    """ Calculate the key rate durations of a list of bonds analytically.
+    The par bonds at the key rate tenors have the coupon frequency and day
+    count of each bond and yields equal to the rates, or to the ytm if no
+    rates are given. This returns the tenors and a matrix with one row per
+    bond and one column per tenor. The results agree with those found by
+    bumping the par yields and rebuilding the zero curve up to the size of
+    the bump. """
+
+    if key_rate_tenors is None:
+        key_rate_tenors = KEY_RATE_TENORS
+
+    key_rate_tenors = np.array(key_rate_tenors, dtype=np.float64)
+
+    if rates is None:
+        rates = np.ones(len(key_rate_tenors)) * ytm
+
+    rates = np.array(rates, dtype=np.float64)
+
+    if len(rates) != len(key_rate_tenors):
+        raise FinError("Need one rate per key rate tenor.")
+
+    groups = {}
+    for i, bond in enumerate(bonds):
+        key = (bond._freq_type, bond._dc_type)
+        groups.setdefault(key, []).append(i)
+
+    key_rate_durations = np.zeros((len(bonds), len(key_rate_tenors)))
+
+    for (freq_type, dc_type), rows in groups.items():
+
+        par_bonds = []
+        clean_prices = []
+
+        for tenor, cpn in zip(key_rate_tenors, rates):
+            mat_date = settle_date.add_years(tenor)
+            par_bond = Bond(settle_date, mat_date, cpn, freq_type, dc_type)
+            clean_price = par_bond.clean_price_from_ytm(settle_date, cpn,
+                                                        YTMCalcType.US_STREET)
+            par_bonds.append(par_bond)
+            clean_prices.append(clean_price)
+
+        par_crv = BondZeroCurve(settle_date, par_bonds, clean_prices,
+                                InterpTypes.LINEAR_ZERO_RATES)
+
+        # The par bonds price to par at their yield whatever the coupon so
+        # the par yields only enter the bootstrap through the coupons
+        _, par_derivs = _zero_rate_sensitivities(par_bonds, settle_date,
+                                                 par_crv)
+
+        annuities = np.zeros(len(par_bonds))
+        for m, par_bond in enumerate(par_bonds):
+            cpn_serials, _ = par_bond._remaining_flows(settle_date)
+            times = (cpn_serials - settle_date._excel_date) / gDaysInYear
+            annuities[m] = np.sum(par_crv.df(times)) * par_bond._par / \
+                par_bond._freq
+
+        # The node zero rates move by -dz_dc for a unit rise in each par yield
+        dz_dc = np.linalg.solve(par_derivs, np.diag(annuities))
+
+        group_bonds = [bonds[i] for i in rows]
+        prices, derivs = _zero_rate_sensitivities(group_bonds, settle_date,
+                                                  par_crv)
+
+        key_rate_durations[rows] = np.dot(derivs, dz_dc) / \
+            prices[:, np.newaxis]
+
+    return key_rate_tenors, key_rate_durations
+
+###############################################################################
 
 
 class Bond:
@@ -210,6 +380,8 @@ class Bond:
 
             self._payment_dates.append(pmt_date)
 
+        self._payment_dates = DateArray(self._payment_dates)
+
     ###########################################################################
 
     def _calculate_flows(self):
@@ -392,7 +564,8 @@ class Bond:
                            ytm: float,
                            key_rate_tenors: list = None,
                            shift: float = None,
-                           rates: list = None):
+                           rates: list = None,
+                           analytic: bool = True):
         """
         Calculates the key rate durations for a bond.
 
@@ -413,6 +586,10 @@ class Bond:
         rates: list of float, optional
             Corresponding yield curve data in line with key_rate_tenors
             If None, flat yield curve is used
+        analytic: bool, optional
+            If True the key rate durations are found analytically from one
+            pass over the cash flows. Otherwise each par yield is bumped up
+            and down by the shift and the zero curve is rebuilt.
 
         Returns
         -------
@@ -424,7 +601,13 @@ class Bond:
         # if it is None, create an array of key rates from 0.5 to 30 years
 
         if key_rate_tenors is None:
-            key_rate_tenors = np.array([0.5,  1,  2,  3,  5,  7,  10, 20, 30])
+            key_rate_tenors = KEY_RATE_TENORS.copy()
+
+        if analytic is True:
+            key_rate_tenors, key_rate_durations = \
+                bond_key_rate_durations([bond], settle_date, ytm,
+                                        key_rate_tenors, rates)
+            return key_rate_tenors, key_rate_durations[0]
 
         # set the shift to a small value if not give
         if not shift:
@@ -548,6 +731,9 @@ class Bond:
             # append the key rate duration to the key_rate_durations list
             key_rate_durations.append(key_rate_duration)
 
+            # restore the rate so the next tenor is bumped from the base curve
+            rates[ind] += shift
+
         return key_rate_tenors, np.array(key_rate_durations)
 
     ###########################################################################
@@ -651,6 +837,65 @@ class Bond:
 
     ###########################################################################
 
+    def _remaining_flows(self,
+                         settle_date: Date):
+        """ Return the Excel serial dates of the coupon dates after the
+        settlement date and the flows on these dates per unit of par as they
+        are used in dirty_price_from_discount_curve. """
+
+        if settle_date > self._maturity_date:
+            raise FinError("Bond settles after it matures.")
+
+        self._calc_pcd_ncd(settle_date)
+
+        cal = Calendar(self._cal_type)
+
+        self._ex_div_date = cal.add_business_days(self._ncd,
+                                                  -self._ex_div_days)
+
+        pay_first_cpn = 1.0
+        if settle_date > self._ex_div_date:
+            pay_first_cpn = 0.0
+
+        # coupons paid on a settlement date are paid to the seller
+        cpn_serials = self._cpn_dates[1:].serials()
+        alive = cpn_serials > int(settle_date._excel_date)
+
+        flows = np.full(len(cpn_serials), self._cpn / self._freq)
+        flows[0] *= pay_first_cpn
+        flows[-1] += 1.0
+
+        return cpn_serials[alive], flows[alive]
+
+    ###########################################################################
+
+    def df_sensitivities(self,
+                         settle_date: Date,
+                         discount_curve: DiscountCurve):
+        """ Calculate the bond dirty price from a discount curve as in the
+        function dirty_price_from_discount_curve and return the derivatives of
+        this price with respect to the discount factors on the settlement date
+        and on the remaining cash flow dates. These are returned as a list
+        holding a tuple of the curve, a Numpy array of Excel serial dates and
+        the derivatives. """
+
+        if settle_date < discount_curve._value_date:
+            raise FinError("Bond settles before Discount curve date")
+
+        cpn_serials, flows = self._remaining_flows(settle_date)
+
+        dfSettle = discount_curve.df(settle_date)
+        dfs = discount_curve.df(cpn_serials)
+
+        px = np.dot(flows, dfs) / dfSettle * self._par
+
+        serials = np.append(int(settle_date._excel_date), cpn_serials)
+        dv_ddf = np.append(-px / dfSettle, flows * self._par / dfSettle)
+
+        return px, [(discount_curve, serials, dv_ddf)]
+
+    ###########################################################################
+
     def current_yield(self, clean_price):
         """ Calculate the current yield of the bond which is the
         coupon divided by the clean price (not the full price)"""
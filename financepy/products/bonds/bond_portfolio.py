@@ -2,277 +2,492 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ###############################################################################
 
-# UNDER CONSTRUCTION !!!!!!!!!!!!!!!!
-
 import numpy as np
+from scipy.sparse import csr_matrix
 
 from ...utils.date import Date
-from ...utils.calendar import CalendarTypes
-from ...utils.helpers import label_to_string, check_argument_types
+from ...utils.error import FinError
+from ...utils.calendar import Calendar
+from ...utils.day_count import DayCount
+from ...utils.global_vars import gDaysInYear
+from ...utils.helpers import label_to_string
 from ...market.curves.discount_curve import DiscountCurve
-from .bond import YTMCalcType
+from .bond import Bond, KEY_RATE_TENORS, key_rate_weights
 
 ###############################################################################
+# The cash flows of all of the bonds in the portfolio are held in a sparse
+# matrix with one row per position and one column per date on a grid that is
+# the union of all of their coupon dates. A bond's flows are generated once
+# when it is added. On a settlement date the flows on or before that date are
+# dropped by zeroing their discount factors and the next coupon is removed
+# for any bond that trades ex-coupon. The prices of all of the bonds are then
+# one product of the matrix with a vector of discount factors. The value and
+# risk of the whole portfolio only need the face weighted sum of the rows,
+# which is a single vector of flows on the date grid.
+###############################################################################
 
 
 class BondPortfolio:
-    """ Class for valuing and risk-managing a portfolio of bonds. """
+    """ Class for valuing and risk-managing a portfolio of fixed coupon bonds.
+    The cash flows of all of the bonds are merged onto a common date grid as
+    a sparse cash flow matrix so that prices, durations, key rate durations
+    and discount curve sensitivities of all of the bonds are each found with
+    one matrix product. Positions can be added and removed one at a time. """
 
     def __init__(self,
-                 bonds: (list),
-                 bondWeights: (list, np.ndarray)):
-        """ XXX """
+                 bonds: list = None,
+                 face_amounts: (list, np.ndarray) = None):
+        """ Create the portfolio from a list of Bond objects and the face
+        amount held of each. Both can be omitted to start from an empty
+        portfolio. """
+
+        if bonds is None:
+            bonds = []
 
-        check_argument_types(self.__init__, locals())
+        if face_amounts is None:
+            face_amounts = np.full(len(bonds), 100.0)
+
+        if len(bonds) != len(face_amounts):
+            raise FinError("Need one face amount per bond.")
 
-        self.calculateFlows()
         self._par = 100.0
 
-###############################################################################
+        self._positions = {}
+        self._next_id = 0
+        self._grid_columns = {}
 
-    def _calculate_flows(self):
-        """ Determine the bond cashflow payment amounts without principal """
+        self._invalidate()
 
-        self._flow_amounts = [0.0]
+        for bond, face_amount in zip(bonds, face_amounts):
+            self.add_bond(bond, face_amount)
 
-        for _ in self._cpn_dates[1:]:
-            cpn = self._cpn / self._freq
-            self._flow_amounts.append(cpn)
+    ###########################################################################
 
-###############################################################################
+    def _invalidate(self):
+        """ Drop the cash flow matrix and settlement date terms after the
+        positions have changed. """
 
-    def dollar_duration(self,
-                        settle_date: Date,
-                        ytm: float,
-                        convention: YTMCalcType = YTMCalcType.UK_DMO):
-        """ Calculate the risk or dP/dy of the bond by bumping. This is also
-        known as the DV01 in Bloomberg. """
+        self._cashflows = None
+        self._settle_date = None
+        self._settle_terms = None
 
-        dy = 0.0001  # 1 basis point
-        p0 = self.dirty_price_from_ytm(settle_date, ytm - dy, convention)
-        p2 = self.dirty_price_from_ytm(settle_date, ytm + dy, convention)
-        durn = -(p2 - p0) / dy / 2.0
-        return durn
+    ###########################################################################
 
-###############################################################################
+    def add_bond(self,
+                 bond: Bond,
+                 face_amount: float = 100.0):
+        """ Add a position in a bond with a face amount and return the id of
+        the position which can be used to remove it. """
 
-    def macauley_duration(self,
-                          settle_date: Date,
-                          ytm: float,
-                          convention: YTMCalcType = YTMCalcType.UK_DMO):
-        """ Calculate the Macauley duration of the bond on a settlement date
-        given its yield to maturity. """
+        if isinstance(bond, Bond) is False:
+            raise FinError("Bond portfolio can only hold Bond objects.")
 
-        dd = self.dollar_duration(settle_date, ytm, convention)
-        fp = self.dirty_price_from_ytm(settle_date, ytm, convention)
-        md = dd * (1.0 + ytm / self._freq) / fp
-        return md
+        cpn_serials = np.array(bond._cpn_dates.serials(), dtype=np.int64)
 
-###############################################################################
+        if len(cpn_serials) < 2:
+            raise FinError("Bond needs at least one coupon date.")
+
+        flows = np.full(len(cpn_serials) - 1, bond._cpn / bond._freq)
+        flows[-1] += 1.0
+        flows *= self._par
+
+        # New dates are appended to the end of the grid
+        grid = self._grid_columns
+        cols = np.array([grid.setdefault(s, len(grid))
+                         for s in cpn_serials[1:].tolist()], dtype=np.int64)
+
+        position_id = self._next_id
+        self._next_id += 1
+
+        self._positions[position_id] = (bond, float(face_amount),
+                                        cpn_serials, cols, flows)
+        self._invalidate()
+
+        return position_id
+
+    ###########################################################################
+
+    def remove_bond(self,
+                    position_id: int):
+        """ Remove the position with the id returned by add_bond. """
+
+        if position_id not in self._positions:
+            raise FinError("Unknown position id " + str(position_id))
+
+        del self._positions[position_id]
+        self._invalidate()
+
+    ###########################################################################
+
+    def position_ids(self):
+        """ Return the ids of the positions in the order of the rows of the
+        arrays returned by the pricing and risk functions. """
+
+        return list(self._positions.keys())
+
+    ###########################################################################
+
+    def face_amounts(self):
+        """ Return the face amount of each position. """
+
+        return np.array([p[1] for p in self._positions.values()])
+
+    ###########################################################################
+
+    def _cashflow_matrix(self):
+        """ Assemble the sparse cash flow matrix per 100 of face from the
+        flows of each position together with the grid of dates and the face
+        weighted sum of the flows on each grid date. """
+
+        if self._cashflows is not None:
+            return self._cashflows
+
+        if len(self._positions) == 0:
+            raise FinError("Bond portfolio has no positions.")
+
+        positions = list(self._positions.values())
+        num_bonds = len(positions)
+
+        grid_serials = np.fromiter(self._grid_columns.keys(), dtype=np.int64,
+                                   count=len(self._grid_columns))
+
+        cols = np.concatenate([p[3] for p in positions])
+        flows = np.concatenate([p[4] for p in positions])
+        num_flows = np.array([len(p[3]) for p in positions], dtype=np.int64)
+        rows = np.repeat(np.arange(num_bonds), num_flows)
+
+        matrix = csr_matrix((flows, (rows, cols)),
+                            shape=(num_bonds, len(grid_serials)))
+
+        weights = np.array([p[1] for p in positions]) / self._par
+        portfolio_flows = matrix.T.dot(weights)
+
+        self._cashflows = (matrix, grid_serials, portfolio_flows, weights)
+        return self._cashflows
+
+    ###########################################################################
+
+    def _terms(self,
+               settle_date: Date):
+        """ Return the accrued interest per 100 of face of each bond on the
+        settlement date, the grid column of its next coupon and the amount of
+        the next coupon which is not paid as the bond trades ex-coupon. These
+        are kept until the settlement date or the positions change. """
+
+        if self._settle_date is not None and \
+                settle_date._excel_date == self._settle_date._excel_date:
+            return self._settle_terms
+
+        positions = list(self._positions.values())
+        num_bonds = len(positions)
+        settle_serial = int(settle_date._excel_date)
+
+        cpn_serials = np.concatenate([p[2] for p in positions])
+        offsets = np.zeros(num_bonds + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(p[2]) for p in positions])
+
+        # Coupons paid on a settlement date are paid to the seller so the next
+        # coupon is the first coupon date after the settlement date
+        alive = np.flatnonzero(cpn_serials > settle_serial)
+        i_next = np.searchsorted(alive, offsets[:-1])
+
+        if np.any(i_next >= len(alive)):
+            raise FinError("Bond settles after it matures.")
+
+        i_next = alive[i_next]
+
+        if np.any(i_next >= offsets[1:]):
+            raise FinError("Bond settles after it matures.")
+
+        if np.any(i_next == offsets[:-1]):
+            raise FinError("Bond settles before it is issued.")
+
+        ncd_serials = cpn_serials[i_next]
+        pcd_serials = cpn_serials[i_next - 1]
+
+        # The coupon column is found from the position of the coupon in the
+        # bond's list of flows which excludes the issue date
+        next_cols = np.array([p[3][k - offsets[i] - 1]
+                              for i, (p, k) in enumerate(zip(positions,
+                                                             i_next))],
+                             dtype=np.int64)
 
-    def modified_duration(self,
+        cpns = np.array([p[0]._cpn for p in positions])
+        freqs = np.array([p[0]._freq for p in positions])
+
+        # The accrual factors are found for all bonds with the same day count
+        # and frequency in one call
+        groups = {}
+        for i, p in enumerate(positions):
+            bond = p[0]
+            key = (bond._dc_type, bond._freq_type)
+            groups.setdefault(key, []).append(i)
+
+        acc_factors = np.zeros(num_bonds)
+
+        for (dc_type, freq_type), rows in groups.items():
+            rows = np.array(rows)
+            dc = DayCount(dc_type)
+            acc_factors[rows] = dc.year_frac_array(pcd_serials[rows],
+                                                   settle_serial,
+                                                   ncd_serials[rows],
+                                                   freq_type)[0]
+
+        ex_div = np.zeros(num_bonds, dtype=bool)
+        ex_div_dates = {}
+
+        for i, p in enumerate(positions):
+            bond = p[0]
+            if bond._ex_div_days == 0:
+                continue
+            key = (bond._cal_type, ncd_serials[i], bond._ex_div_days)
+            if key not in ex_div_dates:
+                cal = Calendar(bond._cal_type)
+                ncd = Date.from_excel(int(ncd_serials[i]))
+                ex_div_dates[key] = cal.add_business_days(ncd,
+                                                          -bond._ex_div_days)
+            ex_div[i] = settle_date > ex_div_dates[key]
+
+        accrued = (acc_factors - ex_div / freqs) * cpns * self._par
+        ex_cpns = ex_div * cpns / freqs * self._par
+
+        self._settle_date = settle_date
+        self._settle_terms = (accrued, next_cols, ex_cpns)
+        return self._settle_terms
+
+    ###########################################################################
+
+    def _discount_factors(self,
                           settle_date: Date,
-                          ytm: float,
-                          convention: YTMCalcType = YTMCalcType.UK_DMO):
-        """ Calculate the modified duration of the bondon a settlement date
-        given its yield to maturity. """
+                          discount_curve: DiscountCurve):
+        """ Return the discount factors on the grid dates relative to the
+        settlement date with zeros on the dates of flows already paid and the
+        times of the grid dates from the settlement date. """
 
-        dd = self.dollar_duration(settle_date, ytm, convention)
-        fp = self.dirty_price_from_ytm(settle_date, ytm, convention)
-        md = dd / fp
-        return md
+        if settle_date < discount_curve._value_date:
+            raise FinError("Bond settles before Discount curve date")
 
-###############################################################################
+        (_, grid_serials, _, _) = self._cashflow_matrix()
 
-    def convexity_from_ytm(self,
-                           settle_date: Date,
-                           ytm: float,
-                           convention: YTMCalcType = YTMCalcType.UK_DMO):
-        """ Calculate the bond convexity from the yield to maturity. This
-        function is vectorised with respect to the yield input. """
-
-        dy = 0.0001
-        p0 = self.dirty_price_from_ytm(settle_date, ytm - dy, convention)
-        p1 = self.dirty_price_from_ytm(settle_date, ytm, convention)
-        p2 = self.dirty_price_from_ytm(settle_date, ytm + dy, convention)
-        conv = ((p2 + p0) - 2.0 * p1) / dy / dy / p1 / self._par
-        return conv
+        alive = grid_serials > int(settle_date._excel_date)
 
-###############################################################################
+        df_settle = discount_curve.df(settle_date)
+        dfs = np.zeros(len(grid_serials))
+        dfs[alive] = discount_curve.df(grid_serials[alive]) / df_settle
 
-    def clean_price_from_ytm(self,
-                             settle_date: Date,
-                             ytm: float,
-                             convention: YTMCalcType = YTMCalcType.UK_DMO):
-        """ Calculate the bond clean price from the yield to maturity. This
-        function is vectorised with respect to the yield input. """
+        times = (grid_serials - settle_date._excel_date) / gDaysInYear
+        times[~alive] = 0.0
 
-        dirty_price = self.dirty_price_from_ytm(settle_date, ytm,
-                                                convention)
-        accrued_amount = self._accrued_interest * self._par
-        clean_price = dirty_price - accrued_amount
-        return clean_price
+        return dfs, times, df_settle, alive
 
-###############################################################################
+    ###########################################################################
 
-    def clean_price_from_discount_curve(self,
+    def accrued_interest(self,
+                         settle_date: Date,
+                         face: float = 100.0):
+        """ Calculate the accrued interest of each bond on the settlement date
+        for a face amount. """
+
+        self._cashflow_matrix()
+        accrued, _, _ = self._terms(settle_date)
+        return accrued * face / self._par
+
+    ###########################################################################
+
+    def dirty_price_from_discount_curve(self,
                                         settle_date: Date,
                                         discount_curve: DiscountCurve):
-        """ Calculate the clean bond value using some discount curve to
-        present-value the bond's cash flows back to the curve anchor date and
-        not to the settlement date. """
+        """ Calculate the dirty price of each bond using a discount curve to
+        PV its cash flows to the settlement date. """
 
+        (matrix, _, _, _) = self._cashflow_matrix()
+        _, next_cols, ex_cpns = self._terms(settle_date)
+        dfs, _, _, _ = self._discount_factors(settle_date, discount_curve)
 
-##############################################################################
+        return matrix.dot(dfs) - ex_cpns * dfs[next_cols]
 
-    def dirty_price_from_discount_curve(self,
+    ###########################################################################
+
+    def clean_price_from_discount_curve(self,
                                         settle_date: Date,
                                         discount_curve: DiscountCurve):
-        """ Calculate the bond price using a provided discount curve to PV the
-        bond's cash flows to the settlement date. As such it is effectively a
-        forward bond price if the settlement date is after the valuation date.
-        """
+        """ Calculate the clean price of each bond using a discount curve to
+        PV its cash flows to the settlement date. """
 
+        dirty_prices = self.dirty_price_from_discount_curve(settle_date,
+                                                            discount_curve)
 
-###############################################################################
+        return dirty_prices - self.accrued_interest(settle_date, self._par)
 
-    def current_yield(self, clean_price):
-        """ Calculate the current yield of the bond which is the
-        coupon divided by the clean price (not the full price)"""
+    ###########################################################################
 
-        y = self._cpn * self._par / clean_price
-        return y
+    def value(self,
+              settle_date: Date,
+              discount_curve: DiscountCurve):
+        """ Calculate the dirty and clean value of the whole portfolio on the
+        settlement date using a discount curve. The dirty value is the dot
+        product of the portfolio flows with the discount factors. """
 
-###############################################################################
+        (_, _, portfolio_flows, weights) = self._cashflow_matrix()
+        accrued, next_cols, ex_cpns = self._terms(settle_date)
+        dfs, _, _, _ = self._discount_factors(settle_date, discount_curve)
 
-    def yield_to_maturity(self,
-                          settle_date: Date,
-                          clean_price: float,
-                          convention: YTMCalcType = YTMCalcType.US_TREASURY):
-        """ Calculate the bond's yield to maturity by solving the price
-        yield relationship using a one-dimensional root solver. """
+        dirty_pv = np.dot(portfolio_flows, dfs)
+        dirty_pv -= np.dot(weights * ex_cpns, dfs[next_cols])
+        clean_pv = dirty_pv - np.dot(weights, accrued)
 
+        return {'dirty_pv': dirty_pv, 'clean_pv': clean_pv}
 
-###############################################################################
+    ###########################################################################
 
-    def accrued_interest(self,
-                         settle_date: Date,
-                         num_ex_dividend_days: int = 0,
-                         cal_type: CalendarTypes = CalendarTypes.WEEKEND):
+    def durations(self,
+                  settle_date: Date,
+                  discount_curve: DiscountCurve):
+        """ Calculate the duration of each bond to a parallel shift in the
+        continuously compounded zero rates of the discount curve. This is the
+        PV weighted average time to its cash flows. """
 
-        return self._accrued_interest
+        (matrix, _, _, _) = self._cashflow_matrix()
+        _, next_cols, ex_cpns = self._terms(settle_date)
+        dfs, times, _, _ = self._discount_factors(settle_date, discount_curve)
 
-###############################################################################
+        tdfs = times * dfs
+        prices = matrix.dot(dfs) - ex_cpns * dfs[next_cols]
+        risk = matrix.dot(tdfs) - ex_cpns * tdfs[next_cols]
 
-    def print_payments(self,
-                       settle_date: Date,
-                       face: (float)):
-        """ Print a list of the unadjusted coupon payment dates used in
-        analytic calculations for the bond. """
+        return risk / prices
 
-        flow = self._cpn / self._freq
+    ###########################################################################
 
-        for dt in self._cpn_dates[1:-1]:
-            # coupons paid on a settlement date are included
-            if dt >= settle_date:
-                print("%12s" % dt, " %12.2f " % flow)
+    def portfolio_duration(self,
+                           settle_date: Date,
+                           discount_curve: DiscountCurve):
+        """ Calculate the duration of the portfolio to a parallel shift in the
+        continuously compounded zero rates of the discount curve. This is the
+        average of the bond durations weighted by the dirty value of each
+        position. """
 
-        redemption_amount = face * (1.0 + flow)
+        (_, _, portfolio_flows, weights) = self._cashflow_matrix()
+        _, next_cols, ex_cpns = self._terms(settle_date)
+        dfs, times, _, _ = self._discount_factors(settle_date, discount_curve)
 
-        print("%12s" % self._cpn_dates[-1], " %12.2f " % redemption_amount)
+        tdfs = times * dfs
+        pv = np.dot(portfolio_flows, dfs) - \
+            np.dot(weights * ex_cpns, dfs[next_cols])
+        risk = np.dot(portfolio_flows, tdfs) - \
+            np.dot(weights * ex_cpns, tdfs[next_cols])
 
-###############################################################################
+        return risk / pv
 
-    def dirty_price_from_survival_curve(self,
-                                        settle_date: Date,
-                                        discount_curve: DiscountCurve,
-                                        survival_curve: DiscountCurve,
-                                        recovery_rate: float):
-        """ Calculate discounted present value of flows assuming default model.
-        The survival curve treats the coupons as zero recovery payments while
-        the recovery fraction of the par amount is paid at default. For the
-        defaulting principal we discretise the time steps using the coupon
-        payment times. A finer discretisation may handle the time value with
-        more accuracy. I reduce any error by averaging period start and period
-        end payment present values. """
+    ###########################################################################
 
-        f = self._freq
-        c = self._cpn
+    def key_rate_durations(self,
+                           settle_date: Date,
+                           discount_curve: DiscountCurve,
+                           key_rate_tenors: np.ndarray = None):
+        """ Calculate the key rate durations of each bond. These are the
+        durations to a shift in the continuously compounded zero rates of the
+        discount curve which is a tent function around each key rate tenor.
+        The tenors default to 0.5 to 30 years. This returns the tenors and a
+        matrix with one row per bond and one column per tenor. The key rate
+        durations of each bond add up to its duration. """
 
-        pv = 0.0
-        prevQ = 1.0
-        prevDf = 1.0
+        if key_rate_tenors is None:
+            key_rate_tenors = KEY_RATE_TENORS
 
-        defaultingPrincipalPVPayStart = 0.0
-        defaultingPrincipalPVPayEnd = 0.0
+        key_rate_tenors = np.array(key_rate_tenors, dtype=np.float64)
 
-        for dt in self._cpn_dates[1:]:
+        (matrix, _, _, _) = self._cashflow_matrix()
+        _, next_cols, ex_cpns = self._terms(settle_date)
+        dfs, times, _, _ = self._discount_factors(settle_date, discount_curve)
 
-            # coupons paid on a settlement date are included
-            if dt >= settle_date:
+        # The key rate weighted times of the discount factors on the grid
+        tdfs = (times * dfs)[:, np.newaxis] * \
+            key_rate_weights(times, key_rate_tenors)
 
-                df = discount_curve.df(dt)
-                q = survival_curve.survival_prob(dt)
+        prices = matrix.dot(dfs) - ex_cpns * dfs[next_cols]
+        risk = matrix.dot(tdfs) - ex_cpns[:, np.newaxis] * tdfs[next_cols]
 
-                # Add PV of coupon conditional on surviving to payment date
-                # Any default results in all subsequent coupons being lost
-                # with zero recovery
+        return key_rate_tenors, risk / prices[:, np.newaxis]
 
-                pv = pv + (c / f) * df * q
-                dq = q - prevQ
+    ###########################################################################
 
-                defaultingPrincipalPVPayStart += -dq * recovery_rate * prevDf
-                defaultingPrincipalPVPayStart += -dq * recovery_rate * df
+    def curve_sensitivities(self,
+                            settle_date: Date,
+                            discount_curve: DiscountCurve):
+        """ Calculate the derivatives of the dirty price of each bond with
+        respect to the discount factors at the nodes of the discount curve.
+        This returns a matrix with one row per bond and one column per node
+        that is found from one product of the cash flow matrix with the
+        Jacobian of the grid discount factors. """
 
-                # Add on PV of principal if default occurs in coupon period
-                prevQ = q
-                prevDf = df
+        (matrix, grid_serials, _, _) = self._cashflow_matrix()
+        _, next_cols, ex_cpns = self._terms(settle_date)
+        dfs, _, df_settle, alive = self._discount_factors(settle_date,
+                                                          discount_curve)
 
-        pv = pv + 0.50 * defaultingPrincipalPVPayStart
-        pv = pv + 0.50 * defaultingPrincipalPVPayEnd
-        pv = pv + df * q * self._par
-        pv *= self._par
-        return pv
+        num_nodes = len(discount_curve._dfs)
 
-###############################################################################
+        jac = np.zeros((len(grid_serials), num_nodes))
+        jac[alive] = discount_curve.df_jacobian(grid_serials[alive]) / \
+            df_settle
 
-    def clean_price_from_survival_curve(self,
-                                        settle_date: Date,
-                                        discount_curve: DiscountCurve,
-                                        survival_curve: DiscountCurve,
-                                        recovery_rate: float):
-        """ Calculate clean price value of flows assuming default model.
-        The survival curve treats the coupons as zero recovery payments while
-        the recovery fraction of the par amount is paid at default. """
+        settle_jac = discount_curve.df_jacobian(
+            np.array([int(settle_date._excel_date)]))[0]
 
-        self.accrued_interest(settle_date, 1.0)
+        prices = matrix.dot(dfs) - ex_cpns * dfs[next_cols]
+        sens = matrix.dot(jac) - ex_cpns[:, np.newaxis] * jac[next_cols]
+        sens -= np.outer(prices / df_settle, settle_jac)
 
-        dirty_price = self.dirty_price_from_survival_curve(settle_date,
-                                                           discount_curve,
-                                                           survival_curve,
-                                                           recovery_rate)
+        return sens
 
-        clean_price = dirty_price - self._accrued_interest
-        return clean_price
+    ###########################################################################
 
-###############################################################################
+    def df_sensitivities(self,
+                         settle_date: Date,
+                         discount_curve: DiscountCurve):
+        """ Calculate the dirty value of the portfolio from a discount curve
+        and return the derivatives of this value with respect to the discount
+        factors on the settlement date and on the grid dates. These are in the
+        form used by the node_sensitivities and bucketed_dv01 functions of
+        the curves. """
+
+        (_, grid_serials, portfolio_flows, weights) = self._cashflow_matrix()
+        _, next_cols, ex_cpns = self._terms(settle_date)
+        dfs, _, df_settle, alive = self._discount_factors(settle_date,
+                                                          discount_curve)
+
+        flows = portfolio_flows.copy()
+        np.subtract.at(flows, next_cols, weights * ex_cpns)
+        flows[~alive] = 0.0
+
+        pv = np.dot(flows, dfs)
+
+        serials = np.append(int(settle_date._excel_date), grid_serials[alive])
+        dv_ddf = np.append(-pv / df_settle, flows[alive] / df_settle)
+
+        return pv, [(discount_curve, serials, dv_ddf)]
+
+    ###########################################################################
+
+    def __len__(self):
+        return len(self._positions)
+
+    ###########################################################################
 
     def __repr__(self):
+        """ Return string with class details. """
 
         s = label_to_string("OBJECT TYPE", type(self).__name__)
-        s += label_to_string("ISSUE DATE", self._issue_date)
-        s += label_to_string("MATURITY DATE", self._maturity_date)
-        s += label_to_string("COUPON", self._cpn)
-        s += label_to_string("FREQUENCY", self._freq_type)
-        s += label_to_string("DAY COUNT TYPE", self._dc_type)
+        s += label_to_string("NUM POSITIONS", len(self._positions))
+        s += label_to_string("NUM GRID DATES", len(self._grid_columns))
+        s += label_to_string("TOTAL FACE", np.sum(self.face_amounts()))
         return s
 
-###############################################################################
+    ###########################################################################
 
     def _print(self):
-        """ Print a list of the unadjusted coupon payment dates used in
-        analytic calculations for the bond. """
+        """ Print a list of the portfolio details. """
         print(self)
 
-
 ###############################################################################
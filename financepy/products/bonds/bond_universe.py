@@ -0,0 +1,421 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit, prange
+
+from ...utils.date import Date
+from ...utils.error import FinError
+from ...utils.frequency import FrequencyTypes
+from ...utils.day_count import DayCount, DayCountTypes
+from ...utils.helpers import label_to_string
+from .bond import Bond, YTMCalcType
+
+###############################################################################
+# The dirty price of a bond under each of the yield conventions of the Bond
+# class is the product of a discount factor to the next coupon date w(y) and
+# the value on that date of the remaining flows
+#
+#   S(v) = c/f x p + c/f x (v + v^2 + ... + v^n) + v^n  where v = 1/(1+y/f)
+#
+# with n flows after the next coupon and p zero if the bond trades ex-coupon.
+# The discount factor is either v^alpha or 1/(1 + a y) for the conventions
+# which use simple discounting to the next coupon date. Only a handful of numbers per bond are needed
+# so a universe of bonds is packed into arrays once per settlement date and
+# the prices and their first two yield derivatives are then found in closed
+# form. The yields are solved by Halley's method with the bonds shared across
+# threads.
+###############################################################################
+
+YIELD_TOLERANCE = 1e-12
+YIELD_MAX_ITERATIONS = 50
+
+# The Bond class shifts the yield by this amount to avoid dividing by zero
+YIELD_SHIFT = 0.000000000012345
+
+COMPOUND_DISCOUNTING = 0
+SIMPLE_DISCOUNTING = 1
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _dirty_price_derivs(y, cpn, freq, num_flows, pay_first_cpn,
+                        discount_type, alpha):
+    """ Return the dirty price per unit par of a bond and its first and second
+    derivatives with respect to the yield. """
+
+    y = y + YIELD_SHIFT
+
+    v = 1.0 / (1.0 + y / freq)
+    dv = -v * v / freq
+    d2v = 2.0 * v * v * v / freq / freq
+
+    c = cpn / freq
+    s = c * pay_first_cpn
+    ds = 0.0
+    d2s = 0.0
+
+    vk = 1.0
+    for k in range(1, num_flows + 1):
+        d2s += c * k * (k - 1) * vk / v
+        ds += c * k * vk
+        vk *= v
+        s += c * vk
+
+    s += vk
+    ds += num_flows * vk / v
+    d2s += num_flows * (num_flows - 1) * vk / v / v
+
+    if discount_type == COMPOUND_DISCOUNTING:
+        w = v ** alpha
+        dw_dv = alpha * w / v
+        d2w_dv2 = alpha * (alpha - 1.0) * w / v / v
+        dw = dw_dv * dv
+        d2w = d2w_dv2 * dv * dv + dw_dv * d2v
+    else:
+        w = 1.0 / (1.0 + alpha * y)
+        dw = -alpha * w * w
+        d2w = 2.0 * alpha * alpha * w * w * w
+
+    p = w * s
+    dp = dw * s + w * ds * dv
+    d2p = d2w * s + 2.0 * dw * ds * dv + w * (d2s * dv * dv + ds * d2v)
+
+    return p, dp, d2p
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _dirty_prices_from_ytms(ytms, cpns, freqs, num_flows, pay_first_cpns,
+                            discount_types, alphas):
+    """ Return the dirty prices per unit par of the bonds and their first and
+    second derivatives with respect to the yield. """
+
+    num_bonds = len(ytms)
+    prices = np.zeros(num_bonds)
+    dprices = np.zeros(num_bonds)
+    d2prices = np.zeros(num_bonds)
+
+    for i in prange(num_bonds):
+        p, dp, d2p = _dirty_price_derivs(ytms[i], cpns[i], freqs[i],
+                                         num_flows[i], pay_first_cpns[i],
+                                         discount_types[i], alphas[i])
+        prices[i] = p
+        dprices[i] = dp
+        d2prices[i] = d2p
+
+    return prices, dprices, d2prices
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _ytms_from_dirty_prices(dirty_prices, cpns, freqs, num_flows,
+                            pay_first_cpns, discount_types, alphas,
+                            tolerance, max_iterations):
+    """ Solve for the yields of the bonds from their dirty prices per unit par
+    using Halley's method starting from a yield of 5%. The second array that
+    is returned flags the bonds whose yield converged. """
+
+    num_bonds = len(dirty_prices)
+    ytms = np.zeros(num_bonds)
+    converged = np.zeros(num_bonds, dtype=np.bool_)
+
+    for i in prange(num_bonds):
+
+        y = 0.05
+
+        for _ in range(0, max_iterations):
+
+            p, dp, d2p = _dirty_price_derivs(y, cpns[i], freqs[i],
+                                             num_flows[i], pay_first_cpns[i],
+                                             discount_types[i], alphas[i])
+
+            g = p - dirty_prices[i]
+            denom = 2.0 * dp * dp - g * d2p
+
+            if denom == 0.0:
+                break
+
+            dy = 2.0 * g * dp / denom
+            y = y - dy
+
+            if abs(dy) < tolerance:
+                converged[i] = True
+                break
+
+        ytms[i] = y
+
+    return ytms, converged
+
+###############################################################################
+
+
+class BondUniverse:
+    """ Class for computing the yields, prices and yield risk of a universe of
+    fixed coupon bonds in one call. The terms of the bonds on a settlement
+    date are packed into arrays and the prices are then found in closed form
+    with their analytic yield derivatives. The results match those of the
+    Bond class for each of its yield conventions. """
+
+    def __init__(self,
+                 bonds: list):
+        """ Create the universe from a list of Bond objects. """
+
+        if len(bonds) == 0:
+            raise FinError("Bond universe needs at least one bond.")
+
+        for bond in bonds:
+            if isinstance(bond, Bond) is False:
+                raise FinError("Bond universe can only hold Bond objects.")
+
+        self._bonds = bonds
+        self._par = 100.0
+
+        self._settle_date = None
+        self._terms = None
+
+    ###########################################################################
+
+    def _bond_terms(self,
+                    settle_date: Date):
+        """ Pack the coupon, frequency, number of flows after the next coupon,
+        ex-coupon flag, accrual fraction and accrued interest of each bond on
+        the settlement date into arrays. These are kept until the settlement
+        date changes. """
+
+        if self._settle_date is not None and \
+                settle_date._excel_date == self._settle_date._excel_date:
+            return self._terms
+
+        num_bonds = len(self._bonds)
+
+        cpns = np.zeros(num_bonds)
+        freqs = np.zeros(num_bonds)
+        num_flows = np.zeros(num_bonds, dtype=np.int64)
+        pay_first_cpns = np.zeros(num_bonds)
+        alphas = np.zeros(num_bonds)
+        cfets_alphas = np.zeros(num_bonds)
+        accrued = np.zeros(num_bonds)
+
+        settle_serial = int(settle_date._excel_date)
+        dc = DayCount(DayCountTypes.ACT_365L)
+
+        for i, bond in enumerate(self._bonds):
+
+            bond.accrued_interest(settle_date, 1.0)
+
+            cpn_serials = bond._cpn_dates.serials()
+            n = int(np.sum(cpn_serials > settle_serial)) - 1
+
+            if n < 0:
+                raise FinError("No coupons left")
+
+            cpns[i] = bond._cpn
+            freqs[i] = bond._freq
+            num_flows[i] = n
+            alphas[i] = bond._alpha
+            accrued[i] = bond._accrued_interest
+
+            pay_first_cpns[i] = 1.0
+            if settle_date > bond._ex_div_date:
+                pay_first_cpns[i] = 0.0
+
+            if n == 0:
+                last_year = bond._maturity_date.add_tenor("-12M")
+                acc_factor = dc.year_frac(last_year,
+                                          settle_date,
+                                          bond._maturity_date,
+                                          freq_type=FrequencyTypes.ANNUAL)[0]
+                cfets_alphas[i] = 1.0 - acc_factor
+
+        self._settle_date = settle_date
+        self._terms = (cpns, freqs, num_flows, pay_first_cpns, alphas,
+                       cfets_alphas, accrued)
+
+        return self._terms
+
+    ###########################################################################
+
+    def _convention_terms(self,
+                          settle_date: Date,
+                          convention: YTMCalcType):
+        """ Return the arrays passed to the pricing kernels for a yield
+        convention. These set the discounting to the next coupon date and
+        whether the next coupon is paid in the last coupon period. """
+
+        if convention not in YTMCalcType:
+            raise FinError("Yield convention unknown." + str(convention))
+
+        if convention == YTMCalcType.ZERO:
+            raise FinError("Zero coupon bonds must use BondZero class.")
+
+        (cpns, freqs, num_flows, pay_first_cpns, alphas, cfets_alphas, _) = \
+            self._bond_terms(settle_date)
+
+        last_period = num_flows == 0
+
+        discount_types = np.full(len(cpns), COMPOUND_DISCOUNTING)
+        discount_alphas = alphas.copy()
+        pay_first = pay_first_cpns.copy()
+
+        if convention == YTMCalcType.US_TREASURY:
+            discount_types[~last_period] = SIMPLE_DISCOUNTING
+            discount_alphas[~last_period] = alphas[~last_period] / \
+                freqs[~last_period]
+            pay_first[last_period] = 1.0
+        elif convention == YTMCalcType.US_STREET:
+            discount_types[last_period] = SIMPLE_DISCOUNTING
+            discount_alphas[last_period] = alphas[last_period] / \
+                freqs[last_period]
+            pay_first[last_period] = 1.0
+        elif convention == YTMCalcType.CFETS:
+            discount_types[last_period] = SIMPLE_DISCOUNTING
+            discount_alphas[last_period] = cfets_alphas[last_period]
+            pay_first[last_period] = 1.0
+
+        return (cpns, freqs, num_flows, pay_first, discount_types,
+                discount_alphas)
+
+    ###########################################################################
+
+    def accrued_interest(self,
+                         settle_date: Date,
+                         face: float = 100.0):
+        """ Calculate the accrued interest of each bond on the settlement
+        date for a face amount. """
+
+        accrued = self._bond_terms(settle_date)[6]
+        return accrued * face
+
+    ###########################################################################
+
+    def dirty_price_from_ytm(self,
+                             settle_date: Date,
+                             ytms: np.ndarray,
+                             convention: YTMCalcType = YTMCalcType.UK_DMO):
+        """ Calculate the dirty price of each bond from its yield to maturity.
+        A single yield is applied to all of the bonds. """
+
+        terms = self._convention_terms(settle_date, convention)
+        ytms = np.broadcast_to(np.asarray(ytms, dtype=np.float64),
+                               len(self._bonds))
+        ytms = np.ascontiguousarray(ytms)
+
+        prices, _, _ = _dirty_prices_from_ytms(ytms, *terms)
+        return prices * self._par
+
+    ###########################################################################
+
+    def clean_price_from_ytm(self,
+                             settle_date: Date,
+                             ytms: np.ndarray,
+                             convention: YTMCalcType = YTMCalcType.UK_DMO):
+        """ Calculate the clean price of each bond from its yield to maturity.
+        A single yield is applied to all of the bonds. """
+
+        dirty_prices = self.dirty_price_from_ytm(settle_date, ytms,
+                                                 convention)
+        return dirty_prices - self.accrued_interest(settle_date, self._par)
+
+    ###########################################################################
+
+    def yield_to_maturity(self,
+                          settle_date: Date,
+                          clean_prices: np.ndarray,
+                          convention: YTMCalcType = YTMCalcType.US_TREASURY):
+        """ Calculate the yield to maturity of each bond from its clean price
+        by solving the price yield relationship of all of the bonds at once
+        using analytic derivatives. """
+
+        terms = self._convention_terms(settle_date, convention)
+
+        clean_prices = np.broadcast_to(np.asarray(clean_prices,
+                                                  dtype=np.float64),
+                                       len(self._bonds))
+
+        dirty_prices = clean_prices + self.accrued_interest(settle_date,
+                                                            self._par)
+        dirty_prices = np.ascontiguousarray(dirty_prices / self._par)
+
+        ytms, converged = _ytms_from_dirty_prices(dirty_prices, *terms,
+                                                  YIELD_TOLERANCE,
+                                                  YIELD_MAX_ITERATIONS)
+
+        if not np.all(converged):
+            num_failed = len(converged) - np.sum(converged)
+            raise FinError("Yield to maturity did not converge for "
+                           + str(num_failed) + " bonds.")
+
+        return ytms
+
+    ###########################################################################
+
+    def risk_from_ytm(self,
+                      settle_date: Date,
+                      ytms: np.ndarray,
+                      convention: YTMCalcType = YTMCalcType.UK_DMO):
+        """ Calculate the dirty price, dollar duration, modified duration,
+        Macauley duration and convexity of each bond from its yield to
+        maturity. These are defined as in the Bond class but use analytic
+        yield derivatives rather than bumping. """
+
+        terms = self._convention_terms(settle_date, convention)
+        ytms = np.broadcast_to(np.asarray(ytms, dtype=np.float64),
+                               len(self._bonds))
+        ytms = np.ascontiguousarray(ytms)
+
+        prices, dprices, d2prices = _dirty_prices_from_ytms(ytms, *terms)
+
+        freqs = terms[1]
+        dollar_duration = -dprices * self._par
+        modified_duration = -dprices / prices
+        macauley_duration = modified_duration * (1.0 + ytms / freqs)
+        convexity = d2prices / prices / self._par
+
+        return {'dirty_price': prices * self._par,
+                'dollar_duration': dollar_duration,
+                'modified_duration': modified_duration,
+                'macauley_duration': macauley_duration,
+                'convexity': convexity}
+
+    ###########################################################################
+
+    def analytics(self,
+                  settle_date: Date,
+                  clean_prices: np.ndarray,
+                  convention: YTMCalcType = YTMCalcType.US_TREASURY):
+        """ Calculate the yield to maturity of each bond from its clean price
+        and return it with the dirty price, durations and convexity at that
+        yield in a dictionary of arrays. """
+
+        ytms = self.yield_to_maturity(settle_date, clean_prices, convention)
+        risk = self.risk_from_ytm(settle_date, ytms, convention)
+        risk['ytm'] = ytms
+        return risk
+
+    ###########################################################################
+
+    def __len__(self):
+        return len(self._bonds)
+
+    ###########################################################################
+
+    def __repr__(self):
+        """ Return string with class details. """
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("NUM BONDS", len(self._bonds))
+        s += label_to_string("PAR", self._par)
+        return s
+
+    ###########################################################################
+
+    def _print(self):
+        """ Print a list of the bond details. """
+        print(self)
+
+###############################################################################
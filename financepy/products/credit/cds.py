@@ -8,7 +8,7 @@ from numba import njit, float64, int64
 from math import exp, log
 from copy import deepcopy
 
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.error import FinError
 from ...utils.calendar import Calendar, CalendarTypes
 from ...utils.calendar import BusDayAdjustTypes, DateGenRuleTypes
@@ -190,6 +190,38 @@ def _protection_leg_pv_numba(teff,
     return prot_pv
 
 ###############################################################################
+
+
+def _bump_ibor_curve(libor_curve, bump):
+    """ Bump the quotes of the deposits, FRAs and swaps used to build a Ibor
+    curve by the bump and then rebuild the curve. The curve is changed in
+    place so a copy should be passed in. """
+
+    for depo in libor_curve._usedDeposits:
+
+        depo._deposit_rate += bump
+
+    for fra in libor_curve._usedFRAs:
+
+        fra._fraRate += bump
+
+    for swap in libor_curve._usedSwaps:
+
+        cpn = swap._fixed_leg._cpn
+        swap._fixed_leg._coupon = cpn + bump
+
+        # Need to regenerate fixed leg payments with bumped coupon
+        # I could call swap._fixed_leg.generate_payments() but it is
+        # overkill as it has to do all the schedule generation which is
+        # not needed as the dates are unchanged
+        num_payments = len(swap._fixed_leg._payments)
+        for i in range(0, num_payments):
+            old_pmt = swap._fixed_leg._payments[i]
+            swap._fixed_leg._payments[i] = old_pmt * (cpn + bump) / cpn
+
+    libor_curve._build_curve()
+
+###############################################################################
 ###############################################################################
 ###############################################################################
 
@@ -328,26 +360,27 @@ class CDS:
         # Final accrual end date is the maturity date
         self._accrual_end_dates.append(self._maturity_date)
 
+        # The dates are held compactly as serial numbers
+        self._payment_dates = DateArray(self._payment_dates)
+        self._accrual_start_dates = DateArray(self._accrual_start_dates)
+        self._accrual_end_dates = DateArray(self._accrual_end_dates)
+
     ###########################################################################
 
     def _calc_flows(self):
         """ Calculate cash flow amounts on premium leg. """
         day_count = DayCount(self._dc_type)
 
-        self._accrual_factors = []
-        self._flows = []
-
-        # self._accrual_factors.append(0.0)
-        # self._flows.append(0.0)
+        # Adding a day because `year_frac` is non-inclusive
+        # eg. 20th to 22nd should be 3 days
+        accrual_factors = day_count.year_frac_array(
+            self._accrual_start_dates,
+            self._accrual_end_dates.add_days(1))[0]
 
-        for t0, t1 in zip(self._accrual_start_dates, self._accrual_end_dates):
-            # Adding a day because `year_frac` is non-inclusive
-            # eg. 20th to 22nd should be 3 days
-            accrual_factor = day_count.year_frac(t0, t1.add_days(1))[0]
-            flow = accrual_factor * self._running_coupon * self._notional
+        flows = accrual_factors * self._running_coupon * self._notional
 
-            self._accrual_factors.append(accrual_factor)
-            self._flows.append(flow)
+        self._accrual_factors = accrual_factors.tolist()
+        self._flows = flows.tolist()
 
     ###########################################################################
 
@@ -450,29 +483,7 @@ class CDS:
 
         bump = 0.0001  # 1 basis point
 
-        for depo in new_issuer_curve._libor_curve._usedDeposits:
-
-            depo._deposit_rate += bump
-
-        for fra in new_issuer_curve._libor_curve._usedFRAs:
-
-            fra._fraRate += bump
-
-        for swap in new_issuer_curve._libor_curve._usedSwaps:
-
-            cpn = swap._fixed_leg._cpn
-            swap._fixed_leg._coupon = cpn + bump
-
-            # Need to regenerate fixed leg payments with bumped coupon
-            # I could call swap._fixed_leg.generate_payments() but it is
-            # overkill as it has to do all the schedule generation which is
-            # not needed as the dates are unchanged
-            num_payments = len(swap._fixed_leg._payments)
-            for i in range(0, num_payments):
-                old_pmt = swap._fixed_leg._payments[i]
-                swap._fixed_leg._payments[i] = old_pmt * (cpn + bump) / cpn
-
-        new_issuer_curve._libor_curve._build_curve()
+        _bump_ibor_curve(new_issuer_curve._libor_curve, bump)
         new_issuer_curve._build_curve()
 
         v1 = self.value(value_date,
@@ -2,9 +2,6 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-# TODO: There are several speed ups for the Monte-Carlo including calculating
-# all default baskets at the same time.
-
 import numpy as np
 
 from ...utils.error import FinError
@@ -17,8 +14,8 @@ from ...utils.calendar import BusDayAdjustTypes, DateGenRuleTypes
 from ...products.credit.cds import CDS
 
 from ...models.gauss_copula_onefactor import homog_basket_loss_dbn
-from ...models.gauss_copula import default_times_gc
-from ...models.student_t_copula import StudentTCopula
+from ...models.gauss_copula import nth_default_times
+from ...models.gauss_copula import nth_default_times_copula
 
 from ...products.credit.cds_curve import CDSCurve
 
@@ -77,17 +74,9 @@ class CDSBasket:
 
 ###############################################################################
 
-    def value_legs_mc(self,
-                      value_date,
-                      n_to_default,
-                      default_times,
-                      issuer_curves,
-                      libor_curve):
-        """ Value the legs of the default basket using Monte Carlo. The default
-        times are an input so this valuation is not model dependent. """
-
-        num_credits = default_times.shape[0]
-        num_trials = default_times.shape[1]
+    def _rpv01_to_times(self, value_date, libor_curve):
+        """ Return the risky PV01 accrued up to each payment date if there is
+        no default, the average accrual factor and the time to maturity. """
 
         payment_dates = self._cds_contract._payment_dates
         num_payments = len(payment_dates)
@@ -111,53 +100,115 @@ class CDSBasket:
 
         tmat = (self._maturity_date - value_date) / gDaysInYear
 
-        rpv01 = 0.0
-        prot = 0.0
+        return rpv01ToTimes, averageAccrualFactor, tmat
 
-        assetTau = np.zeros(num_credits)
+###############################################################################
 
-        for i_trial in range(0, num_trials):
+    def _sum_legs(self,
+                  nth_times,
+                  nth_credits,
+                  recovery_rates,
+                  rpv01ToTimes,
+                  averageAccrualFactor,
+                  tmat,
+                  libor_curve):
+        """ Return the sums over trials of the risky PV01 and the protection
+        leg given the time and the credit of the nth default in each trial.
+        """
+
+        defaulted = nth_times < tmat
+        minTau = nth_times[defaulted]
+        num_defaults = len(minTau)
+
+        rpv01 = (len(nth_times) - num_defaults) * rpv01ToTimes[-1]
+        prot = 0.0
 
-            for i_credit in range(0, num_credits):
+        if num_defaults > 0:
 
-                assetTau[i_credit] = default_times[i_credit, i_trial]
+            numPaymentsIndex = (minTau / averageAccrualFactor).astype(int)
+            rpv01 += np.sum(rpv01ToTimes[numPaymentsIndex] + minTau -
+                            numPaymentsIndex * averageAccrualFactor)
 
-            # ORDER THE DEFAULT TIMES
-            assetTau.sort()
+            protTrial = 1.0 - recovery_rates[nth_credits[defaulted]]
+            protTrial *= libor_curve._df(minTau)
+            prot = np.sum(protTrial)
 
-            # GET THE Nth DEFAULT TIME
-            minTau = assetTau[n_to_default - 1]
+        return rpv01, prot
 
-            if minTau < tmat:
+###############################################################################
 
-                numPaymentsIndex = int(minTau / averageAccrualFactor)
-                rpv01Trial = rpv01ToTimes[numPaymentsIndex]
-                rpv01Trial += (minTau - numPaymentsIndex *
-                               averageAccrualFactor)
+    def value_legs_mc(self,
+                      value_date,
+                      n_to_default,
+                      default_times,
+                      issuer_curves,
+                      libor_curve):
+        """ Value the legs of the default basket using Monte Carlo. The default
+        times are an input so this valuation is not model dependent. """
 
-                # DETERMINE IDENTITY OF N-TO-DEFAULT CREDIT IF BASKET NOT HOMO
-                assetIndex = 0
-                for i_credit in range(0, num_credits):
-                    if minTau == default_times[i_credit, i_trial]:
-                        assetIndex = i_credit
-                        break
+        num_trials = default_times.shape[1]
 
-                protTrial = (1.0 - issuer_curves[assetIndex]._recovery_rate)
-                protTrial *= libor_curve._df(minTau)
+        rpv01ToTimes, averageAccrualFactor, tmat = \
+            self._rpv01_to_times(value_date, libor_curve)
 
-            else:
+        recovery_rates = np.array([c._recovery_rate for c in issuer_curves])
 
-                numPaymentsIndex = int(tmat / averageAccrualFactor)
-                rpv01Trial = rpv01ToTimes[-1]
-                protTrial = 0.0
+        nth_times, nth_credits = nth_default_times(default_times,
+                                                   n_to_default)
 
-            rpv01 += rpv01Trial
-            prot += protTrial
+        rpv01, prot = self._sum_legs(nth_times, nth_credits, recovery_rates,
+                                     rpv01ToTimes, averageAccrualFactor,
+                                     tmat, libor_curve)
 
         rpv01 = rpv01 / num_trials
         prot = prot / num_trials
         return (rpv01, prot)
 
+###############################################################################
+
+    def value_legs_copula_mc(self,
+                             value_date,
+                             n_to_default,
+                             issuer_curves,
+                             correlation_matrix,
+                             libor_curve,
+                             num_trials,
+                             seed,
+                             degrees_of_freedom=0.0,
+                             use_sobol=False):
+        """ Value the legs of the default basket using Monte Carlo in a
+        Gaussian copula, or a Student-t copula if degrees_of_freedom is
+        positive. The default times are simulated in chunks in compiled code
+        and the legs are accumulated chunk by chunk so the default times of
+        the basket are never stored. Each of the num_trials draws gives two
+        trials as the antithetic is also used. """
+
+        rpv01ToTimes, averageAccrualFactor, tmat = \
+            self._rpv01_to_times(value_date, libor_curve)
+
+        recovery_rates = np.array([c._recovery_rate for c in issuer_curves])
+
+        rpv01 = 0.0
+        prot = 0.0
+        num_sims = 0
+
+        for nth_times, nth_credits in nth_default_times_copula(
+                issuer_curves, correlation_matrix, n_to_default, num_trials,
+                seed, degrees_of_freedom, use_sobol):
+
+            rpv01Chunk, protChunk = self._sum_legs(nth_times, nth_credits,
+                                                   recovery_rates,
+                                                   rpv01ToTimes,
+                                                   averageAccrualFactor,
+                                                   tmat, libor_curve)
+            rpv01 += rpv01Chunk
+            prot += protChunk
+            num_sims += len(nth_times)
+
+        rpv01 = rpv01 / num_sims
+        prot = prot / num_sims
+        return (rpv01, prot)
+
 ###############################################################################
 
     def value_gaussian_mc(self,
@@ -167,25 +218,26 @@ class CDSBasket:
                           correlation_matrix,
                           libor_curve,
                           num_trials,
-                          seed):
+                          seed,
+                          use_sobol: bool = False):
         """ Value the default basket using a Gaussian copula model. This
-        depends on the issuer discount and correlation matrix. """
+        depends on the issuer discount and correlation matrix. The Gaussians
+        can be taken from a Sobol sequence with one dimension per credit. """
 
         num_credits = len(issuer_curves)
 
         if n_to_default > num_credits or n_to_default < 1:
             raise FinError("n_to_default must be 1 to num_credits")
 
-        default_times = default_times_gc(issuer_curves,
-                                         correlation_matrix,
-                                         num_trials,
-                                         seed)
-
-        rpv01, prot_pv = self.value_legs_mc(value_date,
-                                            n_to_default,
-                                            default_times,
-                                            issuer_curves,
-                                            libor_curve)
+        rpv01, prot_pv = self.value_legs_copula_mc(value_date,
+                                                   n_to_default,
+                                                   issuer_curves,
+                                                   correlation_matrix,
+                                                   libor_curve,
+                                                   num_trials,
+                                                   seed,
+                                                   0.0,
+                                                   use_sobol)
 
         spd = prot_pv / rpv01
         value = self._notional * (prot_pv - self._running_coupon * rpv01)
@@ -205,27 +257,29 @@ class CDSBasket:
                            degreesOfFreedom,
                            libor_curve,
                            num_trials,
-                           seed):
-        """ Value the default basket using the Student-T copula. """
+                           seed,
+                           use_sobol: bool = False):
+        """ Value the default basket using the Student-T copula. With Sobol
+        numbers the Gaussians are taken from a Sobol sequence and the
+        chi-squared variable is pseudo-random. """
 
         num_credits = len(issuer_curves)
 
         if n_to_default > num_credits or n_to_default < 1:
             raise FinError("n_to_default must be 1 to num_credits")
 
-        model = StudentTCopula()
-
-        default_times = model.default_times(issuer_curves,
-                                            correlation_matrix,
-                                            degreesOfFreedom,
-                                            num_trials,
-                                            seed)
-
-        rpv01, prot_pv = self.value_legs_mc(value_date,
-                                            n_to_default,
-                                            default_times,
-                                            issuer_curves,
-                                            libor_curve)
+        if degreesOfFreedom <= 0.0:
+            raise FinError("Degrees of freedom must be positive.")
+
+        rpv01, prot_pv = self.value_legs_copula_mc(value_date,
+                                                   n_to_default,
+                                                   issuer_curves,
+                                                   correlation_matrix,
+                                                   libor_curve,
+                                                   num_trials,
+                                                   seed,
+                                                   degreesOfFreedom,
+                                                   use_sobol)
 
         spd = prot_pv / rpv01
         value = self._notional * (prot_pv - self._running_coupon * rpv01)
@@ -0,0 +1,488 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit, prange
+from math import exp, log
+from copy import deepcopy
+
+from ...utils.date import Date
+from ...utils.error import FinError
+from ...utils.calendar import CalendarTypes
+from ...utils.calendar import BusDayAdjustTypes, DateGenRuleTypes
+from ...utils.day_count import DayCount, DayCountTypes
+from ...utils.frequency import FrequencyTypes
+from ...utils.global_vars import gDaysInYear
+from ...utils.math import ONE_MILLION
+from ...utils.helpers import label_to_string, stack_ragged
+from ...utils.helpers import check_argument_types
+from ...market.curves.interpolator import InterpTypes, _uinterpolate
+from .cds import CDS, _bump_ibor_curve
+from .cds import standard_recovery_rate, glob_num_steps_per_year
+from .cds_curve import build_cds_curves
+
+###############################################################################
+# A book of CDS contracts which share a payment schedule, such as the
+# constituents of a CDS index, is valued in one pass over a matrix of survival
+# curves with one row per issuer. The discount factors at the payment dates
+# and on the protection leg integration grid are the same for every issuer
+# and so they are only interpolated once. The issuers are then shared across
+# threads. The legs are computed as in the CDS class.
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _cds_legs_batch(teff,
+                    tmat,
+                    accrual_factorPCDToNow,
+                    paymentTimes,
+                    year_fracs,
+                    npIborTimes,
+                    npIborValues,
+                    survTimes,
+                    survValues,
+                    numSurvPoints,
+                    num_steps_per_year):
+    """ Return the full and clean risky PV01 and the protection leg PV per
+    unit of loss given default of a unit notional CDS for each issuer. The
+    survival curve of each issuer is a row of the survival times and values
+    matrices with the number of points in each row given. """
+
+    method = InterpTypes.FLAT_FWD_RATES.value
+    num_credits = len(numSurvPoints)
+    num_payments = len(paymentTimes)
+
+    zPayments = np.zeros(num_payments)
+    for it in range(0, num_payments):
+        zPayments[it] = _uinterpolate(paymentTimes[it], npIborTimes,
+                                      npIborValues, method)
+
+    num_steps = int((tmat - teff) * num_steps_per_year + 0.50)
+    dt = (tmat - teff) / num_steps
+
+    protTimes = np.zeros(num_steps + 1)
+    zProt = np.zeros(num_steps + 1)
+
+    t = teff
+    protTimes[0] = t
+    zProt[0] = _uinterpolate(t, npIborTimes, npIborValues, method)
+
+    for i_step in range(1, num_steps + 1):
+        t = t + dt
+        protTimes[i_step] = t
+        zProt[i_step] = _uinterpolate(t, npIborTimes, npIborValues, method)
+
+    fullRPV01s = np.zeros(num_credits)
+    cleanRPV01s = np.zeros(num_credits)
+    protPVs = np.zeros(num_credits)
+
+    small = 1e-8
+
+    for i_credit in prange(num_credits):
+
+        n = numSurvPoints[i_credit]
+        times = survTimes[i_credit, 0:n]
+        values = survValues[i_credit, 0:n]
+
+        # The premium leg including the coupon accrued at default
+        qeff = _uinterpolate(teff, times, values, method)
+        q1 = _uinterpolate(paymentTimes[0], times, values, method)
+        z1 = zPayments[0]
+
+        fullRPV01 = q1 * z1 * year_fracs[1]
+        fullRPV01 = fullRPV01 + z1 * (qeff - q1) * accrual_factorPCDToNow
+        fullRPV01 += 0.5 * z1 * (qeff - q1) * \
+            (year_fracs[1] - accrual_factorPCDToNow)
+
+        for it in range(1, num_payments):
+
+            q2 = _uinterpolate(paymentTimes[it], times, values, method)
+            z2 = zPayments[it]
+
+            accrual_factor = year_fracs[it]
+            fullRPV01 += q2 * z2 * accrual_factor
+
+            tau = accrual_factor
+            h12 = -log(q2 / q1) / tau
+            r12 = -log(z2 / z1) / tau
+            alpha = h12 + r12
+            expTerm = 1.0 - exp(-alpha * tau) - alpha * \
+                tau * exp(-alpha * tau)
+            dfullRPV01 = q1 * z1 * h12 * \
+                expTerm / abs(alpha * alpha + 1e-20)
+
+            fullRPV01 = fullRPV01 + dfullRPV01
+
+            q1 = q2
+
+        fullRPV01s[i_credit] = fullRPV01
+        cleanRPV01s[i_credit] = fullRPV01 - accrual_factorPCDToNow
+
+        # The protection leg assuming flat hazard and interest rates
+        # between the integration points
+        q1 = _uinterpolate(teff, times, values, method)
+        z1 = zProt[0]
+
+        prot_pv = 0.0
+
+        for i_step in range(1, num_steps + 1):
+            z2 = zProt[i_step]
+            q2 = _uinterpolate(protTimes[i_step], times, values, method)
+            h12 = -log(q2 / q1) / dt
+            r12 = -log(z2 / z1) / dt
+            expTerm = exp(-(r12 + h12) * dt)
+            dprot_pv = h12 * (1.0 - expTerm) * q1 * z1 / \
+                (abs(h12 + r12) + small)
+            prot_pv += dprot_pv
+            q1 = q2
+            z1 = z2
+
+        protPVs[i_credit] = prot_pv
+
+    return fullRPV01s, cleanRPV01s, protPVs
+
+###############################################################################
+
+
+def stack_issuer_curves(issuer_curves: list):
+    """ Return the Ibor curve shared by a list of issuer curves together with
+    a matrix of their survival times and a matrix of their survival
+    probabilities with one row per issuer, and the number of points in each
+    row. All of the issuer curves must use the same Ibor curve. """
+
+    if len(issuer_curves) < 1:
+        raise FinError("No issuer curves have been supplied.")
+
+    libor_curve = issuer_curves[0]._libor_curve
+
+    for issuer_curve in issuer_curves:
+        if issuer_curve._libor_curve is not libor_curve:
+            raise FinError("All issuer curves must use the same Ibor curve.")
+
+    surv_times, num_points = stack_ragged([c._times for c in issuer_curves])
+    surv_values, _ = stack_ragged([c._values for c in issuer_curves])
+
+    return libor_curve, surv_times, surv_values, num_points
+
+###############################################################################
+
+
+class CDSBatch:
+    """ A class which manages a book of Credit Default Swaps that share the
+    same step-in date, maturity date and payment schedule but which can have
+    different coupons, notionals and directions. Each contract references its
+    own issuer curve and all of the contracts are valued together. This is
+    used to value the constituents of a CDS index or a large book of single
+    name CDS. """
+
+    def __init__(self,
+                 step_in_date: Date,  # Date protection starts
+                 maturity_date_or_tenor: (Date, str),  # Date or tenor
+                 running_coupons,  # Annualised coupon of each contract
+                 notionals=ONE_MILLION,
+                 long_protection=True,
+                 freq_type: FrequencyTypes = FrequencyTypes.QUARTERLY,
+                 dc_type: DayCountTypes = DayCountTypes.ACT_360,
+                 cal_type: CalendarTypes = CalendarTypes.WEEKEND,
+                 bd_adjust_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
+                 dg_rule_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD):
+        """ Create a book of CDS contracts from the step-in date and maturity
+        date that they share. The coupons, notionals and long protection
+        flags can be a single value for all contracts or an array with one
+        value per contract. """
+
+        check_argument_types(self.__init__, locals())
+
+        # All of the contracts share the schedule of this unit contract
+        self._cds = CDS(step_in_date,
+                        maturity_date_or_tenor,
+                        0.0,
+                        1.0,
+                        True,
+                        freq_type,
+                        dc_type,
+                        cal_type,
+                        bd_adjust_type,
+                        dg_rule_type)
+
+        self._step_in_date = self._cds._step_in_date
+        self._maturity_date = self._cds._maturity_date
+        self._running_coupons = np.atleast_1d(np.array(running_coupons,
+                                                       dtype=np.float64))
+        self._notionals = np.atleast_1d(np.array(notionals,
+                                                 dtype=np.float64))
+        self._long_protection = np.atleast_1d(np.array(long_protection,
+                                                       dtype=bool))
+
+    ###########################################################################
+
+    def _contract_terms(self, num_credits):
+        """ Return the coupons, notionals and the sign of the protection leg
+        of each of the contracts valued against num_credits issuer curves. """
+
+        try:
+            running_coupons = np.broadcast_to(self._running_coupons,
+                                              num_credits)
+            notionals = np.broadcast_to(self._notionals, num_credits)
+            long_protection = np.broadcast_to(self._long_protection,
+                                              num_credits)
+        except ValueError:
+            raise FinError("Need one issuer curve per CDS contract.")
+
+        signs = np.where(long_protection, 1.0, -1.0)
+
+        return running_coupons, notionals, signs
+
+    ###########################################################################
+
+    def _unit_legs(self,
+                   value_date,
+                   libor_curve,
+                   surv_times,
+                   surv_values,
+                   num_points,
+                   num_steps_per_year=glob_num_steps_per_year):
+        """ Return the full and clean risky PV01 and the protection leg PV per
+        unit of loss given default of a unit notional contract for each row of
+        the survival curve matrices. """
+
+        cds = self._cds
+
+        paymentTimes = (cds._payment_dates - value_date) / gDaysInYear
+        paymentTimes = paymentTimes[paymentTimes > 0.0]
+
+        # this is the part of the coupon accrued from the previous coupon date
+        # to now
+        pcd = cds._accrual_start_dates[0]
+        eff = cds._step_in_date
+        day_count = DayCount(cds._dc_type)
+
+        accrual_factorPCDToNow = day_count.year_frac(pcd, eff)[0]
+
+        teff = (eff - value_date) / gDaysInYear
+        tmat = (cds._maturity_date - value_date) / gDaysInYear
+
+        return _cds_legs_batch(teff,
+                               tmat,
+                               accrual_factorPCDToNow,
+                               np.ascontiguousarray(paymentTimes,
+                                                    dtype=np.float64),
+                               np.array(cds._accrual_factors),
+                               libor_curve._times,
+                               libor_curve._dfs,
+                               surv_times,
+                               surv_values,
+                               num_points,
+                               num_steps_per_year)
+
+    ###########################################################################
+
+    def _legs(self,
+              value_date,
+              issuer_curves,
+              num_steps_per_year=glob_num_steps_per_year):
+        """ Value the unit legs of the contracts on the issuer curves. """
+
+        libor_curve, surv_times, surv_values, num_points = \
+            stack_issuer_curves(issuer_curves)
+
+        return self._unit_legs(value_date, libor_curve, surv_times,
+                               surv_values, num_points, num_steps_per_year)
+
+    ###########################################################################
+
+    def _value_from_legs(self,
+                         fullRPV01s,
+                         cleanRPV01s,
+                         unitProtPVs,
+                         contract_recovery_rates):
+        """ Dirty and clean values of the contracts from their unit legs. """
+
+        num_credits = len(fullRPV01s)
+        running_coupons, notionals, signs = self._contract_terms(num_credits)
+
+        prot_pvs = unitProtPVs * (1.0 - contract_recovery_rates) * notionals
+
+        dirtyPVs = signs * \
+            (prot_pvs - running_coupons * fullRPV01s * notionals)
+        cleanPVs = signs * \
+            (prot_pvs - running_coupons * cleanRPV01s * notionals)
+
+        return {'dirty_pv': dirtyPVs, 'clean_pv': cleanPVs}
+
+    ###########################################################################
+
+    def value(self,
+              value_date,
+              issuer_curves,
+              contract_recovery_rates=standard_recovery_rate,
+              num_steps_per_year=glob_num_steps_per_year):
+        """ Valuation of the CDS contracts given a list of issuer curves with
+        one curve per contract. The contract recovery rates can be a single
+        value or an array. Arrays of the dirty and clean values are returned.
+        """
+
+        legs = self._legs(value_date, issuer_curves, num_steps_per_year)
+
+        return self._value_from_legs(*legs, contract_recovery_rates)
+
+    ###########################################################################
+
+    def risky_pv01(self,
+                   value_date,
+                   issuer_curves):
+        """ The risky PV01 of a risky one dollar paid on the premium leg of
+        each contract. Arrays of the dirty and clean risky PV01 are returned.
+        """
+
+        fullRPV01s, cleanRPV01s, _ = self._legs(value_date, issuer_curves)
+
+        return {'dirty_rpv01': fullRPV01s, 'clean_rpv01': cleanRPV01s}
+
+    ###########################################################################
+
+    def protection_leg_pv(self,
+                          value_date,
+                          issuer_curves,
+                          contract_recovery_rates=standard_recovery_rate,
+                          num_steps_per_year=glob_num_steps_per_year):
+        """ Return an array of the protection leg PVs of the contracts. """
+
+        _, _, unitProtPVs = self._legs(value_date, issuer_curves,
+                                       num_steps_per_year)
+
+        _, notionals, _ = self._contract_terms(len(unitProtPVs))
+
+        return unitProtPVs * (1.0 - contract_recovery_rates) * notionals
+
+    ###########################################################################
+
+    def premium_leg_pv(self,
+                       value_date,
+                       issuer_curves):
+        """ Return an array of the premium leg PVs of the contracts. """
+
+        fullRPV01s, _, _ = self._legs(value_date, issuer_curves)
+
+        running_coupons, notionals, _ = self._contract_terms(len(fullRPV01s))
+
+        return fullRPV01s * notionals * running_coupons
+
+    ###########################################################################
+
+    def par_spread(self,
+                   value_date,
+                   issuer_curves,
+                   contract_recovery_rates=standard_recovery_rate,
+                   num_steps_per_year=glob_num_steps_per_year):
+        """ Return an array of the breakeven coupons which would make the value
+        of each contract equal to zero. By convention these are calculated
+        using the clean RPV01. """
+
+        _, cleanRPV01s, unitProtPVs = self._legs(value_date, issuer_curves,
+                                                 num_steps_per_year)
+
+        return unitProtPVs * (1.0 - contract_recovery_rates) / cleanRPV01s
+
+    ###########################################################################
+
+    def credit_dv01(self,
+                    value_date,
+                    issuer_curves,
+                    contract_recovery_rates=standard_recovery_rate,
+                    num_steps_per_year=glob_num_steps_per_year):
+        """ Return an array of the changes in the value of each contract for a
+        one basis point increase in the CDS spreads used to build its issuer
+        curve. The bumped issuer curves share the unbumped Ibor curve and
+        are built together. """
+
+        libor_curve = stack_issuer_curves(issuer_curves)[0]
+
+        bump = 0.0001  # 1 basis point
+
+        bumpedIssuerCurves = []
+
+        for issuer_curve in issuer_curves:
+
+            # we copy the curve but not the Ibor curve which is unchanged
+            bumpedIssuerCurve = deepcopy(issuer_curve,
+                                         {id(libor_curve): libor_curve})
+
+            for cds in bumpedIssuerCurve._cds_contracts:
+                cds._running_coupon += bump
+
+            bumpedIssuerCurves.append(bumpedIssuerCurve)
+
+        build_cds_curves(bumpedIssuerCurves, incremental=False)
+
+        v0 = self.value(value_date, issuer_curves,
+                        contract_recovery_rates, num_steps_per_year)
+
+        v1 = self.value(value_date, bumpedIssuerCurves,
+                        contract_recovery_rates, num_steps_per_year)
+
+        return v1['dirty_pv'] - v0['dirty_pv']
+
+    ###########################################################################
+
+    def interest_dv01(self,
+                      value_date,
+                      issuer_curves,
+                      contract_recovery_rates=standard_recovery_rate,
+                      num_steps_per_year=glob_num_steps_per_year):
+        """ Return an array of the changes in the value of each contract for a
+        one basis point increase in the quotes used to build the Ibor curve.
+        The Ibor curve is bumped once and the issuer curves are then rebuilt
+        on it. """
+
+        libor_curve = stack_issuer_curves(issuer_curves)[0]
+
+        bump = 0.0001  # 1 basis point
+
+        bumpedIborCurve = deepcopy(libor_curve)
+        _bump_ibor_curve(bumpedIborCurve, bump)
+
+        bumpedIssuerCurves = []
+
+        for issuer_curve in issuer_curves:
+
+            bumpedIssuerCurve = deepcopy(issuer_curve,
+                                         {id(libor_curve): bumpedIborCurve})
+
+            bumpedIssuerCurves.append(bumpedIssuerCurve)
+
+        build_cds_curves(bumpedIssuerCurves, incremental=False)
+
+        v0 = self.value(value_date, issuer_curves,
+                        contract_recovery_rates, num_steps_per_year)
+
+        v1 = self.value(value_date, bumpedIssuerCurves,
+                        contract_recovery_rates, num_steps_per_year)
+
+        return v1['dirty_pv'] - v0['dirty_pv']
+
+    ###########################################################################
+
+    def __repr__(self):
+        """ Print out details of the CDS contracts. """
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("STEP-IN DATE", self._step_in_date)
+        s += label_to_string("MATURITY", self._maturity_date)
+        s += label_to_string("NUM COUPONS", len(self._running_coupons))
+        s += label_to_string("NUM NOTIONALS", len(self._notionals))
+        s += label_to_string("DAYCOUNT", self._cds._dc_type)
+        s += label_to_string("FREQUENCY", self._cds._freq_type)
+        s += label_to_string("CALENDAR", self._cds._cal_type)
+        s += label_to_string("BUSDAYRULE", self._cds._bd_adjust_type)
+        s += label_to_string("DATEGENRULE", self._cds._dg_rule_type)
+        return s
+
+    ###########################################################################
+
+    def _print(self):
+        """ Simple print function for backward compatibility. """
+        print(self)
+
+###############################################################################
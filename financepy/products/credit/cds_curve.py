@@ -3,37 +3,464 @@
 ##############################################################################
 
 import numpy as np
-import scipy.optimize as optimize
+from numba import njit, prange
+from math import exp, log
 
 from ...utils.date import Date
 from ...utils.error import FinError
 from ...utils.global_vars import gDaysInYear
 from ...market.curves.interpolator import _uinterpolate, InterpTypes
-from ...utils.helpers import input_time, table_to_string
+from ...utils.helpers import input_time, table_to_string, stack_ragged
 from ...utils.day_count import DayCount
 from ...utils.frequency import annual_frequency, FrequencyTypes
 from ...utils.helpers import check_argument_types, _func_name
 from ...utils.helpers import label_to_string
+from .cds import glob_num_steps_per_year
 
+BOOTSTRAP_TOLERANCE = 1e-12
+BOOTSTRAP_MAX_ITERATIONS = 50
+
+###############################################################################
+# The survival curve is bootstrapped one CDS at a time. With flat forward
+# interpolation the survival probability beyond the last known node is
+#
+#     q(t) = q(t_prev) x exp(-lambda x (t - t_prev))
+#
+# where lambda is the hazard rate of the new segment. The terms of the
+# premium and protection legs of the CDS which only depend on the known nodes
+# are summed once and the remaining terms are valued as functions of lambda
+# together with their analytical derivatives. Each node is then found using
+# Newton's method on the clean value of the CDS. The legs are computed as in
+# the CDS class.
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _premium_head(Leff, meff, L1, m1, z1, year_frac, accrual_factorPCDToNow,
+                  hazard_rate):
+    """ Value and derivative with respect to the hazard rate of the first
+    coupon of the premium leg including the coupon accrued at default. """
+
+    qeff = exp(-Leff - hazard_rate * meff)
+    q1 = exp(-L1 - hazard_rate * m1)
+    dqeff = -meff * qeff
+    dq1 = -m1 * q1
+
+    v = q1 * z1 * year_frac
+    v += z1 * (qeff - q1) * accrual_factorPCDToNow
+    v += 0.5 * z1 * (qeff - q1) * (year_frac - accrual_factorPCDToNow)
+
+    dv = dq1 * z1 * year_frac
+    dv += z1 * (dqeff - dq1) * accrual_factorPCDToNow
+    dv += 0.5 * z1 * (dqeff - dq1) * (year_frac - accrual_factorPCDToNow)
+
+    return v, dv
 
 ###############################################################################
 
 
-def f(q, *args):
-    """ Function that returns zero when the survival probability that gives a
-    zero value of the CDS has been determined. """
+@njit(cache=True, fastmath=True)
+def _premium_term(L1, m1, L2, m2, z1, z2, accrual_factor, hazard_rate):
+    """ Value and derivative with respect to the hazard rate of a coupon of
+    the premium leg including the coupon accrued at default. """
 
-    curve = args[0]
-    value_date = args[1]
-    cds = args[2]
-    recovery_rate = args[3]
+    tau = accrual_factor
+    q1 = exp(-L1 - hazard_rate * m1)
+    q2 = exp(-L2 - hazard_rate * m2)
+    dq1 = -m1 * q1
+    dq2 = -m2 * q2
 
-    num_points = len(curve._times)
-    curve._values[num_points - 1] = q
-    # This is important - we calibrate a curve that makes the clean PV of the
-    # CDS equal to zero and so we select the second element of the value tuple
-    obj_fn = cds.value(value_date, curve, recovery_rate)['clean_pv']
-    return obj_fn
+    h12 = (L2 - L1 + hazard_rate * (m2 - m1)) / tau
+    dh12 = (m2 - m1) / tau
+    r12 = -log(z2 / z1) / tau
+    alpha = h12 + r12
+
+    expAlpha = exp(-alpha * tau)
+    expTerm = 1.0 - expAlpha - alpha * tau * expAlpha
+    dexpTerm = alpha * tau * tau * expAlpha * dh12
+    denom = alpha * alpha + 1e-20
+    ddenom = 2.0 * alpha * dh12
+
+    v = q2 * z2 * accrual_factor + q1 * z1 * h12 * expTerm / denom
+
+    dv = dq2 * z2 * accrual_factor
+    dv += z1 * (dq1 * h12 + q1 * dh12) * expTerm / denom
+    dv += q1 * z1 * h12 * (dexpTerm * denom - expTerm * ddenom) / \
+        (denom * denom)
+
+    return v, dv
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _protection_term(L1, m1, L2, m2, z1, z2, dt, hazard_rate):
+    """ Value and derivative with respect to the hazard rate of a time step
+    of the protection leg per unit of loss given default. """
+
+    small = 1e-8
+
+    q1 = exp(-L1 - hazard_rate * m1)
+    dq1 = -m1 * q1
+
+    h12 = (L2 - L1 + hazard_rate * (m2 - m1)) / dt
+    dh12 = (m2 - m1) / dt
+    r12 = -log(z2 / z1) / dt
+
+    expTerm = exp(-(r12 + h12) * dt)
+    denom = abs(h12 + r12) + small
+    ddenom = dh12
+    if h12 + r12 < 0.0:
+        ddenom = -dh12
+
+    v = h12 * (1.0 - expTerm) * q1 * z1 / denom
+
+    dv = (dh12 * (1.0 - expTerm) * q1 + h12 * expTerm * dt * dh12 * q1 +
+          h12 * (1.0 - expTerm) * dq1) * z1 / denom
+    dv -= v * ddenom / denom
+
+    return v, dv
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _log_survival(t, t_prev, L_prev, t_new, known_times, known_values):
+    """ Return minus the log of the survival probability at time t as a part
+    due to the known nodes of the curve and the multiple of the hazard rate
+    of the new segment. Before time zero the interpolation extrapolates
+    back from the last node of the curve, which is the new node. """
+
+    if t > t_prev:
+        return L_prev, t - t_prev
+
+    if t < 0.0:
+        return t * L_prev / t_new, t * (t_new - t_prev) / t_new
+
+    q = _uinterpolate(t, known_times, known_values,
+                      InterpTypes.FLAT_FWD_RATES.value)
+
+    return -log(q), 0.0
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _bootstrap_survival_curve(times,
+                              values,
+                              first_cds,
+                              npIborTimes,
+                              npIborValues,
+                              teffs,
+                              accrual_factorsPCDToNow,
+                              paymentTimes,
+                              yearFracs,
+                              numPayments,
+                              coupons,
+                              recovery_rate,
+                              num_steps_per_year,
+                              tolerance,
+                              max_iterations):
+    """ Solve for the survival probabilities at the maturities of the CDS
+    contracts from first_cds onwards. The first node of the curve is at time
+    zero and the nodes before first_cds + 1 must already be known. The values
+    are updated in place. Returns False if Newton's method fails. """
+
+    method = InterpTypes.FLAT_FWD_RATES.value
+    num_cds = len(coupons)
+    lgd = 1.0 - recovery_rate
+
+    # The initial guess is the hazard rate of the previous segment
+    if first_cds > 0:
+        hazard_rate = log(values[first_cds - 1] / values[first_cds]) / \
+            (times[first_cds] - times[first_cds - 1])
+    else:
+        hazard_rate = coupons[0] / max(lgd, 0.01)
+
+    for i_cds in range(first_cds, num_cds):
+
+        known_times = times[0:i_cds + 1]
+        known_values = values[0:i_cds + 1]
+        t_prev = times[i_cds]
+        L_prev = -log(values[i_cds])
+        tmat = times[i_cds + 1]
+
+        teff = teffs[i_cds]
+        accrual_factorPCDToNow = accrual_factorsPCDToNow[i_cds]
+        coupon = coupons[i_cds]
+        num_payments = numPayments[i_cds]
+        year_fracs = yearFracs[i_cds]
+
+        # Premium leg points
+        Leff, meff = _log_survival(teff, t_prev, L_prev, tmat, known_times,
+                                   known_values)
+
+        Lp = np.zeros(num_payments)
+        mp = np.zeros(num_payments)
+        zp = np.zeros(num_payments)
+
+        for it in range(0, num_payments):
+            t = paymentTimes[i_cds, it]
+            Lp[it], mp[it] = _log_survival(t, t_prev, L_prev, tmat,
+                                           known_times, known_values)
+            zp[it] = _uinterpolate(t, npIborTimes, npIborValues, method)
+
+        # Protection leg integration points
+        num_steps = int((tmat - teff) * num_steps_per_year + 0.50)
+        dt = (tmat - teff) / num_steps
+
+        Lg = np.zeros(num_steps + 1)
+        mg = np.zeros(num_steps + 1)
+        zg = np.zeros(num_steps + 1)
+
+        t = teff
+        for i_step in range(0, num_steps + 1):
+            if i_step > 0:
+                t = t + dt
+            Lg[i_step], mg[i_step] = _log_survival(t, t_prev, L_prev, tmat,
+                                                   known_times, known_values)
+            zg[i_step] = _uinterpolate(t, npIborTimes, npIborValues, method)
+
+        # The terms which only depend on the known nodes are summed once and
+        # the indices of the other terms are stored
+        z1 = zp[0]
+
+        premFixed = 0.0
+        newPayments = np.zeros(num_payments, dtype=np.int64)
+        numNewPayments = 0
+
+        for it in range(0, num_payments):
+            if it == 0:
+                if meff == 0.0 and mp[0] == 0.0:
+                    v, _ = _premium_head(Leff, meff, Lp[0], mp[0], z1,
+                                         year_fracs[1],
+                                         accrual_factorPCDToNow, 0.0)
+                    premFixed += v
+                    continue
+            elif mp[it - 1] == 0.0 and mp[it] == 0.0:
+                v, _ = _premium_term(Lp[it - 1], mp[it - 1], Lp[it], mp[it],
+                                     z1, zp[it], year_fracs[it], 0.0)
+                premFixed += v
+                continue
+
+            newPayments[numNewPayments] = it
+            numNewPayments += 1
+
+        protFixed = 0.0
+        newSteps = np.zeros(num_steps, dtype=np.int64)
+        numNewSteps = 0
+
+        for k in range(1, num_steps + 1):
+            if mg[k - 1] == 0.0 and mg[k] == 0.0:
+                v, _ = _protection_term(Lg[k - 1], mg[k - 1], Lg[k], mg[k],
+                                        zg[k - 1], zg[k], dt, 0.0)
+                protFixed += v
+            else:
+                newSteps[numNewSteps] = k
+                numNewSteps += 1
+
+        converged = False
+
+        for _ in range(0, max_iterations):
+
+            prem = premFixed
+            dprem = 0.0
+
+            for i_new in range(0, numNewPayments):
+                it = newPayments[i_new]
+                if it == 0:
+                    v, dv = _premium_head(Leff, meff, Lp[0], mp[0], z1,
+                                          year_fracs[1],
+                                          accrual_factorPCDToNow,
+                                          hazard_rate)
+                else:
+                    v, dv = _premium_term(Lp[it - 1], mp[it - 1], Lp[it],
+                                          mp[it], z1, zp[it], year_fracs[it],
+                                          hazard_rate)
+                prem += v
+                dprem += dv
+
+            prot = protFixed
+            dprot = 0.0
+
+            for i_new in range(0, numNewSteps):
+                k = newSteps[i_new]
+                v, dv = _protection_term(Lg[k - 1], mg[k - 1], Lg[k], mg[k],
+                                         zg[k - 1], zg[k], dt, hazard_rate)
+                prot += v
+                dprot += dv
+
+            # Clean value of a unit notional long protection contract
+            obj_fn = lgd * prot - coupon * (prem - accrual_factorPCDToNow)
+            dobj_fn = lgd * dprot - coupon * dprem
+
+            if dobj_fn == 0.0:
+                break
+
+            step = obj_fn / dobj_fn
+            hazard_rate -= step
+
+            if abs(step) < tolerance:
+                converged = True
+                break
+
+        if not converged:
+            return False
+
+        values[i_cds + 1] = exp(-L_prev - hazard_rate * (tmat - t_prev))
+
+    return True
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _bootstrap_survival_curves(times,
+                               values,
+                               first_cds,
+                               numCDS,
+                               npIborTimes,
+                               npIborValues,
+                               numIborPoints,
+                               teffs,
+                               accrual_factorsPCDToNow,
+                               paymentTimes,
+                               yearFracs,
+                               numPayments,
+                               coupons,
+                               recovery_rates,
+                               num_steps_per_year,
+                               tolerance,
+                               max_iterations):
+    """ Bootstrap many survival curves with the curves shared across threads.
+    Each curve is a row of the inputs which are padded to the largest number
+    of CDS contracts, payments and Ibor curve points. """
+
+    num_curves = len(first_cds)
+    converged = np.zeros(num_curves, dtype=np.bool_)
+
+    for i_curve in prange(num_curves):
+
+        n = numCDS[i_curve]
+        n_ibor = numIborPoints[i_curve]
+
+        converged[i_curve] = _bootstrap_survival_curve(
+            times[i_curve, 0:n + 1],
+            values[i_curve, 0:n + 1],
+            first_cds[i_curve],
+            npIborTimes[i_curve, 0:n_ibor],
+            npIborValues[i_curve, 0:n_ibor],
+            teffs[i_curve, 0:n],
+            accrual_factorsPCDToNow[i_curve, 0:n],
+            paymentTimes[i_curve, 0:n],
+            yearFracs[i_curve, 0:n],
+            numPayments[i_curve, 0:n],
+            coupons[i_curve, 0:n],
+            recovery_rates[i_curve],
+            num_steps_per_year,
+            tolerance,
+            max_iterations)
+
+    return converged
+
+###############################################################################
+
+
+def build_cds_curves(issuer_curves: list,
+                     incremental: bool = True):
+    """ Bootstrap a list of issuer curves together with the curves shared
+    across threads. With incremental set, a curve whose Ibor curve, recovery
+    rate and CDS contracts are unchanged since it was last built is skipped
+    and a curve where only some CDS spreads have moved is only rebuilt from
+    the first of these. The number of curves which are rebuilt is returned.
+    """
+
+    curves = []
+    first_cds = []
+    inputs = []
+
+    for issuer_curve in issuer_curves:
+
+        issuer_curve._validate(issuer_curve._cds_contracts)
+        cds_arrays = issuer_curve._cds_arrays()
+
+        first = 0
+        if incremental:
+            first = issuer_curve._first_changed_cds(*cds_arrays)
+
+        if first < len(issuer_curve._cds_contracts):
+            curves.append(issuer_curve)
+            first_cds.append(first)
+            inputs.append(cds_arrays)
+
+    num_curves = len(curves)
+
+    if num_curves == 0:
+        return 0
+
+    times, numCDS = stack_ragged([x[0] for x in inputs])
+    numCDS = numCDS - 1
+
+    values = np.zeros(times.shape)
+    for i_curve, issuer_curve in enumerate(curves):
+        values[i_curve, 0] = 1.0
+        n = first_cds[i_curve] + 1
+        if n > 1:
+            values[i_curve, 0:n] = issuer_curve._values[0:n]
+
+    iborTimes, numIborPoints = stack_ragged([c._libor_curve._times
+                                             for c in curves])
+    iborValues, _ = stack_ragged([c._libor_curve._dfs for c in curves])
+
+    teffs, _ = stack_ragged([x[1] for x in inputs])
+    accrual_factorsPCDToNow, _ = stack_ragged([x[2] for x in inputs])
+    coupons, _ = stack_ragged([x[3] for x in inputs])
+    numPayments, _ = stack_ragged([x[5] for x in inputs])
+    numPayments = numPayments.astype(np.int64)
+
+    max_cds = times.shape[1] - 1
+    max_payments = max([x[4].shape[1] for x in inputs])
+
+    paymentTimes = np.zeros((num_curves, max_cds, max_payments))
+    yearFracs = np.zeros((num_curves, max_cds, max_payments + 1))
+
+    for i_curve in range(0, num_curves):
+        x = inputs[i_curve]
+        paymentTimes[i_curve, 0:numCDS[i_curve], 0:x[4].shape[1]] = x[4]
+        yearFracs[i_curve, 0:numCDS[i_curve], 0:x[6].shape[1]] = x[6]
+
+    recovery_rates = np.array([c._recovery_rate for c in curves],
+                              dtype=np.float64)
+
+    converged = _bootstrap_survival_curves(times,
+                                           values,
+                                           np.array(first_cds,
+                                                    dtype=np.int64),
+                                           numCDS,
+                                           iborTimes,
+                                           iborValues,
+                                           numIborPoints,
+                                           teffs,
+                                           accrual_factorsPCDToNow,
+                                           paymentTimes,
+                                           yearFracs,
+                                           numPayments,
+                                           coupons,
+                                           recovery_rates,
+                                           glob_num_steps_per_year,
+                                           BOOTSTRAP_TOLERANCE,
+                                           BOOTSTRAP_MAX_ITERATIONS)
+
+    if not np.all(converged):
+        raise FinError("CDS curve bootstrap did not converge.")
+
+    for i_curve, issuer_curve in enumerate(curves):
+        n = numCDS[i_curve] + 1
+        issuer_curve._times = times[i_curve, 0:n].copy()
+        issuer_curve._values = values[i_curve, 0:n].copy()
+        issuer_curve._set_built_inputs(*inputs[i_curve])
+
+    return num_curves
 
 ###############################################################################
 
@@ -67,6 +494,7 @@ class CDSCurve:
         self._libor_curve = libor_curve
         self._interpolation_method = interpolation_method
         self._built_ok = False
+        self._built_inputs = None
 
         self._times = []
         self._values = []
@@ -145,33 +573,126 @@ class CDSCurve:
 
 ###############################################################################
 
-    def _build_curve(self):
-        """ Construct the CDS survival curve from a set of CDS contracts """
+    def _cds_arrays(self):
+        """ Return the times of the curve nodes starting at time zero and the
+        effective times, accrual factors to the step-in date, coupons and
+        premium leg schedules of the CDS contracts used by the bootstrap. """
 
-        self._validate(self._cds_contracts)
-        num_times = len(self._cds_contracts)
+        num_cds = len(self._cds_contracts)
+
+        times = np.zeros(num_cds + 1)
+        teffs = np.zeros(num_cds)
+        accrual_factorsPCDToNow = np.zeros(num_cds)
+        coupons = np.zeros(num_cds)
+        paymentTimes = []
+        yearFracs = []
+
+        for i, cds in enumerate(self._cds_contracts):
+
+            times[i + 1] = (cds._maturity_date - self._value_date) / \
+                gDaysInYear
+            teffs[i] = (cds._step_in_date - self._value_date) / gDaysInYear
+
+            day_count = DayCount(cds._dc_type)
+            pcd = cds._accrual_start_dates[0]
+            accrual_factorsPCDToNow[i] = day_count.year_frac(
+                pcd, cds._step_in_date)[0]
+
+            coupons[i] = cds._running_coupon
 
-        # we size the vectors to include time zero
-        self._times = np.array([0.0])
-        self._values = np.array([1.0])
+            t = (cds._payment_dates - self._value_date) / gDaysInYear
+            paymentTimes.append(t[t > 0.0])
+            yearFracs.append(cds._accrual_factors)
 
-        for i in range(0, num_times):
+        paymentTimes, numPayments = stack_ragged(paymentTimes)
+        yearFracs, _ = stack_ragged(yearFracs)
 
-            maturity_date = self._cds_contracts[i]._maturity_date
+        return (times, teffs, accrual_factorsPCDToNow, coupons,
+                paymentTimes, numPayments, yearFracs)
 
-            argtuple = (self,
-                        self._value_date,
-                        self._cds_contracts[i],
-                        self._recovery_rate)
+###############################################################################
+
+    def _set_built_inputs(self, times, teffs, accrual_factorsPCDToNow,
+                          coupons, paymentTimes, numPayments, yearFracs):
+        """ Record the inputs of the last build of the curve. """
+
+        self._built_inputs = (times, teffs, accrual_factorsPCDToNow,
+                              coupons, paymentTimes, numPayments, yearFracs,
+                              self._recovery_rate,
+                              self._libor_curve._times.copy(),
+                              self._libor_curve._dfs.copy())
+
+###############################################################################
+
+    def _first_changed_cds(self, times, teffs, accrual_factorsPCDToNow,
+                           coupons, paymentTimes, numPayments, yearFracs):
+        """ Return the index of the first CDS contract whose spread has
+        changed since the curve was last built. If the Ibor curve, recovery
+        rate, contract dates or premium leg payment dates and accrual factors
+        have changed the curve is rebuilt from the start and if nothing has
+        changed the number of contracts is returned. """
+
+        if self._built_inputs is None:
+            return 0
+
+        oldTimes, oldTeffs, oldAccrual, oldCoupons, oldPaymentTimes, \
+            oldNumPayments, oldYearFracs, oldRecovery, \
+            oldIborTimes, oldIborValues = self._built_inputs
+
+        if len(oldCoupons) != len(coupons) or \
+                oldRecovery != self._recovery_rate or \
+                not np.array_equal(oldTimes, times) or \
+                not np.array_equal(oldTeffs, teffs) or \
+                not np.array_equal(oldAccrual, accrual_factorsPCDToNow) or \
+                not np.array_equal(oldNumPayments, numPayments) or \
+                not np.array_equal(oldPaymentTimes, paymentTimes) or \
+                not np.array_equal(oldYearFracs, yearFracs) or \
+                not np.array_equal(oldIborTimes, self._libor_curve._times) or \
+                not np.array_equal(oldIborValues, self._libor_curve._dfs):
+            return 0
 
-            tmat = (maturity_date - self._value_date) / gDaysInYear
-            q = self._values[i]
+        changed = np.nonzero(oldCoupons != coupons)[0]
 
-            self._times = np.append(self._times, tmat)
-            self._values = np.append(self._values, q)
+        if len(changed) == 0:
+            return len(coupons)
+
+        return changed[0]
+
+###############################################################################
+
+    def _build_curve(self):
+        """ Construct the CDS survival curve from a set of CDS contracts """
+
+        self._validate(self._cds_contracts)
 
-            optimize.newton(f, x0=q, fprime=None, args=argtuple,
-                            tol=1e-7, maxiter=50, fprime2=None)
+        cds_arrays = self._cds_arrays()
+        times, teffs, accrual_factorsPCDToNow, coupons, paymentTimes, \
+            numPayments, yearFracs = cds_arrays
+
+        values = np.ones(len(times))
+
+        converged = _bootstrap_survival_curve(times,
+                                              values,
+                                              0,
+                                              self._libor_curve._times,
+                                              self._libor_curve._dfs,
+                                              teffs,
+                                              accrual_factorsPCDToNow,
+                                              paymentTimes,
+                                              yearFracs,
+                                              numPayments,
+                                              coupons,
+                                              self._recovery_rate,
+                                              glob_num_steps_per_year,
+                                              BOOTSTRAP_TOLERANCE,
+                                              BOOTSTRAP_MAX_ITERATIONS)
+
+        if not converged:
+            raise FinError("CDS curve bootstrap did not converge.")
+
+        self._times = times
+        self._values = values
+        self._set_built_inputs(*cds_arrays)
 
 ###############################################################################
 
@@ -3,7 +3,7 @@
 ##############################################################################
 
 
-from math import pow
+import numpy as np
 
 from ...utils.calendar import CalendarTypes
 from ...utils.calendar import BusDayAdjustTypes, DateGenRuleTypes
@@ -11,6 +11,7 @@ from ...utils.day_count import DayCountTypes
 from ...utils.frequency import FrequencyTypes
 from ...utils.error import FinError
 from ...products.credit.cds import CDS
+from ...products.credit.cds_batch import CDSBatch, stack_issuer_curves
 from ...products.credit.cds_curve import CDSCurve
 from ...utils.helpers import check_argument_types
 from ...utils.helpers import label_to_string
@@ -53,24 +54,13 @@ class CDSIndexPortfolio:
         """ Calculation of the risky PV01 of the CDS portfolio by taking the
         average of the risky PV01s of each contract. """
 
-        num_credits = len(issuer_curves)
-
-        cds_contract = CDS(step_in_date,
-                           maturity_date,
-                           0.0)
-
-        intrinsic_rpv01 = 0.0
-
-        for m in range(0, num_credits):
-
-            retValue = cds_contract.risky_pv01(value_date,
-                                               issuer_curves[m])
+        cds_contracts = CDSBatch(step_in_date,
+                                 maturity_date,
+                                 0.0)
 
-            cleanRPV01 = retValue['clean_rpv01']
+        retValue = cds_contracts.risky_pv01(value_date, issuer_curves)
 
-            intrinsic_rpv01 += cleanRPV01
-
-        intrinsic_rpv01 /= num_credits
+        intrinsic_rpv01 = np.mean(retValue['clean_rpv01'])
         return (intrinsic_rpv01)
 
     ###########################################################################
@@ -83,23 +73,16 @@ class CDSIndexPortfolio:
         """ Calculation of intrinsic protection leg value of the CDS portfolio
         by taking the average sum the protection legs of each contract. """
 
-        num_credits = len(issuer_curves)
-
-        intrinsic_prot_pv = 0.0
-
-        # All contracts have same flows so only need one object
-        cds_contract = CDS(step_in_date,
-                           maturity_date,
-                           0.0,
-                           1.0)
+        # All contracts have same flows so they are valued together
+        cds_contracts = CDSBatch(step_in_date,
+                                 maturity_date,
+                                 0.0,
+                                 1.0)
 
-        for m in range(0, num_credits):
-            protectionPV = cds_contract.protection_leg_pv(value_date,
-                                                          issuer_curves[m])
+        protectionPVs = cds_contracts.protection_leg_pv(value_date,
+                                                        issuer_curves)
 
-            intrinsic_prot_pv += protectionPV
-
-        intrinsic_prot_pv /= num_credits
+        intrinsic_prot_pv = np.mean(protectionPVs)
         return intrinsic_prot_pv
 
     ###########################################################################
@@ -136,19 +119,13 @@ class CDSIndexPortfolio:
                        issuer_curves):
         """ Calculates the average par CDS spread of the CDS portfolio. """
 
-        num_credits = len(issuer_curves)
-
-        cds_contract = CDS(step_in_date,
-                           maturity_date,
-                           0.0)
+        cds_contracts = CDSBatch(step_in_date,
+                                 maturity_date,
+                                 0.0)
 
-        average_spread = 0.0
+        spreads = cds_contracts.par_spread(value_date, issuer_curves)
 
-        for m in range(0, num_credits):
-            spread = cds_contract.par_spread(value_date, issuer_curves[m])
-            average_spread += spread
-
-        average_spread /= num_credits
+        average_spread = np.mean(spreads)
         return average_spread
 
     ###########################################################################
@@ -161,18 +138,13 @@ class CDSIndexPortfolio:
         """ Calculates the total CDS spread of the CDS portfolio by summing
         over all of the issuers and adding the spread with no weights. """
 
-        num_credits = len(issuer_curves)
+        cds_contracts = CDSBatch(step_in_date,
+                                 maturity_date,
+                                 0.0)
 
-        cds_contract = CDS(step_in_date,
-                           maturity_date,
-                           0.0)
-
-        totalSpread = 0.0
-
-        for m in range(0, num_credits):
-            spread = cds_contract.par_spread(value_date, issuer_curves[m])
-            totalSpread += spread
+        spreads = cds_contracts.par_spread(value_date, issuer_curves)
 
+        totalSpread = np.sum(spreads)
         return totalSpread
 
     ###########################################################################
@@ -192,17 +164,13 @@ class CDSIndexPortfolio:
                 "Number of credits in index must be > 1 and not"
                 + str(num_credits))
 
-        cds_contract = CDS(step_in_date,
-                           maturity_date,
-                           0.0)
+        cds_contracts = CDSBatch(step_in_date,
+                                 maturity_date,
+                                 0.0)
 
-        min_spread = cds_contract.par_spread(value_date, issuer_curves[0])
-
-        for m in range(1, num_credits):
-            spread = cds_contract.par_spread(value_date, issuer_curves[m])
-            if spread < min_spread:
-                min_spread = spread
+        spreads = cds_contracts.par_spread(value_date, issuer_curves)
 
+        min_spread = np.min(spreads)
         return min_spread
 
     ###########################################################################
@@ -222,17 +190,13 @@ class CDSIndexPortfolio:
                 "Number of credits in index must be > 1 and not "
                 + str(num_credits))
 
-        cds_contract = CDS(step_in_date,
-                           maturity_date,
-                           0.0)
-
-        max_spread = cds_contract.par_spread(value_date, issuer_curves[0])
+        cds_contracts = CDSBatch(step_in_date,
+                                 maturity_date,
+                                 0.0)
 
-        for m in range(1, num_credits):
-            spread = cds_contract.par_spread(value_date, issuer_curves[m])
-            if spread > max_spread:
-                max_spread = spread
+        spreads = cds_contracts.par_spread(value_date, issuer_curves)
 
+        max_spread = np.max(spreads)
         return max_spread
 
     ###########################################################################
@@ -311,12 +275,11 @@ class CDSIndexPortfolio:
                 if numIterations > 20:
                     raise FinError("Num iterations > 20.")
 
-                sumRPV01 = 0.0
-                sumProt = 0.0
-
                 # This is for the specific index maturity date
                 indexMaturityDate = index_maturity_dates[i_maturity]
-                cdsIndex = CDS(value_date, indexMaturityDate, 0.0, 1.0)
+                cdsIndex = CDSBatch(value_date, indexMaturityDate, 0.0, 1.0)
+
+                adjustedIssuerCurves = []
 
                 for i_credit in range(0, num_credits):
 
@@ -336,18 +299,14 @@ class CDSIndexPortfolio:
                                                    libor_curve,
                                                    recovery_rate)
 
-                    indexProtectionPV = cdsIndex.protection_leg_pv(value_date,
-                                                                   adjustedIssuerCurve,
-                                                                   indexRecoveryRate)
-
-                    cleanRPV01 = cdsIndex.risky_pv01(value_date,
-                                                     adjustedIssuerCurve)['clean_rpv01']
+                    adjustedIssuerCurves.append(adjustedIssuerCurve)
 
-                    sumRPV01 += cleanRPV01
-                    sumProt += indexProtectionPV
+                # The index legs of all of the credits are valued together
+                _, cleanRPV01s, unitProtPVs = \
+                    cdsIndex._legs(value_date, adjustedIssuerCurves)
 
-                sumRPV01 /= num_credits
-                sumProt /= num_credits
+                sumRPV01 = np.mean(cleanRPV01s)
+                sumProt = np.mean(unitProtPVs) * (1.0 - indexRecoveryRate)
 
                 sumPrem = sumRPV01 * index_cpns[i_maturity]
 
@@ -435,6 +394,11 @@ class CDSIndexPortfolio:
             adjusted_issuer_curve._values = issuer_curve._values.copy()
             adjusted_issuer_curves.append(adjusted_issuer_curve)
 
+        # The survival probabilities of all of the credits are adjusted
+        # together as the rows of a matrix
+        _, surv_times, surv_values, num_points = \
+            stack_issuer_curves(adjusted_issuer_curves)
+
         # We solve for each maturity point
         for i_maturity in range(0, num_index_maturity_points):
 
@@ -442,6 +406,15 @@ class CDSIndexPortfolio:
             ratio = 1.0 + 2.0 * tolerance
             numIterations = 0
 
+            index_maturity_date = index_maturity_dates[i_maturity]
+
+            # the CDS spreads we extract here
+            # should be to the index maturity dates
+            cdsIndex = CDSBatch(value_date,
+                                index_maturity_date,
+                                0.0,
+                                1.0)
+
             while abs(ratio - 1.0) > tolerance:
 
                 numIterations += 1
@@ -449,46 +422,21 @@ class CDSIndexPortfolio:
                 if numIterations > maxIterations:
                     raise FinError("Max Iterations exceeded")
 
-                sumRPV01 = 0.0
-                sumProt = 0.0
-
-                for i_credit in range(0, num_credits):
-
-                    q1 = adjusted_issuer_curves[i_credit]._values[i_maturity]
-                    q2 = adjusted_issuer_curves[i_credit]._values[i_maturity + 1]
-                    q12 = q2 / q1
+                q1 = surv_values[:, i_maturity]
+                q2 = surv_values[:, i_maturity + 1]
+                q12 = q2 / q1
 
-                    q12NEW = pow(q12, ratio)
-                    q2NEW = q1 * q12NEW
+                q12NEW = np.power(q12, ratio)
+                q2NEW = q1 * q12NEW
 
-                    adjusted_issuer_curves[i_credit]._values[i_maturity + 1] = q2NEW
+                surv_values[:, i_maturity + 1] = q2NEW
 
-#                    if i_maturity == 0 and index_cpns[0] == 0.006:
-#                        print(i_credit, q1, q2NEW)
+                _, cleanRPV01s, unitProtPVs = \
+                    cdsIndex._unit_legs(value_date, libor_curve, surv_times,
+                                        surv_values, num_points)
 
-                    index_maturity_date = index_maturity_dates[i_maturity]
-
-                    # the CDS spreads we extract here
-                    # should be to the index maturity dates
-                    cdsIndex = CDS(value_date,
-                                   index_maturity_date,
-                                   0,
-                                   1.0)
-
-                    indexProtPV = cdsIndex.protection_leg_pv(value_date,
-                                                             adjusted_issuer_curves[i_credit],
-                                                             index_recovery_rate)
-
-                    rpv01Ret = cdsIndex.risky_pv01(value_date,
-                                                   adjusted_issuer_curves[i_credit])
-
-                    cleanRPV01 = rpv01Ret['clean_rpv01']
-
-                    sumRPV01 += cleanRPV01
-                    sumProt += indexProtPV
-
-                sumRPV01 /= num_credits
-                sumProt /= num_credits
+                sumRPV01 = np.mean(cleanRPV01s)
+                sumProt = np.mean(unitProtPVs) * (1.0 - index_recovery_rate)
 
                 spd = sumProt / sumRPV01
 
@@ -503,6 +451,11 @@ class CDSIndexPortfolio:
 #                print("Maturity:", i_maturity, "Num:", numerator, "Den:", denominator, "Ratio:", ratio, "Alpha:", alpha)
 #           print("")
 
+        for i_credit in range(0, num_credits):
+            n = num_points[i_credit]
+            adjusted_issuer_curves[i_credit]._values = \
+                surv_values[i_credit, 0:n].copy()
+
         return adjusted_issuer_curves
 
     ###########################################################################
@@ -5,12 +5,9 @@
 # TODO: Add __repr__ method
 
 import numpy as np
-from math import sqrt
 
-from ...models.gauss_copula_onefactor import tranch_surv_prob_gaussian
-from ...models.gauss_copula_onefactor import tranche_surv_prob_adj_binomial
-from ...models.gauss_copula_onefactor import tranche_surv_prob_recursion
-from ...models.gauss_copula_lhp import tr_surv_prob_lhp
+from ...models.loss_dbn_cache import LossDbnCache
+from ...models.loss_dbn_cache import FinLossDistributionBuilder
 
 from ...utils.day_count import DayCountTypes
 from ...utils.frequency import FrequencyTypes
@@ -30,18 +27,6 @@ from ...utils.date import Date
 
 ###############################################################################
 
-from enum import Enum
-
-
-class FinLossDistributionBuilder(Enum):
-    RECURSION = 1
-    ADJUSTED_BINOMIAL = 2
-    GAUSSIAN = 3
-    LHP = 4
-
-
-###############################################################################
-
 
 class CDSTranche:
 
@@ -101,7 +86,13 @@ class CDSTranche:
                  corr1,
                  corr2,
                  num_points=50,
-                 model=FinLossDistributionBuilder.RECURSION):
+                 model=FinLossDistributionBuilder.RECURSION,
+                 loss_dbn_cache: LossDbnCache = None):
+        """ Value the tranche using the base correlation approach in which the
+        base tranches at the attachment point k1 and detachment point k2 have
+        correlations corr1 and corr2. The portfolio loss distributions can be
+        shared with the valuations of other tranches on the same portfolio by
+        passing in the same loss distribution cache. """
 
         num_credits = len(issuer_curves)
         k1 = self._k1
@@ -122,97 +113,47 @@ class CDSTranche:
         if k1 > k2:
             raise FinError("K1 > K2")
 
-        kappa = k2 / (k2 - k1)
+        if loss_dbn_cache is None:
+            loss_dbn_cache = LossDbnCache()
 
-        recovery_rates = np.zeros(num_credits)
+        kappa = k2 / (k2 - k1)
 
         payment_dates = self._cds_contract._payment_dates
         num_payments = len(payment_dates)
         num_times = num_payments + 1
 
-        beta1 = sqrt(corr1)
-        beta2 = sqrt(corr2)
-        beta_vector1 = np.zeros(num_credits)
-        for bb in range(0, num_credits):
-            beta_vector1[bb] = beta1
-
-        beta_vector2 = np.zeros(num_credits)
-        for bb in range(0, num_credits):
-            beta_vector2[bb] = beta2
-
-        qVector = np.zeros(num_credits)
-        qt1 = np.zeros(num_times)  # include 1.0
-        qt2 = np.zeros(num_times)  # include 1.0
-
         trancheTimes = np.zeros(num_times)
         trancheSurvivalCurve = np.zeros(num_times)
 
         trancheTimes[0] = 0
         trancheSurvivalCurve[0] = 1.0
-        qt1[0] = 1.0
-        qt2[0] = 1.0
 
         for i in range(1, num_times):
+            trancheTimes[i] = (payment_dates[i-1] - value_date) / gDaysInYear
 
-            t = (payment_dates[i-1] - value_date) / gDaysInYear
-
-            for j in range(0, num_credits):
-
-                issuer_curve = issuer_curves[j]
-                vTimes = issuer_curve._times
-                qRow = issuer_curve._values
-                recovery_rates[j] = issuer_curve._recovery_rate
-                qVector[j] = interpolate(
-                    t, vTimes, qRow, InterpTypes.FLAT_FWD_RATES.value)
-
-            if model == FinLossDistributionBuilder.RECURSION:
-
-                qt1[i] = tranche_surv_prob_recursion(
-                    0.0, k1, num_credits, qVector, recovery_rates,
-                    beta_vector1, num_points)
-                qt2[i] = tranche_surv_prob_recursion(
-                    0.0, k2, num_credits, qVector, recovery_rates,
-                    beta_vector2, num_points)
-
-            elif model == FinLossDistributionBuilder.ADJUSTED_BINOMIAL:
-
-                qt1[i] = tranche_surv_prob_adj_binomial(
-                    0.0, k1, num_credits, qVector, recovery_rates,
-                    beta_vector1, num_points)
-                qt2[i] = tranche_surv_prob_adj_binomial(
-                    0.0, k2, num_credits, qVector, recovery_rates,
-                    beta_vector2, num_points)
-
-            elif model == FinLossDistributionBuilder.GAUSSIAN:
-
-                qt1[i] = tranch_surv_prob_gaussian(
-                    0.0,
-                    k1,
-                    num_credits,
-                    qVector,
-                    recovery_rates,
-                    beta_vector1,
-                    num_points)
-                qt2[i] = tranch_surv_prob_gaussian(
-                    0.0,
-                    k2,
-                    num_credits,
-                    qVector,
-                    recovery_rates,
-                    beta_vector2,
-                    num_points)
-
-            elif model == FinLossDistributionBuilder.LHP:
-
-                qt1[i] = tr_surv_prob_lhp(
-                    0.0, k1, num_credits, qVector, recovery_rates, beta1)
-
-                qt2[i] = tr_surv_prob_lhp(
-                    0.0, k2, num_credits, qVector, recovery_rates, beta2)
-
-            else:
-                raise FinError(
-                    "Unknown model type only full and AdjBinomial allowed")
+        # The survival probability of each credit at each payment date
+        recovery_rates = np.zeros(num_credits)
+        qMatrix = np.zeros((num_payments, num_credits))
+
+        for j in range(0, num_credits):
+            issuer_curve = issuer_curves[j]
+            recovery_rates[j] = issuer_curve._recovery_rate
+            qMatrix[:, j] = interpolate(trancheTimes[1:],
+                                        issuer_curve._times,
+                                        issuer_curve._values,
+                                        InterpTypes.FLAT_FWD_RATES.value)
+
+        qt = loss_dbn_cache.base_tranche_surv_probs(qMatrix,
+                                                    recovery_rates,
+                                                    [k1, k2],
+                                                    [corr1, corr2],
+                                                    num_points,
+                                                    model)
+
+        qt1 = np.concatenate(([1.0], qt[:, 0]))
+        qt2 = np.concatenate(([1.0], qt[:, 1]))
+
+        for i in range(1, num_times):
 
             if qt1[i] > qt1[i - 1]:
                 raise FinError(
@@ -223,7 +164,6 @@ class CDSTranche:
                     "Tranche K2 survival probabilities not decreasing.")
 
             trancheSurvivalCurve[i] = kappa * qt2[i] + (1.0 - kappa) * qt1[i]
-            trancheTimes[i] = t
 
         curveRecovery = 0.0  # For tranches only
         libor_curve = issuer_curves[0]._libor_curve
@@ -14,6 +14,8 @@ from ...market.curves.discount_curve import DiscountCurve
 from ...products.equity.equity_option import EquityOption
 # from ...models.black_scholes_analytic import baw_value
 from ...models.model import Model
+from ...models.black_scholes import BlackScholes
+from ...models.black_scholes_pde import black_scholes_pde
 
 ###############################################################################
 # TODO: Implement some analytical approximations
@@ -97,6 +99,39 @@ class EquityAmericanOption(EquityOption):
         else:
             return v[0]
 
+###############################################################################
+
+    def value_pde(self,
+                  value_date: Date,
+                  stock_price: float,
+                  discount_curve: DiscountCurve,
+                  dividend_curve: DiscountCurve,
+                  model: Model,
+                  num_samples: int = 400,
+                  num_time_steps: int = 200):
+        """ Value the option by solving the Black-Scholes PDE with the early
+        exercise condition applied after every time step. Returns a dictionary
+        with the value, delta, gamma and theta taken from the grid. """
+
+        if value_date > self._expiry_date:
+            raise FinError("Valuation date after expiry date.")
+
+        if isinstance(model, BlackScholes) is False:
+            raise FinError("Model must be BlackScholes for PDE valuation.")
+
+        t_exp = (self._expiry_date - value_date) / gDaysInYear
+        t_exp = max(t_exp, 1e-10)
+
+        r = discount_curve.cc_rate(self._expiry_date)
+        q = dividend_curve.cc_rate(self._expiry_date)
+
+        v = black_scholes_pde(stock_price, t_exp, self._strike_price, r, q,
+                              model._volatility, self._option_type.value,
+                              num_samples=num_samples,
+                              num_time_steps=num_time_steps)
+
+        return {key: value[0] * self._num_options for key, value in v.items()}
+
 ###############################################################################
 
     def __repr__(self):
@@ -5,6 +5,8 @@
 import numpy as np
 
 from ...models.equity_barrier_models import value_bs
+from ...models.black_scholes_pde import black_scholes_pde
+from ...models.black_scholes import BlackScholes
 from ...market.curves.discount_curve import DiscountCurve
 from ...products.equity.equity_option import EquityOption
 from ...models.process_simulator import FinProcessSimulator
@@ -12,6 +14,7 @@ from ...models.process_simulator import FinProcessSimulator
 from ...utils.date import Date
 from ...utils.error import FinError
 from ...utils.global_types import EquityBarrierTypes
+from ...utils.global_types import OptionTypes
 from ...utils.helpers import label_to_string, check_argument_types
 from ...utils.global_vars import gDaysInYear
 
@@ -111,6 +114,92 @@ class EquityBarrierOption(EquityOption):
         else:
             return np.array(values)
 
+###############################################################################
+
+    def value_pde(self,
+                  value_date: Date,
+                  stock_price: float,
+                  discount_curve: DiscountCurve,
+                  dividend_curve: DiscountCurve,
+                  model,
+                  num_samples: int = 400,
+                  num_time_steps: int = 200):
+        """ Value the barrier option by solving the Black-Scholes PDE on a grid
+        that ends at the barrier, where the option is knocked out. As in the
+        analytical valuation, the barrier is shifted using the correction of
+        Broadie, Glasserman and Kou to allow for the number of observations
+        per year. Knock-in options are valued as the vanilla option less the
+        knock-out option. Returns a dictionary with the value, delta, gamma
+        and theta taken from the grid. """
+
+        if isinstance(value_date, Date) is False:
+            raise FinError("Valuation date is not a Date")
+
+        if value_date > self._expiry_date:
+            raise FinError("Valuation date after expiry date.")
+
+        if isinstance(model, BlackScholes) is False:
+            raise FinError("Model must be BlackScholes for PDE valuation.")
+
+        t_exp = (self._expiry_date - value_date) / gDaysInYear
+        t_exp = max(t_exp, 1e-10)
+
+        r = discount_curve.cc_rate(self._expiry_date)
+        q = dividend_curve.cc_rate(self._expiry_date)
+        v = model._volatility
+
+        option_type = self._option_type
+
+        if option_type in (EquityBarrierTypes.DOWN_AND_OUT_CALL,
+                           EquityBarrierTypes.DOWN_AND_IN_CALL,
+                           EquityBarrierTypes.UP_AND_OUT_CALL,
+                           EquityBarrierTypes.UP_AND_IN_CALL):
+            vanilla_type = OptionTypes.EUROPEAN_CALL
+        else:
+            vanilla_type = OptionTypes.EUROPEAN_PUT
+
+        is_down = option_type in (EquityBarrierTypes.DOWN_AND_OUT_CALL,
+                                  EquityBarrierTypes.DOWN_AND_IN_CALL,
+                                  EquityBarrierTypes.DOWN_AND_OUT_PUT,
+                                  EquityBarrierTypes.DOWN_AND_IN_PUT)
+
+        is_knock_in = option_type in (EquityBarrierTypes.DOWN_AND_IN_CALL,
+                                      EquityBarrierTypes.UP_AND_IN_CALL,
+                                      EquityBarrierTypes.DOWN_AND_IN_PUT,
+                                      EquityBarrierTypes.UP_AND_IN_PUT)
+
+        # Correction by Broadie, Glasserman and Kou, Mathematical Finance, 1997
+        num_observations = 1 + t_exp * self._num_obs_per_year
+        shift = 0.5826 * v * np.sqrt(t_exp / num_observations)
+
+        if is_down:
+            h = self._barrier_level * np.exp(-shift)
+            knocked_out = stock_price <= h
+        else:
+            h = self._barrier_level * np.exp(shift)
+            knocked_out = stock_price >= h
+
+        if knocked_out:
+            out = {'value': 0.0, 'delta': 0.0, 'gamma': 0.0, 'theta': 0.0}
+        else:
+            out = black_scholes_pde(stock_price, t_exp, self._strike_price,
+                                    r, q, v, vanilla_type.value,
+                                    lower_barrier=h if is_down else None,
+                                    upper_barrier=None if is_down else h,
+                                    num_samples=num_samples,
+                                    num_time_steps=num_time_steps)
+            out = {key: value[0] for key, value in out.items()}
+
+        if is_knock_in:
+            vanilla = black_scholes_pde(stock_price, t_exp,
+                                        self._strike_price, r, q, v,
+                                        vanilla_type.value,
+                                        num_samples=num_samples,
+                                        num_time_steps=num_time_steps)
+            out = {key: vanilla[key][0] - out[key] for key in out}
+
+        return {key: value * self._notional for key, value in out.items()}
+
 ###############################################################################
 
     def value_mc(self,
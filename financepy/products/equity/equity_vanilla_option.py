@@ -24,6 +24,7 @@ from ...models.black_scholes_analytic import bs_vanna
 from ...models.black_scholes_analytic import bs_theta
 from ...models.black_scholes_analytic import bs_implied_volatility
 from ...models.black_scholes_analytic import bs_intrinsic
+from ...models.black_scholes_pde import black_scholes_pde
 
 from ...models.black_scholes_mc import _value_mc_nonumba_nonumpy
 from ...models.black_scholes_mc import _value_mc_numpy_numba
@@ -706,6 +707,47 @@ class EquityVanillaOption():
 
         return v
 
+###############################################################################
+
+    def value_pde(self,
+                  value_date: Date,
+                  stock_price: float,
+                  discount_curve: DiscountCurve,
+                  dividend_curve: DiscountCurve,
+                  model: Model,
+                  num_samples: int = 400,
+                  num_time_steps: int = 200):
+        """ Value European style call or put options by solving the Black-
+        Scholes PDE on a grid concentrated around the spot and strikes. If the
+        strike is a vector, the whole strike ladder is valued in one pass over
+        the time steps. Returns a dictionary with the value, delta, gamma and
+        theta taken from the grid. """
+
+        if isinstance(self._expiry_date, Date) is False:
+            raise FinError("PDE valuation needs a single expiry date.")
+
+        if value_date > self._expiry_date:
+            raise FinError("Valuation date after expiry date.")
+
+        if isinstance(model, BlackScholes) is False:
+            raise FinError("Unknown Model Type")
+
+        t_exp = (self._expiry_date - value_date) / gDaysInYear
+        t_exp = max(t_exp, 1e-10)
+
+        df = discount_curve.df(self._expiry_date)
+        r = -np.log(df)/t_exp
+
+        dq = dividend_curve.df(self._expiry_date)
+        q = -np.log(dq)/t_exp
+
+        v = black_scholes_pde(stock_price, t_exp, self._strike_price, r, q,
+                              model._volatility, self._option_type_value,
+                              num_samples=num_samples,
+                              num_time_steps=num_time_steps)
+
+        return {key: value * self._num_options for key, value in v.items()}
+
 ###############################################################################
 
     def __repr__(self):
@@ -84,6 +84,8 @@ class IborBermudanSwaption:
         self._fwd_swap_rate = None
         self._forward_df = None
         self._underlying_swap = None
+        self._underlying_swap_terms = None
+        self._swap_flows = None
         self._cpn_times = None
         self._cpn_flows = None
 
@@ -97,56 +99,8 @@ class IborBermudanSwaption:
         discount curve. The choices of model are the Hull-White model, the
         Black-Karasinski model and the Black-Derman-Toy model. """
 
-        float_spread = 0.0
-
-        # The underlying is a swap in which we pay the fixed amount
-        self._underlying_swap = IborSwap(self._exercise_date,
-                                         self._maturity_date,
-                                         self._fixed_leg_type,
-                                         self._fixed_coupon,
-                                         self._fixed_freq_type,
-                                         self._fixed_dc_type,
-                                         self._notional,
-                                         float_spread,
-                                         self._float_freq_type,
-                                         self._float_dc_type,
-                                         self._cal_type,
-                                         self._bd_adjust_type,
-                                         self._dg_rule_type)
-
-        #  I need to do this to generate the fixed leg flows
-        self._pv01 = self._underlying_swap.pv01(value_date, discount_curve)
-
-        t_exp = (self._exercise_date - value_date) / gDaysInYear
-        tmat = (self._maturity_date - value_date) / gDaysInYear
-
-        #######################################################################
-        # For the tree models we need to generate a vector of the coupons
-        #######################################################################
-
-        cpn_times = [t_exp]
-        cpn_flows = [0.0]
-
-        # The first flow is the expiry date
-        num_flows = len(self._underlying_swap._fixed_leg._payment_dates)
-
-        swap = self._underlying_swap
-
-        for iFlow in range(0, num_flows):
-
-            flow_date = self._underlying_swap._fixed_leg._payment_dates[iFlow]
-
-            if flow_date > self._exercise_date:
-                cpn_time = (flow_date - value_date) / gDaysInYear
-                cpn_flow = swap._fixed_leg._payments[iFlow-1] / self._notional
-                cpn_times.append(cpn_time)
-                cpn_flows.append(cpn_flow)
-
-        cpn_times = np.array(cpn_times)
-        cpn_flows = np.array(cpn_flows)
-
-        self._cpn_times = cpn_times
-        self._cpn_flows = cpn_flows
+        t_exp, tmat, cpn_times, cpn_flows = \
+            self._tree_flows(value_date, discount_curve)
 
         # Allow exercise on coupon dates but control this later for europeans
         self._call_times = cpn_times
@@ -184,6 +138,103 @@ class IborBermudanSwaption:
 
         return v
 
+###############################################################################
+
+    def _swap_terms(self):
+        """ Return the terms of the swaption which define its underlying
+        swap. """
+
+        return (self._exercise_date._excel_date,
+                self._maturity_date._excel_date,
+                self._fixed_leg_type,
+                self._fixed_coupon,
+                self._fixed_freq_type,
+                self._fixed_dc_type,
+                self._notional,
+                self._float_freq_type,
+                self._float_dc_type,
+                self._cal_type,
+                self._bd_adjust_type,
+                self._dg_rule_type)
+
+###############################################################################
+
+    def _swap(self):
+        """ Return the underlying swap which starts on the exercise date and
+        the payment dates and fixed leg flows per unit notional after the
+        exercise date. These only depend on the terms of the swaption so they
+        are built on the first valuation and then reused until the terms
+        change. """
+
+        terms = self._swap_terms()
+
+        if self._underlying_swap is not None and \
+                self._underlying_swap_terms == terms:
+            return self._underlying_swap, self._swap_flows
+
+        float_spread = 0.0
+
+        # The underlying is a swap in which we pay the fixed amount
+        swap = IborSwap(self._exercise_date,
+                        self._maturity_date,
+                        self._fixed_leg_type,
+                        self._fixed_coupon,
+                        self._fixed_freq_type,
+                        self._fixed_dc_type,
+                        self._notional,
+                        float_spread,
+                        self._float_freq_type,
+                        self._float_dc_type,
+                        self._cal_type,
+                        self._bd_adjust_type,
+                        self._dg_rule_type)
+
+        fixed_leg = swap._fixed_leg
+        payment_serials = fixed_leg._payment_dates.serials()
+        after_exercise = payment_serials > int(self._exercise_date._excel_date)
+
+        # Each payment date takes the fixed leg payment before it
+        payments = np.array(fixed_leg._payments) / self._notional
+        flows = np.roll(payments, 1)
+
+        self._underlying_swap = swap
+        self._underlying_swap_terms = terms
+        self._swap_flows = (payment_serials[after_exercise],
+                            flows[after_exercise])
+
+        return self._underlying_swap, self._swap_flows
+
+###############################################################################
+
+    def _tree_flows(self,
+                    value_date,
+                    discount_curve):
+        """ Return the expiry and maturity times and the vectors of coupon
+        times and fixed leg flows of the underlying swap used to value the
+        swaption on a tree. """
+
+        swap, (flow_serials, flows) = self._swap()
+
+        self._pv01 = swap.pv01(value_date, discount_curve)
+
+        t_exp = (self._exercise_date - value_date) / gDaysInYear
+        tmat = (self._maturity_date - value_date) / gDaysInYear
+
+        #######################################################################
+        # For the tree models we need to generate a vector of the coupons
+        #######################################################################
+
+        # The first flow is the expiry date
+        flow_times = (flow_serials - value_date._excel_date) / gDaysInYear
+
+        cpn_times = np.append(t_exp, flow_times)
+        cpn_flows = np.append(0.0, flows)
+
+        self._cpn_times = cpn_times
+        self._cpn_flows = cpn_flows
+
+        return t_exp, tmat, cpn_times, cpn_flows
+
 ###############################################################################
 
     def print_swaption_value(self):
@@ -222,3 +273,69 @@ class IborBermudanSwaption:
         print(self)
 
 ###############################################################################
+
+
+def value_bermudan_swaptions(swaptions: list,
+                             value_date: Date,
+                             discount_curve,
+                             model):
+    """ Value a list of Bermudan swaptions with the Hull-White, Black-Karasinski
+    or Black-Derman-Toy model. The swaptions are grouped by the maturity of
+    their underlying swap. For each group the tree is built once out to that
+    maturity and all of the swaptions in the group are valued in a single
+    backward induction through it. As this is the tree built by the value
+    function, each swaption has the same value as that returned by its value
+    function. """
+
+    if len(swaptions) == 0:
+        raise FinError("No swaptions to value.")
+
+    if not isinstance(model, (BDTTree, BKTree, HWTree)):
+        raise FinError("Invalid model choice for Bermudan Swaption")
+
+    groups = {}
+
+    for i, swaption in enumerate(swaptions):
+
+        t_exp, tmat, cpn_times, cpn_flows = \
+            swaption._tree_flows(value_date, discount_curve)
+
+        swaption._call_times = cpn_times
+
+        if tmat not in groups:
+            groups[tmat] = []
+
+        groups[tmat].append((i, t_exp, cpn_times, cpn_flows))
+
+    values = np.zeros(len(swaptions))
+
+    for tmat, trades in groups.items():
+
+        num_trades = len(trades)
+
+        # Floating leg is assumed to price at par
+        strike_prices = np.ones(num_trades)
+        face_amounts = np.ones(num_trades)
+
+        model.build_tree(tmat, discount_curve._times, discount_curve._dfs)
+
+        v = model.bermudan_swaption_portfolio(
+            np.array([t[1] for t in trades]),
+            strike_prices,
+            face_amounts,
+            [t[2] for t in trades],
+            [t[3] for t in trades],
+            [swaptions[t[0]]._exercise_type for t in trades])
+
+        for k, trade in enumerate(trades):
+
+            swaption = swaptions[trade[0]]
+
+            if swaption._fixed_leg_type == SwapTypes.RECEIVE:
+                values[trade[0]] = swaption._notional * v['rec'][k]
+            elif swaption._fixed_leg_type == SwapTypes.PAY:
+                values[trade[0]] = swaption._notional * v['pay'][k]
+
+    return values
+
+###############################################################################
@@ -0,0 +1,83 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+
+###############################################################################
+# The Ibor single curve, the OIS curve and the Ibor dual curve are all built
+# by refitting deposits, FRAs and swaps. The functions below find the risk of
+# these curves to the market quotes of their calibration instruments. They use
+# the instruments in _usedDeposits, _usedFRAs and _usedSwaps and the Jacobian
+# of the calibration residuals returned by _calibration_residuals.
+###############################################################################
+
+
+def calibration_quote_derivatives(curve,
+                                  discount_curve):
+    """ Return the derivative of each calibration residual of the curve with
+    respect to the market quote of its instrument. These are the deposit
+    rates, the FRA rates and the swap fixed coupons. The FRAs and swaps are
+    discounted on the discount curve, which is the curve itself unless it is
+    an index curve of a dual curve setup. """
+
+    value_date = curve._value_date
+    derivatives = []
+
+    for depo in curve._usedDeposits:
+        dv_dq = depo.quote_sensitivity(value_date, curve)
+        derivatives.append(dv_dq / depo._notional)
+
+    for fra in curve._usedFRAs:
+        dv_dq = fra.quote_sensitivity(value_date, discount_curve, curve)
+        derivatives.append(dv_dq / fra._notional)
+
+    for swap in curve._usedSwaps:
+        dv_dq = swap.quote_sensitivity(value_date, discount_curve)
+        derivatives.append(dv_dq / swap._fixed_leg._notional)
+
+    return np.array(derivatives)
+
+###############################################################################
+
+
+def quote_jacobian(curve,
+                   discount_curve):
+    """ Return the matrix of derivatives of the discount factors at the curve
+    nodes with respect to the market quotes used to build the curve. There is
+    one row per node and one column per market instrument with the deposits
+    first, then the FRAs and then the swaps. When the curve builder has added
+    a synthetic deposit from the value date to the start of the first deposit
+    its rate is the quote of the first deposit and so its column is added to
+    that of the first deposit. The columns then map one to one onto the
+    instruments passed in by the user. """
+
+    curve._interpolator.fit(curve._times, curve._dfs)
+    (_, residual_jacobian) = curve._calibration_residuals()
+    quote_derivatives = calibration_quote_derivatives(curve, discount_curve)
+    jac = curve._quote_jacobian(residual_jacobian, quote_derivatives)
+
+    if curve._synthetic_deposit is True:
+        jac[:, 1] += jac[:, 0]
+        jac = jac[:, 1:]
+
+    return jac
+
+###############################################################################
+
+
+def bucketed_dv01(curve,
+                  discount_curve,
+                  sensitivities: list):
+    """ Return the change in value of a set of trades for a one basis point
+    increase in each of the market quotes used to build the curve. Each
+    element of the list is the list of sensitivities returned by the
+    df_sensitivities function of a product. This returns a matrix with one
+    row per trade and one column per market instrument. The whole book is
+    risked with one matrix product rather than by rebuilding the curve once
+    for each bumped quote. """
+
+    node_sens = curve.node_sensitivities(sensitivities)
+    return np.dot(node_sens, quote_jacobian(curve, discount_curve)) * 0.0001
+
+###############################################################################
@@ -8,6 +8,10 @@
 
 from typing import Optional
 
+import numpy as np
+from numba import njit
+from scipy.stats import norm
+
 from ...utils.date import Date
 from ...utils.calendar import Calendar
 from ...utils.calendar import CalendarTypes
@@ -15,16 +19,16 @@ from ...utils.calendar import DateGenRuleTypes
 from ...utils.calendar import BusDayAdjustTypes
 from ...utils.day_count import DayCount, DayCountTypes
 from ...utils.frequency import FrequencyTypes
-from ...utils.global_vars import gDaysInYear
-from ...utils.math import ONE_MILLION
+from ...utils.global_vars import gDaysInYear, gSmall
+from ...utils.math import ONE_MILLION, n_vect
 from ...utils.error import FinError
 from ...utils.schedule import Schedule
 from ...utils.helpers import label_to_string, check_argument_types
-from ...models.black import Black
+from ...models.black import Black, BlackTypes
 from ...models.black_shifted import BlackShifted
 from ...models.bachelier import Bachelier
-from ...models.sabr import SABR
-from ...models.sabr_shifted import SABRShifted
+from ...models.sabr import SABR, vol_function_sabr
+from ...models.sabr_shifted import SABRShifted, vol_function_shifted_sabr
 from ...models.hw_tree import HWTree
 from ...utils.global_types import FinCapFloorTypes, OptionTypes
 
@@ -41,6 +45,117 @@ class IborCapFloorModelTypes(Enum):
 ##########################################################################
 
 
+@njit(cache=True, fastmath=True)
+def _sabr_vols(params, fwds, strikes, t_exps, shifted):
+    """ Black volatilities of the SABR or shifted SABR model with one row per
+    strike and one column per forward rate and expiry time. """
+
+    num_strikes = len(strikes)
+    num_fwds = len(fwds)
+    vols = np.zeros((num_strikes, num_fwds))
+
+    for i_k in range(0, num_strikes):
+        for i_f in range(0, num_fwds):
+            if shifted:
+                vols[i_k, i_f] = vol_function_shifted_sabr(params,
+                                                           fwds[i_f],
+                                                           strikes[i_k],
+                                                           t_exps[i_f])
+            else:
+                vols[i_k, i_f] = vol_function_sabr(params,
+                                                   fwds[i_f],
+                                                   strikes[i_k],
+                                                   t_exps[i_f])
+
+    return vols
+
+##########################################################################
+
+
+def _caplet_option_values(model, fwds, strikes, t_exps, dfs, option_type):
+    """ Value European options on many forward rates at many strikes with one
+    of the analytical models. The result has one row per strike and one
+    column per forward rate. The formulae are those of the value functions of
+    the models applied to the whole grid at once. """
+
+    f = fwds[np.newaxis, :]
+    t = t_exps[np.newaxis, :]
+    df = dfs[np.newaxis, :]
+    k = strikes[:, np.newaxis]
+
+    if isinstance(model, Black):
+
+        if model._implementation_type != BlackTypes.ANALYTICAL:
+            raise FinError("Implementation not available for this product")
+
+        if np.any(fwds <= 0.0):
+            raise FinError("Forward is zero.")
+
+        t_floor = np.maximum(t, gSmall)
+        vol = max(model._volatility, gSmall)
+        sqrt_t = np.sqrt(t_floor)
+        d1 = np.log(f / np.maximum(k, gSmall)) + vol * vol * t_floor / 2.0
+        d1 = d1 / (vol * sqrt_t)
+        d2 = d1 - vol * sqrt_t
+
+        if option_type == OptionTypes.EUROPEAN_CALL:
+            return df * (f * n_vect(d1) - k * n_vect(d2))
+        else:
+            return df * (k * n_vect(-d2) - f * n_vect(-d1))
+
+    elif isinstance(model, BlackShifted):
+
+        s = model._shift
+        vol = model._volatility
+        sqrt_t = np.sqrt(t)
+        d1 = np.log((f + s) / (k + s)) + vol * vol * t / 2
+        d1 = d1 / (vol * sqrt_t)
+        d2 = d1 - vol * sqrt_t
+
+        if option_type == OptionTypes.EUROPEAN_CALL:
+            return df * ((f + s) * n_vect(d1) - (k + s) * n_vect(d2))
+        else:
+            return df * ((k + s) * n_vect(-d2) - (f + s) * n_vect(-d1))
+
+    elif isinstance(model, Bachelier):
+
+        root_t = np.sqrt(t)
+        v = model._volatility
+        d = (f - k) / (v * root_t)
+
+        if option_type == OptionTypes.EUROPEAN_CALL:
+            return df * ((f - k) * norm.cdf(d) + v * root_t * norm.pdf(d))
+        else:
+            return df * ((k - f) * norm.cdf(-d) + v * root_t * norm.pdf(d))
+
+    elif isinstance(model, (SABR, SABRShifted)):
+
+        if isinstance(model, SABR):
+            params = np.array([model._alpha, model._beta, model._rho,
+                               model._nu])
+        else:
+            params = np.array([model._alpha, model._beta, model._rho,
+                               model._nu, model._shift])
+
+        vol = _sabr_vols(params, fwds, strikes, t_exps,
+                         isinstance(model, SABRShifted))
+
+        sqrt_t = np.sqrt(t)
+        d1 = np.log(f / k) + vol * vol * t / 2
+        d1 = d1 / (vol * sqrt_t)
+        d2 = d1 - vol * sqrt_t
+
+        if option_type == OptionTypes.EUROPEAN_CALL:
+            return df * (f * n_vect(d1) - k * n_vect(d2))
+        else:
+            return df * (k * n_vect(-d2) - f * n_vect(-d1))
+
+    else:
+        raise FinError("Unknown model type " + str(model))
+
+##########################################################################
+
+
 class IborCapFloor():
     """ Class for Caps and Floors. These are contracts which observe a Ibor
     reset L on a future start date and then make a payoff at the end of the
@@ -98,10 +213,25 @@ class IborCapFloor():
 
         self._value_date = None
         self._day_counter = None
+        self._capFloorLetDates = []
+        self._dates_terms = None
 
 ###############################################################################
 
     def _generate_dates(self):
+        """ Generate the caplet or floorlet dates. These only depend on the
+        terms of the cap or floor so the schedule is built on the first
+        valuation and reused until the terms change. """
+
+        terms = (self._start_date._excel_date,
+                 self._maturity_date._excel_date,
+                 self._freq_type,
+                 self._cal_type,
+                 self._bd_adjust_type,
+                 self._dg_rule_type)
+
+        if self._dates_terms == terms:
+            return
 
         schedule = Schedule(self._start_date,
                             self._maturity_date,
@@ -111,6 +241,7 @@ class IborCapFloor():
                             self._dg_rule_type)
 
         self._capFloorLetDates = schedule._adjusted_dates
+        self._dates_terms = terms
 
 ##########################################################################
 
@@ -119,89 +250,126 @@ class IborCapFloor():
         the volatility of the Ibor rate to the cap start date. """
 
         self._value_date = value_date
-        self._generate_dates()
 
-        self._day_counter = DayCount(self._dc_type)
-        num_options = len(self._capFloorLetDates)
-        strike_rate = self._strike_rate
+        v = self.caplet_values(value_date, libor_curve, model,
+                               [self._strike_rate])
 
-        if strike_rate < 0.0:
+        self._capFloorLetValues = [0] + v['caplet_values'][0].tolist()
+        self._capFloorLetAlphas = [0] + v['year_fracs'].tolist()
+        self._capFloorLetFwdRates = [0] + v['fwd_rates'].tolist()
+        self._capFloorLetIntrinsic = [0] + v['intrinsic_values'][0].tolist()
+        self._capFloorLetDiscountFactors = [1.00] + v['dfs'].tolist()
+        self._capFloorPV = [0.0] + v['cumulative_values'][0].tolist()
+
+        return v['values'][0]
+
+###############################################################################
+
+    def caplet_values(self, value_date, libor_curve, model,
+                      strike_rates=None):
+        """ Value the cap or floor at each of a vector of strike rates which
+        default to the strike of the contract. The forward rates, year
+        fractions and discount factors of the caplets or floorlets are found
+        once as arrays and the caplets or floorlets of all strikes are valued
+        together. The first has a known payoff. This returns a dictionary of
+        the cap or floor values with one entry per strike and of the caplet
+        or floorlet breakdown with one row per strike and one column per
+        caplet or floorlet. """
+
+        if strike_rates is None:
+            strike_rates = [self._strike_rate]
+
+        strikes = np.array(strike_rates, dtype=np.float64).ravel()
+
+        if np.any(strikes < 0.0):
             raise FinError("Strike < 0.0")
 
+        self._generate_dates()
+        self._day_counter = DayCount(self._dc_type)
+
+        num_options = len(self._capFloorLetDates)
+
         if num_options <= 1:
             raise FinError("Number of options in capfloor equals 1")
 
-        self._capFloorLetValues = [0]
-        self._capFloorLetAlphas = [0]
-        self._capFloorLetFwdRates = [0]
-        self._capFloorLetIntrinsic = [0]
-        self._capFloorLetDiscountFactors = [1.00]
-        self._capFloorPV = [0.0]
+        serials = self._capFloorLetDates.serials()
+        end_serials = serials[1:]
+        start_serials = serials[:-1].copy()
+        start_serials[0] = self._start_date._excel_date
 
-        capFloorValue = 0.0
-        capFloorLetValue = 0.0
-        # Value the first caplet or floorlet with known payoff
+        alphas = self._day_counter.year_frac_array(start_serials,
+                                                   end_serials)[0]
 
-        start_date = self._start_date
-        end_date = self._capFloorLetDates[1]
+        dfs_start = libor_curve.df(start_serials)
+        dfs = libor_curve.df(end_serials)
+        fwd_rates = (dfs_start / dfs - 1.0) / alphas
 
-        if self._last_fixing is None:
-            fwd_rate = libor_curve.fwd_rate(start_date, end_date,
-                                            self._dc_type)
-        else:
-            fwd_rate = self._last_fixing
+        if self._last_fixing is not None:
+            fwd_rates[0] = self._last_fixing
 
-        alpha = self._day_counter.year_frac(start_date, end_date)[0]
-        df = libor_curve.df(end_date)
+        t_exps = (start_serials - self._start_date._excel_date) / gDaysInYear
 
         if self._option_type == FinCapFloorTypes.CAP:
-            capFloorLetValue = df * alpha * max(fwd_rate - strike_rate, 0.0)
+            option_type = OptionTypes.EUROPEAN_CALL
+            payoffs = np.maximum(fwd_rates - strikes[:, np.newaxis], 0.0)
         elif self._option_type == FinCapFloorTypes.FLOOR:
-            capFloorLetValue = df * alpha * max(strike_rate - fwd_rate, 0.0)
+            option_type = OptionTypes.EUROPEAN_PUT
+            payoffs = np.maximum(strikes[:, np.newaxis] - fwd_rates, 0.0)
+
+        intrinsic_values = dfs * alphas * payoffs * self._notional
+
+        # Value the first caplet or floorlet with known payoff
+        caplet_values = intrinsic_values.copy()
 
-        capFloorLetValue *= self._notional
-        capFloorValue += capFloorLetValue
+        if isinstance(model, HWTree):
 
-        self._capFloorLetFwdRates.append(fwd_rate)
-        self._capFloorLetValues.append(capFloorLetValue)
-        self._capFloorLetAlphas.append(alpha)
-        self._capFloorLetIntrinsic.append(capFloorLetValue)
-        self._capFloorLetDiscountFactors.append(df)
-        self._capFloorPV.append(capFloorValue)
+            df_times = libor_curve._times
+            df_values = libor_curve._dfs
 
-        for i in range(2, num_options):
+            for i_k in range(0, len(strikes)):
+                for i in range(1, num_options - 1):
 
-            start_date = self._capFloorLetDates[i - 1]
-            end_date = self._capFloorLetDates[i]
-            alpha = self._day_counter.year_frac(start_date, end_date)[0]
+                    alpha = alphas[i]
+                    tmat = (end_serials[i] - value_date._excel_date) / \
+                        gDaysInYear
+                    strike_price = 1.0/(1.0 + alpha * strikes[i_k])
+                    notionalAdj = (1.0 + strikes[i_k] * alpha)
 
-            df = libor_curve.df(end_date)
-            fwd_rate = libor_curve.fwd_rate(start_date, end_date,
-                                            self._dc_type)
+                    v = model.option_on_zcb(t_exps[i], tmat, strike_price,
+                                            1.0, df_times, df_values)
 
-            if self._option_type == FinCapFloorTypes.CAP:
-                intrinsic_value = df * alpha * max(fwd_rate - strike_rate, 0.0)
-            elif self._option_type == FinCapFloorTypes.FLOOR:
-                intrinsic_value = df * alpha * max(strike_rate - fwd_rate, 0.0)
+                    # we divide by alpha to offset the multiplication below
+                    if self._option_type == FinCapFloorTypes.CAP:
+                        v = v['put'] * notionalAdj / alpha
+                    else:
+                        v = v['call'] * notionalAdj / alpha
+
+                    caplet_values[i_k, i] = v * self._notional * alpha
+
+        else:
 
-            intrinsic_value *= self._notional
+            model_strikes = np.where(strikes == 0.0, 1e-10, strikes)
 
-            capFloorLetValue = self.value_caplet_floor_let(value_date,
-                                                           start_date,
-                                                           end_date,
-                                                           libor_curve,
-                                                           model)
+            option_values = _caplet_option_values(model,
+                                                  fwd_rates[1:],
+                                                  model_strikes,
+                                                  t_exps[1:],
+                                                  dfs[1:],
+                                                  option_type)
 
-            capFloorValue += capFloorLetValue
+            caplet_values[:, 1:] = option_values * self._notional * alphas[1:]
 
-            self._capFloorLetFwdRates.append(fwd_rate)
-            self._capFloorLetValues.append(capFloorLetValue)
-            self._capFloorLetAlphas.append(alpha)
-            self._capFloorLetIntrinsic.append(intrinsic_value)
-            self._capFloorLetDiscountFactors.append(df)
-            self._capFloorPV.append(capFloorValue)
+        cumulative_values = np.cumsum(caplet_values, axis=1)
 
-        return capFloorValue
+        return {'values': cumulative_values[:, -1],
+                'strikes': strikes,
+                'caplet_values': caplet_values,
+                'intrinsic_values': intrinsic_values,
+                'cumulative_values': cumulative_values,
+                'year_fracs': alphas,
+                'fwd_rates': fwd_rates,
+                'dfs': dfs,
+                'expiry_times': t_exps}
 
 ###############################################################################
 
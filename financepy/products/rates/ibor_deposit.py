@@ -2,6 +2,8 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import numpy as np
+
 from ...utils.date import Date
 from ...utils.error import FinError
 from ...utils.calendar import Calendar
@@ -112,6 +114,54 @@ class IborDeposit:
 
     ###########################################################################
 
+    def df_sensitivities(self,
+                         value_date: Date,
+                         libor_curve):
+        """ Value the deposit and return the derivatives of this value with
+        respect to the discount factors on its settlement and maturity dates.
+        These are returned as a list holding a tuple of the curve, a Numpy
+        array of the Excel serial dates and the derivatives. """
+
+        if value_date > self._maturity_date:
+            raise FinError("Start date after maturity date")
+
+        dc = DayCount(self._dc_type)
+        acc_factor = dc.year_frac(self._start_date, self._maturity_date)[0]
+
+        serials = np.array([int(self._start_date._excel_date),
+                            int(self._maturity_date._excel_date)])
+
+        (df_settle, df_maturity) = libor_curve.df(serials)
+
+        amount = (1.0 + acc_factor * self._deposit_rate) * self._notional
+        value = amount * df_maturity / df_settle
+
+        dv_ddf = np.array([-value / df_settle, amount / df_settle])
+
+        return value, [(libor_curve, serials, dv_ddf)]
+
+    ###########################################################################
+
+    def quote_sensitivity(self,
+                          value_date: Date,
+                          libor_curve):
+        """ Return the derivative of the deposit value with respect to its
+        deposit rate. This is used to find the sensitivity of the curve to
+        the market quotes. """
+
+        if value_date > self._maturity_date:
+            raise FinError("Start date after maturity date")
+
+        dc = DayCount(self._dc_type)
+        acc_factor = dc.year_frac(self._start_date, self._maturity_date)[0]
+
+        df_settle = libor_curve.df(self._start_date)
+        df_maturity = libor_curve.df(self._maturity_date)
+
+        return acc_factor * self._notional * df_maturity / df_settle
+
+    ###########################################################################
+
     def print_payments(self,
                        value_date: Date):
         """ Print the date and size of the future repayment. """
@@ -3,6 +3,8 @@
 ##############################################################################
 
 
+import numpy as np
+
 from ...utils.error import FinError
 from ...utils.date import Date
 from ...utils.calendar import Calendar
@@ -113,6 +115,73 @@ class IborFRA:
 
     ##########################################################################
 
+    def df_sensitivities(self,
+                         value_date: Date,
+                         discount_curve: DiscountCurve,
+                         index_curve: DiscountCurve = None):
+        """ Value the FRA and return the derivatives of this value with
+        respect to the index curve discount factors at the start and end of
+        the FRA period and the discount curve discount factors on the value
+        and maturity dates. These are returned as a list of tuples of the
+        curve, a Numpy array of Excel serial dates and the derivatives. """
+
+        if index_curve is None:
+            index_curve = discount_curve
+
+        dc = DayCount(self._dc_type)
+        acc_factor = dc.year_frac(self._start_date, self._maturity_date)[0]
+
+        index_serials = np.array([int(self._start_date._excel_date),
+                                  int(self._maturity_date._excel_date)])
+
+        discount_serials = np.array([int(value_date._excel_date),
+                                     int(self._maturity_date._excel_date)])
+
+        (dfIndex1, dfIndex2) = index_curve.df(index_serials)
+        (df_to_value_date, dfDiscount2) = discount_curve.df(discount_serials)
+
+        scale = self._notional / df_to_value_date
+
+        if self._payFixedRate is True:
+            scale *= -1.0
+
+        payoff = dfIndex1 / dfIndex2 - 1.0 - acc_factor * self._fraRate
+        v = payoff * dfDiscount2 * scale
+
+        index_dv_ddf = np.array([dfDiscount2 * scale / dfIndex2,
+                                 -dfDiscount2 * scale * dfIndex1 /
+                                 dfIndex2 / dfIndex2])
+
+        discount_dv_ddf = np.array([-v / df_to_value_date, payoff * scale])
+
+        return v, [(index_curve, index_serials, index_dv_ddf),
+                   (discount_curve, discount_serials, discount_dv_ddf)]
+
+    ##########################################################################
+
+    def quote_sensitivity(self,
+                          value_date: Date,
+                          discount_curve: DiscountCurve,
+                          index_curve: DiscountCurve = None):
+        """ Return the derivative of the FRA value with respect to the FRA
+        rate. This is used to find the sensitivity of the curve to the market
+        quotes. """
+
+        dc = DayCount(self._dc_type)
+        acc_factor = dc.year_frac(self._start_date, self._maturity_date)[0]
+
+        df_to_value_date = discount_curve.df(value_date)
+        dfDiscount2 = discount_curve.df(self._maturity_date)
+
+        scale = self._notional / df_to_value_date
+
+        if self._payFixedRate is True:
+            scale *= -1.0
+
+        return -acc_factor * dfDiscount2 * scale
+
+    ##########################################################################
+
     def maturity_df(self, index_curve):
         """ Determine the maturity date index discount factor needed to refit
         the market FRA rate. In a dual-curve world, this is not the discount
@@ -28,8 +28,16 @@ from ...utils.date import Date
 from ...models.lmm_mc import lmm_simulate_fwds_1f
 from ...models.lmm_mc import lmm_simulate_fwds_mf
 from ...models.lmm_mc import lmm_simulate_fwds_nf
+from ...models.lmm_mc import lmm_simulate_fwds_1f_parallel
+from ...models.lmm_mc import lmm_simulate_fwds_mf_parallel
+from ...models.lmm_mc import lmm_simulate_fwds_nf_parallel
+from ...models.lmm_mc import lmm_simulate_fwds_1f_batches
+from ...models.lmm_mc import lmm_simulate_fwds_mf_batches
+from ...models.lmm_mc import lmm_simulate_fwds_nf_batches
+from ...models.lmm_mc import lmm_stream_pricer
 from ...models.lmm_mc import ModelLMMModelTypes
 from ...models.lmm_mc import lmm_cap_flr_pricer
+from ...models.lmm_mc import lmm_swaption_pricer
 
 from ...utils.global_vars import gDaysInYear
 from ...utils.math import ONE_MILLION
@@ -94,6 +102,7 @@ class IborLMMProducts():
         self._accrual_factors = np.array(self._accrual_factors)
         self._numForwards = len(self._accrual_factors)
         self._fwds = None
+        self._fwdBatches = None
 
 #        print("Num FORWARDS", self._numForwards)
 
@@ -105,9 +114,19 @@ class IborLMMProducts():
                     num_paths: int = 1000,
                     numeraireIndex: int = 0,
                     useSobol: bool = True,
-                    seed: int = 42):
+                    seed: int = 42,
+                    useParallel: bool = False,
+                    numPathsPerBatch: int = 0):
         """ Run the one-factor simulation of the evolution of the forward
-        Ibors to generate and store all of the Ibor forward rate paths. """
+        Ibors to generate and store all of the Ibor forward rate paths. If
+        useParallel is True the paths are simulated across all of the cores
+        available to Numba. The paths then use a random number stream for
+        each block of paths and so differ from those of the serial simulation
+        unless Sobol numbers are used. They do not depend on the number of
+        threads. If numPathsPerBatch is positive the paths are not stored.
+        Instead they are simulated again by the parallel kernels in batches
+        of about this many paths each time a product is valued, so that the
+        memory used does not grow with the number of paths. """
 
         if num_paths < 2 or num_paths > 1000000:
             raise FinError("NumPaths must be between 2 and 1 million")
@@ -118,10 +137,12 @@ class IborLMMProducts():
         self._num_paths = num_paths
         self._numeraireIndex = numeraireIndex
         self._useSobol = useSobol
+        self._useParallel = useParallel
+        self._numPathsPerBatch = numPathsPerBatch
 
         numGridPoints = len(self._gridDates)
 
-        self._numForwards = numGridPoints
+        self._numForwards = numGridPoints - 1
         self._forwardCurve = []
 
         for i in range(1, numGridPoints):
@@ -134,19 +155,39 @@ class IborLMMProducts():
 
         self._forwardCurve = np.array(self._forwardCurve)
 
-        gammas = np.zeros(numGridPoints)
-        for ix in range(1, numGridPoints):
+        gammas = np.zeros(self._numForwards)
+        for ix in range(1, self._numForwards):
             dt = self._gridDates[ix]
             gammas[ix] = volCurve.caplet_vol(dt)
 
-        self._fwds = lmm_simulate_fwds_1f(self._numForwards,
-                                          num_paths,
-                                          numeraireIndex,
-                                          self._forwardCurve,
-                                          gammas,
-                                          self._accrual_factors,
-                                          useSobol,
-                                          seed)
+        if numPathsPerBatch > 0:
+            self._fwds = None
+            self._fwdBatches = \
+                lambda: lmm_simulate_fwds_1f_batches(self._numForwards,
+                                                     num_paths,
+                                                     numeraireIndex,
+                                                     self._forwardCurve,
+                                                     gammas,
+                                                     self._accrual_factors,
+                                                     useSobol,
+                                                     seed,
+                                                     numPathsPerBatch)
+            return
+
+        if useParallel is True:
+            simulate_fwds = lmm_simulate_fwds_1f_parallel
+        else:
+            simulate_fwds = lmm_simulate_fwds_1f
+
+        self._fwdBatches = None
+        self._fwds = simulate_fwds(self._numForwards,
+                                   num_paths,
+                                   numeraireIndex,
+                                   self._forwardCurve,
+                                   gammas,
+                                   self._accrual_factors,
+                                   useSobol,
+                                   seed)
 
 ###############################################################################
 
@@ -157,39 +198,43 @@ class IborLMMProducts():
                     num_paths: int = 10000,
                     numeraireIndex: int = 0,
                     useSobol: bool = True,
-                    seed: int = 42):
+                    seed: int = 42,
+                    useParallel: bool = False,
+                    numPathsPerBatch: int = 0):
         """ Run the simulation to generate and store all of the Ibor forward
         rate paths. This is a multi-factorial version so the user must input
         a numpy array consisting of a column for each factor and the number of
         rows must equal the number of grid times on the underlying simulation
-        grid. CHECK THIS. """
+        grid. CHECK THIS. If useParallel is True the paths are simulated
+        across all of the cores available to Numba and if numPathsPerBatch is
+        positive they are streamed in batches as in simulate_1f. """
 
 #        check_argument_types(self.__init__, locals())
 
         if num_paths < 2 or num_paths > 1000000:
             raise FinError("NumPaths must be between 2 and 1 million")
 
-        if discount_curve._curve_date != self._start_date:
+        if discount_curve._value_date != self._start_date:
             raise FinError("Curve anchor date not the same as LMM start date.")
 
-        print("LEN LAMBDAS", len(lambdas))
-        print("LEN", len(lambdas[0]))
         # We pass a vector of vol discount, one for each factor
         if numFactors != len(lambdas):
             raise FinError("Lambda doesn't have specified number of factors.")
 
         numRows = len(lambdas[0])
-        if numRows != self._numForwards+1:
+        if numRows != len(self._gridDates) - 1:
             raise FinError("Vol Components needs same number of rows as grid")
 
         self._num_paths = num_paths
         self._numeraireIndex = numeraireIndex
         self._useSobol = useSobol
+        self._useParallel = useParallel
+        self._numPathsPerBatch = numPathsPerBatch
 
         self._numForwards = len(self._gridDates) - 1
         self._forwardCurve = []
 
-        for i in range(1, self._numForwards):
+        for i in range(1, self._numForwards + 1):
             start_date = self._gridDates[i-1]
             end_date = self._gridDates[i]
             fwd_rate = discount_curve.fwd_rate(start_date, end_date,
@@ -198,15 +243,36 @@ class IborLMMProducts():
 
         self._forwardCurve = np.array(self._forwardCurve)
 
-        self._fwds = lmm_simulate_fwds_mf(self._numForwards,
-                                          numFactors,
-                                          num_paths,
-                                          numeraireIndex,
-                                          self._forwardCurve,
-                                          lambdas,
-                                          self._accrual_factors,
-                                          useSobol,
-                                          seed)
+        if numPathsPerBatch > 0:
+            self._fwds = None
+            self._fwdBatches = \
+                lambda: lmm_simulate_fwds_mf_batches(self._numForwards,
+                                                     numFactors,
+                                                     num_paths,
+                                                     numeraireIndex,
+                                                     self._forwardCurve,
+                                                     lambdas,
+                                                     self._accrual_factors,
+                                                     useSobol,
+                                                     seed,
+                                                     numPathsPerBatch)
+            return
+
+        if useParallel is True:
+            simulate_fwds = lmm_simulate_fwds_mf_parallel
+        else:
+            simulate_fwds = lmm_simulate_fwds_mf
+
+        self._fwdBatches = None
+        self._fwds = simulate_fwds(self._numForwards,
+                                   numFactors,
+                                   num_paths,
+                                   numeraireIndex,
+                                   self._forwardCurve,
+                                   lambdas,
+                                   self._accrual_factors,
+                                   useSobol,
+                                   seed)
 
 ###############################################################################
 
@@ -218,10 +284,15 @@ class IborLMMProducts():
                     num_paths: int = 1000,
                     numeraireIndex: int = 0,
                     useSobol: bool = True,
-                    seed: int = 42):
+                    seed: int = 42,
+                    useParallel: bool = False,
+                    numPathsPerBatch: int = 0):
         """ Run the simulation to generate and store all of the Ibor forward
         rate paths using a full factor reduction of the fwd-fwd correlation
-        matrix using Cholesky decomposition."""
+        matrix using Cholesky decomposition. If useParallel is True the paths
+        are simulated across all of the cores available to Numba and if
+        numPathsPerBatch is positive they are streamed in batches as in
+        simulate_1f."""
 
         check_argument_types(self.__init__, locals())
 
@@ -231,7 +302,7 @@ class IborLMMProducts():
         if isinstance(modelType, ModelLMMModelTypes) is False:
             raise FinError("Model type must be type FinRateModelLMMModelTypes")
 
-        if discount_curve.curve_date != self._start_date:
+        if discount_curve._value_date != self._start_date:
             raise FinError("Curve anchor date not the same as LMM start date.")
 
         self._num_paths = num_paths
@@ -240,6 +311,8 @@ class IborLMMProducts():
         self._modelType = modelType
         self._numeraireIndex = numeraireIndex
         self._useSobol = useSobol
+        self._useParallel = useParallel
+        self._numPathsPerBatch = numPathsPerBatch
 
         numGridPoints = len(self._gridTimes)
 
@@ -249,26 +322,45 @@ class IborLMMProducts():
         for i in range(1, numGridPoints):
             start_date = self._gridDates[i-1]
             end_date = self._gridDates[i]
-            fwd_rate = discount_curve.forward_rate(start_date,
-                                                   end_date,
-                                                   self._float_dc_type)
+            fwd_rate = discount_curve.fwd_rate(start_date,
+                                               end_date,
+                                               self._float_dc_type)
             self._forwardCurve.append(fwd_rate)
 
         self._forwardCurve = np.array(self._forwardCurve)
 
-        zetas = np.zeros(numGridPoints)
-        for ix in range(1, numGridPoints):
+        zetas = np.zeros(self._numForwards)
+        for ix in range(1, self._numForwards):
             dt = self._gridDates[ix]
             zetas[ix] = volCurve.caplet_vol(dt)
 
         # This function does not use Sobol - TODO
-        self._fwds = lmm_simulate_fwds_nf(self._numForwards,
-                                          num_paths,
-                                          self._forwardCurve,
-                                          zetas,
-                                          correlationMatrix,
-                                          self._accrual_factors,
-                                          seed)
+        if numPathsPerBatch > 0:
+            self._fwds = None
+            self._fwdBatches = \
+                lambda: lmm_simulate_fwds_nf_batches(self._numForwards,
+                                                     num_paths,
+                                                     self._forwardCurve,
+                                                     zetas,
+                                                     correlationMatrix,
+                                                     self._accrual_factors,
+                                                     seed,
+                                                     numPathsPerBatch)
+            return
+
+        if useParallel is True:
+            simulate_fwds = lmm_simulate_fwds_nf_parallel
+        else:
+            simulate_fwds = lmm_simulate_fwds_nf
+
+        self._fwdBatches = None
+        self._fwds = simulate_fwds(self._numForwards,
+                                   num_paths,
+                                   self._forwardCurve,
+                                   zetas,
+                                   correlationMatrix,
+                                   self._accrual_factors,
+                                   seed)
 
 ###############################################################################
 
@@ -346,14 +438,23 @@ class IborLMMProducts():
             else:
                 b += 1
 
+        if a == len(self._gridDates):
+            raise FinError("Swaption exercise date not on grid.")
+
         if b == 0:
             raise FinError("Swaption swap maturity date is today.")
 
-#        num_paths = 1000
-#        v = LMMSwaptionPricer(fixed_coupon, a, b, num_paths,
-#                              fwd0, fwds, taus, isPayer)
-        v = 0.0
-        return v
+        isPayer = 0
+        if swaptionType == SwapTypes.PAY:
+            isPayer = 1
+
+        fwd0 = self._forwardCurve
+        taus = self._accrual_factors
+
+        v = self._value_paths(lambda fwds, n: lmm_swaption_pricer(
+            fixed_coupon, a, b, n, fwd0, fwds, taus, isPayer))
+
+        return v * notional
 
 ###############################################################################
 
@@ -387,18 +488,16 @@ class IborLMMProducts():
                 raise FinError("CapFloor date not on grid.")
 
         numFowards = len(capFloorDates)
-        num_paths = self._num_paths
         K = capFloorRate
         isCap = 0
         if capFloorType == FinCapFloorTypes.CAP:
             isCap = 1
 
         fwd0 = self._forwardCurve
-        fwds = self._fwds
         taus = self._accrual_factors
 
-        v = lmm_cap_flr_pricer(numFowards, num_paths, K,
-                               fwd0, fwds, taus, isCap)
+        v = self._value_paths(lambda fwds, n: lmm_cap_flr_pricer(
+            numFowards, n, K, fwd0, fwds, taus, isCap))
 
         # Sum the cap/floorlets to get cap/floor value
         v_capFloor = 0.0
@@ -407,6 +506,21 @@ class IborLMMProducts():
 
         return v_capFloor
 
+###############################################################################
+
+    def _value_paths(self, pricer):
+        """ Average a path pricer, called with the forwards and the number of
+        paths, over the stored paths or, if the simulation was run with
+        numPathsPerBatch, over the paths simulated again batch by batch. """
+
+        if self._fwdBatches is not None:
+            return lmm_stream_pricer(self._fwdBatches(), pricer)
+
+        if self._fwds is None:
+            raise FinError("Simulate the forwards before valuing products.")
+
+        return pricer(self._fwds, len(self._fwds))
+
 ###############################################################################
 
     def __repr__(self):
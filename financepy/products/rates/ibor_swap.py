@@ -136,6 +136,45 @@ class IborSwap:
 
     ###########################################################################
 
+    def df_sensitivities(self,
+                         value_date: Date,
+                         discount_curve: DiscountCurve,
+                         index_curve: DiscountCurve = None,
+                         firstFixingRate=None):
+        """ Value the interest rate swap and return the derivatives of this
+        value with respect to the discount factors on the dates used by the
+        two legs. These are returned as a list of tuples of the curve, a Numpy
+        array of Excel serial dates and the derivatives of the value with
+        respect to the discount factors on those dates. """
+
+        if index_curve is None:
+            index_curve = discount_curve
+
+        fixed_leg_value, fixed_leg_sens = \
+            self._fixed_leg.df_sensitivities(value_date, discount_curve)
+
+        float_leg_value, float_leg_sens = \
+            self._float_leg.df_sensitivities(value_date,
+                                             discount_curve,
+                                             index_curve,
+                                             firstFixingRate)
+
+        value = fixed_leg_value + float_leg_value
+        return value, fixed_leg_sens + float_leg_sens
+
+    ###########################################################################
+
+    def quote_sensitivity(self,
+                          value_date: Date,
+                          discount_curve: DiscountCurve):
+        """ Return the derivative of the swap value with respect to the fixed
+        coupon. This is used to find the sensitivity of the curve to the
+        market quotes. """
+
+        return self._fixed_leg.cpn_sensitivity(value_date, discount_curve)
+
+    ###########################################################################
+
     def pv01(self, value_date, discount_curve):
         """ Calculate the value of 1 basis point coupon on the fixed leg. """
 
@@ -17,7 +17,7 @@ from ...utils.calendar import BusDayAdjustTypes
 from ...utils.calendar import DateGenRuleTypes
 from ...utils.day_count import DayCountTypes
 from ...utils.frequency import FrequencyTypes
-from ...utils.global_vars import gDaysInYear
+from ...utils.global_vars import gDaysInYear, gSmall
 from ...utils.math import ONE_MILLION
 from ...utils.error import FinError
 from ...utils.helpers import label_to_string, check_argument_types
@@ -94,6 +94,59 @@ class IborSwaption():
         self._fwd_swap_rate = None
         self._forward_df = None
         self._underlying_swap = None
+        self._underlying_swap_terms = None
+
+###############################################################################
+
+    def _swap_terms(self):
+        """ Return the terms of the swaption which define its underlying
+        swap. """
+
+        return (self._exercise_date._excel_date,
+                self._maturity_date._excel_date,
+                self._fixed_leg_type,
+                self._fixed_coupon,
+                self._fixed_freq_type,
+                self._fixed_dc_type,
+                self._notional,
+                self._float_freq_type,
+                self._float_dc_type,
+                self._cal_type,
+                self._bd_adjust_type,
+                self._dg_rule_type)
+
+###############################################################################
+
+    def _swap(self):
+        """ Return the underlying swap which starts on the exercise date. Its
+        schedules and cash flows only depend on the terms of the swaption so
+        it is built on the first valuation and then reused until the terms
+        change. """
+
+        terms = self._swap_terms()
+
+        if self._underlying_swap is not None and \
+                self._underlying_swap_terms == terms:
+            return self._underlying_swap
+
+        float_spread = 0.0
+
+        self._underlying_swap = IborSwap(self._exercise_date,
+                                         self._maturity_date,
+                                         self._fixed_leg_type,
+                                         self._fixed_coupon,
+                                         self._fixed_freq_type,
+                                         self._fixed_dc_type,
+                                         self._notional,
+                                         float_spread,
+                                         self._float_freq_type,
+                                         self._float_dc_type,
+                                         self._cal_type,
+                                         self._bd_adjust_type,
+                                         self._dg_rule_type)
+
+        self._underlying_swap_terms = terms
+        return self._underlying_swap
 
 ###############################################################################
 
@@ -107,22 +160,8 @@ class IborSwaption():
         FinModelBK and FinModelBDT. The last two involved a tree-based
         valuation. """
 
-        float_spread = 0.0
-
-        # We create a swap that starts on the exercise date.
-        swap = IborSwap(self._exercise_date,
-                        self._maturity_date,
-                        self._fixed_leg_type,
-                        self._fixed_coupon,
-                        self._fixed_freq_type,
-                        self._fixed_dc_type,
-                        self._notional,
-                        float_spread,
-                        self._float_freq_type,
-                        self._float_dc_type,
-                        self._cal_type,
-                        self._bd_adjust_type,
-                        self._dg_rule_type)
+        # We use a swap that starts on the exercise date.
+        swap = self._swap()
 
         k = self._fixed_coupon
 
@@ -274,7 +313,6 @@ class IborSwaption():
         self._pv01 = pv01
         self._fwd_swap_rate = s
         self._forward_df = discount_curve.df(self._exercise_date)
-        self._underlying_swap = swap
 
         # The exchange of cash occurs on the settlement date. However the
         # actual value is that on the specified valuation date which could
@@ -283,6 +321,93 @@ class IborSwaption():
         swaption_price = swaption_price * pv01 * self._notional / df_settle
         return swaption_price
 
+###############################################################################
+
+    def df_sensitivities(self,
+                         value_date: Date,
+                         discount_curve,
+                         model):
+        """ Value the swaption using a Black-type model and return the
+        derivatives of this value with respect to the discount factors used
+        to compute the PV01 annuity, the forward swap rate and the discounting
+        to the settlement date. These are returned as a list holding a tuple
+        of the curve, a Numpy array of Excel serial dates and the derivatives.
+        The derivative of the option price with respect to the forward swap
+        rate is found by a central difference of the model price. Only the
+        Black, BlackShifted, SABR and SABRShifted models are supported. """
+
+        if not isinstance(model, (Black, BlackShifted, SABR, SABRShifted)):
+            raise FinError("Discount factor sensitivities need a Black-type "
+                           "swaption model and not " + str(model))
+
+        # We use a swap that starts on the exercise date.
+        swap = self._swap()
+
+        k = self._fixed_coupon
+
+        # The pv01 is the value of the swap cash flows as of the curve date
+        fixed_leg = swap._fixed_leg
+        payment_serials = fixed_leg._payment_dates.serials()
+        alive = payment_serials > int(value_date._excel_date)
+
+        year_fracs = np.array(fixed_leg._year_fracs)[alive]
+        payment_serials = payment_serials[alive]
+
+        df_value = discount_curve.df(value_date)
+        df_pmnts = discount_curve.df(payment_serials)
+        pv01 = np.dot(year_fracs, df_pmnts) / df_value
+
+        if abs(pv01) < gSmall:
+            raise FinError("PV01 is zero. Cannot compute swap rate.")
+
+        # The forward swap rate that makes the forward swap worth par
+        if value_date < swap._effective_date:
+            start_date = swap._effective_date
+        else:
+            start_date = value_date
+
+        df0 = discount_curve.df(start_date)
+        df_t = discount_curve.df(swap._maturity_date)
+        s = (df0 - df_t) / pv01
+
+        t_exp = (self._exercise_date - self._settle_date) / gDaysInYear
+
+        if self._fixed_leg_type == SwapTypes.PAY:
+            option_type = OptionTypes.EUROPEAN_CALL
+        else:
+            option_type = OptionTypes.EUROPEAN_PUT
+
+        # Discounting is done via the PV01 annuity so no discounting in Black
+        df = 1.0
+        ds = 1e-6
+
+        swaption_price = float(model.value(s, k, t_exp, df, option_type))
+        price_up = float(model.value(s + ds, k, t_exp, df, option_type))
+        price_down = float(model.value(s - ds, k, t_exp, df, option_type))
+        dprice_ds = (price_up - price_down) / (2.0 * ds)
+
+        df_settle = discount_curve.df(self._settle_date)
+        scale = self._notional / df_settle
+        v = swaption_price * pv01 * scale
+
+        # The swap rate depends on the pv01 as well as on df0 and df_t
+        dv_dpv01 = (swaption_price - dprice_ds * s) * scale
+        dv_ddf0 = dprice_ds * scale
+
+        serials = np.concatenate((payment_serials,
+                                  [int(value_date._excel_date),
+                                   int(start_date._excel_date),
+                                   int(swap._maturity_date._excel_date),
+                                   int(self._settle_date._excel_date)]))
+
+        dv_ddf = np.concatenate((dv_dpv01 * year_fracs / df_value,
+                                 [-dv_dpv01 * pv01 / df_value,
+                                  dv_ddf0,
+                                  -dv_ddf0,
+                                  -v / df_settle]))
+
+        return v, [(discount_curve, serials, dv_ddf)]
+
 ###############################################################################
 
     def cash_settled_value(self,
@@ -296,21 +421,7 @@ class IborSwaption():
         Black volatility for this valuation should in general not equal the
         Black volatility for the standard arbitrage-free valuation. """
 
-        float_spread = 0.0
-
-        swap = IborSwap(self._exercise_date,
-                        self._maturity_date,
-                        self._fixed_leg_type,
-                        self._fixed_coupon,
-                        self._fixed_freq_type,
-                        self._fixed_dc_type,
-                        self._notional,
-                        float_spread,
-                        self._float_freq_type,
-                        self._float_dc_type,
-                        self._cal_type,
-                        self._bd_adjust_type,
-                        self._dg_rule_type)
+        swap = self._swap()
 
         k = self._fixed_coupon
         s = swap_rate
@@ -338,7 +449,6 @@ class IborSwaption():
 
         self._fwd_swap_rate = swap_rate
         self._forward_df = discount_curve.df(self._exercise_date)
-        self._underlying_swap = swap
         # The annuity needs to be discounted to today using the correct df
         self._pv01 = pv01 * self._forward_df
 
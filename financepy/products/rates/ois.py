@@ -154,6 +154,41 @@ class OIS:
         value = fixed_leg_value + float_leg_value
         return value
 
+##########################################################################
+
+    def df_sensitivities(self,
+                         value_date: Date,
+                         ois_curve: DiscountCurve,
+                         first_fixing_rate=None):
+        """ Value the OIS and return the derivatives of this value with
+        respect to the discount factors on the dates used by the two legs.
+        These are returned as a list of tuples of the curve, a Numpy array of
+        Excel serial dates and the derivatives of the value with respect to
+        the discount factors on those dates. """
+
+        fixed_leg_value, fixed_leg_sens = \
+            self._fixed_leg.df_sensitivities(value_date, ois_curve)
+
+        float_leg_value, float_leg_sens = \
+            self._float_leg.df_sensitivities(value_date,
+                                             ois_curve,
+                                             ois_curve,
+                                             first_fixing_rate)
+
+        value = fixed_leg_value + float_leg_value
+        return value, fixed_leg_sens + float_leg_sens
+
+##########################################################################
+
+    def quote_sensitivity(self,
+                          value_date: Date,
+                          ois_curve: DiscountCurve):
+        """ Return the derivative of the OIS value with respect to the fixed
+        coupon. This is used to find the sensitivity of the curve to the
+        market quotes. """
+
+        return self._fixed_leg.cpn_sensitivity(value_date, ois_curve)
+
 ##########################################################################
 
     def pv01(self, value_date, discount_curve):
@@ -11,8 +11,11 @@ from ...utils.date import Date
 from ...utils.helpers import label_to_string
 from ...utils.helpers import check_argument_types, _func_name
 from ...utils.global_vars import gDaysInYear
+from ...utils.global_types import CurveBuildTypes
 from ...market.curves.interpolator import InterpTypes, Interpolator
 from ...market.curves.discount_curve import DiscountCurve
+from ...products.rates.curve_quote_risk import quote_jacobian
+from ...products.rates.curve_quote_risk import bucketed_dv01
 
 from ...products.rates.ibor_deposit import IborDeposit
 from ...products.rates.ois import OIS
@@ -107,7 +110,9 @@ class OISCurve(DiscountCurve):
                  ois_fras: list,
                  ois_swaps: list,
                  interp_type: InterpTypes = InterpTypes.FLAT_FWD_RATES,
-                 check_refit: bool = False):  # Set to True to test it works
+                 check_refit: bool = False,  # Set to True to test it works
+                 build_type: CurveBuildTypes = CurveBuildTypes.BOOTSTRAP,
+                 warm_start_curve=None):
         """ Create an instance of an overnight index rate swap curve given a
         valuation date and a set of OIS rates. Some of these may
         be left None and the algorithm will just use what is provided. An
@@ -116,6 +121,12 @@ class OISCurve(DiscountCurve):
         flat forwards between these coupon dates.
 
         The curve will assign a discount factor of 1.0 to the valuation date.
+
+        The build type GLOBAL_NEWTON solves for all of the discount factors
+        together using a Newton solver with analytic Jacobians. This can be
+        warm started from a previously built curve, such as the previous
+        day's or previous scenario's curve, whose discount factors at the
+        curve times are used as the starting point.
         """
 
         check_argument_types(getattr(self, _func_name(), None), locals())
@@ -124,6 +135,8 @@ class OISCurve(DiscountCurve):
         self._validate_inputs(ois_deposits, ois_fras, ois_swaps)
         self._interp_type = interp_type
         self._check_refit = check_refit
+        self._build_type = build_type
+        self._warm_start_curve = warm_start_curve
         self._interpolator = None
         self._build_curve()
 
@@ -132,7 +145,10 @@ class OISCurve(DiscountCurve):
     def _build_curve(self):
         """ Build curve based on interpolation. """
 
-        self._build_curve_using_1d_solver()
+        if self._build_type == CurveBuildTypes.GLOBAL_NEWTON:
+            self._build_curve_using_newton_solver()
+        else:
+            self._build_curve_using_1d_solver()
 
 ###############################################################################
 
@@ -282,6 +298,8 @@ class OISCurve(DiscountCurve):
             if first_swap_maturity_date <= lastFRAMaturityDate:
                 raise FinError("First Swap must mature after last FRA")
 
+        self._synthetic_deposit = False
+
         if swap_start_date > self._value_date:
 
             if num_depos == 0:
@@ -294,7 +312,8 @@ class OISCurve(DiscountCurve):
                     syntheticDeposit = copy.deepcopy(firstDepo)
                     syntheticDeposit._start_date = self._value_date
                     syntheticDeposit._maturity_date = firstDepo._start_date
-                    oisDeposits.insert(0, syntheticDeposit)
+                    oisDeposits = [syntheticDeposit] + oisDeposits
+                    self._synthetic_deposit = True
                     num_depos += 1
 
         # Now determine which instruments are used
@@ -375,6 +394,106 @@ class OISCurve(DiscountCurve):
         if self._check_refit is True:
             self._check_refits(1e-10, swaptol, 1e-5)
 
+###############################################################################
+
+    def _build_curve_using_newton_solver(self):
+        """ Construct the discount curve by solving for the discount factors
+        at all of the curve times together. Each Newton step uses the analytic
+        Jacobian of the calibration instrument values with respect to the
+        discount factors. For the local interpolation schemes this gives the
+        same curve as the bootstrap. If a warm start curve was supplied, the
+        iterations start from its discount factors so that only a few of them
+        are needed after small changes in the market quotes. """
+
+        self._interpolator = Interpolator(self._interp_type)
+
+        times = [0.0]
+
+        for depo in self._usedDeposits:
+            tmat = (depo._maturity_date - self._value_date) / gDaysInYear
+            times.append(tmat)
+
+        for fra in self._usedFRAs:
+            tmat = (fra._maturity_date - self._value_date) / gDaysInYear
+            times.append(tmat)
+
+        for swap in self._usedSwaps:
+            maturity_date = swap._fixed_leg._payment_dates[-1]
+            tmat = (maturity_date - self._value_date) / gDaysInYear
+            times.append(tmat)
+
+        self._times = np.array(times)
+
+        if self._warm_start_curve is not None:
+            self._dfs = np.array(self._warm_start_curve._df(self._times))
+            self._dfs[0] = 1.0
+        else:
+            self._dfs = np.exp(-self._times * 0.05)
+
+        self._num_iterations = \
+            self._solve_nodes_by_newton(self._calibration_residuals)
+
+        if self._check_refit is True:
+            self._check_refits(1e-10, swaptol, 1e-5)
+
+###############################################################################
+
+    def _calibration_residuals(self):
+        """ Return the values of the calibration instruments, scaled so that
+        they are zero when the curve refits them, and the Jacobian of these
+        with respect to the discount factors at the curve times. """
+
+        values = []
+        notionals = []
+        sensitivities = []
+
+        for depo in self._usedDeposits:
+            v, sens = depo.df_sensitivities(self._value_date, self)
+            values.append(v - depo._notional)
+            notionals.append(depo._notional)
+            sensitivities.append(sens)
+
+        for fra in self._usedFRAs:
+            v, sens = fra.df_sensitivities(self._value_date, self)
+            values.append(v)
+            notionals.append(fra._notional)
+            sensitivities.append(sens)
+
+        for swap in self._usedSwaps:
+            v, sens = swap.df_sensitivities(self._value_date, self)
+            values.append(v)
+            notionals.append(swap._fixed_leg._notional)
+            sensitivities.append(sens)
+
+        notionals = np.array(notionals)
+        residuals = np.array(values) / notionals
+        jacobian = self.node_sensitivities(sensitivities)
+        jacobian = jacobian / notionals[:, np.newaxis]
+
+        return residuals, jacobian
+
+###############################################################################
+
+    def quote_jacobian(self):
+        """ Return the matrix of derivatives of the discount factors at the
+        curve nodes with respect to the market quotes used to build the curve.
+        There is one row per node and one column per market instrument with
+        the deposits first, then the FRAs and then the swaps. """
+
+        return quote_jacobian(self, self)
+
+###############################################################################
+
+    def bucketed_dv01(self,
+                      sensitivities: list):
+        """ Return the change in value of a set of trades for a one basis
+        point increase in each of the market quotes used to build the curve.
+        Each element of the list is the list of sensitivities returned by the
+        df_sensitivities function of a product. This returns a matrix with one
+        row per trade and one column per market instrument. """
+
+        return bucketed_dv01(self, self, sensitivities)
+
 ###############################################################################
 
     def _build_curve_linear_swap_rate_interpolation(self):
@@ -2,8 +2,10 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import numpy as np
+
 from ...utils.error import FinError
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.math import ONE_MILLION
 from ...utils.day_count import DayCount, DayCountTypes
 from ...utils.frequency import FrequencyTypes
@@ -103,44 +105,31 @@ class SwapFixedLeg:
         if len(scheduleDates) < 2:
             raise FinError("Schedule has none or only one date")
 
-        self._startAccruedDates = []
-        self._endAccruedDates = []
-        self._payment_dates = []
-        self._payments = []
-        self._year_fracs = []
-        self._accrued_days = []
-        self._rates = []
-
-        prev_dt = scheduleDates[0]
-
         day_counter = DayCount(self._dc_type)
         calendar = Calendar(self._cal_type)
 
-        for next_dt in scheduleDates[1:]:
-
-            self._startAccruedDates.append(prev_dt)
-            self._endAccruedDates.append(next_dt)
+        # The dates are held compactly as serial numbers
+        self._startAccruedDates = scheduleDates[:-1]
+        self._endAccruedDates = scheduleDates[1:]
 
-            if self._payment_lag == 0:
-                payment_date = next_dt
-            else:
-                payment_date = calendar.add_business_days(next_dt,
-                                                          self._payment_lag)
-
-            self._payment_dates.append(payment_date)
-
-            (year_frac, num, den) = day_counter.year_frac(prev_dt,
-                                                          next_dt)
-
-            self._rates.append(self._cpn)
+        if self._payment_lag == 0:
+            self._payment_dates = self._endAccruedDates.copy()
+        else:
+            self._payment_dates = DateArray(
+                [calendar.add_business_days(next_dt, self._payment_lag)
+                 for next_dt in self._endAccruedDates])
 
-            payment = year_frac * self._notional * self._cpn
+        # The accrual factors of the whole leg are calculated in one call
+        (year_fracs, nums, _) = \
+            day_counter.year_frac_array(self._startAccruedDates,
+                                        self._endAccruedDates)
 
-            self._payments.append(payment)
-            self._year_fracs.append(year_frac)
-            self._accrued_days.append(num)
+        num_flows = len(year_fracs)
 
-            prev_dt = next_dt
+        self._year_fracs = year_fracs.tolist()
+        self._accrued_days = nums.tolist()
+        self._rates = [self._cpn] * num_flows
+        self._payments = (year_fracs * self._notional * self._cpn).tolist()
 
 ###############################################################################
 
@@ -191,6 +180,65 @@ class SwapFixedLeg:
 
         return legPV
 
+##########################################################################
+
+    def df_sensitivities(self,
+                         value_date: Date,
+                         discount_curve: DiscountCurve):
+        """ Value the fixed leg and return the derivatives of this value with
+        respect to the discount factors on the dates which it uses. These are
+        returned as a list of tuples of the curve, a Numpy array of the Excel
+        serial dates and the derivatives of the value with respect to the
+        discount factor on each of those dates. """
+
+        payment_serials = self._payment_dates.serials()
+        alive = payment_serials > int(value_date._excel_date)
+
+        amounts = np.array(self._payments)[alive]
+        payment_serials = payment_serials[alive]
+
+        if len(amounts) > 0:
+            amounts[-1] += self._principal * self._notional
+
+        dfValue = discount_curve.df(value_date)
+        dfPmnts = discount_curve.df(payment_serials)
+
+        legPV = np.dot(amounts, dfPmnts) / dfValue
+
+        serials = np.append(int(value_date._excel_date), payment_serials)
+        dv_ddf = np.append(-legPV / dfValue, amounts / dfValue)
+
+        if self._leg_type == SwapTypes.PAY:
+            legPV = legPV * (-1.0)
+            dv_ddf = dv_ddf * (-1.0)
+
+        return legPV, [(discount_curve, serials, dv_ddf)]
+
+##########################################################################
+
+    def cpn_sensitivity(self,
+                        value_date: Date,
+                        discount_curve: DiscountCurve):
+        """ Return the derivative of the fixed leg value with respect to the
+        fixed coupon. This is the notional times the annuity of the payments
+        that are still to be made and is negative for a paying leg. """
+
+        payment_serials = self._payment_dates.serials()
+        alive = payment_serials > int(value_date._excel_date)
+
+        year_fracs = np.array(self._year_fracs)[alive]
+        payment_serials = payment_serials[alive]
+
+        dfValue = discount_curve.df(value_date)
+        dfPmnts = discount_curve.df(payment_serials)
+
+        dv_dcpn = np.dot(year_fracs, dfPmnts) * self._notional / dfValue
+
+        if self._leg_type == SwapTypes.PAY:
+            dv_dcpn = dv_dcpn * (-1.0)
+
+        return dv_dcpn
+
 ##########################################################################
 
     def print_payments(self):
@@ -2,8 +2,10 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import numpy as np
+
 from ...utils.error import FinError
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.math import ONE_MILLION
 from ...utils.day_count import DayCount, DayCountTypes
 from ...utils.frequency import FrequencyTypes
@@ -99,38 +101,27 @@ class SwapFloatLeg:
         if len(scheduleDates) < 2:
             raise FinError("Schedule has none or only one date")
 
-        self._startAccruedDates = []
-        self._endAccruedDates = []
-        self._payment_dates = []
-        self._year_fracs = []
-        self._accrued_days = []
-
-        prev_dt = scheduleDates[0]
-
         day_counter = DayCount(self._dc_type)
         calendar = Calendar(self._cal_type)
 
-        # All of the lists end up with the same length
-        for next_dt in scheduleDates[1:]:
-
-            self._startAccruedDates.append(prev_dt)
-            self._endAccruedDates.append(next_dt)
-
-            if self._payment_lag == 0:
-                payment_date = next_dt
-            else:
-                payment_date = calendar.add_business_days(next_dt,
-                                                          self._payment_lag)
-
-            self._payment_dates.append(payment_date)
+        # The dates are held compactly as serial numbers
+        self._startAccruedDates = scheduleDates[:-1]
+        self._endAccruedDates = scheduleDates[1:]
 
-            (year_frac, num, _) = day_counter.year_frac(prev_dt,
-                                                        next_dt)
+        if self._payment_lag == 0:
+            self._payment_dates = self._endAccruedDates.copy()
+        else:
+            self._payment_dates = DateArray(
+                [calendar.add_business_days(next_dt, self._payment_lag)
+                 for next_dt in self._endAccruedDates])
 
-            self._year_fracs.append(year_frac)
-            self._accrued_days.append(num)
+        # The accrual factors of the whole leg are calculated in one call
+        (year_fracs, nums, _) = \
+            day_counter.year_frac_array(self._startAccruedDates,
+                                        self._endAccruedDates)
 
-            prev_dt = next_dt
+        self._year_fracs = year_fracs.tolist()
+        self._accrued_days = nums.tolist()
 
 ###############################################################################
 
@@ -222,6 +213,91 @@ class SwapFloatLeg:
 
         return legPV
 
+##########################################################################
+
+    def df_sensitivities(self,
+                         value_date: Date,
+                         discount_curve: DiscountCurve,
+                         index_curve: DiscountCurve,
+                         firstFixingRate: float = None):
+        """ Value the floating leg and return the derivatives of this value
+        with respect to the discount factors on the dates which it uses on
+        the discount and on the index curve. These are returned as a list of
+        tuples of the curve, a Numpy array of the Excel serial dates and the
+        derivatives of the value with respect to the discount factor on each
+        of those dates. """
+
+        if discount_curve is None:
+            raise FinError("Discount curve is None")
+
+        if index_curve is None:
+            index_curve = discount_curve
+
+        numPayments = len(self._payment_dates)
+
+        if not len(self._notional_array):
+            self._notional_array = [self._notional] * numPayments
+
+        payment_serials = self._payment_dates.serials()
+        alive = payment_serials > int(value_date._excel_date)
+
+        payment_serials = payment_serials[alive]
+        start_serials = self._startAccruedDates.serials()[alive]
+        end_serials = self._endAccruedDates.serials()[alive]
+        pay_alphas = np.array(self._year_fracs)[alive]
+        notionals = np.array(self._notional_array, dtype=float)[alive]
+
+        index_day_counter = DayCount(index_curve._dc_type)
+        index_alphas = index_day_counter.year_frac_array(start_serials,
+                                                         end_serials)[0]
+
+        # The rate on the first live coupon may have been fixed in which case
+        # it does not depend on the index curve
+        first = 0
+        if firstFixingRate is not None and len(start_serials) > 0:
+            first = 1
+
+        start_serials = start_serials[first:]
+        end_serials = end_serials[first:]
+
+        dfStarts = index_curve.df(start_serials)
+        dfEnds = index_curve.df(end_serials)
+
+        fwd_rates = np.empty(len(pay_alphas))
+        fwd_rates[first:] = (dfStarts / dfEnds - 1.0) / index_alphas[first:]
+
+        if first == 1:
+            fwd_rates[0] = firstFixingRate
+
+        amounts = (fwd_rates + self._spread) * pay_alphas * notionals
+
+        if len(amounts) > 0:
+            amounts[-1] += self._principal * notionals[-1]
+
+        dfValue = discount_curve.df(value_date)
+        dfPmnts = discount_curve.df(payment_serials) / dfValue
+
+        legPV = np.dot(amounts, dfPmnts)
+
+        discount_serials = np.append(int(value_date._excel_date),
+                                     payment_serials)
+        discount_dv_ddf = np.append(-legPV / dfValue, amounts / dfValue)
+
+        index_weights = (pay_alphas * notionals * dfPmnts)[first:] / \
+            index_alphas[first:]
+
+        index_serials = np.append(start_serials, end_serials)
+        index_dv_ddf = np.append(index_weights / dfEnds,
+                                 -index_weights * dfStarts / dfEnds / dfEnds)
+
+        if self._leg_type == SwapTypes.PAY:
+            legPV = legPV * (-1.0)
+            discount_dv_ddf = discount_dv_ddf * (-1.0)
+            index_dv_ddf = index_dv_ddf * (-1.0)
+
+        return legPV, [(discount_curve, discount_serials, discount_dv_ddf),
+                       (index_curve, index_serials, index_dv_ddf)]
+
 ##########################################################################
 
     def print_payments(self):
@@ -8,12 +8,13 @@
 ###############################################################################
 
 import datetime
+import numpy as np
 from enum import Enum
-from .date import Date
+from numba import njit
+from .date import Date, DateArray
+from .date import excel_serial_to_dmy, dmy_to_excel_serial, _vdmy
 from .error import FinError
 
-# from numba import njit, jit, int64, boolean
-
 easterMondayDay = [98, 90, 103, 95, 114, 106, 91, 111, 102, 87,
                    107, 99, 83, 103, 95, 115, 99, 91, 111, 96, 87,
                    107, 92, 112, 103, 95, 108, 100, 91,
@@ -77,6 +78,227 @@ class DateGenRuleTypes(Enum):
     BACKWARD = 2
 
 ###############################################################################
+# Each calendar is compiled lazily into a holiday bitmap indexed by Excel
+# serial date. The holiday rules are only evaluated for the blocks of years
+# around the dates which are actually queried, and each block is cached once
+# it has been built. Joint calendars OR these bitmaps together and then remove
+# weekends to give a business day bitmap and a cumulative count of business
+# days. The bitmaps start in 1900 and are extended by further blocks of years
+# whenever a date outside the blocks built so far is used.
+###############################################################################
+
+_BITMAP_START_YEAR = 1900
+_BITMAP_BLOCK_YEARS = 10
+
+# Number of days either side of a date which is included when the bitmap is
+# extended so that an adjustment does not step off the end of the bitmap
+_BITMAP_MARGIN_DAYS = 31
+
+_holiday_blocks = {}
+_business_day_index = {}
+
+# Index of a calendar for which no bitmap has been built yet
+_EMPTY_INDEX = (None, None, None, 1, 0)
+
+
+def _calendar_types_key(cal_types):
+    """ Canonical key for a single or joint calendar. """
+    return tuple(sorted(set(cal_types), key=lambda c: c.value))
+
+###############################################################################
+
+
+def _block_range(block):
+    """ Return the first and last Excel serial dates of a block of years. """
+
+    y = _BITMAP_START_YEAR + block * _BITMAP_BLOCK_YEARS
+    first = dmy_to_excel_serial(1, 1, y)
+    last = dmy_to_excel_serial(31, 12, y + _BITMAP_BLOCK_YEARS - 1)
+    return first, last
+
+###############################################################################
+
+
+def _serial_block(s):
+    """ Return the block of years containing an Excel serial date. """
+
+    _, _, y = excel_serial_to_dmy(max(s, 1))
+    return (y - _BITMAP_START_YEAR) // _BITMAP_BLOCK_YEARS
+
+###############################################################################
+
+
+def _holiday_block(cal_type, block):
+    """ Return the cached boolean array which is True on the holidays of a
+    single calendar type in a block of years. It is indexed from the first
+    Excel serial date of the block and is built once by evaluating the
+    holiday rules on every date in the block. """
+
+    key = (cal_type, block)
+
+    if key in _holiday_blocks:
+        return _holiday_blocks[key]
+
+    first, last = _block_range(block)
+    serials = np.arange(first, last + 1, dtype=np.int32)
+    dd, mm, yy = _vdmy(serials)
+
+    holidays = np.zeros(len(serials), dtype=np.bool_)
+
+    if cal_type != CalendarTypes.NONE:
+
+        cal = Calendar(cal_type)
+        current_year = 0
+        year_start = 0
+
+        for s, d, m, y in zip(serials.tolist(), dd.tolist(),
+                              mm.tolist(), yy.tolist()):
+
+            if y != current_year:
+                current_year = y
+                year_start = dmy_to_excel_serial(1, 1, y)
+
+            cal._y = y
+            cal._m = m
+            cal._d = d
+            cal._day_in_year = s - year_start + 1
+            cal._weekday = (s + 5) % 7
+            holidays[s - first] = cal._holiday_rule(cal_type)
+
+    holidays.flags.writeable = False
+    _holiday_blocks[key] = holidays
+    return holidays
+
+###############################################################################
+
+
+def _business_days(key, first_serial, last_serial):
+    """ Return the cached holiday bitmap, business day bitmap and cumulative
+    business day count of the calendar with this canonical key, together
+    with the first and last Excel serial dates which they cover. The arrays
+    are indexed by Excel serial date and are built over a contiguous run of
+    blocks of years which covers the dates from first_serial to last_serial.
+    If the run does not cover these dates it is extended and the arrays are
+    rebuilt. Before the run the business day bitmap is False and the
+    cumulative count is zero so that the bitmap kernels return -1. The
+    holiday bitmaps of the calendars are OR-ed together and weekends are
+    then removed. """
+
+    first_serial = max(first_serial, 1)
+
+    if key in _business_day_index:
+
+        index = _business_day_index[key]
+
+        if index[3] <= first_serial and last_serial <= index[4]:
+            return index
+
+        first_serial = min(first_serial, index[3])
+        last_serial = max(last_serial, index[4])
+
+    first_block = _serial_block(first_serial)
+    last_block = _serial_block(last_serial)
+
+    start, _ = _block_range(first_block)
+    _, end = _block_range(last_block)
+
+    holidays = np.zeros(end + 1, dtype=np.bool_)
+
+    for block in range(first_block, last_block + 1):
+        first, last = _block_range(block)
+        for cal_type in key:
+            holidays[first:last + 1] |= _holiday_block(cal_type, block)
+
+    serials = np.arange(0, len(holidays))
+    weekend = (serials + 5) % 7 >= 5
+    bus_days = ~(holidays | weekend)
+
+    # Only the dates in the blocks which have been built are business days
+    bus_days[:start] = False
+    bus_days[0] = False
+
+    # Excel serial date 60 is the non-existent 29th of February 1900
+    if len(bus_days) > 60:
+        bus_days[60] = False
+
+    cum_bus_days = np.cumsum(bus_days, dtype=np.int64)
+
+    holidays.flags.writeable = False
+    bus_days.flags.writeable = False
+    cum_bus_days.flags.writeable = False
+
+    index = (holidays, bus_days, cum_bus_days, max(start, 1), end)
+    _business_day_index[key] = index
+    return index
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _adjust_serial(s, bus_days, adj_type):
+    """ Adjust a single Excel serial date using a business day bitmap and the
+    integer value of the BusDayAdjustTypes. Returns -1 if the adjustment would
+    step outside the bitmap. """
+
+    n = len(bus_days)
+
+    if s < 1 or s >= n:
+        return -1
+
+    if adj_type == 1 or bus_days[s]:
+        return s
+
+    t = s
+
+    if adj_type == 2 or adj_type == 3:
+        while t < n - 1 and not bus_days[t]:
+            t += 1
+    else:
+        while t > 0 and not bus_days[t]:
+            t -= 1
+
+    if not bus_days[t]:
+        return -1
+
+    if adj_type == 3 or adj_type == 5:
+
+        _, m_start, _ = excel_serial_to_dmy(s)
+        _, m_end, _ = excel_serial_to_dmy(t)
+
+        # If we have crossed into a new month go the other way instead
+        if m_start != m_end:
+
+            t = s
+
+            if adj_type == 3:
+                while t > 0 and not bus_days[t]:
+                    t -= 1
+            else:
+                while t < n - 1 and not bus_days[t]:
+                    t += 1
+
+            if not bus_days[t]:
+                return -1
+
+    return t
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _vadjust(serials, bus_days, adj_type):
+    """ Adjust an array of Excel serial dates using a business day bitmap.
+    Returns -1 for any date whose adjustment would step outside the bitmap. """
+
+    n = len(serials)
+    adjusted = np.empty(n, dtype=np.int32)
+
+    for i in range(0, n):
+        adjusted[i] = _adjust_serial(serials[i], bus_days, adj_type)
+
+    return adjusted
+
+###############################################################################
 
 
 class Calendar:
@@ -84,34 +306,147 @@ class Calendar:
     a regional or country-specific calendar convention specified by the user.
     It also supplies an adjustment method which takes in an adjustment
     convention and then applies that to any date that falls on a holiday in the
-    specified calendar. """
+    specified calendar. A list of calendar types can be passed in to create a
+    joint calendar in which a date is a holiday if it is a holiday in any of
+    the calendars. """
 
     def __init__(self,
-                 cal_type: CalendarTypes):
-        """ Create a calendar based on a specified calendar type. """
+                 cal_type: (CalendarTypes, list)):
+        """ Create a calendar based on a specified calendar type or a list of
+        calendar types for a joint calendar. """
 
-        if cal_type not in CalendarTypes:
-            raise FinError(
-                "Need to pass FinCalendarType and not " +
-                str(cal_type))
+        if isinstance(cal_type, (list, tuple)):
+            cal_types = list(cal_type)
+        else:
+            cal_types = [cal_type]
+
+        if len(cal_types) == 0:
+            raise FinError("Need to pass at least one FinCalendarType")
+
+        for ct in cal_types:
+            if not isinstance(ct, CalendarTypes):
+                raise FinError(
+                    "Need to pass FinCalendarType and not " +
+                    str(ct))
+
+        self._cal_types = _calendar_types_key(cal_types)
+
+        if len(self._cal_types) == 1:
+            self._cal_type = self._cal_types[0]
+        else:
+            self._cal_type = self._cal_types
+
+        self._bus_day_index = _business_day_index.get(self._cal_types,
+                                                      _EMPTY_INDEX)
 
-        self._cal_type = cal_type
+    ###########################################################################
+
+    def _business_day_index(self,
+                            first_serial: int,
+                            last_serial: int):
+        """ Return the holiday bitmap, business day bitmap and cumulative
+        business day count for this calendar together with the first and
+        last Excel serial dates they cover. These cover at least the dates
+        from first_serial to last_serial. They are built on first use and
+        shared by all calendars of the same type, and are only extended
+        when a date outside the range built so far is used. """
+
+        index = self._bus_day_index
+
+        if first_serial < index[3] or last_serial > index[4]:
+            index = _business_days(self._cal_types,
+                                   first_serial - _BITMAP_MARGIN_DAYS,
+                                   last_serial + _BITMAP_MARGIN_DAYS)
+            self._bus_day_index = index
+
+        return index
 
     ###########################################################################
 
     def adjust(self,
-               dt: Date,
+               dt: (Date, DateArray, np.ndarray),
                bd_adjust_type: BusDayAdjustTypes):
         """ Adjust a payment date if it falls on a holiday according to the
-        specified business day convention. """
+        specified business day convention. A DateArray or an array of Excel
+        serial dates can also be passed in, in which case all of the dates are
+        adjusted in one vectorised call and the same type is returned. """
 
         if type(bd_adjust_type) != BusDayAdjustTypes:
             raise FinError("Invalid type passed. Need Finbd_adjust_type")
 
+        if isinstance(dt, (DateArray, np.ndarray)):
+            return self._adjust_array(dt, bd_adjust_type)
+
         # If calendar type is NONE then every day is a business day
         if self._cal_type == CalendarTypes.NONE:
             return dt
 
+        if bd_adjust_type == BusDayAdjustTypes.NONE:
+            return dt
+
+        s = int(dt._excel_date)
+        index = self._bus_day_index
+
+        if s < index[3] or s > index[4]:
+            index = self._business_day_index(s, s)
+
+        bus_days = index[1]
+
+        if bus_days[s]:
+            return dt
+
+        t = _adjust_serial(s, bus_days, bd_adjust_type.value)
+
+        if t == s:
+            return dt
+        elif t > 0:
+            return dt.add_days(t - s)
+
+        return self._adjust_by_rules(dt, bd_adjust_type)
+
+    ###########################################################################
+
+    def _adjust_array(self,
+                      dates: (DateArray, np.ndarray),
+                      bd_adjust_type: BusDayAdjustTypes):
+        """ Adjust an array of dates using the business day bitmap. Any date
+        whose adjustment leaves the range of the bitmap is adjusted using the
+        holiday rules. """
+
+        if isinstance(dates, DateArray):
+            serials = dates._serials
+        else:
+            serials = np.ascontiguousarray(dates, dtype=np.int32)
+
+        if self._cal_type == CalendarTypes.NONE or \
+                bd_adjust_type == BusDayAdjustTypes.NONE:
+            adjusted = serials.copy()
+        elif len(serials) == 0:
+            adjusted = serials.copy()
+        else:
+            _, bus_days, _, _, _ = \
+                self._business_day_index(int(serials.min()),
+                                         int(serials.max()))
+            adjusted = _vadjust(serials, bus_days, bd_adjust_type.value)
+
+            for i in np.nonzero(adjusted < 0)[0]:
+                dt = Date.from_excel(serials[i])
+                dt = self._adjust_by_rules(dt, bd_adjust_type)
+                adjusted[i] = int(dt._excel_date)
+
+        if isinstance(dates, DateArray):
+            return DateArray.from_serials(adjusted)
+
+        return adjusted
+
+    ###########################################################################
+
+    def _adjust_by_rules(self,
+                         dt: Date,
+                         bd_adjust_type: BusDayAdjustTypes):
+        """ Adjust a date by stepping one day at a time. This is only used for
+        dates outside the range covered by the business day bitmap. """
+
         if bd_adjust_type == BusDayAdjustTypes.NONE:
             return dt
 
@@ -135,7 +470,6 @@ class Calendar:
 
             # if the business day is in a different month look back
             # for previous first business day one day at a time
-            # TODO: I could speed this up by starting it at initial date
             if dt._m != m_start:
                 dt = Date(d_start, m_start, y_start)
                 while self.is_business_day(dt) is False:
@@ -164,7 +498,6 @@ class Calendar:
 
             # if the business day is in a different month look forward
             # for previous first business day one day at a time
-            # I could speed this up by starting it at initial date
             if dt._m != m_start:
                 dt = Date(d_start, m_start, y_start)
                 while self.is_business_day(dt) is False:
@@ -177,21 +510,47 @@ class Calendar:
             raise FinError("Unknown adjustment convention" +
                            str(bd_adjust_type))
 
-        return dt
-
 ###############################################################################
 
     def add_business_days(self,
                           start_date: Date,
                           numDays: int):
         """ Returns a new date that is numDays business days after Date.
-        All holidays in the chosen calendar are assumed not business days. """
-
-        # TODO: REMOVE DATETIME DEPENDENCE HERE ???
+        All holidays in the chosen calendar are assumed not business days.
+        This uses the cumulative count of business days so it takes the same
+        time however many days are added. """
 
         if isinstance(numDays, int) is False:
             raise FinError("Num days must be an integer")
 
+        if numDays == 0:
+            return Date(start_date._d, start_date._m, start_date._y)
+
+        s = int(start_date._excel_date)
+
+        # Five business days take at most seven days plus some holidays
+        if numDays > 0:
+            last = s + 2 * numDays
+            first = s
+        else:
+            last = s
+            first = s + 2 * numDays
+
+        _, _, cum_bus_days, _, _ = self._business_day_index(first, last)
+
+        if s > 0:
+
+            # The target date is the first date at which the cumulative count
+            # reaches the required number of business days
+            if numDays > 0:
+                target = cum_bus_days[s] + numDays
+            else:
+                target = cum_bus_days[s - 1] + numDays + 1
+
+            if target > 0 and target <= cum_bus_days[-1]:
+                t = np.searchsorted(cum_bus_days, target)
+                return Date.from_excel(t)
+
         dt = datetime.date(start_date._y, start_date._m, start_date._d)
         d = dt.day
         m = dt.month
@@ -222,15 +581,13 @@ class Calendar:
         """ Determines if a date is a business day according to the specified
         calendar. If it is it returns True, otherwise False. """
 
-        # For all calendars so far, SAT and SUN are not business days
-        # If this ever changes I will need to add a filter here.
-        if dt.is_weekend():
-            return False
+        s = int(dt._excel_date)
+        index = self._bus_day_index
 
-        if self.is_holiday(dt) is True:
-            return False
-        else:
-            return True
+        if s < index[3] or s > index[4]:
+            index = self._business_day_index(s, s)
+
+        return bool(index[1][s])
 
 ###############################################################################
 
@@ -240,49 +597,53 @@ class Calendar:
         calendar. Weekends are not holidays unless the holiday falls on a
         weekend date. """
 
-        start_date = Date(1, 1, dt._y)
-        day_in_year = dt._excel_date - start_date._excel_date + 1
-        weekday = dt._weekday
+        s = int(dt._excel_date)
+        index = self._bus_day_index
 
-        self._y = dt._y
-        self._m = dt._m
-        self._d = dt._d
-        self._day_in_year = day_in_year
-        self._weekday = weekday
-        self._dt = dt
+        if s < index[3] or s > index[4]:
+            index = self._business_day_index(s, s)
 
-        if self._cal_type == CalendarTypes.NONE:
+        return bool(index[0][s])
+
+###############################################################################
+
+    def _holiday_rule(self,
+                      cal_type: CalendarTypes):
+        """ Apply the holiday rules of a single calendar type to the date
+        which has been unpacked into this object. """
+
+        if cal_type == CalendarTypes.NONE:
             return self.holiday_none()
-        elif self._cal_type == CalendarTypes.WEEKEND:
+        elif cal_type == CalendarTypes.WEEKEND:
             return self.holiday_weekend()
-        elif self._cal_type == CalendarTypes.AUSTRALIA:
+        elif cal_type == CalendarTypes.AUSTRALIA:
             return self.holiday_australia()
-        elif self._cal_type == CalendarTypes.CANADA:
+        elif cal_type == CalendarTypes.CANADA:
             return self.holiday_canada()
-        elif self._cal_type == CalendarTypes.FRANCE:
+        elif cal_type == CalendarTypes.FRANCE:
             return self.holiday_france()
-        elif self._cal_type == CalendarTypes.GERMANY:
+        elif cal_type == CalendarTypes.GERMANY:
             return self.holiday_germany()
-        elif self._cal_type == CalendarTypes.ITALY:
+        elif cal_type == CalendarTypes.ITALY:
             return self.holiday_italy()
-        elif self._cal_type == CalendarTypes.JAPAN:
+        elif cal_type == CalendarTypes.JAPAN:
             return self.holiday_japan()
-        elif self._cal_type == CalendarTypes.NEW_ZEALAND:
+        elif cal_type == CalendarTypes.NEW_ZEALAND:
             return self.holiday_new_zealand()
-        elif self._cal_type == CalendarTypes.NORWAY:
+        elif cal_type == CalendarTypes.NORWAY:
             return self.holiday_norway()
-        elif self._cal_type == CalendarTypes.SWEDEN:
+        elif cal_type == CalendarTypes.SWEDEN:
             return self.holiday_sweden()
-        elif self._cal_type == CalendarTypes.SWITZERLAND:
+        elif cal_type == CalendarTypes.SWITZERLAND:
             return self.holiday_switzerland()
-        elif self._cal_type == CalendarTypes.TARGET:
+        elif cal_type == CalendarTypes.TARGET:
             return self.holiday_target()
-        elif self._cal_type == CalendarTypes.UNITED_KINGDOM:
+        elif cal_type == CalendarTypes.UNITED_KINGDOM:
             return self.holiday_united_kingdom()
-        elif self._cal_type == CalendarTypes.UNITED_STATES:
+        elif cal_type == CalendarTypes.UNITED_STATES:
             return self.holiday_united_states()
         else:
-            print(self._cal_type)
+            print(cal_type)
             raise FinError("Unknown calendar")
 
 ###############################################################################
@@ -290,7 +651,7 @@ class Calendar:
     def holiday_weekend(self):
         """ Weekends by themselves are a holiday. """
 
-        if self._dt.is_weekend():
+        if self._weekday == Date.SAT or self._weekday == Date.SUN:
             return True
         else:
             return False
@@ -1099,7 +1460,7 @@ class Calendar:
 ###############################################################################
 
     def __str__(self):
-        s = self._cal_type.name
+        s = "+".join([cal_type.name for cal_type in self._cal_types])
         return s
 
 ###############################################################################
@@ -190,10 +190,171 @@ def weekday(day_count):
     return weekday
 
 ###############################################################################
+# These functions map between the Excel serial number used as the internal
+# representation of a Date and its day, month and year without going through
+# the padded lookup list. They can be called from inside numba so that arrays
+# of dates held as serial numbers can be processed without creating Dates.
+# Serial 60 is the fictitious 29 Feb 1900 that Excel inherited from Lotus.
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def excel_serial_to_dmy(serial):
+    """ Convert an Excel serial date number to a (day, month, year) tuple. """
+
+    s = int(serial)
+
+    if s <= 31:
+        return (s, 1, 1900)
+    elif s <= 60:
+        return (s - 31, 2, 1900)
+
+    # Days since 1 Mar 0000 in the proleptic Gregorian calendar
+    z = s - 25569 + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    d = doy - (153 * mp + 2) // 5 + 1
+
+    if mp < 10:
+        m = mp + 3
+    else:
+        m = mp - 9
+
+    y = yoe + era * 400
+    if m <= 2:
+        y += 1
+
+    return (d, m, y)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def dmy_to_excel_serial(d, m, y):
+    """ Convert a day, month and year to its Excel serial date number. """
+
+    if y == 1900 and m <= 2:
+        return (m - 1) * 31 + d
+
+    if m <= 2:
+        y -= 1
+
+    era = y // 400
+    yoe = y - era * 400
+
+    if m > 2:
+        mp = m - 3
+    else:
+        mp = m + 9
+
+    doy = (153 * mp + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468 + 25569
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _days_in_month(m, y):
+    """ Number of days in month m of year y for use inside numba. """
+    if m == 2:
+        if (y % 4 == 0) and (y % 100 != 0) or (y % 400 == 0):
+            return 29
+        return 28
+    elif m == 4 or m == 6 or m == 9 or m == 11:
+        return 30
+    return 31
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _add_months(serial, num_months):
+    """ Add a number of months to an Excel serial date in the same way as
+    Date.add_months, moving the day back to the end of a short month. """
+
+    d, m, y = excel_serial_to_dmy(serial)
+
+    m = m + num_months
+    y = y + (m - 1) // 12
+    m = (m - 1) % 12 + 1
+
+    d = min(d, _days_in_month(m, y))
+    return dmy_to_excel_serial(d, m, y)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _vadd_months(serials, num_months, fix_feb29):
+    """ Add a number of months to an array of Excel serial dates. If the new
+    month is too short the day is set to the last day of that month. If the
+    fix_feb29 flag is set then a 29 Feb start date always lands on the 28th
+    as happens when stepping forward one year at a time. """
+
+    n = len(serials)
+    new_serials = np.empty(n, dtype=np.int32)
+
+    for i in range(0, n):
+
+        d, m, y = excel_serial_to_dmy(serials[i])
+
+        if fix_feb29 and d == 29 and m == 2 and num_months[i] != 0:
+            d = 28
+
+        m = m + num_months[i]
+        y = y + (m - 1) // 12
+        m = (m - 1) % 12 + 1
+
+        d = min(d, _days_in_month(m, y))
+        new_serials[i] = dmy_to_excel_serial(d, m, y)
+
+    return new_serials
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _veom(serials):
+    """ Return the last date of the month for each serial date. """
+
+    n = len(serials)
+    new_serials = np.empty(n, dtype=np.int32)
+
+    for i in range(0, n):
+        d, m, y = excel_serial_to_dmy(serials[i])
+        new_serials[i] = dmy_to_excel_serial(_days_in_month(m, y), m, y)
+
+    return new_serials
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _vdmy(serials):
+    """ Split an array of Excel serial dates into day, month, year arrays. """
+
+    n = len(serials)
+    dd = np.empty(n, dtype=np.int32)
+    mm = np.empty(n, dtype=np.int32)
+    yy = np.empty(n, dtype=np.int32)
+
+    for i in range(0, n):
+        dd[i], mm[i], yy[i] = excel_serial_to_dmy(serials[i])
+
+    return dd, mm, yy
+
+###############################################################################
 
 
 def vectorisation_helper(func):
     def wrapper(self_, other):
+        if isinstance(other, DateArray):
+            # Let the DateArray handle the operation with reflected methods
+            return NotImplemented
         if isinstance(other, Iterable):
             # Store the type of other, then cast the output to be the same type
             output_type = type(other)
@@ -216,6 +377,10 @@ class Date():
     SAT = 5
     SUN = 6
 
+    # Dates are created in very large numbers so we avoid a per-object dict
+    __slots__ = ('_y', '_m', '_d', '_hh', '_mm', '_ss',
+                 '_excel_date', '_weekday')
+
     ###########################################################################
 
     def __init__(self, d, m, y, hh=0, mm=0, ss=0):
@@ -331,6 +496,26 @@ class Date():
             d, m, y = date.day, date.month, date.year
             return cls(d, m, y)
 
+    ###########################################################################
+
+    @classmethod
+    def from_excel(cls, serial: int):
+        """ Create a Date from its Excel serial date number. This bypasses the
+        validation done in the constructor and so is fast enough to be used
+        when unpacking large arrays of dates.
+        Example Input:
+        start_date = Date.from_excel(43466) """
+
+        serial = int(serial)
+        dt = cls.__new__(cls)
+        dt._d, dt._m, dt._y = excel_serial_to_dmy(serial)
+        dt._hh = 0
+        dt._mm = 0
+        dt._ss = 0
+        dt._excel_date = float(serial)
+        dt._weekday = (serial + 5) % 7
+        return dt
+
     ###########################################################################
     def _refresh(self):
         """ Update internal representation of date as number of days since the
@@ -966,6 +1151,317 @@ class Date():
         print(self)
 
 
+###############################################################################
+# Compact array of dates
+###############################################################################
+
+
+class DateArray():
+    """ A compact container for a sequence of dates. The dates are held as a
+    contiguous int32 buffer of Excel serial numbers rather than as a list of
+    Date objects which greatly reduces memory and garbage collection costs
+    when very many cash flow dates are held. It behaves like a list of Dates
+    when indexed or iterated, creating a Date only when an element is
+    accessed. Slicing returns a DateArray. It also provides vectorised date
+    arithmetic. Any intraday time on a Date is dropped when it is stored. """
+
+    __slots__ = ('_serials',)
+
+    ###########################################################################
+
+    def __init__(self, dates=None):
+        """ Create a DateArray from a list of Dates, another DateArray or a
+        Numpy array of integer Excel serial dates.
+
+        Example Input:
+        dates = DateArray([Date(1, 1, 2020), Date(1, 7, 2020)]) """
+
+        if dates is None:
+            self._serials = np.zeros(0, dtype=np.int32)
+        elif isinstance(dates, DateArray):
+            self._serials = dates._serials.copy()
+        elif isinstance(dates, np.ndarray):
+            if not np.issubdtype(dates.dtype, np.integer):
+                raise FinError("DateArray needs an integer array of serials")
+            self._serials = np.ascontiguousarray(dates, dtype=np.int32)
+        elif isinstance(dates, Date):
+            self._serials = np.array([dates._excel_date], dtype=np.int32)
+        else:
+            serials = []
+            for dt in dates:
+                if isinstance(dt, Date) is False:
+                    raise FinError("DateArray can only hold Dates")
+                serials.append(int(dt._excel_date))
+            self._serials = np.array(serials, dtype=np.int32)
+
+    ###########################################################################
+
+    @classmethod
+    def from_serials(cls, serials: np.ndarray):
+        """ Create a DateArray which takes ownership of an array of integer
+        Excel serial dates without copying it if it is already int32. """
+
+        da = cls.__new__(cls)
+        da._serials = np.ascontiguousarray(serials, dtype=np.int32)
+        return da
+
+    ###########################################################################
+
+    def to_list(self):
+        """ Return the dates as a list of Date objects. """
+        return [Date.from_excel(s) for s in self._serials.tolist()]
+
+    ###########################################################################
+
+    def serials(self):
+        """ Return the underlying int32 array of Excel serial dates. """
+        return self._serials
+
+    ###########################################################################
+
+    def __len__(self):
+        return len(self._serials)
+
+    ###########################################################################
+
+    def __iter__(self):
+        for s in self._serials.tolist():
+            yield Date.from_excel(s)
+
+    ###########################################################################
+
+    def __reversed__(self):
+        for s in reversed(self._serials.tolist()):
+            yield Date.from_excel(s)
+
+    ###########################################################################
+
+    def __getitem__(self, idx):
+        """ An integer index returns a Date. A slice, mask or array of
+        indices returns a new DateArray. """
+
+        if isinstance(idx, (int, np.integer)):
+            return Date.from_excel(self._serials[idx])
+
+        return DateArray.from_serials(self._serials[idx])
+
+    ###########################################################################
+
+    def __setitem__(self, idx, dt):
+        if isinstance(dt, Date):
+            self._serials[idx] = int(dt._excel_date)
+        elif isinstance(dt, DateArray):
+            self._serials[idx] = dt._serials
+        else:
+            self._serials[idx] = DateArray(dt)._serials
+
+    ###########################################################################
+
+    def __contains__(self, dt):
+        if isinstance(dt, Date) is False:
+            return False
+        return bool(np.any(self._serials == int(dt._excel_date)))
+
+    ###########################################################################
+
+    def append(self, dt: Date):
+        """ Append a date. This copies the buffer and so should not be used
+        to build up a large array one date at a time. """
+
+        self._serials = np.append(self._serials,
+                                  np.int32(int(dt._excel_date)))
+
+    ###########################################################################
+
+    def copy(self):
+        return DateArray.from_serials(self._serials.copy())
+
+    ###########################################################################
+
+    def _other_serials(self, other):
+        """ Convert the other operand of a comparison or difference to serial
+        dates, keeping any intraday fraction on a single Date. """
+
+        if isinstance(other, Date):
+            return other._excel_date
+        elif isinstance(other, DateArray):
+            other_serials = other._serials
+        elif isinstance(other, (list, tuple)):
+            other_serials = DateArray(other)._serials
+        elif isinstance(other, np.ndarray):
+            other_serials = other
+        else:
+            raise FinError("Cannot compare a DateArray with " +
+                           str(type(other)))
+
+        if other_serials.ndim > 0 and len(other_serials) != len(self):
+            raise FinError("Cannot compare DateArrays of different lengths")
+
+        return other_serials
+
+    ###########################################################################
+    # Comparisons with a Date or a sequence of dates of the same length are
+    # elementwise and return a Numpy boolean array, as they do for a Numpy
+    # array. Use np.all or compare to_list() to test a whole array of dates.
+    ###########################################################################
+
+    def __gt__(self, other):
+        return self._serials > self._other_serials(other)
+
+    def __lt__(self, other):
+        return self._serials < self._other_serials(other)
+
+    def __ge__(self, other):
+        return self._serials >= self._other_serials(other)
+
+    def __le__(self, other):
+        return self._serials <= self._other_serials(other)
+
+    def __eq__(self, other):
+        if not isinstance(other, _DATE_OPERAND_TYPES):
+            return NotImplemented
+        return self._serials == self._other_serials(other)
+
+    def __ne__(self, other):
+        if not isinstance(other, _DATE_OPERAND_TYPES):
+            return NotImplemented
+        return self._serials != self._other_serials(other)
+
+    __hash__ = None
+
+    ###########################################################################
+
+    def __sub__(self, other):
+        """ Return the number of days between each date and another Date or
+        the elementwise number of days between two date arrays. """
+        return self._serials - self._other_serials(other)
+
+    ###########################################################################
+
+    def __rsub__(self, other):
+        return self._other_serials(other) - self._serials
+
+    ###########################################################################
+
+    def add_days(self, num_days: (int, np.ndarray)):
+        """ Returns a new DateArray with each date moved by num_days calendar
+        days. The number of days can differ by element. """
+
+        num_days = np.asarray(num_days, dtype=np.int32)
+        return DateArray.from_serials(self._serials + num_days)
+
+    ###########################################################################
+
+    def add_months(self, mm: (int, np.ndarray)):
+        """ Returns a new DateArray with each date moved by mm months. As in
+        Date.add_months the day is reduced to the end of the month if the new
+        month is too short. The number of months can differ by element. """
+
+        num_months = np.broadcast_to(np.asarray(mm, dtype=np.int64),
+                                     self._serials.shape)
+        num_months = np.ascontiguousarray(num_months)
+        return DateArray.from_serials(_vadd_months(self._serials,
+                                                   num_months, False))
+
+    ###########################################################################
+
+    def add_years(self, yy: (int, np.ndarray)):
+        """ Returns a new DateArray with each date moved by a whole number of
+        years as in Date.add_years. Fractional years are not supported. """
+
+        yy = np.asarray(yy)
+        if np.any(yy != np.floor(yy)):
+            raise FinError("DateArray can only add whole numbers of years.")
+
+        return self.add_months(12 * yy.astype(np.int64))
+
+    ###########################################################################
+
+    def add_tenor(self, tenor: (str, np.ndarray), period: str = None):
+        """ Return a new DateArray with every date moved by a tenor string
+        such as '3M' or '10Y'. This gives the same dates as calling add_tenor
+        on each Date. Alternatively pass an array with the number of periods
+        for each date and a period letter D, W, M or Y. """
+
+        if isinstance(tenor, str):
+
+            ten_str = tenor.upper()
+
+            if ten_str == "ON" or ten_str == "TN":
+                period = "D"
+                num_periods = 1
+            elif ten_str[-1] in ("D", "W", "M", "Y"):
+                period = ten_str[-1]
+                num_periods = int(ten_str[0:-1])
+            else:
+                raise FinError("Unknown tenor type in " + tenor)
+
+        else:
+
+            if period is None:
+                raise FinError("Need a period letter with a periods array")
+
+            period = period.upper()
+            num_periods = np.asarray(tenor, dtype=np.int64)
+
+        num_periods = np.ascontiguousarray(
+            np.broadcast_to(num_periods, self._serials.shape), dtype=np.int64)
+
+        if period == "D":
+            serials = self._serials + num_periods
+        elif period == "W":
+            serials = self._serials + 7 * num_periods
+        elif period == "M":
+            serials = _vadd_months(self._serials, num_periods, False)
+        elif period == "Y":
+            # Date.add_tenor steps one year at a time so 29 Feb becomes 28 Feb
+            serials = _vadd_months(self._serials, 12 * num_periods, True)
+        else:
+            raise FinError("Unknown tenor period " + period)
+
+        return DateArray.from_serials(serials)
+
+    ###########################################################################
+
+    def eom(self):
+        """ Returns a DateArray of the last date of the month of each date. """
+        return DateArray.from_serials(_veom(self._serials))
+
+    ###########################################################################
+
+    def is_eom(self):
+        """ Returns a boolean array which is True where the date falls on a
+        month end. """
+        return self._serials == _veom(self._serials)
+
+    ###########################################################################
+
+    def weekday(self):
+        """ Returns an array of weekday numbers with Monday equal to 0. """
+        return (self._serials + 5) % 7
+
+    ###########################################################################
+
+    def is_weekend(self):
+        """ Returns a boolean array which is True on Saturday and Sunday. """
+        return self.weekday() >= Date.SAT
+
+    ###########################################################################
+
+    def dmy(self):
+        """ Returns a tuple of arrays of the days, months and years. """
+        return _vdmy(self._serials)
+
+    ###########################################################################
+
+    def __repr__(self):
+        """ Print in the same way as a list of Dates. """
+        return str(self.to_list())
+
+
+# Operands a DateArray can be compared with
+_DATE_OPERAND_TYPES = (Date, DateArray, list, tuple, np.ndarray)
+
 ###############################################################################
 # Date functions that are not class members but are useful
 ###############################################################################
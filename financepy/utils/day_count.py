@@ -2,8 +2,11 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-from .date import Date, monthDaysLeapYear, monthDaysNotLeapYear, datediff
-from .date import is_leap_year
+import numpy as np
+from numba import njit
+
+from .date import Date, DateArray, monthDaysLeapYear, monthDaysNotLeapYear, datediff
+from .date import is_leap_year, excel_serial_to_dmy, dmy_to_excel_serial
 from .error import FinError
 from .frequency import FrequencyTypes, annual_frequency
 from .global_vars import gDaysInYear
@@ -61,18 +64,193 @@ class DayCountTypes(Enum):
 ###############################################################################
 
 
+@njit(fastmath=True, cache=True)
+def _is_leap_year(y):
+    """ Numba version of is_leap_year for use inside compiled kernels. """
+    return ((y % 4 == 0) and (y % 100 != 0) or (y % 400 == 0))
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _is_last_day_of_feb(d, m, y):
+    """ Numba version of is_last_day_of_feb taking a day, month and year. """
+    if m != 2:
+        return False
+    if _is_leap_year(y):
+        return d == 29
+    return d == 28
+
+###############################################################################
+
+
+# This is not compiled with fastmath so that the year fractions are exactly
+# the same as those calculated by DayCount.year_frac
+@njit(cache=True)
+def _vyear_frac(dc_type, s1, s2, s3, freq, is_termination_date,
+                days_in_year):
+    """ Vectorised year fraction between two arrays of Excel serial dates
+    using the day count convention whose DayCountTypes value is dc_type. This
+    reproduces DayCount.year_frac for every convention. The array s3 holds
+    the next coupon dates for ACT_ACT_ICMA and ACT_365L and freq is the annual
+    coupon frequency. The dates may include an intraday fraction. Returns the
+    arrays of year fractions, numerators and denominators. """
+
+    n = len(s1)
+    acc_factors = np.empty(n)
+    nums = np.empty(n)
+    dens = np.empty(n)
+
+    for i in range(0, n):
+
+        d1, m1, y1 = excel_serial_to_dmy(s1[i])
+        d2, m2, y2 = excel_serial_to_dmy(s2[i])
+
+        if dc_type == 1 or dc_type == 2 or dc_type == 3 or dc_type == 4:
+
+            if d1 == 31:
+                d1 = 30
+
+            if dc_type == 1:  # THIRTY_360_BOND
+                if d2 == 31 and d1 == 30:
+                    d2 = 30
+            elif dc_type == 2:  # THIRTY_E_360
+                if d2 == 31:
+                    d2 = 30
+            elif dc_type == 3:  # THIRTY_E_360_ISDA
+                if _is_last_day_of_feb(d1, m1, y1):
+                    d1 = 30
+                if d2 == 31:
+                    d2 = 30
+                if _is_last_day_of_feb(d2, m2, y2) and \
+                        not is_termination_date[i]:
+                    d2 = 30
+            else:  # THIRTY_E_PLUS_360
+                if d2 == 31:
+                    m2 = m2 + 1
+                    d2 = 1
+
+            nums[i] = 360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)
+            dens[i] = 360.0
+
+        elif dc_type == 5 or dc_type == 0:  # ACT_ACT_ISDA or ZERO
+
+            if _is_leap_year(y1):
+                denom1 = 366.0
+            else:
+                denom1 = 365.0
+
+            if _is_leap_year(y2):
+                denom2 = 366.0
+            else:
+                denom2 = 365.0
+
+            if y1 == y2:
+                nums[i] = s2[i] - s1[i]
+                dens[i] = denom1
+            else:
+                daysYear1 = int(dmy_to_excel_serial(1, 1, y1 + 1) - s1[i])
+                daysYear2 = int(s2[i] - dmy_to_excel_serial(1, 1, y2))
+                # Note that num/den does not equal acc_factor
+                nums[i] = daysYear1 + daysYear2
+                dens[i] = denom1 + denom2
+                acc_factors[i] = daysYear1 / denom1 + daysYear2 / denom2 \
+                    + (y2 - y1 - 1.0)
+                continue
+
+        elif dc_type == 6:  # ACT_ACT_ICMA
+            nums[i] = s2[i] - s1[i]
+            dens[i] = freq * (s3[i] - s1[i])
+
+        elif dc_type == 7:  # ACT_365F
+            nums[i] = s2[i] - s1[i]
+            dens[i] = 365.0
+
+        elif dc_type == 8:  # ACT_360
+            nums[i] = s2[i] - s1[i]
+            dens[i] = 360.0
+
+        elif dc_type == 9:  # ACT_365L
+
+            _, _, y3 = excel_serial_to_dmy(s3[i])
+
+            nums[i] = s2[i] - s1[i]
+            dens[i] = 365.0
+
+            if _is_leap_year(y1):
+                feb29 = dmy_to_excel_serial(29, 2, y1)
+            elif _is_leap_year(y3):
+                feb29 = dmy_to_excel_serial(29, 2, y3)
+            else:
+                feb29 = 1
+
+            if freq == 1.0:
+                if feb29 > s1[i] and feb29 <= s3[i]:
+                    dens[i] = 366.0
+            else:
+                if _is_leap_year(y3):
+                    dens[i] = 366.0
+
+        else:  # SIMPLE
+            nums[i] = s2[i] - s1[i]
+            dens[i] = days_in_year
+
+        acc_factors[i] = nums[i] / dens[i]
+
+    return acc_factors, nums, dens
+
+###############################################################################
+
+
+def _to_serials(dates):
+    """ Convert a Date, list of Dates, DateArray or array of Excel serial
+    dates into a float array of serial dates. Intraday times are kept. """
+
+    if isinstance(dates, Date):
+        return np.array([dates._excel_date])
+    elif isinstance(dates, DateArray):
+        return dates._serials.astype(np.float64)
+    elif isinstance(dates, list):
+        return np.array([dt._excel_date for dt in dates], dtype=np.float64)
+
+    return np.asarray(dates, dtype=np.float64)
+
+###############################################################################
+
+# Cache of DayCount objects so that there is only one for each convention
+_day_counters = {}
+
+###############################################################################
+
+
 class DayCount:
     """ Calculate the fractional day count between two dates according to a
     specified day count convention. """
 
-    def __init__(self,
-                 dccType: DayCountTypes):
-        """ Create Day Count convention by passing in the Day Count Type. """
+    def __new__(cls,
+                dccType: DayCountTypes):
+        """ Create Day Count convention by passing in the Day Count Type. As
+        a DayCount has no state other than its type, objects are interned and
+        the same object is returned for each convention. """
+
+        try:
+            return _day_counters[dccType]
+        except (KeyError, TypeError):
+            pass
 
         if dccType not in DayCountTypes:
             raise FinError("Need to pass FinDayCountType")
 
-        self._type = dccType
+        day_counter = super().__new__(cls)
+        day_counter._type = dccType
+        _day_counters[dccType] = day_counter
+        return day_counter
+
+###############################################################################
+
+    def __reduce__(self):
+        """ Copies and unpickled objects are also the interned object. """
+        return (DayCount, (self._type,))
 
 ###############################################################################
 
@@ -287,6 +465,70 @@ class DayCount:
             raise FinError(str(self._type) +
                            " is not one of DayCountTypes")
 
+###############################################################################
+
+    def year_frac_array(self,
+                        dt1: (list, np.ndarray),  # Start of coupon periods
+                        dt2: (list, np.ndarray),  # Settlement or period ends
+                        dt3: (list, np.ndarray) = None,  # Next coupon dates
+                        freq_type: FrequencyTypes = FrequencyTypes.ANNUAL,
+                        isTerminationDate: (bool, np.ndarray) = False):
+        """ Calculate the year fractions for many pairs of dates in a single
+        compiled call. The dates can be lists of Dates, DateArrays or arrays
+        of Excel serial dates, and a single date is broadcast against an
+        array. The arguments and results are the same as those of year_frac
+        applied to each element so this returns arrays of the year fractions,
+        numerators and denominators. This is used to calculate the accrual
+        factors of a whole swap leg or of many bonds at once. """
+
+        s1 = _to_serials(dt1)
+        s2 = _to_serials(dt2)
+
+        if dt3 is None:
+            s3 = s2
+        else:
+            s3 = _to_serials(dt3)
+
+        s1, s2, s3, is_term = np.broadcast_arrays(s1, s2, s3,
+                                                  np.asarray(isTerminationDate,
+                                                             dtype=np.bool_))
+
+        s1 = np.ascontiguousarray(s1).ravel()
+        s2 = np.ascontiguousarray(s2).ravel()
+        s3 = np.ascontiguousarray(s3).ravel()
+        is_term = np.ascontiguousarray(is_term).ravel()
+
+        freq = annual_frequency(freq_type)
+
+        if self._type == DayCountTypes.ACT_ACT_ICMA:
+            if dt3 is None or freq is None:
+                raise FinError("ACT_ACT_ICMA requires three dates and a freq")
+
+        if self._type == DayCountTypes.ACT_365L:
+            if dt3 is None and freq == 1:
+                raise FinError("ACT_365L with an annual frequency requires" +
+                               " three dates")
+
+        if freq is None:
+            freq = 0.0
+
+        return _vyear_frac(self._type.value, s1, s2, s3, float(freq),
+                           is_term, gDaysInYear)
+
+###############################################################################
+
+    def year_frac_serials(self,
+                          start_serials: np.ndarray,
+                          end_serials: np.ndarray):
+        """ Calculate the year fractions between two equal length arrays of
+        Excel serial dates in one compiled call. This avoids creating a Date
+        object for each element and is much faster than calling year_frac in
+        a loop. Only the year fractions are returned, not num and den. Either
+        argument can be a scalar serial which is then broadcast. Conventions
+        which need the next coupon date should use year_frac_array. """
+
+        return self.year_frac_array(start_serials, end_serials)[0]
+
 ###############################################################################
 
     def __repr__(self):
@@ -76,6 +76,15 @@ class FinSolverTypes(Enum):
     CONJUGATE_GRADIENT = 0
     NELDER_MEAD = 1
     NELDER_MEAD_NUMBA = 2
+    LEVENBERG_MARQUARDT = 3
+
+
+###############################################################################
+
+
+class CurveBuildTypes(Enum):
+    BOOTSTRAP = 1
+    GLOBAL_NEWTON = 2
 
 
 ###############################################################################
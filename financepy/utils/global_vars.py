@@ -9,4 +9,9 @@ gDaysInYear = 365.0  # .242
 gSmall = 1e-12
 gNotebookMode = False
 
+# If True the types of the arguments passed to constructors are checked
+# against their annotations. Set to False to skip these checks when objects
+# are being built many times, for example in bump and revalue risk.
+gCheckArgumentTypes = True
+
 ###############################################################################
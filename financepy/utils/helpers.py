@@ -4,11 +4,13 @@
 
 import sys
 import numpy as np
+from contextlib import contextmanager
 from numba import njit, float64
 from typing import Union
 from prettytable import PrettyTable
 
-from .date import Date
+from .date import Date, DateArray
+from . import global_vars
 from .global_vars import gDaysInYear, gSmall
 from .error import FinError
 from .day_count import DayCountTypes, DayCount
@@ -84,11 +86,20 @@ def times_from_dates(dt: (Date, list),
     """ If a single date is passed in then return the year from valuation date
     but if a whole vector of dates is passed in then convert to a vector of
     times from the valuation date. The output is always a numpy vector of times
-    which has only one element if the input is only one date. """
+    which has only one element if the input is only one date. A DateArray or
+    a Numpy array of integer Excel serial dates is also accepted. This is
+    converted to times in a single vectorised call without creating any Date
+    objects. """
 
     if isinstance(value_date, Date) is False:
         raise FinError("Valuation date is not a Date")
 
+    if isinstance(dt, DateArray):
+        return times_from_serials(dt._serials, value_date, day_count_type)
+
+    if isinstance(dt, np.ndarray) and np.issubdtype(dt.dtype, np.integer):
+        return times_from_serials(dt, value_date, day_count_type)
+
     if day_count_type is None:
         dcCounter = None
     else:
@@ -105,16 +116,14 @@ def times_from_dates(dt: (Date, list),
         return times[0]
 
     elif isinstance(dt, list) and isinstance(dt[0], Date):
-        num_dates = len(dt)
-        times = []
-        for i in range(0, num_dates):
-            if dcCounter is None:
-                t = (dt[i] - value_date) / gDaysInYear
-            else:
-                t = dcCounter.year_frac(value_date, dt[i])[0]
-            times.append(t)
+        # The times of all the dates are calculated in one vectorised call
+        serials = np.array([d._excel_date for d in dt])
+        if dcCounter is None:
+            times = (serials - value_date._excel_date) / gDaysInYear
+        else:
+            times = dcCounter.year_frac_array(value_date, serials)[0]
 
-        return np.array(times)
+        return times
 
     elif isinstance(dt, np.ndarray):
         raise FinError("You passed an ndarray instead of dates.")
@@ -126,6 +135,30 @@ def times_from_dates(dt: (Date, list),
 ###############################################################################
 
 
+def times_from_serials(serials: np.ndarray,
+                       value_date: Date,
+                       day_count_type: DayCountTypes = None):
+    """ Convert an array of integer Excel serial dates into a vector of times
+    from the valuation date. If no day count type is given then the time is
+    the number of days divided by gDaysInYear. The output always has the same
+    shape as the input array. """
+
+    if isinstance(value_date, Date) is False:
+        raise FinError("Valuation date is not a Date")
+
+    serials = np.asarray(serials)
+
+    if day_count_type is None:
+        times = (serials - value_date._excel_date) / gDaysInYear
+        return times.astype(np.float64)
+
+    day_counter = DayCount(day_count_type)
+    times = day_counter.year_frac_serials(value_date._excel_date, serials)
+    return times.reshape(serials.shape)
+
+###############################################################################
+
+
 def check_vector_differences(x: np.ndarray,
                              y: np.ndarray,
                              tol: float = 1e-6):
@@ -494,15 +527,71 @@ def accrued_tree(gridTimes: np.ndarray,
 ###############################################################################
 
 
+def stack_ragged(vectors: list):
+    """ Stack a list of vectors of different lengths into the rows of a 2D
+    Numpy array padded with zeros. The array and a vector of the number of
+    elements in each row are returned. """
+
+    num_rows = len(vectors)
+    lengths = np.array([len(v) for v in vectors], dtype=np.int64)
+
+    num_cols = 0
+    if num_rows > 0:
+        num_cols = max(1, np.max(lengths))
+
+    matrix = np.zeros((num_rows, num_cols))
+
+    for i, v in enumerate(vectors):
+        matrix[i, :lengths[i]] = v
+
+    return matrix, lengths
+
+
+###############################################################################
+
+
+# Cache of the argument names and usable types of each checked function
+_argument_types_cache = {}
+
+
+def _argument_types(func):
+    """ Return the names and usable types of the annotated arguments of a
+    function. These are worked out on the first call and then cached. """
+
+    # A bound method is a new object each time so cache the function itself
+    key = getattr(func, "__func__", func)
+
+    try:
+        return _argument_types_cache[key]
+    except KeyError:
+        pass
+
+    argument_types = tuple((value_name, to_usable_type(annotation_type))
+                           for value_name, annotation_type
+                           in func.__annotations__.items()
+                           if value_name != "return")
+
+    _argument_types_cache[key] = argument_types
+    return argument_types
+
+###############################################################################
+
+
 def check_argument_types(func, values):
     """ Check that all values passed into a function are of the same type
     as the function annotations. If a value has not been annotated, it
-    will not be checked. """
-    for valueName, annotationType in func.__annotations__.items():
+    will not be checked. The checks are skipped if gCheckArgumentTypes in
+    global_vars is False. """
+
+    if global_vars.gCheckArgumentTypes is False:
+        return
+
+    for valueName, usableType in _argument_types(func):
 
-        if valueName in values:
-            value = values[valueName]
-            usableType = to_usable_type(annotationType)
+        if valueName not in values:
+            continue
+
+        value = values[valueName]
 
         if (not isinstance(value, usableType)):
 
@@ -519,3 +608,22 @@ def check_argument_types(func, values):
             raise FinError("Argument Type Error")
 
 ###############################################################################
+
+
+@contextmanager
+def argument_type_checks(enabled: bool):
+    """ Context manager which turns the checking of argument types on or off
+    within a block of code and then restores the previous setting. Example:
+
+    with argument_type_checks(False):
+        curve = DiscountCurve(value_date, dates, dfs) """
+
+    previous = global_vars.gCheckArgumentTypes
+    global_vars.gCheckArgumentTypes = enabled
+
+    try:
+        yield
+    finally:
+        global_vars.gCheckArgumentTypes = previous
+
+###############################################################################
@@ -4,6 +4,7 @@
 
 
 # from math import exp, sqrt, fabs, log
+from math import lgamma
 from numba import njit, boolean, int64, float64, vectorize
 import numpy as np
 from .error import FinError
@@ -628,6 +629,95 @@ def phi2(h1, hk, r):
 ###############################################################################
 
 
+@njit(float64(float64, float64, float64), fastmath=True, cache=True)
+def _beta_continued_fraction(a, b, x):
+    """ Continued fraction for the incomplete beta function evaluated using
+    the modified Lentz method as in Numerical Recipes Section 6.4. """
+
+    max_iter = 300
+    eps = 1e-15
+    fpmin = 1e-300
+
+    qab = a + b
+    qap = a + 1.0
+    qam = a - 1.0
+
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    if np.abs(d) < fpmin:
+        d = fpmin
+    d = 1.0 / d
+    h = d
+
+    for m in range(1, max_iter + 1):
+
+        m2 = 2 * m
+
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        if np.abs(d) < fpmin:
+            d = fpmin
+        c = 1.0 + aa / c
+        if np.abs(c) < fpmin:
+            c = fpmin
+        d = 1.0 / d
+        h *= d * c
+
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        if np.abs(d) < fpmin:
+            d = fpmin
+        c = 1.0 + aa / c
+        if np.abs(c) < fpmin:
+            c = fpmin
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+
+        if np.abs(delta - 1.0) < eps:
+            break
+
+    return h
+
+###############################################################################
+
+
+@njit(float64(float64, float64, float64), fastmath=True, cache=True)
+def incomplete_beta(a, b, x):
+    """ Regularised incomplete beta function I_x(a, b) for 0 <= x <= 1. """
+
+    if x <= 0.0:
+        return 0.0
+
+    if x >= 1.0:
+        return 1.0
+
+    bt = np.exp(lgamma(a + b) - lgamma(a) - lgamma(b) +
+                a * np.log(x) + b * np.log(1.0 - x))
+
+    if x < (a + 1.0) / (a + b + 2.0):
+        return bt * _beta_continued_fraction(a, b, x) / a
+    else:
+        return 1.0 - bt * _beta_continued_fraction(b, a, 1.0 - x) / b
+
+###############################################################################
+
+
+@njit(float64(float64, float64), fastmath=True, cache=True)
+def student_t_cdf(x, dof):
+    """ Cumulative distribution function of the Student-t distribution with
+    dof degrees of freedom which need not be an integer. """
+
+    p = 0.5 * incomplete_beta(0.5 * dof, 0.5, dof / (dof + x * x))
+
+    if x > 0.0:
+        return 1.0 - p
+    else:
+        return p
+
+###############################################################################
+
+
 @njit(float64[:, :](float64[:, :]), cache=True, fastmath=True)
 def cholesky(rho):
     """ Numba-compliant wrapper around Numpy cholesky function. """
@@ -3,10 +3,16 @@
 ##############################################################################
 
 
+import numpy as np
+from numba import njit
+
 from .error import FinError
-from .date import Date
+from .date import Date, DateArray
+from .date import excel_serial_to_dmy, dmy_to_excel_serial
+from .date import _add_months, _days_in_month
 from .calendar import (Calendar, CalendarTypes)
 from .calendar import (BusDayAdjustTypes, DateGenRuleTypes)
+from .calendar import _adjust_serial
 from .frequency import (annual_frequency, FrequencyTypes)
 from .helpers import label_to_string
 from .helpers import check_argument_types
@@ -116,7 +122,7 @@ class Schedule:
     ###############################################################################
 
     def schedule_dates(self):
-        """ Returns a list of the schedule of Dates. """
+        """ Returns the schedule of Dates as a DateArray. """
 
         if self._adjusted_dates is None:
             self._generate()
@@ -128,109 +134,54 @@ class Schedule:
     def _generate(self):
         """ Generate schedule of dates according to specified date generation
         rules and also adjust these dates for holidays according to the
-        specified business day convention and the specified calendar. """
+        specified business day convention and the specified calendar. The
+        dates are generated as Excel serial dates and adjusted on the business
+        day bitmap of the calendar in one call to the same kernel that is used
+        by BulkSchedule. """
 
         calendar = Calendar(self._cal_type)
         frequency = annual_frequency(self._freq_type)
         num_months = int(12 / frequency)
 
-        unadjusted_schedule_dates = []
-        self._adjusted_dates = []
-
-        if self._dg_rule_type == DateGenRuleTypes.BACKWARD:
-
-            next_date = self._termination_date
-            flow_num = 0
-
-            while next_date > self._effective_date:
-
-                unadjusted_schedule_dates.append(next_date)
-                tot_num_months = num_months * (1 + flow_num)
-                next_date = self._termination_date.add_months(-tot_num_months)
-
-                if self._end_of_month is True:
-                    next_date = next_date.eom()
-
-                flow_num += 1
-
-            # Add on the Previous Coupon Date
-            unadjusted_schedule_dates.append(next_date)
-            flow_num += 1
+        effective_date = int(self._effective_date._excel_date)
+        termination_date = int(self._termination_date._excel_date)
 
-            # reverse order and holiday adjust dates
-            # the first date is not adjusted as this was provided
-            dt = unadjusted_schedule_dates[flow_num - 1]
-            self._adjusted_dates.append(dt)
-
-            # We adjust all flows after the effective date and before the
-            # termination date to fall on business days according to their cal
-            for i in range(1, flow_num - 1):
-                dt = calendar.adjust(unadjusted_schedule_dates[flow_num - i - 1],
-                                     self._bd_adjust_type)
-
-                self._adjusted_dates.append(dt)
-
-            self._adjusted_dates.append(self._termination_date)
-
-        elif self._dg_rule_type == DateGenRuleTypes.FORWARD:
-
-            # This needs checking
-            next_date = self._effective_date
-            flow_num = 0
+        # If calendar type is NONE then every day is a business day
+        if self._cal_type == CalendarTypes.NONE:
+            bd_adjust_type = BusDayAdjustTypes.NONE.value
+        else:
+            bd_adjust_type = self._bd_adjust_type.value
 
-            unadjusted_schedule_dates.append(next_date)
-            flow_num = 1
+        _, bus_days, _, _, _ = \
+            calendar._business_day_index(effective_date, termination_date)
 
-            while next_date < self._termination_date:
-                unadjusted_schedule_dates.append(next_date)
-                tot_num_months = num_months * (flow_num)
-                next_date = self._effective_date.add_months(tot_num_months)
-                flow_num = flow_num + 1
+        # Bound on the number of dates in the schedule for the buffers
+        num_months_between = \
+            (self._termination_date._y - self._effective_date._y) * 12 + \
+            self._termination_date._m - self._effective_date._m
+        max_dates = max(num_months_between // num_months + 4, 2)
 
-            # The effective date is not adjusted as it is given
-            for i in range(1, flow_num):
-                dt = calendar.adjust(unadjusted_schedule_dates[i],
-                                     self._bd_adjust_type)
+        unadjusted = np.empty(max_dates, dtype=np.int32)
+        adjusted = np.empty(max_dates, dtype=np.int32)
 
-                self._adjusted_dates.append(dt)
+        num_dates, num_dropped, error = \
+            _generate_schedule(effective_date, termination_date, num_months,
+                               self._dg_rule_type.value, self._end_of_month,
+                               self._adjust_termination_date, bd_adjust_type,
+                               bus_days, unadjusted, adjusted)
 
-            self._adjusted_dates.append(self._termination_date)
+        if error != 0:
+            raise FinError(_SCHEDULE_ERRORS[error])
 
-        if self._adjusted_dates[0] < self._effective_date:
-            self._adjusted_dates[0] = self._effective_date
+        # The dates are stored compactly as serial numbers
+        self._adjusted_dates = \
+            DateArray.from_serials(adjusted[num_dropped:num_dates].copy())
 
         # The market standard for swaps is not to adjust the termination date
         # unless it is specified in the contract. It is standard for CDS.
         # We change it if the adjust_termination_date flag is True.
         if self._adjust_termination_date is True:
-
-            self._termination_date = calendar.adjust(self._termination_date,
-                                                     self._bd_adjust_type)
-
-            self._adjusted_dates[-1] = self._termination_date
-
-        #######################################################################
-        # Check the resulting schedule to ensure that no two dates are the
-        # same in which case we remove the duplicate and that they are
-        # monotonic - this should never happen but ...
-        #######################################################################
-
-        if len(self._adjusted_dates) < 2:
-            raise FinError("Schedule has two dates only.")
-
-        prev_dt = self._adjusted_dates[0]
-        for dt in self._adjusted_dates[1:]:
-
-            # if the first date lands on the effective date then remove it
-            if dt == prev_dt:
-                self._adjusted_dates.pop(0)
-
-            if dt < prev_dt:  # Dates must be ordered
-                raise FinError("Dates are not monotonic")
-
-            prev_dt = dt
-
-        #######################################################################
+            self._termination_date = self._adjusted_dates[-1]
 
         return self._adjusted_dates
 
@@ -270,3 +221,359 @@ class Schedule:
         print(self)
 
 ###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _generate_schedule(effective_date, termination_date, num_months,
+                       dg_rule_type, end_of_month, adjust_termination_date,
+                       bd_adjust_type, bus_days, unadjusted, adjusted):
+    """ Generate the schedule of a single trade from Excel serial dates
+    following the ISDA rules described in Schedule. This is used by both
+    Schedule and BulkSchedule. The unadjusted and adjusted dates are written
+    into the buffers provided. Returns the number of dates generated, the
+    number of leading dates to drop and an error code which is zero if the
+    schedule is valid. """
+
+    if effective_date >= termination_date:
+        return 0, 0, 1
+
+    if dg_rule_type == 2:  # BACKWARD
+
+        # Step back from the termination date and write the dates in reverse
+        next_date = termination_date
+        flow_num = 0
+
+        while next_date > effective_date:
+
+            unadjusted[flow_num] = next_date
+            flow_num += 1
+            next_date = _add_months(termination_date, -num_months * flow_num)
+
+            if end_of_month:
+                d, m, y = excel_serial_to_dmy(next_date)
+                next_date = dmy_to_excel_serial(_days_in_month(m, y), m, y)
+
+        # Add on the Previous Coupon Date
+        unadjusted[flow_num] = next_date
+        flow_num += 1
+
+        unadjusted[0:flow_num] = unadjusted[0:flow_num][::-1].copy()
+
+        adjusted[0] = unadjusted[0]
+
+        for i in range(1, flow_num - 1):
+            adjusted[i] = _adjust_serial(unadjusted[i], bus_days,
+                                         bd_adjust_type)
+            if adjusted[i] < 0:
+                return 0, 0, 4
+
+        adjusted[flow_num - 1] = termination_date
+
+    else:  # FORWARD
+
+        next_date = effective_date
+        flow_num = 0
+
+        while next_date < termination_date:
+            unadjusted[flow_num] = next_date
+            flow_num += 1
+            next_date = _add_months(effective_date, num_months * flow_num)
+
+        # The effective date is adjusted along with the other dates
+        for i in range(0, flow_num):
+            adjusted[i] = _adjust_serial(unadjusted[i], bus_days,
+                                         bd_adjust_type)
+            if adjusted[i] < 0:
+                return 0, 0, 4
+
+        unadjusted[flow_num] = termination_date
+        adjusted[flow_num] = termination_date
+        flow_num += 1
+
+    if adjusted[0] < effective_date:
+        adjusted[0] = effective_date
+
+    if adjust_termination_date:
+        adjusted[flow_num - 1] = _adjust_serial(termination_date, bus_days,
+                                                bd_adjust_type)
+        if adjusted[flow_num - 1] < 0:
+            return 0, 0, 4
+
+    if flow_num < 2:
+        return 0, 0, 2
+
+    # Schedule removes the first date each time two neighbouring dates are
+    # the same and requires the dates to be ordered
+    num_dropped = 0
+    for i in range(1, flow_num):
+
+        if adjusted[i] == adjusted[i - 1]:
+            num_dropped += 1
+
+        if adjusted[i] < adjusted[i - 1]:
+            return 0, 0, 3
+
+    return flow_num, num_dropped, 0
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _generate_schedules(effective_dates, termination_dates, num_months,
+                        dg_rule_types, end_of_month, adjust_termination_dates,
+                        bd_adjust_types, calendar_indices, bus_days):
+    """ Generate the schedules of many trades in one pass. The dates of all
+    schedules are returned in two flat arrays with an array of offsets so
+    that the dates of trade i are in the slice offsets[i]:offsets[i+1]. """
+
+    num_trades = len(effective_dates)
+
+    offsets = np.zeros(num_trades + 1, dtype=np.int64)
+    dropped = np.zeros(num_trades, dtype=np.int64)
+    errors = np.zeros(num_trades, dtype=np.int64)
+
+    # Bound on the number of dates in any schedule for the scratch buffers
+    max_dates = 2
+    for i in range(0, num_trades):
+        _, m1, y1 = excel_serial_to_dmy(effective_dates[i])
+        _, m2, y2 = excel_serial_to_dmy(termination_dates[i])
+        n = ((y2 - y1) * 12 + m2 - m1) // num_months[i] + 4
+        max_dates = max(max_dates, n)
+
+    unadjusted = np.empty(max_dates, dtype=np.int32)
+    adjusted = np.empty(max_dates, dtype=np.int32)
+
+    # First pass counts the dates of each schedule
+    for i in range(0, num_trades):
+
+        n, num_dropped, error = \
+            _generate_schedule(effective_dates[i], termination_dates[i],
+                               num_months[i], dg_rule_types[i],
+                               end_of_month[i], adjust_termination_dates[i],
+                               bd_adjust_types[i],
+                               bus_days[calendar_indices[i]],
+                               unadjusted, adjusted)
+
+        dropped[i] = num_dropped
+        errors[i] = error
+        offsets[i + 1] = offsets[i] + n - num_dropped
+
+    all_unadjusted = np.empty(offsets[num_trades], dtype=np.int32)
+    all_adjusted = np.empty(offsets[num_trades], dtype=np.int32)
+
+    # Second pass generates them again into their place in the flat arrays
+    for i in range(0, num_trades):
+
+        if errors[i] != 0:
+            continue
+
+        n, num_dropped, error = \
+            _generate_schedule(effective_dates[i], termination_dates[i],
+                               num_months[i], dg_rule_types[i],
+                               end_of_month[i], adjust_termination_dates[i],
+                               bd_adjust_types[i],
+                               bus_days[calendar_indices[i]],
+                               unadjusted, adjusted)
+
+        start = offsets[i]
+        end = offsets[i + 1]
+        all_unadjusted[start:end] = unadjusted[num_dropped:n]
+        all_adjusted[start:end] = adjusted[num_dropped:n]
+
+    return offsets, all_unadjusted, all_adjusted, errors
+
+###############################################################################
+
+
+def _to_serials(dates):
+    """ Convert a DateArray, list of Dates or array of Excel serial dates into
+    an int32 array of serial dates. """
+
+    if isinstance(dates, DateArray):
+        return dates._serials
+    elif isinstance(dates, Date):
+        return np.array([dates._excel_date], dtype=np.int32)
+    elif isinstance(dates, list):
+        return DateArray(dates)._serials
+
+    return np.ascontiguousarray(dates, dtype=np.int32)
+
+###############################################################################
+
+
+def _broadcast(values, num_trades, name):
+    """ Turn a single value or a list of values into a list with one value
+    for each trade. """
+
+    if isinstance(values, (list, np.ndarray)):
+        if len(values) != num_trades:
+            raise FinError("Need one value of " + name + " for each trade")
+        return list(values)
+
+    return [values] * num_trades
+
+###############################################################################
+
+
+_SCHEDULE_ERRORS = {1: "Effective date must be before termination date.",
+                    2: "Schedule has two dates only.",
+                    3: "Dates are not monotonic",
+                    4: "Adjusted date is outside the calendar date range."}
+
+
+class BulkSchedule:
+    """ A set of schedules for many trades which are all generated in a
+    single vectorised pass. Each input can either be a single value which
+    applies to all trades or a list with one value per trade. A joint
+    calendar is given as a tuple of calendar types. The dates are
+    exactly the same as those of the Schedule of each trade and are stored
+    as ragged arrays of Excel serial dates. The dates of trade i are in the
+    slice offsets[i]:offsets[i+1] of the flat unadjusted and adjusted date
+    arrays. """
+
+    def __init__(self,
+                 effective_dates: (list, DateArray, np.ndarray),
+                 termination_dates: (list, DateArray, np.ndarray),
+                 freq_types: (FrequencyTypes, list) = FrequencyTypes.ANNUAL,
+                 cal_types: (CalendarTypes, tuple, list) = CalendarTypes.WEEKEND,
+                 bd_adjust_types: (BusDayAdjustTypes, list) = BusDayAdjustTypes.FOLLOWING,
+                 dg_rule_types: (DateGenRuleTypes, list) = DateGenRuleTypes.BACKWARD,
+                 adjust_termination_dates: (bool, list) = True,
+                 end_of_month: (bool, list) = False):
+        """ Create the schedules of many trades from arrays of effective dates
+        and termination dates which can be a DateArray, a list of Dates or an
+        array of Excel serial dates. """
+
+        check_argument_types(self.__init__, locals())
+
+        effective_serials = _to_serials(effective_dates)
+        termination_serials = _to_serials(termination_dates)
+
+        num_trades = len(effective_serials)
+
+        if len(termination_serials) != num_trades:
+            raise FinError("Need the same number of effective and " +
+                           "termination dates")
+
+        # Map each distinct calendar onto a row of a stacked bitmap
+        calendar_keys = {}
+        bitmaps = []
+        calendar_indices = np.empty(num_trades, dtype=np.int64)
+        is_none_calendar = np.empty(num_trades, dtype=np.bool_)
+
+        trade_cal_types = _broadcast(cal_types, num_trades, "cal_types")
+
+        # The bitmaps only need to cover the dates of the trades
+        if num_trades > 0:
+            first_serial = int(min(effective_serials.min(),
+                                   termination_serials.min()))
+            last_serial = int(max(effective_serials.max(),
+                                  termination_serials.max()))
+        else:
+            first_serial = last_serial = 1
+
+        for i, cal_type in enumerate(trade_cal_types):
+
+            key = cal_type if isinstance(cal_type, CalendarTypes) \
+                else tuple(cal_type)
+
+            if key not in calendar_keys:
+                calendar = Calendar(cal_type)
+                _, bus_days, _, _, _ = \
+                    calendar._business_day_index(first_serial, last_serial)
+                calendar_keys[key] = (len(bitmaps),
+                                      calendar._cal_type == CalendarTypes.NONE)
+                bitmaps.append(bus_days)
+
+            calendar_indices[i], is_none_calendar[i] = calendar_keys[key]
+
+        # Bitmaps which have been extended further are padded to one length
+        num_serials = max(len(bitmap) for bitmap in bitmaps)
+        bus_days = np.zeros((len(bitmaps), num_serials), dtype=np.bool_)
+        for i, bitmap in enumerate(bitmaps):
+            bus_days[i, 0:len(bitmap)] = bitmap
+
+        num_months = np.empty(num_trades, dtype=np.int64)
+        for i, freq_type in enumerate(_broadcast(freq_types, num_trades,
+                                                 "freq_types")):
+            frequency = annual_frequency(freq_type)
+            if frequency is None or frequency <= 0:
+                raise FinError("Frequency type " + str(freq_type) +
+                               " cannot be used to generate a schedule")
+            num_months[i] = int(12 / frequency)
+
+        bd_values = [bd.value for bd in _broadcast(bd_adjust_types,
+                                                   num_trades,
+                                                   "bd_adjust_types")]
+        bd_values = np.array(bd_values, dtype=np.int64)
+
+        # If the calendar type is NONE then no date is ever adjusted
+        bd_values[is_none_calendar] = BusDayAdjustTypes.NONE.value
+
+        dg_values = [dg.value for dg in _broadcast(dg_rule_types,
+                                                   num_trades,
+                                                   "dg_rule_types")]
+        dg_values = np.array(dg_values, dtype=np.int64)
+
+        adjust_flags = np.array(_broadcast(adjust_termination_dates,
+                                           num_trades,
+                                           "adjust_termination_dates"),
+                                dtype=np.bool_)
+
+        eom_flags = np.array(_broadcast(end_of_month, num_trades,
+                                        "end_of_month"), dtype=np.bool_)
+
+        offsets, unadjusted, adjusted, errors = \
+            _generate_schedules(effective_serials, termination_serials,
+                                num_months, dg_values, eom_flags,
+                                adjust_flags, bd_values, calendar_indices,
+                                bus_days)
+
+        if np.any(errors != 0):
+            i = int(np.nonzero(errors)[0][0])
+            raise FinError("Trade " + str(i) + ": " +
+                           _SCHEDULE_ERRORS[int(errors[i])])
+
+        self._offsets = offsets
+        self._unadjusted_dates = unadjusted
+        self._adjusted_dates = adjusted
+
+    ###########################################################################
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    ###########################################################################
+
+    def schedule_dates(self, i: int):
+        """ Returns the adjusted schedule dates of trade i as a DateArray.
+        These are the same as those of Schedule.schedule_dates. """
+
+        start = self._offsets[i]
+        end = self._offsets[i + 1]
+        return DateArray.from_serials(self._adjusted_dates[start:end])
+
+    ###########################################################################
+
+    def unadjusted_dates(self, i: int):
+        """ Returns the unadjusted schedule dates of trade i as a DateArray.
+        """
+
+        start = self._offsets[i]
+        end = self._offsets[i + 1]
+        return DateArray.from_serials(self._unadjusted_dates[start:end])
+
+    ###########################################################################
+
+    def __repr__(self):
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("NUM SCHEDULES", len(self))
+        s += label_to_string("NUM DATES", len(self._adjusted_dates), "")
+        return s
+
+    ###########################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
@@ -10,6 +10,7 @@ from financepy.utils.date import Date
 from financepy.utils.day_count import DayCountTypes
 from financepy.utils.frequency import FrequencyTypes
 from financepy.products.bonds.bond import YTMCalcType, Bond
+from financepy.products.bonds.bond import bond_key_rate_durations
 from financepy.products.bonds.bond_zero import BondZero
 from financepy.products.bonds.bond_market import BondMarkets
 from financepy.products.bonds.bond_market import get_bond_market_conventions
@@ -364,3 +365,30 @@ def test_key_rate_durations_bloomberg_example():
         assert round(key_rate_durations[i], 3) == bbg_key_rate_durations[i]
 
 ###############################################################################
+
+
+def test_key_rate_durations_analytic():
+
+    dc_type, freq_type, settlementDays, exDiv, calendar =\
+        get_bond_market_conventions(BondMarkets.UNITED_STATES)
+
+    settle_date = Date(24, 4, 2023)
+    ytm = 3.725060/100
+
+    bonds = []
+    for i in range(0, 6):
+        issue_date = Date(15, 5, 2020 - i)
+        maturity_date = Date(15, 5, 2025 + 4 * i)
+        bonds.append(Bond(issue_date, maturity_date, 0.01 + 0.005 * i,
+                          freq_type, dc_type))
+
+    key_rate_tenors, key_rate_durations = \
+        bond_key_rate_durations(bonds, settle_date, ytm)
+
+    assert key_rate_durations.shape == (len(bonds), len(key_rate_tenors))
+
+    for i, bond in enumerate(bonds):
+        _, bumped = bond.key_rate_durations(settle_date, ytm, analytic=False)
+        assert np.max(np.abs(key_rate_durations[i] - bumped)) < 1e-4
+
+###############################################################################
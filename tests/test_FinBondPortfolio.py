@@ -4,11 +4,14 @@
 
 import os
 import datetime as dt
+import numpy as np
 
 from financepy.utils.date import Date, from_datetime
 from financepy.utils.day_count import DayCountTypes
 from financepy.utils.frequency import FrequencyTypes
 from financepy.products.bonds.bond import Bond
+from financepy.products.bonds.bond_portfolio import BondPortfolio
+from financepy.market.curves.discount_curve_zeros import DiscountCurveZeros
 
 settlement = Date(19, 9, 2012)
 
@@ -187,3 +190,86 @@ def test_11():
     ytm = bond.yield_to_maturity(settlement, clean_price)
     assert round(bond._accrued_interest, 4) == 0.0060
     assert round(ytm * 100, 4) == 0.7652
+
+
+def build_portfolio():
+    zero_dates = [settlement.add_years(t) for t in [0.5, 1, 2, 5, 10, 30]]
+    zero_rates = [0.010, 0.012, 0.015, 0.020, 0.025, 0.030]
+    curve = DiscountCurveZeros(settlement, zero_dates, zero_rates,
+                               FrequencyTypes.CONTINUOUS,
+                               DayCountTypes.ACT_365F)
+
+    bonds = []
+    face_amounts = []
+
+    for i in range(0, 20):
+        maturityDt = Date(15, 1 + i % 12, 2013 + i)
+        issueDt = Date(15, 1 + i % 12, 2000)
+        bond = Bond(issueDt, maturityDt, 0.01 + 0.002 * i,
+                    FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_ACT_ICMA)
+        bonds.append(bond)
+        face_amounts.append(1000000.0 * (i + 1))
+
+    return curve, bonds, face_amounts
+
+
+def test_portfolio_prices():
+    curve, bonds, face_amounts = build_portfolio()
+    portfolio = BondPortfolio(bonds, face_amounts)
+
+    dirty_prices = portfolio.dirty_price_from_discount_curve(settlement,
+                                                             curve)
+    clean_prices = portfolio.clean_price_from_discount_curve(settlement,
+                                                             curve)
+
+    for i, bond in enumerate(bonds):
+        assert abs(dirty_prices[i] -
+                   bond.dirty_price_from_discount_curve(settlement,
+                                                        curve)) < 1e-10
+        assert abs(clean_prices[i] -
+                   bond.clean_price_from_discount_curve(settlement,
+                                                        curve)) < 1e-10
+
+    v = portfolio.value(settlement, curve)
+    assert abs(v['dirty_pv'] - np.dot(face_amounts, dirty_prices) / 100.0) \
+        < 1e-6
+
+    position_id = portfolio.position_ids()[3]
+    portfolio.remove_bond(position_id)
+    v_removed = portfolio.value(settlement, curve)
+    assert abs(v['dirty_pv'] - v_removed['dirty_pv'] -
+               face_amounts[3] * dirty_prices[3] / 100.0) < 1e-6
+
+    portfolio.add_bond(bonds[3], face_amounts[3])
+    v_added = portfolio.value(settlement, curve)
+    assert abs(v['dirty_pv'] - v_added['dirty_pv']) < 1e-6
+
+
+def test_portfolio_risk():
+    curve, bonds, face_amounts = build_portfolio()
+    portfolio = BondPortfolio(bonds, face_amounts)
+
+    durations = portfolio.durations(settlement, curve)
+    _, krds = portfolio.key_rate_durations(settlement, curve)
+    assert np.max(np.abs(np.sum(krds, axis=1) - durations)) < 1e-12
+
+    dirty_prices = portfolio.dirty_price_from_discount_curve(settlement,
+                                                             curve)
+    weights = np.array(face_amounts) * dirty_prices
+    portfolio_duration = portfolio.portfolio_duration(settlement, curve)
+    assert abs(portfolio_duration -
+               np.dot(weights, durations) / np.sum(weights)) < 1e-12
+
+    # The curve sensitivities of each bond match those of the bond itself
+    sens = portfolio.curve_sensitivities(settlement, curve)
+
+    for i in range(0, len(bonds), 5):
+        _, bond_sens = bonds[i].df_sensitivities(settlement, curve)
+        bond_node_sens = curve.node_sensitivities([bond_sens])[0]
+        assert np.max(np.abs(sens[i] - bond_node_sens)) < 1e-8
+
+    pv, pv_sens = portfolio.df_sensitivities(settlement, curve)
+    node_sens = curve.node_sensitivities([pv_sens])[0]
+    assert abs(pv - portfolio.value(settlement, curve)['dirty_pv']) < 1e-6
+    assert np.max(np.abs(node_sens - np.dot(face_amounts, sens) / 100.0)) \
+        < 1e-4
@@ -0,0 +1,85 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+import os
+import pandas as pd
+import datetime as dt
+import numpy as np
+
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.date import Date, from_datetime
+from financepy.products.bonds.bond import Bond, YTMCalcType
+from financepy.products.bonds.bond_universe import BondUniverse
+
+path = os.path.join(os.path.dirname(__file__), './data/giltBondPrices.txt')
+bondDataFrame = pd.read_csv(path, sep='\t')
+bondDataFrame['mid'] = 0.5*(bondDataFrame['bid'] + bondDataFrame['ask'])
+
+settlement = Date(19, 9, 2012)
+
+bonds = []
+clean_prices = []
+
+for i, (_, row) in enumerate(bondDataFrame.iterrows()):
+
+    date_string = row['maturity']
+    matDatetime = dt.datetime.strptime(date_string, '%d-%b-%y')
+    maturityDt = from_datetime(matDatetime)
+    issueDt = Date(maturityDt._d, maturityDt._m, 2000)
+    coupon = row['coupon']/100.0
+
+    if i % 2 == 0:
+        bond = Bond(issueDt, maturityDt, coupon,
+                    FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_ACT_ICMA,
+                    ex_div_days=7)
+    else:
+        bond = Bond(issueDt, maturityDt, coupon,
+                    FrequencyTypes.ANNUAL, DayCountTypes.THIRTY_360_BOND)
+
+    bonds.append(bond)
+    clean_prices.append(row['mid'])
+
+universe = BondUniverse(bonds)
+
+
+def test_yield_to_maturity():
+
+    for convention in [YTMCalcType.UK_DMO, YTMCalcType.US_STREET,
+                       YTMCalcType.US_TREASURY, YTMCalcType.CFETS]:
+
+        ytms = universe.yield_to_maturity(settlement, clean_prices,
+                                          convention)
+
+        for bond, clean_price, ytm in zip(bonds, clean_prices, ytms):
+            assert abs(bond.yield_to_maturity(settlement, clean_price,
+                                              convention) - ytm) < 1e-8
+
+        dirty_prices = universe.dirty_price_from_ytm(settlement, ytms,
+                                                     convention)
+
+        for bond, dirty_price, ytm in zip(bonds, dirty_prices, ytms):
+            assert abs(bond.dirty_price_from_ytm(settlement, ytm,
+                                                 convention) -
+                       dirty_price) < 1e-10
+
+
+def test_analytics():
+
+    convention = YTMCalcType.UK_DMO
+    analytics = universe.analytics(settlement, clean_prices, convention)
+
+    for i, bond in enumerate(bonds):
+        ytm = analytics['ytm'][i]
+        dd = bond.dollar_duration(settlement, ytm, convention)
+        md = bond.modified_duration(settlement, ytm, convention)
+        mac = bond.macauley_duration(settlement, ytm, convention)
+        conv = bond.convexity_from_ytm(settlement, ytm, convention)
+        assert abs(analytics['dollar_duration'][i] / dd - 1.0) < 1e-5
+        assert abs(analytics['modified_duration'][i] / md - 1.0) < 1e-5
+        assert abs(analytics['macauley_duration'][i] / mac - 1.0) < 1e-5
+        assert abs(analytics['convexity'][i] / conv - 1.0) < 1e-4
+
+    clean = universe.clean_price_from_ytm(settlement, analytics['ytm'],
+                                          convention)
+    assert np.max(np.abs(clean - np.array(clean_prices))) < 1e-10
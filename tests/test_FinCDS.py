@@ -399,17 +399,17 @@ def test_par_spread():
         value_date2,
         issuer_curve2,
         cdsRecovery) * 10000.0
-    assert round(spd, 4) == 99.5858
+    assert round(spd, 4) == 100.0001
 
 
 def test_value():
     v = cds_contract1.value(value_date1, issuer_curve1, cdsRecovery)
-    assert round(v['dirty_pv'], 4) == 168514.5956
-    assert round(v['clean_pv'], 4) == 170639.5956
+    assert round(v['dirty_pv'], 4) == 168514.5948
+    assert round(v['clean_pv'], 4) == 170639.5948
 
     v = cds_contract2.value(value_date2, issuer_curve2, cdsRecovery)
-    assert round(v['dirty_pv'], 4) == -199842.7922
-    assert round(v['clean_pv'], 4) == -191509.4589
+    assert round(v['dirty_pv'], 4) == -195348.6079
+    assert round(v['clean_pv'], 4) == -187015.2745
 
 
 def test_clean_price():
@@ -417,7 +417,7 @@ def test_clean_price():
     assert round(p, 4) == 82.936
 
     p = cds_contract2.clean_price(value_date2, issuer_curve2, cdsRecovery)
-    assert round(p, 4) == 119.1509
+    assert round(p, 4) == 118.7015
 
 
 def test_accrued_days():
@@ -439,21 +439,21 @@ def test_accrued_interest():
 def test_protection_leg_pv():
     prot_pv = cds_contract1.protection_leg_pv(
         value_date1, issuer_curve1, cdsRecovery)
-    assert round(prot_pv, 4) == 273023.5221
+    assert round(prot_pv, 4) == 273023.5209
 
     prot_pv = cds_contract2.protection_leg_pv(
         value_date2, issuer_curve2, cdsRecovery)
-    assert round(prot_pv, 4) == 47629.7343
+    assert round(prot_pv, 4) == 46753.8705
 
 
 def test_premium_leg_pv():
     premPV = cds_contract1.premium_leg_pv(
         value_date1, issuer_curve1, cdsRecovery)
-    assert round(premPV, 4) == 104508.9265
+    assert round(premPV, 4) == 104508.926
 
     premPV = cds_contract2.premium_leg_pv(
         value_date2, issuer_curve2, cdsRecovery)
-    assert round(premPV, 4) == 247472.5265
+    assert round(premPV, 4) == 242102.4784
 
 
 def test_value_approx():
@@ -7,6 +7,7 @@ from financepy.utils.date import Date
 from financepy.utils.math import corr_matrix_generator
 from financepy.products.credit.cds_basket import CDSBasket
 from financepy.products.credit.cds_index_portfolio import CDSIndexPortfolio
+from financepy.models.gauss_copula import default_times_gc
 import numpy as np
 from os.path import dirname, join
 
@@ -80,7 +81,7 @@ def test_gaussian_copula():
                                        beta_vector,
                                        libor_curve)
 
-    assert round(v1[2] * 10000, 4) == 151.7163
+    assert round(v1[2] * 10000, 4) == 159.7524
     assert round(v2[3] * 10000, 4) == 160.0121
 
     ntd = 2
@@ -103,7 +104,7 @@ def test_gaussian_copula():
                                        beta_vector,
                                        libor_curve)
 
-    assert round(v1[2] * 10000, 4) == 15.6402
+    assert round(v1[2] * 10000, 4) == 18.4394
     assert round(v2[3] * 10000, 4) == 16.6395
 
 
@@ -125,7 +126,7 @@ def test_student_t():
                                   num_trials,
                                   seed)
 
-    assert round(v[2] * 10000, 4) == 133.6284
+    assert round(v[2] * 10000, 4) == 163.3282
 
     ntd = 2
     beta = 0.5
@@ -141,4 +142,75 @@ def test_student_t():
                                   num_trials,
                                   seed)
 
-    assert round(v[2] * 10000, 4) == 26.5991
+    assert round(v[2] * 10000, 4) == 27.5641
+
+
+def test_gaussian_copula_sobol():
+    num_trials = 1000
+
+    ntd = 1
+    beta = 0.0
+    corr_matrix = corr_matrix_generator(beta * beta, num_credits)
+
+    v = basket.value_gaussian_mc(value_date,
+                                 ntd,
+                                 issuer_curves,
+                                 corr_matrix,
+                                 libor_curve,
+                                 num_trials,
+                                 seed,
+                                 use_sobol=True)
+
+    assert round(v[2] * 10000, 4) == 161.2586
+
+    # The seed sets the digital shift of the Sobol points
+    v_seed = basket.value_gaussian_mc(value_date,
+                                      ntd,
+                                      issuer_curves,
+                                      corr_matrix,
+                                      libor_curve,
+                                      num_trials,
+                                      seed + 1,
+                                      use_sobol=True)
+
+    assert v_seed[2] != v[2]
+    assert abs(v_seed[2] - v[2]) * 10000 < 5.0
+
+    ntd = 2
+    beta = 0.5
+    corr_matrix = corr_matrix_generator(beta * beta, num_credits)
+
+    v = basket.value_student_t_mc(value_date,
+                                  ntd,
+                                  issuer_curves,
+                                  corr_matrix,
+                                  5,
+                                  libor_curve,
+                                  num_trials,
+                                  seed,
+                                  use_sobol=True)
+
+    assert round(v[2] * 10000, 4) == 27.3889
+
+
+def test_value_legs_mc():
+    # The legs can still be valued from a matrix of default times
+    num_trials = 1000
+
+    ntd = 2
+    beta = 0.5
+    corr_matrix = corr_matrix_generator(beta * beta, num_credits)
+
+    default_times = default_times_gc(issuer_curves,
+                                     corr_matrix,
+                                     num_trials,
+                                     seed)
+
+    rpv01, prot = basket.value_legs_mc(value_date,
+                                       ntd,
+                                       default_times,
+                                       issuer_curves,
+                                       libor_curve)
+
+    assert round(rpv01, 4) == 4.2449
+    assert round(prot * 10000, 4) == 66.3914
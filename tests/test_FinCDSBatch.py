@@ -0,0 +1,81 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+from helpers import build_Ibor_Curve, loadHeterogeneousSpreadCurves
+from financepy.utils.date import Date
+from financepy.products.credit.cds import CDS
+from financepy.products.credit.cds_batch import CDSBatch
+import numpy as np
+
+
+tradeDate = Date(1, 3, 2007)
+value_date = tradeDate.add_days(1)
+maturity_date = Date(20, 12, 2011)
+
+libor_curve = build_Ibor_Curve(tradeDate)
+issuer_curves = loadHeterogeneousSpreadCurves(value_date, libor_curve)
+num_credits = len(issuer_curves)
+
+running_coupons = np.linspace(0.001, 0.020, num_credits)
+notionals = np.linspace(1e6, 5e6, num_credits)
+long_protection = np.arange(num_credits) % 2 == 0
+
+contracts = CDSBatch(value_date, maturity_date, running_coupons,
+                     notionals, long_protection)
+
+single_contracts = [CDS(value_date, maturity_date, running_coupons[i],
+                        notionals[i], bool(long_protection[i]))
+                    for i in range(0, num_credits)]
+
+
+def test_value():
+    v = contracts.value(value_date, issuer_curves, 0.40)
+
+    for i in range(0, num_credits):
+        v_single = single_contracts[i].value(value_date, issuer_curves[i],
+                                             0.40)
+        assert abs(v['dirty_pv'][i] - v_single['dirty_pv']) < 1e-6
+        assert abs(v['clean_pv'][i] - v_single['clean_pv']) < 1e-6
+
+
+def test_legs():
+    rpv01 = contracts.risky_pv01(value_date, issuer_curves)
+    prot = contracts.protection_leg_pv(value_date, issuer_curves)
+    prem = contracts.premium_leg_pv(value_date, issuer_curves)
+    spds = contracts.par_spread(value_date, issuer_curves)
+
+    for i in range(0, num_credits, 10):
+        cds = single_contracts[i]
+        rpv01_single = cds.risky_pv01(value_date, issuer_curves[i])
+        assert abs(rpv01['dirty_rpv01'][i] -
+                   rpv01_single['dirty_rpv01']) < 1e-12
+        assert abs(rpv01['clean_rpv01'][i] -
+                   rpv01_single['clean_rpv01']) < 1e-12
+        assert abs(prot[i] -
+                   cds.protection_leg_pv(value_date, issuer_curves[i])) < 1e-6
+        assert abs(prem[i] -
+                   cds.premium_leg_pv(value_date, issuer_curves[i])) < 1e-6
+        assert abs(spds[i] -
+                   cds.par_spread(value_date, issuer_curves[i])) < 1e-12
+
+
+def test_dv01():
+    num_names = 5
+    some_contracts = CDSBatch(value_date, maturity_date,
+                              running_coupons[0:num_names],
+                              notionals[0:num_names])
+
+    credit_dv01 = some_contracts.credit_dv01(value_date,
+                                             issuer_curves[0:num_names], 0.40)
+
+    interest_dv01 = some_contracts.interest_dv01(value_date,
+                                                 issuer_curves[0:num_names],
+                                                 0.40)
+
+    for i in range(0, num_names):
+        cds = CDS(value_date, maturity_date, running_coupons[i], notionals[i])
+        assert abs(credit_dv01[i] -
+                   cds.credit_dv01(value_date, issuer_curves[i], 0.40)) < 1e-6
+        assert abs(interest_dv01[i] -
+                   cds.interest_dv01(value_date, issuer_curves[i], 0.40)) < 1e-6
@@ -8,8 +8,10 @@ from financepy.utils.day_count import DayCountTypes
 from financepy.utils.frequency import FrequencyTypes
 from financepy.products.rates.ibor_single_curve import IborSingleCurve
 from financepy.products.credit.cds_curve import CDSCurve
+from financepy.products.credit.cds_curve import build_cds_curves
 from financepy.products.rates.ibor_swap import IborSwap
 from financepy.products.credit.cds import CDS
+import numpy as np
 
 
 def test_FinCDSCurve():
@@ -63,19 +65,87 @@ def test_FinCDSCurve():
     maturity_date = curve_date.add_months(12 * i)
     cds = CDS(curve_date, maturity_date, 0.005 + 0.001 * (i - 1))
     v = cds.value(curve_date, issuer_curve, recovery_rate)
-    assert round(v['dirty_pv'] * 1000, 4) == -0.0086
-    assert round(v['clean_pv'] * 1000, 4) == -0.0086
+    assert round(v['dirty_pv'] * 1000, 4) == 0.0
+    assert round(v['clean_pv'] * 1000, 4) == 0.0
 
     i = 5
     maturity_date = curve_date.add_months(12 * i)
     cds = CDS(curve_date, maturity_date, 0.005 + 0.001 * (i - 1))
     v = cds.value(curve_date, issuer_curve, recovery_rate)
-    assert round(v['dirty_pv'] * 1000, 4) == -0.1640
-    assert round(v['clean_pv'] * 1000, 4) == -0.1640
+    assert round(v['dirty_pv'] * 1000, 4) == 0.0
+    assert round(v['clean_pv'] * 1000, 4) == 0.0
 
     i = 10
     maturity_date = curve_date.add_months(12 * i)
     cds = CDS(curve_date, maturity_date, 0.005 + 0.001 * (i - 1))
     v = cds.value(curve_date, issuer_curve, recovery_rate)
-    assert round(v['dirty_pv'] * 1000, 4) == -1.1491
-    assert round(v['clean_pv'] * 1000, 4) == -1.1491
+    assert round(v['dirty_pv'] * 1000, 4) == 0.0
+    assert round(v['clean_pv'] * 1000, 4) == 0.0
+
+
+def test_build_cds_curves():
+
+    curve_date = Date(20, 12, 2018)
+
+    swaps = []
+    fixedDCC = DayCountTypes.ACT_365F
+    fixedFreq = FrequencyTypes.SEMI_ANNUAL
+
+    for i in range(1, 11):
+        maturity_date = curve_date.add_months(12 * i)
+        swap = IborSwap(curve_date, maturity_date, SwapTypes.PAY, 0.05,
+                        fixedFreq, fixedDCC)
+        swaps.append(swap)
+
+    libor_curve = IborSingleCurve(curve_date, [], [], swaps)
+
+    issuer_curves = []
+
+    for j in range(0, 5):
+        cds_contracts = []
+        for i in range(1, 6):
+            maturity_date = curve_date.add_months(24 * i)
+            spd = 0.005 + 0.001 * (i - 1) + 0.002 * j
+            cds = CDS(curve_date, maturity_date, spd)
+            cds_contracts.append(cds)
+
+        issuer_curve = CDSCurve(curve_date, cds_contracts, libor_curve, 0.40)
+        issuer_curves.append(issuer_curve)
+
+    # Nothing has changed so nothing is rebuilt
+    assert build_cds_curves(issuer_curves) == 0
+
+    old_values = [c._values.copy() for c in issuer_curves]
+
+    # Move the spread of the 6Y CDS of one name
+    issuer_curves[2]._cds_contracts[2]._running_coupon += 0.0010
+    assert build_cds_curves(issuer_curves) == 1
+
+    new_values = issuer_curves[2]._values
+    assert np.array_equal(new_values[0:3], old_values[2][0:3])
+    assert new_values[3] < old_values[2][3]
+
+    full_curve = CDSCurve(curve_date, issuer_curves[2]._cds_contracts,
+                          libor_curve, 0.40)
+    assert np.max(np.abs(full_curve._values - new_values)) < 1e-12
+
+    # A premium leg paid on different dates is a change even when the
+    # maturity and coupon are the same
+    old_cds = issuer_curves[1]._cds_contracts[3]
+    issuer_curves[1]._cds_contracts[3] = \
+        CDS(curve_date, old_cds._maturity_date, old_cds._running_coupon,
+            freq_type=FrequencyTypes.SEMI_ANNUAL)
+    assert build_cds_curves(issuer_curves) == 1
+
+    full_curve = CDSCurve(curve_date, issuer_curves[1]._cds_contracts,
+                          libor_curve, 0.40)
+    assert np.max(np.abs(full_curve._values -
+                         issuer_curves[1]._values)) < 1e-12
+    assert np.max(np.abs(full_curve._values - old_values[1])) > 1e-8
+    old_values[1] = full_curve._values
+
+    # All of the curves are rebuilt when they are not incremental
+    assert build_cds_curves(issuer_curves, incremental=False) == 5
+    for j in [0, 1, 3, 4]:
+        assert np.max(np.abs(issuer_curves[j]._values - old_values[j])) \
+            < 1e-12
@@ -7,6 +7,7 @@ from financepy.utils.date import Date
 from financepy.products.credit.cds_tranche import CDSTranche
 from financepy.products.credit.cds_index_portfolio import CDSIndexPortfolio
 from financepy.products.credit.cds_tranche import FinLossDistributionBuilder
+from financepy.models.loss_dbn_cache import LossDbnCache
 
 
 tradeDate = Date(1, 3, 2007)
@@ -172,4 +173,32 @@ def test_heterogeneous():
         corr2,
         num_points,
         method)
-    assert round(v[3] * 10000, 4) == 0.3386
+    assert round(v[3] * 10000, 4) == 0.3385
+
+
+def test_shared_loss_dbn_cache():
+    num_points = 40
+
+    issuer_curves = loadHeterogeneousSpreadCurves(value_date,
+                                                  libor_curve)
+
+    for method in [FinLossDistributionBuilder.RECURSION,
+                   FinLossDistributionBuilder.ADJUSTED_BINOMIAL]:
+
+        cache = LossDbnCache()
+
+        for tranche in tranches:
+            v1 = tranche.value_bc(value_date, issuer_curves, upfront, spd,
+                                  corr1, corr2, num_points, method)
+
+            v2 = tranche.value_bc(value_date, issuer_curves, upfront, spd,
+                                  corr1, corr2, num_points, method, cache)
+
+            assert abs(v1[3] - v2[3]) < 1e-12
+
+        # Only two correlations so the distributions are shared by tranches
+        assert cache.stats()['hits'] > 0
+        assert len(cache) == cache.stats()['misses']
+
+        cache.clear()
+        assert len(cache) == 0
@@ -3,8 +3,10 @@
 ###############################################################################
 
 from financepy.utils.calendar import Calendar, CalendarTypes
+from financepy.utils.calendar import BusDayAdjustTypes
 from financepy.utils.date import set_date_format, DateFormatTypes
-from financepy.utils.date import Date
+from financepy.utils.date import Date, DateArray
+import numpy as np
 import sys
 
 # Between 3rd of January 2020 and 3rd of January 2030
@@ -36,3 +38,95 @@ def test_add_business_day():
 
         assert cal.add_business_days(start, num_days) == end, \
             f"Landed on incorrect business day using {cal_type}"
+
+
+def test_joint_calendar():
+    uk = Calendar(CalendarTypes.UNITED_KINGDOM)
+    us = Calendar(CalendarTypes.UNITED_STATES)
+    target = Calendar(CalendarTypes.TARGET)
+    joint = Calendar([CalendarTypes.TARGET,
+                      CalendarTypes.UNITED_KINGDOM,
+                      CalendarTypes.UNITED_STATES])
+
+    assert str(joint) == "TARGET+UNITED_STATES+UNITED_KINGDOM"
+
+    dt = Date(1, 1, 2020)
+    end = Date(1, 1, 2025)
+    while dt < end:
+        expected = uk.is_business_day(dt) and us.is_business_day(dt) and \
+            target.is_business_day(dt)
+        assert joint.is_business_day(dt) == expected
+        dt = dt.add_days(1)
+
+    # 4th July 2022 is a US holiday only and 29th August 2022 a UK one only
+    assert joint.adjust(Date(4, 7, 2022), BusDayAdjustTypes.FOLLOWING) == \
+        Date(5, 7, 2022)
+    assert joint.adjust(Date(29, 8, 2022), BusDayAdjustTypes.PRECEDING) == \
+        Date(26, 8, 2022)
+
+
+def test_adjust_date_array():
+    start = Date(1, 1, 2020)
+    dates = DateArray([start.add_days(i) for i in range(0, 1000)])
+
+    for cal_type in CalendarTypes:
+        cal = Calendar(cal_type)
+        for bd_type in BusDayAdjustTypes:
+            adjusted = cal.adjust(dates, bd_type)
+            assert isinstance(adjusted, DateArray)
+            assert adjusted.to_list() == [cal.adjust(dt, bd_type)
+                                          for dt in dates]
+
+            serials = cal.adjust(dates.serials(), bd_type)
+            assert np.all(serials == adjusted.serials())
+
+
+def test_add_business_days_negative():
+    cal = Calendar(CalendarTypes.UNITED_KINGDOM)
+    start = Date(3, 1, 2020)
+
+    for num_days in [1, 5, 20, 250, 2527]:
+        end = cal.add_business_days(start, num_days)
+        assert cal.add_business_days(end, -num_days) == start
+
+
+def test_lazy_bitmap_blocks():
+    from financepy.utils.calendar import _holiday_blocks, _business_day_index
+
+    cal = Calendar(CalendarTypes.NORWAY)
+    start = Date(17, 12, 2029)
+
+    # Only the blocks of years around the dates used are built
+    end = cal.add_business_days(start, 10)
+    assert end > Date(1, 1, 2030)
+    assert cal.is_holiday(Date(1, 1, 2030))
+    assert (CalendarTypes.NORWAY, 0) not in _holiday_blocks
+    assert (CalendarTypes.NORWAY, 12) in _holiday_blocks
+    assert (CalendarTypes.NORWAY, 13) in _holiday_blocks
+
+    # Extending the bitmap back in time keeps the business day count right
+    early = Date(3, 1, 1995)
+    assert cal.is_business_day(early)
+    _, _, _, first_serial, last_serial = \
+        _business_day_index[(CalendarTypes.NORWAY,)]
+    assert Date.from_excel(first_serial) == Date(1, 1, 1990)
+    assert Date.from_excel(last_serial) == Date(31, 12, 2039)
+
+    num_days = 0
+    dt = early
+    while dt < start:
+        dt = dt.add_days(1)
+        if cal.is_business_day(dt):
+            num_days += 1
+
+    assert cal.add_business_days(early, num_days) == start
+    assert cal.add_business_days(start, -num_days) == early
+
+
+def test_bitmap_after_2100():
+    cal = Calendar(CalendarTypes.UNITED_KINGDOM)
+
+    # The bitmap is extended beyond 2100 when later dates are used
+    assert cal.is_holiday(Date(25, 12, 2110))
+    assert cal.adjust(Date(25, 12, 2110), BusDayAdjustTypes.FOLLOWING) == \
+        Date(29, 12, 2110)
@@ -5,6 +5,7 @@
 from financepy.utils.frequency import FrequencyTypes
 from financepy.utils.day_count import DayCount, DayCountTypes
 from financepy.utils.date import Date
+import numpy as np
 
 
 start = Date(1, 1, 2019)
@@ -90,3 +91,47 @@ def test_year_frace_SIMPLE():
     answer = day_count.year_frac(start, end, end, finFreq)
 
     assert round(answer[0], 4) == 0.3836
+
+
+def test_year_frac_serials():
+    end_dates = [start.add_days(n) for n in range(1, 2000, 13)]
+    end_serials = np.array([dt._excel_date for dt in end_dates])
+
+    for dc_type in DayCountTypes:
+        if dc_type in (DayCountTypes.ACT_ACT_ICMA, DayCountTypes.ACT_365L):
+            continue
+
+        day_count = DayCount(dc_type)
+        expected = [day_count.year_frac(start, dt)[0] for dt in end_dates]
+        answer = day_count.year_frac_serials(start._excel_date, end_serials)
+
+        assert np.allclose(answer, expected, atol=1e-12)
+
+
+def test_year_frac_array():
+    start_dates = [start.add_days(n) for n in range(0, 1500, 37)]
+    end_dates = [dt.add_days(n % 200) for n, dt in enumerate(start_dates)]
+    next_dates = [dt.add_months(6) for dt in start_dates]
+
+    for dc_type in DayCountTypes:
+        for freq_type in [FrequencyTypes.ANNUAL, FrequencyTypes.SEMI_ANNUAL]:
+            day_count = DayCount(dc_type)
+            acc, nums, dens = day_count.year_frac_array(start_dates,
+                                                        end_dates,
+                                                        next_dates,
+                                                        freq_type)
+
+            for i in range(0, len(start_dates)):
+                expected = day_count.year_frac(start_dates[i],
+                                               end_dates[i],
+                                               next_dates[i],
+                                               freq_type)
+                assert acc[i] == expected[0]
+                assert nums[i] == expected[1]
+                assert dens[i] == expected[2]
+
+
+def test_day_count_interned():
+    assert DayCount(DayCountTypes.ACT_360) is DayCount(DayCountTypes.ACT_360)
+    assert DayCount(DayCountTypes.ACT_360) is not \
+        DayCount(DayCountTypes.ACT_365F)
@@ -44,3 +44,24 @@ def test_FinDiscountCurveZeros():
     date = start_date.add_years(10)
     df = curve.df(date)
     assert round(df, 4) == 0.5584
+
+
+def test_FinDiscountCurveZerosSerials():
+    start_date = Date(1, 1, 2018)
+    times = np.linspace(1.0, 10.0, 10)
+    dates = start_date.add_years(times)
+    zero_rates = np.linspace(5.0, 6.0, 10)/100
+
+    curve = DiscountCurveZeros(start_date,
+                               dates,
+                               zero_rates,
+                               FrequencyTypes.ANNUAL,
+                               DayCountTypes.ACT_ACT_ISDA,
+                               InterpTypes.FLAT_FWD_RATES)
+
+    df_dates = start_date.add_months(list(range(1, 150, 5)))
+    serials = np.array([dt._excel_date for dt in df_dates], dtype=np.int32)
+
+    assert np.allclose(curve.df(serials), curve.df(df_dates), atol=1e-14)
+    assert np.allclose(curve.zero_rate(serials), curve.zero_rate(df_dates),
+                       atol=1e-14)
@@ -5,7 +5,15 @@
 import matplotlib.pyplot as plt
 
 from financepy.models.volatility_fns import VolFuncTypes
-from financepy.utils.date import Date
+from financepy.models.volatility_fns import vol_function_clark_grad
+from financepy.models.volatility_fns import vol_function_bloomberg_grad
+from financepy.models.volatility_fns import vol_function_svi_grad
+from financepy.models.sabr import vol_function_sabr_grad
+from financepy.models.sabr import vol_function_sabr_beta_half_grad
+from financepy.models.sabr import vol_function_sabr_beta_one_grad
+from financepy.market.volatility.vol_calibration import vol_function_grad
+from financepy.utils.date import Date, DateArray
+from financepy.utils.global_types import FinSolverTypes
 from financepy.market.volatility.equity_vol_surface import EquityVolSurface
 from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
 import numpy as np
@@ -69,3 +77,160 @@ def test_equity_vol_surface():
     vol = equitySurface.volatility_from_delta_date(delta, expiry_date)
     assert round(vol[0], 4) == 0.3498
     assert round(vol[1], 4) == 2199.6665
+
+
+def test_equity_vol_surface_levenberg_marquardt():
+    value_date = Date(11, 1, 2021)
+
+    stock_price = 3800.0
+
+    expiry_dates = [Date(11, 2, 2021), Date(11, 3, 2021),
+                    Date(11, 4, 2021), Date(11, 7, 2021),
+                    Date(11, 10, 2021), Date(11, 1, 2022),
+                    Date(11, 1, 2023)]
+
+    strikes = np.array([3037, 3418, 3608, 3703, 3798,
+                        3893, 3988, 4178, 4557])
+
+    volSurface = [[42.94, 31.30, 25.88, 22.94, 19.72, 16.90, 15.31, 17.54, 25.67],
+                  [37.01, 28.25, 24.19, 21.93, 19.57, 17.45, 15.89, 15.34, 21.15],
+                  [34.68, 27.38, 23.82, 21.85, 19.83, 17.98, 16.52, 15.31, 18.94],
+                  [31.41, 26.25, 23.51, 22.05, 20.61, 19.25, 18.03, 16.01, 15.90],
+                  [29.91, 25.58, 23.21, 22.01, 20.83, 19.70, 18.62, 16.63, 14.94],
+                  [29.26, 25.24, 23.03, 21.91, 20.81, 19.73, 18.69, 16.76, 14.63],
+                  [27.59, 24.33, 22.72, 21.93, 21.17, 20.43, 19.71, 18.36, 16.26]]
+
+    volSurface = np.array(volSurface) / 100.0
+
+    discount_curve = DiscountCurveFlat(value_date, 0.020)
+    dividend_curve = DiscountCurveFlat(value_date, 0.010)
+
+    def fit_error(surface, vols):
+        err = 0.0
+        for i in range(0, len(expiry_dates)):
+            for j in range(0, len(strikes)):
+                vol = surface.volatility_from_strike_date(strikes[j],
+                                                          expiry_dates[i])
+                err += (vol - vols[i][j])**2
+        return err
+
+    for vol_functionType in [VolFuncTypes.SVI, VolFuncTypes.CLARK5]:
+
+        nmSurface = EquityVolSurface(value_date, stock_price,
+                                     discount_curve, dividend_curve,
+                                     expiry_dates, strikes, volSurface,
+                                     vol_functionType,
+                                     FinSolverTypes.NELDER_MEAD)
+
+        lmSurface = EquityVolSurface(value_date, stock_price,
+                                     discount_curve, dividend_curve,
+                                     expiry_dates, strikes, volSurface,
+                                     vol_functionType,
+                                     FinSolverTypes.LEVENBERG_MARQUARDT)
+
+        assert lmSurface._build_time > 0.0
+        assert fit_error(lmSurface, volSurface) <= \
+            fit_error(nmSurface, volSurface) + 1e-8
+
+        # Recalibrating to an unchanged market leaves the fit unchanged
+        params = lmSurface._parameters.copy()
+        lmSurface.recalibrate()
+        assert np.max(np.abs(lmSurface._parameters - params)) < 1e-6
+
+        # Warm starting from the last fit matches a fit from scratch
+        newVolSurface = volSurface * 1.02
+        lmSurface.recalibrate(stock_price=3820.0,
+                              volatility_grid=newVolSurface)
+
+        newSurface = EquityVolSurface(value_date, 3820.0,
+                                      discount_curve, dividend_curve,
+                                      expiry_dates, strikes, newVolSurface,
+                                      vol_functionType,
+                                      FinSolverTypes.LEVENBERG_MARQUARDT)
+
+        assert abs(fit_error(lmSurface, newVolSurface) -
+                   fit_error(newSurface, newVolSurface)) < 1e-6
+
+
+def test_vol_function_grad_nan():
+    """ The calibration rejects a trial step that leaves the domain of the
+    volatility function by detecting the NaN it gives. This relies on the
+    gradient functions not being compiled with fastmath. """
+
+    gradFunctions = [vol_function_grad, vol_function_clark_grad,
+                     vol_function_bloomberg_grad, vol_function_svi_grad,
+                     vol_function_sabr_grad, vol_function_sabr_beta_half_grad,
+                     vol_function_sabr_beta_one_grad]
+
+    for gradFunction in gradFunctions:
+        assert not gradFunction.targetoptions.get("fastmath", False)
+
+    # The SVI total variance is negative at the money
+    params = np.array([-0.10, 0.01, 0.0, 0.0, 0.10])
+    grad = np.zeros(5)
+    vol = vol_function_grad(VolFuncTypes.SVI.value, params, 100.0, 100.0,
+                            1.0, grad)
+    assert np.isnan(vol)
+
+
+def test_equity_vol_surface_array():
+    value_date = Date(11, 1, 2021)
+
+    stock_price = 3800.0
+
+    expiry_dates = [Date(11, 2, 2021), Date(11, 3, 2021),
+                    Date(11, 4, 2021), Date(11, 7, 2021),
+                    Date(11, 10, 2021), Date(11, 1, 2022),
+                    Date(11, 1, 2023)]
+
+    strikes = np.array([3037, 3418, 3608, 3703, 3798,
+                        3893, 3988, 4178, 4557])
+
+    volSurface = [[42.94, 31.30, 25.88, 22.94, 19.72, 16.90, 15.31, 17.54, 25.67],
+                  [37.01, 28.25, 24.19, 21.93, 19.57, 17.45, 15.89, 15.34, 21.15],
+                  [34.68, 27.38, 23.82, 21.85, 19.83, 17.98, 16.52, 15.31, 18.94],
+                  [31.41, 26.25, 23.51, 22.05, 20.61, 19.25, 18.03, 16.01, 15.90],
+                  [29.91, 25.58, 23.21, 22.01, 20.83, 19.70, 18.62, 16.63, 14.94],
+                  [29.26, 25.24, 23.03, 21.91, 20.81, 19.73, 18.69, 16.76, 14.63],
+                  [27.59, 24.33, 22.72, 21.93, 21.17, 20.43, 19.71, 18.36, 16.26]]
+
+    volSurface = np.array(volSurface) / 100.0
+
+    discount_curve = DiscountCurveFlat(value_date, 0.020)
+    dividend_curve = DiscountCurveFlat(value_date, 0.010)
+
+    equitySurface = EquityVolSurface(value_date, stock_price,
+                                     discount_curve, dividend_curve,
+                                     expiry_dates, strikes, volSurface,
+                                     VolFuncTypes.SVI,
+                                     FinSolverTypes.LEVENBERG_MARQUARDT)
+
+    # Dates before, on, between and after the surface expiries
+    dates = [Date(20, 1, 2021), Date(11, 3, 2021), Date(1, 6, 2021),
+             Date(11, 1, 2023), Date(11, 6, 2024)]
+
+    testStrikes = np.array([2800.0, 3500.0, 3800.0, 4200.0, 4800.0])
+
+    vols = equitySurface.volatility_from_strike_date_array(testStrikes,
+                                                           DateArray(dates))
+
+    for k, dt, vol in zip(testStrikes, dates, vols):
+        assert abs(vol - equitySurface.volatility_from_strike_date(k, dt)) \
+            < 1e-12
+
+    # A column of strikes against a list of dates gives a grid of vols
+    grid = equitySurface.volatility_from_strike_date_array(
+        testStrikes.reshape(-1, 1), dates)
+
+    assert grid.shape == (len(testStrikes), len(dates))
+
+    for i in range(0, len(testStrikes)):
+        for j in range(0, len(dates)):
+            vol = equitySurface.volatility_from_strike_date(testStrikes[i],
+                                                            dates[j])
+            assert abs(grid[i][j] - vol) < 1e-12
+
+    # A single expiry date applies to all of the strikes
+    vols = equitySurface.volatility_from_strike_date_array(testStrikes,
+                                                           dates[2])
+    assert abs(vols[3] - grid[3][2]) < 1e-12
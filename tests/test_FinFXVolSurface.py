@@ -2,8 +2,11 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ###############################################################################
 
+import numpy as np
+
 from financepy.models.volatility_fns import VolFuncTypes
-from financepy.utils.date import Date
+from financepy.utils.date import Date, DateArray
+from financepy.utils.global_types import FinSolverTypes
 from financepy.market.volatility.fx_vol_surface import FinFXDeltaMethod
 from financepy.market.volatility.fx_vol_surface import FinFXATMMethod
 from financepy.market.volatility.fx_vol_surface import FXVolSurface
@@ -192,3 +195,107 @@ def test_FinFXMktVolSurface4(capsys):
     fxMarket.check_calibration(verboseCalibration)
     captured = capsys.readouterr()
     assert captured.out == ""
+
+
+def test_FinFXMktVolSurfaceLevenbergMarquardt(capsys):
+    # EURUSD example from Clark as in test_FinFXMktVolSurface1
+
+    value_date = Date(10, 4, 2020)
+
+    forName = "EUR"
+    domName = "USD"
+    forCCRate = 0.03460  # EUR
+    domCCRate = 0.02940  # USD
+
+    dom_discount_curve = DiscountCurveFlat(value_date, domCCRate)
+    for_discount_curve = DiscountCurveFlat(value_date, forCCRate)
+
+    currency_pair = forName + domName
+    spot_fx_rate = 1.3465
+
+    tenors = ['1M', '2M', '3M', '6M', '1Y', '2Y']
+    atm_vols = [21.00, 21.00, 20.750, 19.400, 18.250, 17.677]
+    marketStrangle25DeltaVols = [0.65, 0.75, 0.85, 0.90, 0.95, 0.85]
+    riskReversal25DeltaVols = [-0.20, -0.25, -0.30, -0.50, -0.60, -0.562]
+
+    notional_currency = forName
+
+    atmMethod = FinFXATMMethod.FWD_DELTA_NEUTRAL
+    delta_method = FinFXDeltaMethod.SPOT_DELTA
+
+    surfaces = []
+
+    for finSolverType in [FinSolverTypes.CONJUGATE_GRADIENT,
+                          FinSolverTypes.LEVENBERG_MARQUARDT]:
+
+        fxMarket = FXVolSurface(value_date,
+                                spot_fx_rate,
+                                currency_pair,
+                                notional_currency,
+                                dom_discount_curve,
+                                for_discount_curve,
+                                tenors,
+                                atm_vols,
+                                marketStrangle25DeltaVols,
+                                riskReversal25DeltaVols,
+                                atmMethod,
+                                delta_method,
+                                VolFuncTypes.CLARK,
+                                finSolverType)
+
+        fxMarket.check_calibration(verboseCalibration, tol=1e-5)
+        captured = capsys.readouterr()
+        assert captured.out == ""
+        assert fxMarket._build_time > 0.0
+
+        surfaces.append(fxMarket)
+
+    cgMarket, lmMarket = surfaces
+
+    assert np.max(np.abs(cgMarket._parameters -
+                         lmMarket._parameters)) < 1e-4
+
+    # Refit after a spot move starting from the current calibration
+    lmMarket.recalibrate(spot_fx_rate=1.3500)
+    lmMarket.check_calibration(verboseCalibration, tol=1e-5)
+    captured = capsys.readouterr()
+    assert captured.out == ""
+
+
+def test_FinFXMktVolSurfaceArray():
+    # EURUSD example from Clark as in test_FinFXMktVolSurface1
+
+    value_date = Date(10, 4, 2020)
+
+    dom_discount_curve = DiscountCurveFlat(value_date, 0.02940)
+    for_discount_curve = DiscountCurveFlat(value_date, 0.03460)
+
+    tenors = ['1M', '2M', '3M', '6M', '1Y', '2Y']
+    atm_vols = [21.00, 21.00, 20.750, 19.400, 18.250, 17.677]
+    marketStrangle25DeltaVols = [0.65, 0.75, 0.85, 0.90, 0.95, 0.85]
+    riskReversal25DeltaVols = [-0.20, -0.25, -0.30, -0.50, -0.60, -0.562]
+
+    fxMarket = FXVolSurface(value_date,
+                            1.3465,
+                            "EURUSD",
+                            "EUR",
+                            dom_discount_curve,
+                            for_discount_curve,
+                            tenors,
+                            atm_vols,
+                            marketStrangle25DeltaVols,
+                            riskReversal25DeltaVols,
+                            FinFXATMMethod.FWD_DELTA_NEUTRAL,
+                            FinFXDeltaMethod.SPOT_DELTA,
+                            VolFuncTypes.CLARK)
+
+    # Dates before, between and after the surface expiries
+    dates = [Date(20, 4, 2020), Date(1, 7, 2020), Date(1, 2, 2021),
+             Date(1, 1, 2022), Date(1, 1, 2024)]
+
+    strikes = np.array([1.20, 1.30, 1.35, 1.40, 1.50])
+
+    vols = fxMarket.volatility_array(strikes, DateArray(dates))
+
+    for k, dt, vol in zip(strikes, dates, vols):
+        assert abs(vol - fxMarket.volatility(k, dt)) < 1e-12
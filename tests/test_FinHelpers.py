@@ -0,0 +1,35 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import pytest
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.error import FinError
+from financepy.utils import global_vars
+from financepy.utils.helpers import argument_type_checks
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+
+
+def test_argument_type_checks():
+    value_date = Date(1, 1, 2021)
+
+    with pytest.raises(FinError):
+        DiscountCurveFlat(value_date, "0.05")
+
+    # The cached validator gives the same answer on later calls
+    with pytest.raises(FinError):
+        DiscountCurveFlat(value_date, "0.05")
+
+    DiscountCurveFlat(value_date, 0.05)
+
+    with pytest.raises(FinError):
+        DiscountCurveFlat(value_date, np.float32(0.05))
+
+    with argument_type_checks(False):
+        assert global_vars.gCheckArgumentTypes is False
+        curve = DiscountCurveFlat(value_date, np.float32(0.05))
+        assert curve._flat_rate == np.float32(0.05)
+
+    assert global_vars.gCheckArgumentTypes is True
@@ -7,7 +7,9 @@ from financepy.models.bdt_tree import BDTTree
 from financepy.models.hw_tree import HWTree
 from financepy.models.bk_tree import BKTree
 from financepy.models.black import Black
+from financepy.models.tree_cache import TreeCache
 from financepy.products.rates.bermudan_swaption import IborBermudanSwaption
+from financepy.products.rates.bermudan_swaption import value_bermudan_swaptions
 from financepy.products.rates.ibor_swap import IborSwap
 from financepy.products.rates.ibor_swaption import IborSwaption
 from financepy.utils.global_types import FinExerciseTypes
@@ -308,3 +310,167 @@ def test_hw_bermudan_exercise():
 
     valueRec = bermudan_swaption_rec.value(value_date, libor_curve, model)
     assert round(valueRec, 4) == 10406.4558
+
+
+def test_tree_cache():
+    bermudan_swaption_pay = IborBermudanSwaption(settle_date,
+                                                 exercise_date,
+                                                 swap_maturity_date,
+                                                 SwapTypes.PAY,
+                                                 FinExerciseTypes.BERMUDAN,
+                                                 swap_fixed_coupon,
+                                                 swap_fixed_frequency_type,
+                                                 swapFixedDayCountType)
+
+    bermudan_swaption_rec = IborBermudanSwaption(settle_date,
+                                                 exercise_date,
+                                                 swap_maturity_date,
+                                                 SwapTypes.RECEIVE,
+                                                 FinExerciseTypes.BERMUDAN,
+                                                 swap_fixed_coupon,
+                                                 swap_fixed_frequency_type,
+                                                 swapFixedDayCountType)
+
+    sigma = 0.01
+    a = 0.01
+
+    for model_type, args in [(HWTree, (sigma, a, num_time_steps)),
+                             (BKTree, (0.2, a, num_time_steps)),
+                             (BDTTree, (0.2, num_time_steps))]:
+
+        tree_cache = TreeCache(max_size=2)
+        model = model_type(*args)
+        cached_model = model_type(*args, tree_cache=tree_cache)
+
+        for swaption in [bermudan_swaption_pay, bermudan_swaption_rec]:
+            v = swaption.value(value_date, libor_curve, model)
+            v_cached = swaption.value(value_date, libor_curve, cached_model)
+            assert v == v_cached
+
+        stats = tree_cache.stats()
+        assert stats['misses'] == 1
+        assert stats['hits'] == 1
+        assert tree_cache.hit_rate() == 0.5
+
+    # A tree to a longer maturity is only reused if this is allowed and it
+    # has the same time step. The swap maturities are 4 and 8 years, which
+    # are 1461 and 2922 days, so 200 and 400 steps give the same time step.
+    long_swaption = IborBermudanSwaption(settle_date,
+                                         exercise_date,
+                                         settle_date.add_years(8),
+                                         SwapTypes.PAY,
+                                         FinExerciseTypes.BERMUDAN,
+                                         swap_fixed_coupon,
+                                         swap_fixed_frequency_type,
+                                         swapFixedDayCountType)
+
+    for model_type, args in [(HWTree, (sigma, a)),
+                             (BKTree, (0.2, a)),
+                             (BDTTree, (0.2,))]:
+
+        v = bermudan_swaption_pay.value(value_date, libor_curve,
+                                        model_type(*args, 200))
+
+        for reuse_longer_trees in [False, True]:
+            tree_cache = TreeCache(reuse_longer_trees=reuse_longer_trees)
+            long_model = model_type(*args, 400, tree_cache=tree_cache)
+            model = model_type(*args, 200, tree_cache=tree_cache)
+            long_swaption.value(value_date, libor_curve, long_model)
+            v_cached = bermudan_swaption_pay.value(value_date, libor_curve,
+                                                   model)
+            assert tree_cache.stats()['hits'] == int(reuse_longer_trees)
+            assert abs(v_cached - v) < 1e-6
+
+        # A longer tree with a different time step is not reused
+        tree_cache = TreeCache(reuse_longer_trees=True)
+        long_model = model_type(*args, 300, tree_cache=tree_cache)
+        model = model_type(*args, 200, tree_cache=tree_cache)
+        long_swaption.value(value_date, libor_curve, long_model)
+        bermudan_swaption_pay.value(value_date, libor_curve, model)
+        assert tree_cache.stats()['hits'] == 0
+
+    # The least recently used tree is evicted when the cache is full
+    tree_cache = TreeCache(max_size=1)
+    model = HWTree(sigma, a, num_time_steps, tree_cache=tree_cache)
+    long_swaption.value(value_date, libor_curve, model)
+    bermudan_swaption_pay.value(value_date, libor_curve, model)
+    long_swaption.value(value_date, libor_curve, model)
+    assert tree_cache.stats()['evictions'] == 2
+    assert len(tree_cache) == 1
+
+
+def test_value_bermudan_swaptions():
+    swaptions = []
+
+    for fixed_leg_type in [SwapTypes.PAY, SwapTypes.RECEIVE]:
+        for exercise_type in [FinExerciseTypes.EUROPEAN,
+                              FinExerciseTypes.BERMUDAN]:
+            for fixed_coupon in [0.05, swap_fixed_coupon, 0.07]:
+                swaption = IborBermudanSwaption(settle_date,
+                                                exercise_date,
+                                                swap_maturity_date,
+                                                fixed_leg_type,
+                                                exercise_type,
+                                                fixed_coupon,
+                                                swap_fixed_frequency_type,
+                                                swapFixedDayCountType)
+                swaptions.append(swaption)
+
+    # A shorter swaption is valued on its own tree
+    short_swaption = IborBermudanSwaption(settle_date,
+                                          exercise_date,
+                                          settle_date.add_years(3),
+                                          SwapTypes.PAY,
+                                          FinExerciseTypes.BERMUDAN,
+                                          swap_fixed_coupon,
+                                          swap_fixed_frequency_type,
+                                          swapFixedDayCountType)
+
+    for model in [HWTree(0.01, 0.01, num_time_steps),
+                  BKTree(0.2, 0.05, num_time_steps),
+                  BDTTree(0.2, num_time_steps)]:
+
+        values = value_bermudan_swaptions(swaptions + [short_swaption],
+                                          value_date, libor_curve, model)
+
+        for swaption, v in zip(swaptions, values):
+            v_single = swaption.value(value_date, libor_curve, model)
+            assert abs(v - v_single) < 1e-6
+
+        v_single = short_swaption.value(value_date, libor_curve, model)
+        assert abs(values[-1] - v_single) < 1e-6
+
+
+def test_underlying_swap_reused():
+    swaption = IborBermudanSwaption(settle_date,
+                                    exercise_date,
+                                    swap_maturity_date,
+                                    SwapTypes.PAY,
+                                    FinExerciseTypes.BERMUDAN,
+                                    swap_fixed_coupon,
+                                    swap_fixed_frequency_type,
+                                    swapFixedDayCountType)
+
+    model = HWTree(0.01, 0.01, num_time_steps)
+
+    v1 = swaption.value(value_date, libor_curve, model)
+    swap = swaption._underlying_swap
+    v2 = swaption.value(value_date, libor_curve, model)
+    assert swaption._underlying_swap is swap
+    assert v1 == v2
+
+    # Changing the coupon rebuilds the underlying swap and its flows
+    swaption._fixed_coupon = 0.05
+    v3 = swaption.value(value_date, libor_curve, model)
+    assert swaption._underlying_swap is not swap
+
+    swaption = IborBermudanSwaption(settle_date,
+                                    exercise_date,
+                                    swap_maturity_date,
+                                    SwapTypes.PAY,
+                                    FinExerciseTypes.BERMUDAN,
+                                    0.05,
+                                    swap_fixed_frequency_type,
+                                    swapFixedDayCountType)
+
+    assert v3 == swaption.value(value_date, libor_curve, model)
@@ -170,3 +170,53 @@ def test_floor():
     assert round(cvalue4, 4) == 29258.1395
     assert round(cvalue5, 4) == 81255.1368
     assert round(cvalue6, 4) == 29258.2786
+
+
+def test_dates_reused():
+    capfloor = IborCapFloor(start_date, maturity_date,
+                            FinCapFloorTypes.CAP, 0.02)
+
+    v1 = capfloor.value(value_date, libor_curve, model1)
+    dates = capfloor._capFloorLetDates
+    v2 = capfloor.value(value_date, libor_curve, model1)
+    assert capfloor._capFloorLetDates is dates
+    assert v1 == v2
+
+    # Changing the maturity regenerates the caplet dates
+    capfloor._maturity_date = start_date.add_tenor("2Y")
+    v3 = capfloor.value(value_date, libor_curve, model1)
+    assert len(capfloor._capFloorLetDates) > len(dates)
+
+    capfloor = IborCapFloor(start_date, start_date.add_tenor("2Y"),
+                            FinCapFloorTypes.CAP, 0.02)
+
+    assert v3 == capfloor.value(value_date, libor_curve, model1)
+
+
+def test_caplet_values():
+    strikes = [0.01, 0.02, 0.035, 0.05, 0.08]
+    capfloor = IborCapFloor(start_date, start_date.add_tenor("5Y"),
+                            FinCapFloorTypes.FLOOR, 0.02)
+
+    for model in [model1, model2, model3, model4, model5, model6]:
+        v = capfloor.caplet_values(value_date, libor_curve, model, strikes)
+
+        for i_k, k in enumerate(strikes):
+            single = IborCapFloor(start_date, start_date.add_tenor("5Y"),
+                                  FinCapFloorTypes.FLOOR, k)
+            value = single.value(value_date, libor_curve, model)
+            assert abs(v['values'][i_k] - value) < 1e-8
+            assert abs(v['caplet_values'][i_k].sum() - value) < 1e-8
+
+    # The breakdown agrees with the valuation of each floorlet
+    capfloor.value(value_date, libor_curve, model1)
+    v = capfloor.caplet_values(value_date, libor_curve, model1)
+    dates = capfloor._capFloorLetDates
+
+    for i in range(2, len(dates)):
+        floorlet = capfloor.value_caplet_floor_let(value_date,
+                                                   dates[i - 1],
+                                                   dates[i],
+                                                   libor_curve,
+                                                   model1)
+        assert abs(v['caplet_values'][0, i - 1] - floorlet) < 1e-8
@@ -6,7 +6,7 @@ from financepy.products.rates.ois import OIS
 from financepy.products.rates.ois_curve import OISCurve
 from financepy.products.rates.dual_curve import IborDualCurve
 from financepy.products.rates.ibor_single_curve import IborSingleCurve
-from financepy.utils.global_types import SwapTypes
+from financepy.utils.global_types import SwapTypes, CurveBuildTypes
 from financepy.utils.math import ONE_MILLION
 from financepy.market.curves.interpolator import InterpTypes
 from financepy.products.rates.ibor_swap import IborSwap
@@ -271,3 +271,46 @@ def test_bloombergPricingExample():
         settle_date, oisCurve), 4) == -55524.5709
     assert round(swaps[0]._float_leg.value(
         settle_date, oisCurve, liborDualCurve, None), 4) == 55524.5709
+
+
+def test_global_newton_build():
+    value_date = Date(6, 6, 2018)
+    settle_date = value_date.add_weekdays(2)
+    oisCurve = buildOIS(value_date)
+
+    depoDCCType = DayCountTypes.ACT_360
+    depos = [IborDeposit(settle_date, "3M", 0.0231, depoDCCType)]
+    fras = [IborFRA(settle_date.add_months(3), "3M", 0.0245, depoDCCType)]
+
+    def build_swaps(shift):
+        swaps = []
+        for (tenor, swap_rate) in [("2Y", 0.0277), ("5Y", 0.0293),
+                                   ("10Y", 0.0300), ("30Y", 0.0301)]:
+            swap = IborSwap(settle_date, tenor, SwapTypes.PAY,
+                            swap_rate + shift, FrequencyTypes.SEMI_ANNUAL,
+                            DayCountTypes.THIRTY_E_360)
+            swaps.append(swap)
+        return swaps
+
+    swaps = build_swaps(0.0)
+
+    bootstrap_curve = IborDualCurve(value_date, oisCurve, depos, fras, swaps,
+                                    InterpTypes.FLAT_FWD_RATES)
+
+    newton_curve = IborDualCurve(value_date, oisCurve, depos, fras, swaps,
+                                 InterpTypes.FLAT_FWD_RATES, True,
+                                 CurveBuildTypes.GLOBAL_NEWTON)
+
+    assert np.max(np.abs(newton_curve._dfs - bootstrap_curve._dfs)) < 1e-9
+
+    for swap in swaps:
+        v = swap.value(value_date, oisCurve, newton_curve, None)
+        assert abs(v) < 1e-6
+
+    swaps = build_swaps(0.0001)
+
+    warm_curve = IborDualCurve(value_date, oisCurve, depos, fras, swaps,
+                               InterpTypes.FLAT_FWD_RATES, True,
+                               CurveBuildTypes.GLOBAL_NEWTON, newton_curve)
+
+    assert warm_curve._num_iterations <= 3
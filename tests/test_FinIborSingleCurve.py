@@ -2,13 +2,18 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ###############################################################################
 
-from financepy.utils.global_types import SwapTypes
+import numpy as np
+
+from financepy.utils.global_types import SwapTypes, CurveBuildTypes
 from financepy.utils.math import ONE_MILLION
 from financepy.market.curves.interpolator import InterpTypes
 from financepy.products.rates.ibor_swap import IborSwap
 from financepy.products.rates.ibor_deposit import IborDeposit
 from financepy.products.rates.ibor_future import IborFuture
 from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.rates.ibor_swaption import IborSwaption
+from financepy.products.bonds.bond import Bond
+from financepy.models.black import Black
 from financepy.utils.frequency import FrequencyTypes
 from financepy.utils.day_count import DayCountTypes
 from financepy.utils.date import Date
@@ -137,3 +142,138 @@ def test_bloombergPricingExample():
         settle_date, libor_curve), 4) == 53714.5507
     assert round(swaps[0]._float_leg.value(
         settle_date, libor_curve, libor_curve, None), 4) == 53714.5507
+
+
+def build_ibor_instruments(value_date, shift=0.0):
+    settle_date = value_date.add_weekdays(2)
+    depoDCCType = DayCountTypes.ACT_360
+
+    depos = []
+    depos.append(IborDeposit(settle_date, "3M", 0.0231 + shift, depoDCCType))
+    depos.append(IborDeposit(settle_date, "6M", 0.0240 + shift, depoDCCType))
+
+    fras = []
+
+    swaps = []
+    swap_rates = [("2Y", 0.0277), ("3Y", 0.0286), ("5Y", 0.0293),
+                  ("7Y", 0.0295), ("10Y", 0.0300), ("20Y", 0.0305),
+                  ("30Y", 0.0301)]
+
+    for (tenor, swap_rate) in swap_rates:
+        swap = IborSwap(settle_date, tenor, SwapTypes.PAY, swap_rate + shift,
+                        FrequencyTypes.SEMI_ANNUAL, DayCountTypes.THIRTY_E_360)
+        swaps.append(swap)
+
+    return depos, fras, swaps
+
+
+def test_global_newton_build():
+    value_date = Date(6, 6, 2018)
+
+    for interp_type in [InterpTypes.FLAT_FWD_RATES,
+                        InterpTypes.LINEAR_ZERO_RATES,
+                        InterpTypes.LINEAR_FWD_RATES]:
+
+        depos, fras, swaps = build_ibor_instruments(value_date)
+
+        bootstrap_curve = IborSingleCurve(value_date, depos, fras, swaps,
+                                          interp_type)
+
+        newton_curve = IborSingleCurve(value_date, depos, fras, swaps,
+                                       interp_type, True,
+                                       CurveBuildTypes.GLOBAL_NEWTON)
+
+        assert np.max(np.abs(newton_curve._dfs -
+                             bootstrap_curve._dfs)) < 1e-9
+
+        for swap in swaps:
+            v = swap.value(value_date, newton_curve, newton_curve, None)
+            assert abs(v) < 1e-6
+
+        # After a small move in the quotes the warm start needs few steps
+        depos, fras, swaps = build_ibor_instruments(value_date, 0.0001)
+
+        warm_curve = IborSingleCurve(value_date, depos, fras, swaps,
+                                     interp_type, True,
+                                     CurveBuildTypes.GLOBAL_NEWTON,
+                                     newton_curve)
+
+        assert warm_curve._num_iterations <= 2
+
+    # A spline curve refits all of the instruments
+    depos, fras, swaps = build_ibor_instruments(value_date)
+
+    spline_curve = IborSingleCurve(value_date, depos, fras, swaps,
+                                   InterpTypes.NATCUBIC_LOG_DISCOUNT, False,
+                                   CurveBuildTypes.GLOBAL_NEWTON)
+
+    for swap in swaps:
+        v = swap.value(value_date, spline_curve, spline_curve, None)
+        assert abs(v) < 1e-6
+
+
+def test_bucketed_dv01():
+    value_date = Date(6, 6, 2018)
+    settle_date = value_date.add_weekdays(2)
+
+    depos, fras, swaps = build_ibor_instruments(value_date)
+    curve = IborSingleCurve(value_date, depos, fras, swaps,
+                            InterpTypes.FLAT_FWD_RATES)
+
+    swap = IborSwap(settle_date, "6Y", SwapTypes.RECEIVE, 0.031,
+                    FrequencyTypes.ANNUAL, DayCountTypes.ACT_360)
+
+    bond = Bond(Date(1, 1, 2015), Date(15, 5, 2027), 0.04,
+                FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_ACT_ICMA)
+
+    swaption = IborSwaption(value_date, value_date.add_years(2),
+                            value_date.add_years(9), SwapTypes.PAY, 0.03,
+                            FrequencyTypes.SEMI_ANNUAL,
+                            DayCountTypes.THIRTY_E_360)
+
+    model = Black(0.20)
+
+    def values(c):
+        return np.array([swap.value(value_date, c),
+                         bond.dirty_price_from_discount_curve(settle_date, c),
+                         swaption.value(value_date, c, model)])
+
+    sensitivities = [swap.df_sensitivities(value_date, curve),
+                     bond.df_sensitivities(settle_date, curve),
+                     swaption.df_sensitivities(value_date, curve, model)]
+
+    for (v, _), v_curve in zip(sensitivities, values(curve)):
+        assert abs(v - v_curve) < 1e-6
+
+    dv01 = curve.bucketed_dv01([sens for (_, sens) in sensitivities])
+
+    # The synthetic deposit added in front of the market deposits is risked
+    # through the quote of the first deposit
+    num_depos = len(depos)
+    assert dv01.shape == (3, num_depos + len(fras) + len(swaps))
+
+    bumped_values = []
+    for shift in [0.0001, -0.0001]:
+        new_depos, new_fras, new_swaps = build_ibor_instruments(value_date)
+        new_depos[0]._deposit_rate += shift
+        new_curve = IborSingleCurve(value_date, new_depos, new_fras,
+                                    new_swaps, InterpTypes.FLAT_FWD_RATES)
+        bumped_values.append(values(new_curve))
+
+    dv01_bumped = (bumped_values[0] - bumped_values[1]) / 2.0
+    assert np.allclose(dv01[:, 0], dv01_bumped, rtol=1e-4)
+
+    # Compare with bumping each swap quote and rebuilding the curve
+    for i in [1, 3, 4]:
+        bumped_values = []
+        for shift in [0.0001, -0.0001]:
+            new_depos, new_fras, new_swaps = build_ibor_instruments(value_date)
+            fixed_leg = new_swaps[i]._fixed_leg
+            fixed_leg._cpn += shift
+            fixed_leg.generate_payments()
+            new_curve = IborSingleCurve(value_date, new_depos, new_fras,
+                                        new_swaps, InterpTypes.FLAT_FWD_RATES)
+            bumped_values.append(values(new_curve))
+
+        dv01_bumped = (bumped_values[0] - bumped_values[1]) / 2.0
+        assert np.allclose(dv01[:, num_depos + i], dv01_bumped, rtol=1e-4)
@@ -219,3 +219,34 @@ def test_receive():
     assert round(swap4, 1) == 125293.6
     assert round(swap5, 1) == 124657.1
     assert round(swap6, 1) == 124274.9
+
+
+def test_underlying_swap_reused():
+    swaption = IborSwaption(settle_date,
+                            exercise_date,
+                            swap_maturity_date,
+                            SwapTypes.PAY,
+                            0.02,
+                            swap_fixed_frequency_type,
+                            swapFixedDayCountType)
+
+    v1 = swaption.value(value_date, libor_curve, model1)
+    swap = swaption._underlying_swap
+    v2 = swaption.value(value_date, libor_curve, model1)
+    assert swaption._underlying_swap is swap
+    assert v1 == v2
+
+    # Changing the strike rebuilds the underlying swap
+    swaption._fixed_coupon = 0.08
+    v3 = swaption.value(value_date, libor_curve, model1)
+    assert swaption._underlying_swap is not swap
+
+    swaption = IborSwaption(settle_date,
+                            exercise_date,
+                            swap_maturity_date,
+                            SwapTypes.PAY,
+                            0.08,
+                            swap_fixed_frequency_type,
+                            swapFixedDayCountType)
+
+    assert v3 == swaption.value(value_date, libor_curve, model1)
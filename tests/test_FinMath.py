@@ -3,7 +3,7 @@
 ###############################################################################
 
 from financepy.utils.math import normcdf_slow, N, normcdf_integrate
-from financepy.utils.math import accrued_interpolator
+from financepy.utils.math import accrued_interpolator, student_t_cdf
 import numpy as np
 
 
@@ -25,6 +25,15 @@ def test_normcdf_integrate():
     assert round(result, 5) == 0.00135
 
 
+def test_student_t_cdf():
+    assert round(student_t_cdf(x, 5.0), 6) == 0.01505
+    assert round(student_t_cdf(-x, 5.0), 6) == 0.98495
+    assert round(student_t_cdf(x, 2.5), 6) == 0.036288
+    assert student_t_cdf(0.0, 5.0) == 0.5
+    # The distribution tends to the normal for many degrees of freedom
+    assert round(student_t_cdf(x, 1e7), 5) == 0.00135
+
+
 def test_accrued_interpolator():
     cpn_times = [0.0, 4.000087613144162,
                     4.495649459810208, 5.002162949496498]
@@ -0,0 +1,120 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+from pytest import approx
+
+from financepy.products.equity.equity_american_option import EquityAmericanOption
+from financepy.products.equity.equity_vanilla_option import EquityVanillaOption
+from financepy.products.equity.equity_barrier_option import EquityBarrierOption
+from financepy.models.black_scholes import BlackScholesTypes
+from financepy.models.black_scholes import BlackScholes
+from financepy.models.black_scholes_pde import black_scholes_pde
+from financepy.models.black_scholes_pde import pde_log_grid
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.utils.global_types import OptionTypes
+from financepy.utils.global_types import EquityBarrierTypes
+from financepy.utils.date import Date
+from financepy.utils.error import FinError
+from financepy.models.black import Black
+
+
+value_date = Date(1, 1, 2021)
+expiry_date = Date(1, 1, 2022)
+stock_price = 100.0
+volatility = 0.25
+discount_curve = DiscountCurveFlat(value_date, 0.05)
+dividend_curve = DiscountCurveFlat(value_date, 0.02)
+model = BlackScholes(volatility)
+
+
+def test_pde_log_grid():
+    x = pde_log_grid(0.0, 1.0, 100, [0.5], 0.05, 0.0)
+    assert x == approx(np.linspace(0.0, 1.0, 101))
+
+    x = pde_log_grid(0.0, 1.0, 100, [0.5], 0.05, 5.0)
+    dx = np.diff(x)
+    assert x[0] == 0.0 and x[-1] == 1.0
+    assert np.all(dx > 0.0)
+    assert dx[50] < dx[0] / 3.0
+
+
+def test_strike_ladder():
+    strike_prices = np.linspace(80.0, 120.0, 9)
+
+    option = EquityVanillaOption(expiry_date, strike_prices,
+                                 OptionTypes.EUROPEAN_CALL)
+
+    v_bs = option.value(value_date, stock_price, discount_curve,
+                        dividend_curve, model)
+    delta_bs = option.delta(value_date, stock_price, discount_curve,
+                            dividend_curve, model)
+    gamma_bs = option.gamma(value_date, stock_price, discount_curve,
+                            dividend_curve, model)
+
+    v_pde = option.value_pde(value_date, stock_price, discount_curve,
+                             dividend_curve, model)
+
+    assert v_pde['value'] == approx(v_bs, abs=1e-3)
+    assert v_pde['delta'] == approx(delta_bs, abs=1e-4)
+    assert v_pde['gamma'] == approx(gamma_bs, abs=1e-4)
+
+    # Each option valued on its own has the same value as in the ladder
+    v_single = black_scholes_pde(stock_price, 1.0, strike_prices[2],
+                                 0.05, 0.02, volatility,
+                                 OptionTypes.EUROPEAN_CALL.value)
+    v_ladder = black_scholes_pde(stock_price, 1.0, strike_prices,
+                                 0.05, 0.02, volatility,
+                                 [OptionTypes.EUROPEAN_CALL.value] * 9)
+    assert v_single['value'][0] == approx(v_ladder['value'][2], abs=1e-3)
+
+
+def test_american_put():
+    option = EquityAmericanOption(expiry_date, 100.0,
+                                  OptionTypes.AMERICAN_PUT)
+
+    v_pde = option.value_pde(value_date, stock_price, discount_curve,
+                             dividend_curve, model)
+
+    pde_model = BlackScholes(volatility, bs_type=BlackScholesTypes.PDE)
+    v = option.value(value_date, stock_price, discount_curve,
+                     dividend_curve, pde_model)
+
+    assert v == v_pde['value']
+    assert v_pde['value'] == approx(8.5651, abs=1e-2)
+    assert v_pde['delta'] < 0.0
+    assert v_pde['gamma'] > 0.0
+
+
+def test_barrier_options():
+    for option_type in EquityBarrierTypes:
+        for barrier_level in [90.0, 110.0]:
+            option = EquityBarrierOption(expiry_date, 100.0, option_type,
+                                         barrier_level)
+
+            v = option.value(value_date, stock_price, discount_curve,
+                             dividend_curve, model)
+
+            v_pde = option.value_pde(value_date, stock_price, discount_curve,
+                                     dividend_curve, model)
+
+            assert v_pde['value'] == approx(v, abs=2e-3)
+
+
+def test_pde_needs_black_scholes():
+    black_model = Black(volatility)
+
+    options = [EquityVanillaOption(expiry_date, 100.0,
+                                   OptionTypes.EUROPEAN_CALL),
+               EquityAmericanOption(expiry_date, 100.0,
+                                    OptionTypes.AMERICAN_PUT),
+               EquityBarrierOption(expiry_date, 100.0,
+                                   EquityBarrierTypes.DOWN_AND_OUT_CALL,
+                                   90.0)]
+
+    for option in options:
+        with pytest.raises(FinError):
+            option.value_pde(value_date, stock_price, discount_curve,
+                             dividend_curve, black_model)
@@ -61,3 +61,45 @@ def test_HullWhiteExampleTwo():
     assert round(vAnal['call'], 4) == 1.0448
     assert round(vTreePut, 4) == 1.8237
     assert round(vAnal['put'], 4) == 1.8239
+
+
+def test_callable_puttable_bond_portfolio():
+    times = np.linspace(0.0, 12.0, 49)
+    dfs = np.exp(-0.04 * times - 0.001 * times * times)
+
+    model = HWTree(0.01, 0.05, 200)
+    model.build_tree(10.0, times, dfs)
+
+    cpn_times = []
+    cpn_flows = []
+    call_times = []
+    call_prices = []
+    put_times = []
+    put_prices = []
+    face_amounts = []
+
+    for tmat, cpn in [(5.0, 0.05), (10.0, 0.04), (7.5, 0.06)]:
+        cpn_times.append(np.arange(0.5, tmat + 1e-9, 0.5))
+        cpn_flows.append(np.full(len(cpn_times[-1]), cpn / 2.0))
+        call_times.append(np.arange(2.0, tmat, 1.0))
+        call_prices.append(np.full(len(call_times[-1]), 100.0))
+        put_times.append(np.array([3.0]))
+        put_prices.append(np.array([98.0]))
+        face_amounts.append(100.0)
+
+    v = model.callable_puttable_bond_portfolio(cpn_times, cpn_flows,
+                                               call_times, call_prices,
+                                               put_times, put_prices,
+                                               face_amounts)
+
+    for i in range(0, len(cpn_times)):
+        v_single = model.callable_puttable_bond_tree(cpn_times[i],
+                                                     cpn_flows[i],
+                                                     call_times[i],
+                                                     call_prices[i],
+                                                     put_times[i],
+                                                     put_prices[i],
+                                                     face_amounts[i])
+
+        assert abs(v['bondwithoption'][i] - v_single['bondwithoption']) < 1e-8
+        assert abs(v['bondpure'][i] - v_single['bondpure']) < 1e-8
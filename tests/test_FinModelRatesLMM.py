@@ -6,8 +6,25 @@ from financepy.models.lmm_mc import lmm_sticky_caplet_pricer
 from financepy.models.lmm_mc import lmm_ratchet_caplet_pricer
 from financepy.models.lmm_mc import lmm_simulate_fwds_mf
 from financepy.models.lmm_mc import lmm_simulate_fwds_1f
+from financepy.models.lmm_mc import lmm_simulate_fwds_mf_parallel
+from financepy.models.lmm_mc import lmm_simulate_fwds_1f_parallel
+from financepy.models.lmm_mc import lmm_simulate_fwds_mf_batches
+from financepy.models.lmm_mc import lmm_simulate_fwds_1f_batches
+from financepy.models.lmm_mc import lmm_swaption_pricer
+from financepy.models.lmm_mc import lmm_stream_pricer
 from financepy.utils.helpers import check_vector_differences
+from financepy.products.rates.ibor_lmm_products import IborLMMProducts
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.market.volatility.ibor_cap_vol_curve import IborCapVolCurve
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
 import numpy as np
+import numba
+import os
+import subprocess
+import sys
 
 
 def test_HullBookExamples(capsys):
@@ -126,3 +143,277 @@ def test_HullBookExamples(capsys):
 
     assert captured.out == ""
     assert captured.err == ""
+
+
+def test_parallel_simulation():
+    """ The parallel simulation gives the same forwards as the serial one when
+    Sobol numbers are used and repeatable forwards for a fixed seed when
+    pseudo-random numbers are used. """
+
+    numFwds = 11
+    taus = np.array([1.0] * numFwds)
+    fwd0 = np.array([0.05127] * numFwds)
+    seed = 438
+    num_paths = 5000
+    spread = 0.0025
+    numeraireIndex = 0
+
+    gammas1F = np.array([0.00, 0.1550, 0.2063674, 0.1720986, 0.1721993,
+                         0.1524579, 0.1414779, 0.1297711, 0.1381053,
+                         0.135955, 0.1339842])
+
+    lambdas2F = np.array([gammas1F * 0.9, gammas1F * 0.3])
+
+    fwds = lmm_simulate_fwds_1f(numFwds, num_paths, numeraireIndex, fwd0,
+                                gammas1F, taus, 1, seed)
+
+    fwdsPar = lmm_simulate_fwds_1f_parallel(numFwds, num_paths,
+                                            numeraireIndex, fwd0, gammas1F,
+                                            taus, 1, seed)
+
+    v = lmm_sticky_caplet_pricer(spread, numFwds, num_paths, fwd0, fwds,
+                                 taus)
+
+    vPar = lmm_sticky_caplet_pricer(spread, numFwds, num_paths, fwd0,
+                                    fwdsPar, taus)
+
+    assert np.max(np.abs(v - vPar)) < 1e-12
+
+    fwds = lmm_simulate_fwds_mf_parallel(numFwds, 2, num_paths,
+                                         numeraireIndex, fwd0, lambdas2F,
+                                         taus, 0, seed)
+
+    fwdsPar = lmm_simulate_fwds_mf_parallel(numFwds, 2, num_paths,
+                                            numeraireIndex, fwd0, lambdas2F,
+                                            taus, 0, seed)
+
+    v = lmm_ratchet_caplet_pricer(spread, numFwds, num_paths, fwd0, fwds,
+                                  taus)
+
+    vPar = lmm_ratchet_caplet_pricer(spread, numFwds, num_paths, fwd0,
+                                     fwdsPar, taus)
+
+    assert np.max(np.abs(v - vPar)) < 1e-12
+
+
+def test_parallel_simulation_thread_count(tmp_path):
+    """ The pseudo-random paths are seeded per block of paths so that they do
+    not depend on the number of threads used to simulate them. """
+
+    numFwds = 11
+    taus = np.array([1.0] * numFwds)
+    fwd0 = np.array([0.05127] * numFwds)
+    seed = 438
+    num_paths = 5000
+    numeraireIndex = 0
+
+    gammas1F = np.array([0.00, 0.1550, 0.2063674, 0.1720986, 0.1721993,
+                         0.1524579, 0.1414779, 0.1297711, 0.1381053,
+                         0.135955, 0.1339842])
+
+    lambdas2F = np.array([gammas1F * 0.9, gammas1F * 0.3])
+
+    # Only the forwards that have not yet reset are simulated
+    used = np.triu(np.ones((numFwds, numFwds), dtype=bool))
+
+    numThreads = numba.get_num_threads()
+
+    try:
+        numba.set_num_threads(1)
+        fwds1 = lmm_simulate_fwds_mf_parallel(numFwds, 2, num_paths,
+                                              numeraireIndex, fwd0,
+                                              lambdas2F, taus, 0, seed)
+
+        numba.set_num_threads(numba.config.NUMBA_NUM_THREADS)
+        fwdsN = lmm_simulate_fwds_mf_parallel(numFwds, 2, num_paths,
+                                              numeraireIndex, fwd0,
+                                              lambdas2F, taus, 0, seed)
+    finally:
+        numba.set_num_threads(numThreads)
+
+    assert np.max(np.abs(fwds1[:, used] - fwdsN[:, used])) == 0.0
+
+    # The thread pool size is fixed when numba starts so a larger pool needs
+    # a fresh interpreter
+    fileName = str(tmp_path / "fwds.npy")
+
+    script = "\n".join([
+        "import numba, numpy as np",
+        "from financepy.models.lmm_mc import lmm_simulate_fwds_mf_parallel",
+        "numba.set_num_threads(4)",
+        "g = np.array(%r)" % gammas1F.tolist(),
+        "fwds = lmm_simulate_fwds_mf_parallel(%d, 2, %d, %d, np.array(%r),"
+        " np.array([g * 0.9, g * 0.3]), np.array(%r), 0, %d)"
+        % (numFwds, num_paths, numeraireIndex, fwd0.tolist(), taus.tolist(),
+           seed),
+        "np.save(%r, fwds)" % fileName])
+
+    env = dict(os.environ, NUMBA_NUM_THREADS="4")
+    subprocess.run([sys.executable, "-c", script], env=env, check=True,
+                   cwd=os.path.dirname(os.path.dirname(__file__)))
+
+    fwds4 = np.load(fileName)
+
+    assert np.max(np.abs(fwds1[:, used] - fwds4[:, used])) == 0.0
+
+
+def test_products_parallel_simulation():
+    """ The products simulate the forwards with the parallel kernels when
+    useParallel is True. With Sobol numbers these are the serial paths. """
+
+    settle_date = Date(1, 1, 2020)
+    maturity_date = Date(1, 1, 2030)
+
+    discount_curve = DiscountCurveFlat(settle_date, 0.05,
+                                       FrequencyTypes.ANNUAL,
+                                       DayCountTypes.ACT_365F)
+
+    capVolDates = [settle_date.add_years(i) for i in range(0, 11)]
+    capVols = np.array([0.0] + [0.20] * 10)
+    volCurve = IborCapVolCurve(settle_date, capVolDates, capVols,
+                               DayCountTypes.ACT_365F)
+
+    lmmProducts = IborLMMProducts(settle_date, maturity_date,
+                                  FrequencyTypes.ANNUAL,
+                                  DayCountTypes.ACT_365F)
+
+    numFwds = lmmProducts._numForwards
+    assert numFwds == 10
+
+    # Only the forwards that have not yet reset are simulated
+    used = np.triu(np.ones((numFwds, numFwds), dtype=bool))
+
+    lmmProducts.simulate_1f(discount_curve, volCurve, 2000, 0, True, 42,
+                            False)
+    fwds = lmmProducts._fwds
+
+    lmmProducts.simulate_1f(discount_curve, volCurve, 2000, 0, True, 42,
+                            True)
+    fwdsPar = lmmProducts._fwds
+
+    assert fwdsPar.shape == (2000, numFwds, numFwds)
+    assert np.max(np.abs(fwds[:, used] - fwdsPar[:, used])) < 1e-12
+
+    lambdas = np.array([[0.15] * numFwds, [0.05] * numFwds])
+
+    lmmProducts.simulate_mf(discount_curve, 2, lambdas, 2000, 0, True, 42,
+                            False)
+    fwds = lmmProducts._fwds
+
+    lmmProducts.simulate_mf(discount_curve, 2, lambdas, 2000, 0, True, 42,
+                            True)
+    fwdsPar = lmmProducts._fwds
+
+    assert np.max(np.abs(fwds[:, used] - fwdsPar[:, used])) < 1e-12
+
+
+def test_products_streaming_simulation():
+    """ The products value the same from forwards simulated in batches as from
+    the stored parallel simulation of all of the paths. """
+
+    settle_date = Date(1, 1, 2020)
+    maturity_date = Date(1, 1, 2030)
+
+    discount_curve = DiscountCurveFlat(settle_date, 0.05,
+                                       FrequencyTypes.ANNUAL,
+                                       DayCountTypes.ACT_365F)
+
+    capVolDates = [settle_date.add_years(i) for i in range(0, 11)]
+    capVols = np.array([0.0] + [0.20] * 10)
+    volCurve = IborCapVolCurve(settle_date, capVolDates, capVols,
+                               DayCountTypes.ACT_365F)
+
+    lmmProducts = IborLMMProducts(settle_date, maturity_date,
+                                  FrequencyTypes.ANNUAL,
+                                  DayCountTypes.ACT_365F)
+
+    # The exercise date must be one of the adjusted simulation grid dates
+    exercise_date = lmmProducts._gridDates[3]
+
+    lambdas = np.array([[0.15] * 10, [0.05] * 10])
+
+    for useSobol in [False, True]:
+
+        values = []
+
+        for numPathsPerBatch in [0, 1024]:
+
+            lmmProducts.simulate_1f(discount_curve, volCurve, 5000, 0,
+                                    useSobol, 42, True, numPathsPerBatch)
+
+            values.append(lmmProducts.value_swaption(
+                settle_date, exercise_date, maturity_date, SwapTypes.PAY,
+                0.05, FrequencyTypes.ANNUAL, DayCountTypes.ACT_365F,
+                float_frequency_type=FrequencyTypes.ANNUAL))
+
+            lmmProducts.simulate_mf(discount_curve, 2, lambdas, 5000, 0,
+                                    useSobol, 42, True, numPathsPerBatch)
+
+            values.append(lmmProducts.value_swaption(
+                settle_date, exercise_date, maturity_date, SwapTypes.RECEIVE,
+                0.05, FrequencyTypes.ANNUAL, DayCountTypes.ACT_365F,
+                float_frequency_type=FrequencyTypes.ANNUAL))
+
+        assert lmmProducts._fwds is None
+        assert values[0] > 0.0 and values[1] > 0.0
+        assert abs(values[0] - values[2]) < 1e-6
+        assert abs(values[1] - values[3]) < 1e-6
+
+
+def test_streaming_simulation():
+    """ Pricing from batches of simulated paths gives the same values as the
+    full parallel simulation with the same seed. """
+
+    numFwds = 11
+    taus = np.array([1.0] * numFwds)
+    fwd0 = np.array([0.05127] * numFwds)
+    seed = 438
+    num_paths = 5000
+    spread = 0.0025
+    numeraireIndex = 0
+
+    gammas1F = np.array([0.00, 0.1550, 0.2063674, 0.1720986, 0.1721993,
+                         0.1524579, 0.1414779, 0.1297711, 0.1381053,
+                         0.135955, 0.1339842])
+
+    lambdas2F = np.array([gammas1F * 0.9, gammas1F * 0.3])
+
+    for useSobol in [0, 1]:
+
+        fwds = lmm_simulate_fwds_1f_parallel(numFwds, num_paths,
+                                             numeraireIndex, fwd0, gammas1F,
+                                             taus, useSobol, seed)
+
+        v = lmm_swaption_pricer(0.05, 2, 8, num_paths, fwd0, fwds, taus, 1)
+
+        batches = lmm_simulate_fwds_1f_batches(numFwds, num_paths,
+                                               numeraireIndex, fwd0,
+                                               gammas1F, taus, useSobol,
+                                               seed, 2048)
+
+        vStream = lmm_stream_pricer(batches,
+                                    lambda f, n: lmm_swaption_pricer(
+                                        0.05, 2, 8, n, fwd0, f, taus, 1))
+
+        assert abs(v - vStream) < 1e-12
+
+    fwds = lmm_simulate_fwds_mf_parallel(numFwds, 2, num_paths,
+                                         numeraireIndex, fwd0, lambdas2F,
+                                         taus, 0, seed)
+
+    v = lmm_ratchet_caplet_pricer(spread, numFwds, num_paths, fwd0, fwds,
+                                  taus)
+
+    batches = list(lmm_simulate_fwds_mf_batches(numFwds, 2, num_paths,
+                                                numeraireIndex, fwd0,
+                                                lambdas2F, taus, 0, seed,
+                                                2048))
+
+    assert len(batches) == 3
+    assert sum([len(f) for f in batches]) == num_paths
+
+    vStream = lmm_stream_pricer(batches,
+                                lambda f, n: lmm_ratchet_caplet_pricer(
+                                    spread, numFwds, n, fwd0, f, taus))
+
+    assert np.max(np.abs(v - vStream)) < 1e-12
@@ -5,6 +5,11 @@
 from financepy.utils.global_types import OptionTypes
 from financepy.models.sabr import SABR
 from financepy.models.sabr import vol_function_sabr
+from financepy.models.sabr import vol_function_sabr_grad
+from financepy.models.sabr import vol_function_sabr_beta_half
+from financepy.models.sabr import vol_function_sabr_beta_half_grad
+from financepy.models.sabr import vol_function_sabr_beta_one
+from financepy.models.sabr import vol_function_sabr_beta_one_grad
 import numpy as np
 
 
@@ -82,3 +87,30 @@ def test_SABR_Calibration():
     valuePut = modelSABR_02.value(f, k, t_exp, df, put_optionType)
     assert round(valueCall - valuePut, 12) == round(df*(f - k), 12), \
         "The method called 'value()' doesn't comply with Call-Put parity"
+
+
+def test_SABR_gradients():
+    f = 0.043
+    t = 2.0
+    h = 1e-6
+
+    fns = [(vol_function_sabr, vol_function_sabr_grad,
+            np.array([0.05, 0.6, -0.3, 0.5])),
+           (vol_function_sabr_beta_half, vol_function_sabr_beta_half_grad,
+            np.array([0.15, -0.3, 0.5])),
+           (vol_function_sabr_beta_one, vol_function_sabr_beta_one_grad,
+            np.array([0.2, -0.3, 0.7]))]
+
+    for fn, grad_fn, params in fns:
+        for k in [0.03, 0.043, 0.06]:
+            grad = np.zeros(len(params))
+            vol = grad_fn(params, f, k, t, grad)
+            assert abs(vol - fn(params, f, k, t)) < 1e-12
+
+            for i in range(0, len(params)):
+                up = params.copy()
+                up[i] += h
+                down = params.copy()
+                down[i] -= h
+                bump_grad = (fn(up, f, k, t) - fn(down, f, k, t)) / (2.0 * h)
+                assert abs(grad[i] - bump_grad) < 1e-7
@@ -2,7 +2,7 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ###############################################################################
 
-from financepy.utils.global_types import SwapTypes
+from financepy.utils.global_types import SwapTypes, CurveBuildTypes
 from financepy.market.curves.interpolator import InterpTypes
 from financepy.utils.calendar import BusDayAdjustTypes
 from financepy.products.rates.ibor_deposit import IborDeposit
@@ -129,3 +129,60 @@ def test_bloombergPricingExample():
                                             oisCurve), 4) == 53714.3020
     assert round(swaps[0]._float_leg.value(
         settleDt, oisCurve, None), 4) == 53714.3020
+
+
+def test_global_newton_build():
+    value_date = Date(6, 6, 2018)
+    settleDt = value_date.add_weekdays(2)
+    accrual = DayCountTypes.THIRTY_E_360
+    freq = FrequencyTypes.SEMI_ANNUAL
+
+    depos = [IborDeposit(value_date, "1D", 1.712 / 100.0, accrual)]
+    fras = []
+
+    def build_swaps(shift):
+        swaps = []
+        for (tenor, swap_rate) in [("2Y", 0.0278), ("5Y", 0.0293),
+                                   ("10Y", 0.0300), ("30Y", 0.0301)]:
+            swap = OIS(settleDt, tenor, SwapTypes.PAY, swap_rate + shift,
+                       freq, accrual)
+            swaps.append(swap)
+        return swaps
+
+    swaps = build_swaps(0.0)
+
+    bootstrap_curve = OISCurve(value_date, depos, fras, swaps)
+
+    newton_curve = OISCurve(value_date, depos, fras, swaps,
+                            InterpTypes.FLAT_FWD_RATES, False,
+                            CurveBuildTypes.GLOBAL_NEWTON)
+
+    assert np.max(np.abs(newton_curve._dfs - bootstrap_curve._dfs)) < 1e-9
+
+    for swap in swaps:
+        assert abs(swap.value(value_date, newton_curve, None)) < 1e-6
+
+    swaps = build_swaps(0.0001)
+
+    warm_curve = OISCurve(value_date, depos, fras, swaps,
+                          InterpTypes.FLAT_FWD_RATES, False,
+                          CurveBuildTypes.GLOBAL_NEWTON, newton_curve)
+
+    assert warm_curve._num_iterations <= 2
+
+    for swap in swaps:
+        assert abs(swap.value(value_date, warm_curve, None)) < 1e-6
+
+    # Each calibration swap only has risk to its own quote and when its quote
+    # rises by one basis point its value changes by one basis point of PV01
+    sensitivities = [swap.df_sensitivities(value_date, warm_curve)[1]
+                     for swap in swaps]
+
+    dv01 = warm_curve.bucketed_dv01(sensitivities)
+    assert dv01.shape == (len(swaps), len(depos) + len(swaps))
+
+    for i, swap in enumerate(swaps):
+        pv01 = swap.quote_sensitivity(value_date, warm_curve) * 0.0001
+        expected = np.zeros(len(depos) + len(swaps))
+        expected[len(depos) + i] = -pv01
+        assert np.allclose(dv01[i], expected, atol=1e-6)
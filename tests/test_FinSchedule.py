@@ -5,7 +5,7 @@
 from financepy.utils.date import Date, set_date_format, DateFormatTypes
 from financepy.utils.calendar import CalendarTypes, Calendar
 from financepy.utils.frequency import FrequencyTypes
-from financepy.utils.schedule import Schedule
+from financepy.utils.schedule import Schedule, BulkSchedule
 from financepy.utils.calendar import DateGenRuleTypes
 from financepy.utils.calendar import BusDayAdjustTypes
 
@@ -215,3 +215,90 @@ def test_forward_end_stub():
     adjusted_dates = schedule._adjusted_dates
     assert len(adjusted_dates) == 5
     check_frequency(schedule)
+
+
+def test_bulk_schedule():
+    # A mix of month end, leap year and holiday dates
+    effective_dates = [Date(20, 6, 2018), Date(31, 1, 2021),
+                       Date(29, 2, 2020), Date(24, 12, 2019),
+                       Date(15, 3, 2021)]
+    termination_dates = [Date(20, 6, 2028), Date(28, 2, 2031),
+                         Date(30, 11, 2025), Date(26, 12, 2022),
+                         Date(17, 3, 2031)]
+
+    for freq_type in [FrequencyTypes.ANNUAL, FrequencyTypes.QUARTERLY,
+                      FrequencyTypes.MONTHLY]:
+        for cal_type in [CalendarTypes.NONE, CalendarTypes.UNITED_KINGDOM]:
+            for bd_adjust_type in BusDayAdjustTypes:
+                for dg_rule_type in DateGenRuleTypes:
+                    for end_of_month in [False, True]:
+
+                        schedules = BulkSchedule(effective_dates,
+                                                 termination_dates,
+                                                 freq_type,
+                                                 cal_type,
+                                                 bd_adjust_type,
+                                                 dg_rule_type,
+                                                 termination_dateAdjust,
+                                                 end_of_month)
+
+                        assert len(schedules) == len(effective_dates)
+
+                        for i in range(0, len(effective_dates)):
+                            schedule = Schedule(effective_dates[i],
+                                                termination_dates[i],
+                                                freq_type,
+                                                cal_type,
+                                                bd_adjust_type,
+                                                dg_rule_type,
+                                                termination_dateAdjust,
+                                                end_of_month)
+
+                            assert schedules.schedule_dates(i).to_list() \
+                                == schedule.schedule_dates().to_list()
+
+
+def test_bulk_schedule_mixed_inputs():
+    effective_dates = [Date(20, 6, 2018), Date(20, 6, 2018)]
+    termination_dates = [Date(20, 6, 2023), Date(20, 6, 2023)]
+    freq_types = [FrequencyTypes.ANNUAL, FrequencyTypes.SEMI_ANNUAL]
+    cal_types = [CalendarTypes.TARGET,
+                 (CalendarTypes.TARGET, CalendarTypes.UNITED_STATES)]
+
+    schedules = BulkSchedule(effective_dates, termination_dates,
+                             freq_types, cal_types)
+
+    assert len(schedules.schedule_dates(0)) == 6
+    assert len(schedules.schedule_dates(1)) == 11
+
+    # 4th July 2022 is a US holiday so the joint calendar rolls to the 5th
+    schedules = BulkSchedule([Date(4, 7, 2021)], [Date(4, 7, 2022)],
+                             FrequencyTypes.ANNUAL, cal_types[1])
+
+    assert schedules.schedule_dates(0)[-1] == Date(5, 7, 2022)
+    assert schedules.unadjusted_dates(0)[-1] == Date(4, 7, 2022)
+
+
+def test_bulk_schedule_after_2100():
+    # Trades which run past 2100 are adjusted on an extended bitmap
+    effective_dates = [Date(25, 12, 2020), Date(25, 12, 2030)]
+    termination_dates = [Date(25, 12, 2110), Date(25, 12, 2120)]
+
+    schedules = BulkSchedule(effective_dates, termination_dates,
+                             FrequencyTypes.ANNUAL,
+                             CalendarTypes.UNITED_KINGDOM)
+
+    calendar = Calendar(CalendarTypes.UNITED_KINGDOM)
+
+    for i in range(0, 2):
+        schedule = Schedule(effective_dates[i], termination_dates[i],
+                            FrequencyTypes.ANNUAL,
+                            CalendarTypes.UNITED_KINGDOM)
+
+        assert schedules.schedule_dates(i).to_list() == \
+            schedule.schedule_dates().to_list()
+
+        for dt in schedule.schedule_dates()[1:]:
+            assert calendar.is_business_day(dt)
+
+    assert schedules.schedule_dates(0)[-1] == Date(29, 12, 2110)
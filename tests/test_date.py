@@ -6,7 +6,7 @@ import datetime
 import numpy as np
 import time
 
-from financepy.utils.date import Date, date_range
+from financepy.utils.date import Date, DateArray, date_range
 
 # Not under test
 
@@ -340,3 +340,90 @@ def test_list_of_date():
     # Test finding date difference
     assert (Date(1, 1, 2019) - dates) == [Date(1, 1, 2019) - d for d in dates]
     assert (dates - Date(1, 1, 2019)) == [Date(1, 1, 2019) - d for d in dates]
+
+
+def test_from_excel():
+    dt = Date(29, 2, 2020)
+    assert Date.from_excel(dt._excel_date) == dt
+    assert Date.from_excel(dt._excel_date)._weekday == dt._weekday
+
+
+def test_date_array():
+    start_date = Date(29, 2, 2020)
+    dates = [start_date.add_days(n) for n in range(0, 4000, 11)]
+    date_array = DateArray(dates)
+
+    assert len(date_array) == len(dates)
+    assert np.all(date_array == dates)
+    assert date_array.to_list() == dates
+    assert date_array[3] == dates[3]
+    assert np.all(date_array[1:4] == dates[1:4])
+    assert list(date_array) == dates
+    assert date_array.serials().dtype == np.int32
+
+    for tenor in ["1D", "2W", "1M", "-3M", "13M", "1Y", "4Y", "-2Y"]:
+        assert date_array.add_tenor(tenor).to_list() == \
+            [dt.add_tenor(tenor) for dt in dates]
+
+    assert date_array.add_months(7).to_list() == \
+        [dt.add_months(7) for dt in dates]
+    assert date_array.eom().to_list() == [dt.eom() for dt in dates]
+    assert list(date_array.is_eom()) == [dt.is_eom() for dt in dates]
+    assert list(date_array.weekday()) == [dt._weekday for dt in dates]
+
+    assert list(date_array - start_date) == [dt - start_date for dt in dates]
+    assert list(date_array > dates[5]) == [dt > dates[5] for dt in dates]
+    assert list(dates[5] < date_array) == [dates[5] < dt for dt in dates]
+
+
+def test_date_array_equality():
+    from financepy.utils.error import FinError
+
+    dates = [Date(1, 1, 2021), Date(1, 2, 2021), Date(1, 3, 2021)]
+    date_array = DateArray(dates)
+    other = [Date(1, 1, 2021), Date(2, 2, 2021), Date(1, 3, 2021)]
+
+    # Equality is elementwise like the other comparisons
+    assert list(date_array == other) == [True, False, True]
+    assert list(date_array != other) == [False, True, False]
+    assert list(other == date_array) == [True, False, True]
+    assert list(date_array == DateArray(other)) == [True, False, True]
+    assert list(date_array == Date(1, 2, 2021)) == [False, True, False]
+    assert list(Date(1, 2, 2021) == date_array) == [False, True, False]
+    assert list(date_array < other) == [False, True, False]
+    assert list(date_array >= other) == [True, False, True]
+
+    assert np.all(date_array == dates)
+    assert not np.all(date_array == other)
+
+    try:
+        date_array == dates[0:2]
+        assert False, "DateArrays of different lengths compared"
+    except FinError:
+        pass
+
+    assert (date_array == "2021-01-01") is False
+    assert (date_array != None) is True
+
+
+def test_date_array_argument_types():
+    from financepy.utils.helpers import check_argument_types
+    from financepy.utils.error import FinError
+    from financepy.market.curves.discount_curve import DiscountCurve
+
+    def func(dates: (list, DateArray), values: list):
+        check_argument_types(func, locals())
+
+    dates = DateArray([Date(1, 1, 2021), Date(1, 1, 2022)])
+
+    # A DateArray is only accepted where it is in the annotation
+    func(dates, [1.0, 2.0])
+
+    try:
+        func(dates, dates)
+        assert False, "DateArray accepted for a list of values"
+    except FinError:
+        pass
+
+    curve = DiscountCurve(Date(1, 1, 2020), dates, np.array([0.99, 0.98]))
+    assert abs(curve.df(dates[1]) - 0.98) < 1e-3
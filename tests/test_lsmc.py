@@ -3,6 +3,9 @@ from financepy.utils.date import Date
 from financepy.utils.global_vars import gDaysInYear
 from financepy.models.equity_crr_tree import crr_tree_val_avg
 from financepy.models.equity_lsmc import equity_lsmc, FIT_TYPES
+from financepy.models.equity_lsmc import equity_lsmc_bridge
+from financepy.models.equity_lsmc import equity_lsmc_boundary_value
+from financepy.models.black_scholes_analytic import bs_value
 from financepy.products.equity.equity_vanilla_option import EquityVanillaOption
 from financepy.models.black_scholes import BlackScholes
 from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
@@ -138,3 +141,85 @@ def test_put_option():
                        time_to_expiry, option_type.value, strike_price, poly_degree, FIT_TYPES.LAGUERRE.value, 0, 0)
 
     assert v_ls == approx(v0, 1e-1)
+
+
+def test_american_put_bridge():
+    """
+    Check the Brownian bridge version gives the Longstaff-Schwartz value and
+    that reusing its exercise boundary on new paths gives a similar value
+    """
+    spot_price = 36.0
+    strike_price = 40.0
+    risk_free_rate = 0.06
+    dividend_yield = 0.0
+    volatility = 0.20
+    time_to_expiry = 1.0
+    num_steps_per_year = 50
+    num_paths = 50_000
+    poly_degree = 3
+    option_type = OptionTypes.AMERICAN_PUT
+
+    for use_sobol in [False, True]:
+
+        v_ls = equity_lsmc_bridge(spot_price, risk_free_rate, dividend_yield,
+                                  volatility, num_paths, num_steps_per_year,
+                                  time_to_expiry, option_type.value,
+                                  strike_price, poly_degree,
+                                  FIT_TYPES.LAGUERRE.value, use_sobol, 42)
+
+        # Value of 4.472 is from the Longstaff and Schwartz paper
+        assert v_ls['value'] == approx(4.472, abs=2e-2)
+
+        boundary = v_ls['exercise_boundary']
+        assert len(boundary) == len(v_ls['times'])
+        assert boundary[-2] > boundary[1]
+        assert boundary[-2] < strike_price
+
+        v_boundary = equity_lsmc_boundary_value(spot_price, risk_free_rate,
+                                                dividend_yield, volatility,
+                                                num_paths, v_ls['times'],
+                                                boundary, option_type.value,
+                                                strike_price, use_sobol, 7)
+
+        assert v_boundary == approx(v_ls['value'], abs=3e-2)
+
+    option_type = OptionTypes.EUROPEAN_PUT
+
+    v_ls = equity_lsmc_bridge(spot_price, risk_free_rate, dividend_yield,
+                              volatility, num_paths, num_steps_per_year,
+                              time_to_expiry, option_type.value,
+                              strike_price, poly_degree,
+                              FIT_TYPES.LAGUERRE.value, True, 42)
+
+    v_bs = bs_value(spot_price, time_to_expiry, strike_price, risk_free_rate,
+                    dividend_yield, volatility, option_type.value)
+
+    assert v_ls['value'] == approx(v_bs, abs=2e-2)
+
+
+def test_lsmc_boundary_value_sobol_seed():
+    """ With Sobol numbers the seed sets a random digital shift, so that the
+    boundary valuation with a different seed uses different paths. """
+    spot_price = 36.0
+    strike_price = 40.0
+    risk_free_rate = 0.06
+    dividend_yield = 0.0
+    volatility = 0.20
+    option_type = OptionTypes.AMERICAN_PUT
+
+    v_ls = equity_lsmc_bridge(spot_price, risk_free_rate, dividend_yield,
+                              volatility, 10_000, 50, 1.0, option_type.value,
+                              strike_price, 3, FIT_TYPES.LAGUERRE.value,
+                              True, 42)
+
+    values = [equity_lsmc_boundary_value(spot_price, risk_free_rate,
+                                         dividend_yield, volatility, 10_000,
+                                         v_ls['times'],
+                                         v_ls['exercise_boundary'],
+                                         option_type.value, strike_price,
+                                         True, seed)
+              for seed in [7, 7, 8]]
+
+    assert values[0] == values[1]
+    assert values[0] != values[2]
+    assert values[2] == approx(values[0], abs=5e-2)
@@ -0,0 +1,82 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+import sys
+sys.path.append("..")
+
+import numpy as np
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+from financepy.utils.date import Date
+from financepy.products.bonds.bond import Bond, bond_key_rate_durations
+from financepy.products.bonds.bond_market import BondMarkets
+from financepy.products.bonds.bond_market import get_bond_market_conventions
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def test_key_rate_durations():
+
+    dc_type, freq_type, _, _, _ = \
+        get_bond_market_conventions(BondMarkets.UNITED_STATES)
+
+    settle_date = Date(24, 4, 2023)
+    ytm = 0.0372506
+
+    key_rate_tenors = np.array([0.5, 1, 2, 3, 5, 7, 10, 20, 30])
+    rates = np.array([5.0367, 4.7327, 4.1445, 3.8575, 3.6272, 3.5825,
+                      3.5347, 3.80, 3.70]) / 100.0
+
+    np.random.seed(42)
+    num_bonds = 1000
+
+    bonds = []
+    for _ in range(0, num_bonds):
+        maturity_date = settle_date.add_days(np.random.randint(90, 30 * 365))
+        issue_date = Date(min(maturity_date._d, 28), maturity_date._m, 2015)
+        coupon = np.random.randint(1, 25) * 0.0025
+        bonds.append(Bond(issue_date, maturity_date, coupon,
+                          freq_type, dc_type))
+
+    start = time.time()
+    _, krds = bond_key_rate_durations(bonds, settle_date, ytm,
+                                      key_rate_tenors, rates)
+    end = time.time()
+    analytic_time = end - start
+
+    # Bumping rebuilds the par curve twice per tenor so only time a few
+    num_bumped = 10
+
+    start = time.time()
+    max_diff = 0.0
+    for i in range(0, num_bumped):
+        _, bumped = bonds[i].key_rate_durations(settle_date, ytm,
+                                                key_rate_tenors,
+                                                rates=rates.copy(),
+                                                analytic=False)
+        max_diff = max(max_diff, np.max(np.abs(bumped - krds[i])))
+    end = time.time()
+    bump_time = (end - start) * num_bonds / num_bumped
+
+    testCases.header("BOND", "MATURITY", "COUPON", "KRD_2Y", "KRD_5Y",
+                     "KRD_10Y", "KRD_30Y")
+    for i in range(0, num_bumped):
+        testCases.print(i, bonds[i]._maturity_date, bonds[i]._cpn,
+                        krds[i, 2], krds[i, 4], krds[i, 6], krds[i, 8])
+
+    testCases.header("NUM_BONDS", "MAX_DIFF_TO_BUMP")
+    testCases.print(num_bonds, round(max_diff, 5))
+
+    testCases.header("ANALYTIC_TIME", "BUMP_TIME_ESTIMATE", "SPEEDUP")
+    testCases.print(analytic_time, bump_time, bump_time / analytic_time)
+
+###############################################################################
+
+
+test_key_rate_durations()
+testCases.compareTestCases()
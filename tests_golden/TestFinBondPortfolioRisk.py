@@ -0,0 +1,108 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+import sys
+sys.path.append("..")
+
+import numpy as np
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.date import Date
+from financepy.products.bonds.bond import Bond
+from financepy.products.bonds.bond_portfolio import BondPortfolio
+from financepy.market.curves.discount_curve_zeros import DiscountCurveZeros
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def test_BondPortfolioRisk():
+
+    settle_date = Date(19, 9, 2012)
+
+    zero_dates = [settle_date.add_years(t) for t in [0.5, 1, 2, 5, 10, 30]]
+    zero_rates = [0.010, 0.012, 0.015, 0.020, 0.025, 0.030]
+    curve = DiscountCurveZeros(settle_date, zero_dates, zero_rates,
+                               FrequencyTypes.CONTINUOUS,
+                               DayCountTypes.ACT_365F)
+
+    np.random.seed(1234)
+    num_bonds = 5000
+
+    bonds = []
+    for i in range(0, num_bonds):
+        maturity_date = settle_date.add_days(np.random.randint(30, 30 * 365))
+        issue_date = Date(min(maturity_date._d, 28), maturity_date._m, 2000)
+        coupon = np.random.randint(1, 33) * 0.0025
+        bonds.append(Bond(issue_date, maturity_date, coupon,
+                          FrequencyTypes.SEMI_ANNUAL,
+                          DayCountTypes.ACT_ACT_ICMA))
+
+    face_amounts = np.random.randint(1, 100, num_bonds) * 100000.0
+
+    start = time.time()
+    portfolio = BondPortfolio(bonds, face_amounts)
+    end = time.time()
+    build_time = end - start
+
+    start = time.time()
+    v = portfolio.value(settle_date, curve)
+    durn = portfolio.portfolio_duration(settle_date, curve)
+    tenors, krds = portfolio.key_rate_durations(settle_date, curve)
+    sens = portfolio.curve_sensitivities(settle_date, curve)
+    end = time.time()
+    portfolio_time = end - start
+
+    start = time.time()
+    dirty_pv = 0.0
+    for bond, face in zip(bonds, face_amounts):
+        dirty_pv += bond.dirty_price_from_discount_curve(settle_date,
+                                                         curve) * face / 100.0
+    end = time.time()
+    loop_time = end - start
+
+    prices = portfolio.dirty_price_from_discount_curve(settle_date, curve)
+    weights = face_amounts * prices
+    portfolio_krds = np.dot(weights, krds) / np.sum(weights)
+
+    testCases.header("NUM_BONDS", "DIRTY_PV", "CLEAN_PV", "DURATION")
+    testCases.print(num_bonds, v['dirty_pv'], v['clean_pv'], durn)
+
+    testCases.header("TENOR", "KEY_RATE_DURATION")
+    for tenor, krd in zip(tenors, portfolio_krds):
+        testCases.print(tenor, krd)
+
+    testCases.header("NODE", "DPV_DDF")
+    node_sens = np.dot(face_amounts, sens) / 100.0
+    for i_node, s in enumerate(node_sens):
+        testCases.print(i_node, s)
+
+    testCases.header("LOOP_PV", "DIFF")
+    testCases.print(dirty_pv, round(dirty_pv - v['dirty_pv'], 6))
+
+    testCases.header("BUILD_TIME", "RISK_TIME", "LOOP_PV_TIME")
+    testCases.print(build_time, portfolio_time, loop_time)
+
+    # Replace one position in ten
+    start = time.time()
+    for position_id in portfolio.position_ids()[::10]:
+        portfolio.remove_bond(position_id)
+        portfolio.add_bond(bonds[position_id], face_amounts[position_id])
+    v2 = portfolio.value(settle_date, curve)
+    end = time.time()
+
+    testCases.header("NUM_REPLACED", "DIFF", "TIME")
+    testCases.print(num_bonds // 10, round(v2['dirty_pv'] - v['dirty_pv'], 6),
+                    end - start)
+
+##########################################################################
+
+
+test_BondPortfolioRisk()
+testCases.compareTestCases()
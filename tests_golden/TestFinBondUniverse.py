@@ -0,0 +1,102 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import os
+import time
+import datetime as dt
+
+import sys
+sys.path.append("..")
+
+import numpy as np
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.products.bonds.bond import Bond, YTMCalcType
+from financepy.products.bonds.bond_universe import BondUniverse
+from financepy.utils.date import Date, from_datetime
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def test_BondUniverse():
+
+    import pandas as pd
+    path = os.path.join(os.path.dirname(__file__), './data/giltBondPrices.txt')
+    bondDataFrame = pd.read_csv(path, sep='\t')
+    bondDataFrame['mid'] = 0.5*(bondDataFrame['bid'] + bondDataFrame['ask'])
+
+    freq_type = FrequencyTypes.SEMI_ANNUAL
+    dc_type = DayCountTypes.ACT_ACT_ICMA
+    settle_date = Date(19, 9, 2012)
+    convention = YTMCalcType.UK_DMO
+
+    bonds = []
+    clean_prices = []
+
+    for _, bond in bondDataFrame.iterrows():
+
+        date_string = bond['maturity']
+        matDatetime = dt.datetime.strptime(date_string, '%d-%b-%y')
+        maturityDt = from_datetime(matDatetime)
+        issueDt = Date(maturityDt._d, maturityDt._m, 2000)
+        coupon = bond['coupon']/100.0
+
+        bonds.append(Bond(issueDt, maturityDt, coupon, freq_type, dc_type))
+        clean_prices.append(bond['mid'])
+
+    universe = BondUniverse(bonds)
+    analytics = universe.analytics(settle_date, clean_prices, convention)
+
+    testCases.header("MATDATE", "CPN", "PRICE", "YTM", "MOD_DURN", "CONV")
+
+    for i, bond in enumerate(bonds):
+        testCases.print(bond._maturity_date, bond._cpn * 100.0,
+                        clean_prices[i], analytics['ytm'][i] * 100.0,
+                        analytics['modified_duration'][i],
+                        analytics['convexity'][i])
+
+    # Time a large universe made by repeating the gilts at shifted prices
+    num_copies = 100
+    big_bonds = bonds * num_copies
+    big_prices = np.concatenate([np.array(clean_prices) + 0.01 * i
+                                 for i in range(0, num_copies)])
+
+    start = time.time()
+    ytms = []
+    for bond, clean_price in zip(big_bonds, big_prices):
+        ytm = bond.yield_to_maturity(settle_date, clean_price, convention)
+        ytms.append(ytm)
+    end = time.time()
+    loop_time = end - start
+
+    big_universe = BondUniverse(big_bonds)
+    start = time.time()
+    big_analytics = big_universe.analytics(settle_date, big_prices,
+                                           convention)
+    end = time.time()
+    universe_time = end - start
+
+    start = time.time()
+    big_universe.analytics(settle_date, big_prices, convention)
+    end = time.time()
+    repeat_time = end - start
+
+    max_diff = np.max(np.abs(np.array(ytms) - big_analytics['ytm']))
+
+    testCases.header("NUM_BONDS", "MAX_YTM_DIFF")
+    testCases.print(len(big_bonds), round(max_diff, 8))
+
+    testCases.header("LOOP_TIME", "UNIVERSE_TIME", "REPEAT_TIME", "SPEEDUP")
+    testCases.print(loop_time, universe_time, repeat_time,
+                    loop_time / universe_time)
+
+##########################################################################
+
+
+test_BondUniverse()
+testCases.compareTestCases()
@@ -0,0 +1,203 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import os
+import time
+
+import sys
+sys.path.append("..")
+
+import numpy as np
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.products.credit.cds_curve import CDSCurve
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.credit.cds import CDS
+from financepy.products.credit.cds_batch import CDSBatch
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+##########################################################################
+
+
+def build_Ibor_Curve(tradeDate):
+
+    value_date = tradeDate.add_days(1)
+    dcType = DayCountTypes.ACT_360
+    depos = []
+
+    depos = []
+    fras = []
+    swaps = []
+
+    dcType = DayCountTypes.THIRTY_E_360_ISDA
+    fixedFreq = FrequencyTypes.SEMI_ANNUAL
+    settle_date = value_date
+
+    maturity_date = settle_date.add_months(12)
+    swap1 = IborSwap(
+        settle_date,
+        maturity_date,
+        SwapTypes.PAY,
+        0.0502,
+        fixedFreq,
+        dcType)
+    swaps.append(swap1)
+
+    maturity_date = settle_date.add_months(24)
+    swap2 = IborSwap(
+        settle_date,
+        maturity_date,
+        SwapTypes.PAY,
+        0.0502,
+        fixedFreq,
+        dcType)
+    swaps.append(swap2)
+
+    maturity_date = settle_date.add_months(36)
+    swap3 = IborSwap(
+        settle_date,
+        maturity_date,
+        SwapTypes.PAY,
+        0.0501,
+        fixedFreq,
+        dcType)
+    swaps.append(swap3)
+
+    maturity_date = settle_date.add_months(48)
+    swap4 = IborSwap(
+        settle_date,
+        maturity_date,
+        SwapTypes.PAY,
+        0.0502,
+        fixedFreq,
+        dcType)
+    swaps.append(swap4)
+
+    maturity_date = settle_date.add_months(60)
+    swap5 = IborSwap(
+        settle_date,
+        maturity_date,
+        SwapTypes.PAY,
+        0.0501,
+        fixedFreq,
+        dcType)
+    swaps.append(swap5)
+
+    libor_curve = IborSingleCurve(value_date, depos, fras, swaps)
+    return libor_curve
+
+##############################################################################
+
+
+def build_issuer_curves(tradeDate, libor_curve, num_copies):
+    """ Build the issuer curves of the CDX NA IG S7 index repeated num_copies
+    times to give a large book of names. """
+
+    step_in_date = tradeDate.add_days(1)
+    value_date = step_in_date
+
+    maturity3Y = tradeDate.next_cds_date(36)
+    maturity5Y = tradeDate.next_cds_date(60)
+    maturity7Y = tradeDate.next_cds_date(84)
+    maturity10Y = tradeDate.next_cds_date(120)
+
+    path = os.path.join(os.path.dirname(__file__),
+                        './/data//CDX_NA_IG_S7_SPREADS.csv')
+    f = open(path, 'r')
+    data = f.readlines()
+    f.close()
+    issuer_curves = []
+
+    for row in data[1:]:
+
+        splitRow = row.split(",")
+        spd3Y = float(splitRow[1]) / 10000.0
+        spd5Y = float(splitRow[2]) / 10000.0
+        spd7Y = float(splitRow[3]) / 10000.0
+        spd10Y = float(splitRow[4]) / 10000.0
+        recovery_rate = float(splitRow[5])
+
+        cds3Y = CDS(step_in_date, maturity3Y, spd3Y)
+        cds5Y = CDS(step_in_date, maturity5Y, spd5Y)
+        cds7Y = CDS(step_in_date, maturity7Y, spd7Y)
+        cds10Y = CDS(step_in_date, maturity10Y, spd10Y)
+        cds_contracts = [cds3Y, cds5Y, cds7Y, cds10Y]
+
+        issuer_curve = CDSCurve(value_date,
+                                cds_contracts,
+                                libor_curve,
+                                recovery_rate)
+
+        issuer_curves.append(issuer_curve)
+
+    return issuer_curves * num_copies
+
+##########################################################################
+
+
+def test_CDSBatch():
+    """ Value a book of CDS contracts one at a time and then all together
+    and report the number of contracts valued per second. """
+
+    tradeDate = Date(1, 8, 2007)
+    value_date = tradeDate.add_days(1)
+    maturity_date = tradeDate.next_cds_date(60)
+
+    libor_curve = build_Ibor_Curve(tradeDate)
+    issuer_curves = build_issuer_curves(tradeDate, libor_curve, 8)
+    num_names = len(issuer_curves)
+
+    np.random.seed(1919)
+    running_coupons = np.random.uniform(0.0010, 0.0100, num_names)
+    notionals = np.random.uniform(1e6, 1e7, num_names)
+
+    contracts = CDSBatch(value_date, maturity_date, running_coupons,
+                         notionals)
+
+    # Compile the numba kernels before timing
+    contracts.value(value_date, issuer_curves)
+
+    start = time.time()
+    vs = []
+    for i in range(0, num_names):
+        cds = CDS(value_date, maturity_date, running_coupons[i], notionals[i])
+        vs.append(cds.value(value_date, issuer_curves[i],
+                            0.40)['dirty_pv'])
+    end = time.time()
+    scalar_rate = num_names / (end - start)
+
+    start = time.time()
+    v = contracts.value(value_date, issuer_curves, 0.40)
+    end = time.time()
+    batch_rate = num_names / (end - start)
+
+    max_diff = np.max(np.abs(v['dirty_pv'] - np.array(vs)))
+
+    testCases.header("NUM_NAMES", "TOTAL_PV", "MAX_DIFF")
+    testCases.print(num_names, np.sum(v['dirty_pv']), round(max_diff, 6))
+
+    spds = contracts.par_spread(value_date, issuer_curves) * 10000.0
+
+    testCases.header("LABEL", "VALUE")
+    testCases.print("AVERAGE SPD 5Y", np.mean(spds))
+    testCases.print("MIN SPD 5Y", np.min(spds))
+    testCases.print("MAX SPD 5Y", np.max(spds))
+
+    testCases.header("METHOD", "NUM_NAMES", "NAMES_PER_SEC")
+    testCases.print("SCALAR", num_names, scalar_rate)
+    testCases.print("BATCH", num_names, batch_rate)
+
+    print("SPEEDUP %8.1fx" % (batch_rate / scalar_rate))
+
+##########################################################################
+
+
+test_CDSBatch()
+testCases.compareTestCases()
@@ -0,0 +1,202 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import os
+import time
+
+import sys
+sys.path.append("..")
+
+import numpy as np
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.products.credit.cds_curve import CDSCurve, build_cds_curves
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.credit.cds import CDS
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+##########################################################################
+
+
+def build_Ibor_Curve(tradeDate):
+
+    value_date = tradeDate.add_days(1)
+    dcType = DayCountTypes.ACT_360
+    depos = []
+
+    depos = []
+    fras = []
+    swaps = []
+
+    dcType = DayCountTypes.THIRTY_E_360_ISDA
+    fixedFreq = FrequencyTypes.SEMI_ANNUAL
+    settle_date = value_date
+
+    maturity_date = settle_date.add_months(12)
+    swap1 = IborSwap(
+        settle_date,
+        maturity_date,
+        SwapTypes.PAY,
+        0.0502,
+        fixedFreq,
+        dcType)
+    swaps.append(swap1)
+
+    maturity_date = settle_date.add_months(24)
+    swap2 = IborSwap(
+        settle_date,
+        maturity_date,
+        SwapTypes.PAY,
+        0.0502,
+        fixedFreq,
+        dcType)
+    swaps.append(swap2)
+
+    maturity_date = settle_date.add_months(36)
+    swap3 = IborSwap(
+        settle_date,
+        maturity_date,
+        SwapTypes.PAY,
+        0.0501,
+        fixedFreq,
+        dcType)
+    swaps.append(swap3)
+
+    maturity_date = settle_date.add_months(48)
+    swap4 = IborSwap(
+        settle_date,
+        maturity_date,
+        SwapTypes.PAY,
+        0.0502,
+        fixedFreq,
+        dcType)
+    swaps.append(swap4)
+
+    maturity_date = settle_date.add_months(60)
+    swap5 = IborSwap(
+        settle_date,
+        maturity_date,
+        SwapTypes.PAY,
+        0.0501,
+        fixedFreq,
+        dcType)
+    swaps.append(swap5)
+
+    libor_curve = IborSingleCurve(value_date, depos, fras, swaps)
+    return libor_curve
+
+##############################################################################
+
+
+def load_cds_contracts(tradeDate, num_copies):
+    """ Return the CDS contracts of the CDX NA IG S7 index names repeated
+    num_copies times together with their recovery rates. """
+
+    step_in_date = tradeDate.add_days(1)
+
+    maturity3Y = tradeDate.next_cds_date(36)
+    maturity5Y = tradeDate.next_cds_date(60)
+    maturity7Y = tradeDate.next_cds_date(84)
+    maturity10Y = tradeDate.next_cds_date(120)
+
+    path = os.path.join(os.path.dirname(__file__),
+                        './/data//CDX_NA_IG_S7_SPREADS.csv')
+    f = open(path, 'r')
+    data = f.readlines()
+    f.close()
+
+    contracts = []
+    recovery_rates = []
+
+    for _ in range(0, num_copies):
+        for row in data[1:]:
+
+            splitRow = row.split(",")
+            spd3Y = float(splitRow[1]) / 10000.0
+            spd5Y = float(splitRow[2]) / 10000.0
+            spd7Y = float(splitRow[3]) / 10000.0
+            spd10Y = float(splitRow[4]) / 10000.0
+            recovery_rate = float(splitRow[5])
+
+            cds3Y = CDS(step_in_date, maturity3Y, spd3Y)
+            cds5Y = CDS(step_in_date, maturity5Y, spd5Y)
+            cds7Y = CDS(step_in_date, maturity7Y, spd7Y)
+            cds10Y = CDS(step_in_date, maturity10Y, spd10Y)
+            contracts.append([cds3Y, cds5Y, cds7Y, cds10Y])
+            recovery_rates.append(recovery_rate)
+
+    return contracts, recovery_rates
+
+##########################################################################
+
+
+def test_build_cds_curves():
+    """ Build the curves of a book of issuers one at a time and together and
+    then rebuild them after the spreads of some of the names have moved. """
+
+    tradeDate = Date(1, 8, 2007)
+    value_date = tradeDate.add_days(1)
+
+    libor_curve = build_Ibor_Curve(tradeDate)
+    contracts, recovery_rates = load_cds_contracts(tradeDate, 4)
+    num_names = len(contracts)
+
+    # Compile the numba kernels before timing
+    CDSCurve(value_date, contracts[0], libor_curve, recovery_rates[0])
+    curves = [CDSCurve(value_date, [], libor_curve, recovery_rates[0])]
+    curves[0]._cds_contracts = contracts[0]
+    build_cds_curves(curves)
+
+    start = time.time()
+    issuer_curves = []
+    for i in range(0, num_names):
+        issuer_curves.append(CDSCurve(value_date, contracts[i],
+                                      libor_curve, recovery_rates[i]))
+    end = time.time()
+    one_by_one_rate = num_names / (end - start)
+
+    values = np.array([c._values for c in issuer_curves])
+
+    start = time.time()
+    build_cds_curves(issuer_curves, incremental=False)
+    end = time.time()
+    together_rate = num_names / (end - start)
+
+    max_diff = np.max(np.abs(np.array([c._values for c in issuer_curves]) -
+                             values))
+
+    testCases.header("NUM_NAMES", "AVERAGE_Q10Y", "MAX_DIFF")
+    testCases.print(num_names, np.mean(values[:, -1]), round(max_diff, 12))
+
+    # Move the 7Y spread of one name in ten
+    np.random.seed(1919)
+    moved = np.random.choice(num_names, num_names // 10, replace=False)
+
+    for i in moved:
+        issuer_curves[i]._cds_contracts[2]._running_coupon *= 1.10
+
+    start = time.time()
+    num_rebuilt = build_cds_curves(issuer_curves)
+    end = time.time()
+    incremental_rate = num_names / (end - start)
+
+    testCases.header("NUM_MOVED", "NUM_REBUILT")
+    testCases.print(len(moved), num_rebuilt)
+
+    testCases.header("METHOD", "NUM_NAMES", "NAMES_PER_SEC")
+    testCases.print("ONE_BY_ONE", num_names, one_by_one_rate)
+    testCases.print("TOGETHER", num_names, together_rate)
+    testCases.print("INCREMENTAL", num_names, incremental_rate)
+
+##########################################################################
+
+
+test_build_cds_curves()
+testCases.compareTestCases()
@@ -0,0 +1,111 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import sys
+sys.path.append("..")
+
+import time
+import numpy as np
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes, OptionTypes
+from financepy.utils.helpers import argument_type_checks
+from financepy.market.curves.discount_curve import DiscountCurve
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.market.curves.discount_curve_zeros import DiscountCurveZeros
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.bonds.bond import Bond
+from financepy.products.credit.cds import CDS
+from financepy.products.equity.equity_vanilla_option import EquityVanillaOption
+from financepy.products.fx.fx_vanilla_option import FXVanillaOption
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def constructors():
+    """ A set of functions which each build one object. """
+
+    value_date = Date(15, 3, 2021)
+    years = [1, 2, 3, 5, 7, 10]
+    dates = [value_date.add_years(y) for y in years]
+    rates = [0.020, 0.022, 0.024, 0.027, 0.029, 0.031]
+    dfs = np.exp(-np.array(rates) * np.array(years))
+
+    return [
+        ("DiscountCurve",
+         lambda: DiscountCurve(value_date, dates, dfs)),
+        ("DiscountCurveFlat",
+         lambda: DiscountCurveFlat(value_date, 0.03)),
+        ("DiscountCurveZeros",
+         lambda: DiscountCurveZeros(value_date, dates, rates)),
+        ("IborDeposit",
+         lambda: IborDeposit(value_date, "3M", 0.02,
+                             DayCountTypes.ACT_360)),
+        ("IborSwap",
+         lambda: IborSwap(value_date, "5Y", SwapTypes.PAY, 0.03,
+                          FrequencyTypes.SEMI_ANNUAL,
+                          DayCountTypes.THIRTY_E_360)),
+        ("Bond",
+         lambda: Bond(value_date, value_date.add_years(10), 0.05,
+                      FrequencyTypes.SEMI_ANNUAL,
+                      DayCountTypes.ACT_ACT_ICMA)),
+        ("CDS",
+         lambda: CDS(value_date, "5Y", 0.01)),
+        ("EquityVanillaOption",
+         lambda: EquityVanillaOption(value_date.add_years(1), 100.0,
+                                     OptionTypes.EUROPEAN_CALL)),
+        ("FXVanillaOption",
+         lambda: FXVanillaOption(value_date.add_years(1), 1.2, "EURUSD",
+                                 OptionTypes.EUROPEAN_CALL, 1000000.0,
+                                 "USD"))]
+
+###############################################################################
+
+
+def time_construction(build, num_objects):
+    start = time.time()
+    for _ in range(0, num_objects):
+        build()
+    end = time.time()
+    return (end - start) / num_objects
+
+###############################################################################
+
+
+def test_FinConstructionTimings():
+    """ Compare the cost of building objects with and without the argument
+    type checks done in their constructors. """
+
+    num_objects = 200
+
+    testCases.header("OBJECT", "CHECKS", "TIME")
+
+    for name, build in constructors():
+
+        # First call caches the argument types of the constructors
+        build()
+
+        checked_time = time_construction(build, num_objects)
+
+        with argument_type_checks(False):
+            unchecked_time = time_construction(build, num_objects)
+
+        testCases.print(name, "ON", checked_time)
+        testCases.print(name, "OFF", unchecked_time)
+
+        print("%-20s ON %9.2f us OFF %9.2f us" % (name,
+                                                  checked_time * 1e6,
+                                                  unchecked_time * 1e6))
+
+###############################################################################
+
+
+test_FinConstructionTimings()
+testCases.compareTestCases()
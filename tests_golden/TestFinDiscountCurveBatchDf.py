@@ -0,0 +1,112 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import sys
+sys.path.append("..")
+
+import time
+import numpy as np
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.market.curves.discount_curve import DiscountCurve
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.market.curves.discount_curve_zeros import DiscountCurveZeros
+from financepy.market.curves.discount_curve_ns import DiscountCurveNS
+from financepy.market.curves.interpolator import InterpTypes
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def build_curves(value_date):
+
+    years = [1, 2, 3, 5, 7, 10, 15, 20, 30]
+    dates = [value_date.add_years(y) for y in years]
+    rates = [0.020, 0.022, 0.024, 0.027, 0.029, 0.031, 0.033, 0.034, 0.035]
+    dfs = np.exp(-np.array(rates) * np.array(years))
+
+    curves = [DiscountCurve(value_date, dates, dfs,
+                            InterpTypes.FLAT_FWD_RATES),
+              DiscountCurveFlat(value_date, 0.03),
+              DiscountCurveZeros(value_date, dates, rates),
+              DiscountCurveNS(value_date, 0.03, -0.02, 0.01, 2.0)]
+
+    return curves
+
+###############################################################################
+
+
+def test_FinDiscountCurveBatchDf():
+    """ Compare the time taken to calculate discount factors from a list of
+    Dates with the time taken to calculate them from an array of Excel serial
+    dates, which is done in one vectorised call. """
+
+    value_date = Date(15, 3, 2021)
+    curves = build_curves(value_date)
+
+    testCases.header("CURVE", "NUM_DATES", "MAX_DIFF")
+
+    for num_dates in [100, 1000, 10000]:
+
+        offsets = np.linspace(1, 30 * 365, num_dates).astype(np.int64)
+        dates = [value_date.add_days(int(n)) for n in offsets]
+        serials = np.array([dt._excel_date for dt in dates], dtype=np.int32)
+
+        for curve in curves:
+            dfs_list = curve.df(dates)
+            dfs_array = curve.df(serials)
+            max_diff = np.max(np.abs(dfs_list - dfs_array))
+            testCases.print(type(curve).__name__, num_dates,
+                            round(max_diff, 12))
+
+    testCases.header("CURVE", "NUM_DATES", "TIME")
+
+    num_dates = 50000
+    offsets = np.linspace(1, 30 * 365, num_dates).astype(np.int64)
+    dates = [value_date.add_days(int(n)) for n in offsets]
+    serials = np.array([dt._excel_date for dt in dates], dtype=np.int32)
+
+    for curve in curves:
+
+        # Compile the numba kernels before timing
+        curve.df(serials[0:10])
+
+        start = time.time()
+        curve.df(dates)
+        end = time.time()
+        list_time = end - start
+
+        start = time.time()
+        curve.df(serials)
+        end = time.time()
+        array_time = end - start
+
+        testCases.print(type(curve).__name__ + " LIST", num_dates, list_time)
+        testCases.print(type(curve).__name__ + " ARRAY", num_dates,
+                        array_time)
+
+        print("%-20s SPEEDUP %8.1fx" % (type(curve).__name__,
+                                         list_time / array_time))
+
+    testCases.header("DAY_COUNT", "NUM_DATES", "TIME")
+
+    for dc_type in [DayCountTypes.ACT_ACT_ISDA, DayCountTypes.THIRTY_E_360]:
+
+        curve = curves[1]
+        curve._dc_type = dc_type
+        curve.df(serials[0:10])
+
+        start = time.time()
+        curve.df(serials)
+        end = time.time()
+        testCases.print(str(dc_type), num_dates, end - start)
+
+###############################################################################
+
+
+test_FinDiscountCurveBatchDf()
+testCases.compareTestCases()
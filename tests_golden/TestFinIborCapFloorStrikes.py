@@ -0,0 +1,104 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+import sys
+sys.path.append("..")
+
+import numpy as np
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import FinCapFloorTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.products.rates.ibor_cap_floor import IborCapFloor
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.models.black import Black
+from financepy.models.black_shifted import BlackShifted
+from financepy.models.bachelier import Bachelier
+from financepy.models.sabr import SABR
+from financepy.models.sabr_shifted import SABRShifted
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def build_curve(value_date):
+
+    depoBasis = DayCountTypes.THIRTY_E_360_ISDA
+    depos = []
+    for tenor in ["1M", "3M", "6M"]:
+        depos.append(IborDeposit(value_date, tenor, 0.03, depoBasis))
+
+    swaps = []
+    fixedBasis = DayCountTypes.ACT_365F
+    fixedFreq = FrequencyTypes.SEMI_ANNUAL
+    for tenor, rate in [("2Y", 0.032), ("5Y", 0.035), ("10Y", 0.038),
+                        ("20Y", 0.040)]:
+        swaps.append(IborSwap(value_date, tenor, SwapTypes.PAY, rate,
+                              fixedFreq, fixedBasis))
+
+    libor_curve = IborSingleCurve(value_date, depos, [], swaps)
+    return libor_curve
+
+###############################################################################
+
+
+def test_cap_floor_strikes():
+
+    value_date = Date(20, 6, 2019)
+    start_date = value_date.add_weekdays(2)
+    maturity_date = start_date.add_tenor("20Y")
+    libor_curve = build_curve(value_date)
+
+    strikes = np.linspace(0.005, 0.08, 50)
+
+    models = [("BLACK", Black(0.20)),
+              ("BLACK_SHIFTED", BlackShifted(0.18, 0.01)),
+              ("BACHELIER", Bachelier(0.008)),
+              ("SABR", SABR(0.05, 0.5, -0.2, 0.4)),
+              ("SABR_SHIFTED", SABRShifted(0.05, 0.5, -0.2, 0.4, 0.01))]
+
+    testCases.header("MODEL", "TYPE", "STRIKE", "VALUE", "MAX_DIFF",
+                     "LOOP_TIME", "BATCH_TIME", "SPEEDUP")
+
+    for name, model in models:
+        for option_type in [FinCapFloorTypes.CAP, FinCapFloorTypes.FLOOR]:
+
+            start = time.time()
+            loop_values = []
+            for k in strikes:
+                capfloor = IborCapFloor(start_date, maturity_date,
+                                        option_type, k)
+                loop_values.append(capfloor.value(value_date, libor_curve,
+                                                  model))
+            end = time.time()
+            loop_time = end - start
+
+            capfloor = IborCapFloor(start_date, maturity_date,
+                                    option_type, strikes[0])
+
+            start = time.time()
+            v = capfloor.caplet_values(value_date, libor_curve, model,
+                                       strikes)
+            end = time.time()
+            batch_time = end - start
+
+            max_diff = np.max(np.abs(v['values'] - np.array(loop_values)))
+
+            testCases.print(name, option_type, strikes[20], v['values'][20],
+                            round(max_diff, 6), loop_time, batch_time,
+                            loop_time / batch_time)
+
+###############################################################################
+
+
+test_cap_floor_strikes()
+testCases.compareTestCases()
@@ -0,0 +1,124 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import sys
+sys.path.append("..")
+
+import time
+import numpy as np
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes, CurveBuildTypes
+from financepy.market.curves.interpolator import InterpTypes
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def build_instruments(value_date, shift):
+
+    settle_date = value_date.add_weekdays(2)
+    depoDCCType = DayCountTypes.ACT_360
+
+    depos = []
+    depos.append(IborDeposit(settle_date, "1M", 0.0225 + shift, depoDCCType))
+    depos.append(IborDeposit(settle_date, "3M", 0.0231 + shift, depoDCCType))
+    depos.append(IborDeposit(settle_date, "6M", 0.0240 + shift, depoDCCType))
+
+    fras = []
+
+    swap_rates = [("1Y", 0.0262), ("2Y", 0.0277), ("3Y", 0.0286),
+                  ("4Y", 0.0290), ("5Y", 0.0293), ("7Y", 0.0295),
+                  ("10Y", 0.0300), ("12Y", 0.0302), ("15Y", 0.0304),
+                  ("20Y", 0.0305), ("25Y", 0.0303), ("30Y", 0.0301)]
+
+    swaps = []
+    for (tenor, swap_rate) in swap_rates:
+        swap = IborSwap(settle_date, tenor, SwapTypes.PAY, swap_rate + shift,
+                        FrequencyTypes.SEMI_ANNUAL, DayCountTypes.THIRTY_E_360)
+        swaps.append(swap)
+
+    return depos, fras, swaps
+
+###############################################################################
+
+
+def test_FinIborCurveNewton():
+    """ Compare the global Newton curve build with the bootstrap and time
+    rebuilds of the curve after small changes in the market quotes with and
+    without warm starting from the previous curve. """
+
+    value_date = Date(6, 6, 2018)
+    num_ticks = 20
+
+    testCases.header("INTERP", "BUILD", "NUM_ITER", "MAX_DF_DIFF", "TIME")
+
+    for interp_type in [InterpTypes.FLAT_FWD_RATES,
+                        InterpTypes.LINEAR_ZERO_RATES,
+                        InterpTypes.LINEAR_FWD_RATES]:
+
+        depos, fras, swaps = build_instruments(value_date, 0.0)
+
+        bootstrap_curve = IborSingleCurve(value_date, depos, fras, swaps,
+                                          interp_type)
+
+        newton_curve = IborSingleCurve(value_date, depos, fras, swaps,
+                                       interp_type, False,
+                                       CurveBuildTypes.GLOBAL_NEWTON)
+
+        # Differences are of the order of the bootstrap root search tolerance
+        max_df_diff = np.max(np.abs(newton_curve._dfs - bootstrap_curve._dfs))
+        max_df_diff = round(max_df_diff, 8)
+
+        ticks = [build_instruments(value_date, 0.00001 * (i + 1))
+                 for i in range(0, num_ticks)]
+
+        start = time.time()
+        for (depos, fras, swaps) in ticks:
+            IborSingleCurve(value_date, depos, fras, swaps, interp_type)
+        end = time.time()
+        bootstrap_time = (end - start) / num_ticks
+
+        start = time.time()
+        for (depos, fras, swaps) in ticks:
+            curve = IborSingleCurve(value_date, depos, fras, swaps,
+                                    interp_type, False,
+                                    CurveBuildTypes.GLOBAL_NEWTON)
+        end = time.time()
+        newton_time = (end - start) / num_ticks
+        newton_iter = curve._num_iterations
+
+        prev_curve = newton_curve
+        start = time.time()
+        for (depos, fras, swaps) in ticks:
+            prev_curve = IborSingleCurve(value_date, depos, fras, swaps,
+                                         interp_type, False,
+                                         CurveBuildTypes.GLOBAL_NEWTON,
+                                         prev_curve)
+        end = time.time()
+        warm_time = (end - start) / num_ticks
+        warm_iter = prev_curve._num_iterations
+
+        testCases.print(interp_type, "BOOTSTRAP", "-", 0.0, bootstrap_time)
+        testCases.print(interp_type, "NEWTON", newton_iter, max_df_diff,
+                        newton_time)
+        testCases.print(interp_type, "WARM_NEWTON", warm_iter, max_df_diff,
+                        warm_time)
+
+        print("%-20s BOOTSTRAP %8.2f ms NEWTON %8.2f ms WARM %8.2f ms" %
+              (interp_type.name, bootstrap_time * 1e3, newton_time * 1e3,
+               warm_time * 1e3))
+
+###############################################################################
+
+
+test_FinIborCurveNewton()
+testCases.compareTestCases()
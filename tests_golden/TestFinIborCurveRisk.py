@@ -0,0 +1,134 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import sys
+sys.path.append("..")
+
+import time
+import numpy as np
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.market.curves.interpolator import InterpTypes
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+depo_rates = [("1M", 0.0225), ("3M", 0.0231), ("6M", 0.0240)]
+
+swap_rates = [("1Y", 0.0262), ("2Y", 0.0277), ("3Y", 0.0286),
+              ("4Y", 0.0290), ("5Y", 0.0293), ("7Y", 0.0295),
+              ("10Y", 0.0300), ("12Y", 0.0302), ("15Y", 0.0304),
+              ("20Y", 0.0305), ("25Y", 0.0303), ("30Y", 0.0301)]
+
+###############################################################################
+
+
+def build_instruments(value_date, shifts):
+
+    settle_date = value_date.add_weekdays(2)
+    depoDCCType = DayCountTypes.ACT_360
+
+    depos = []
+    for i, (tenor, depo_rate) in enumerate(depo_rates):
+        depo = IborDeposit(settle_date, tenor, depo_rate + shifts[i],
+                           depoDCCType)
+        depos.append(depo)
+
+    fras = []
+
+    swaps = []
+    for i, (tenor, swap_rate) in enumerate(swap_rates):
+        swap = IborSwap(settle_date, tenor, SwapTypes.PAY,
+                        swap_rate + shifts[len(depo_rates) + i],
+                        FrequencyTypes.SEMI_ANNUAL, DayCountTypes.THIRTY_E_360)
+        swaps.append(swap)
+
+    return depos, fras, swaps
+
+###############################################################################
+
+
+def build_book(value_date, num_trades):
+
+    np.random.seed(1919)
+    settle_date = value_date.add_weekdays(2)
+    tenors = np.random.randint(1, 30, num_trades)
+    cpns = np.random.uniform(0.02, 0.04, num_trades)
+
+    book = []
+    for i in range(0, num_trades):
+        swap = IborSwap(settle_date, settle_date.add_years(int(tenors[i])),
+                        SwapTypes.RECEIVE, cpns[i], FrequencyTypes.ANNUAL,
+                        DayCountTypes.ACT_360)
+        book.append(swap)
+
+    return book
+
+###############################################################################
+
+
+def test_FinIborCurveRisk():
+    """ Compare the bucketed DV01 of a book of swaps found by bumping each
+    market quote and rebuilding the curve with the one found from the curve
+    quote Jacobian and the discount factor sensitivities of the swaps. """
+
+    value_date = Date(6, 6, 2018)
+    interp_type = InterpTypes.FLAT_FWD_RATES
+    num_quotes = len(depo_rates) + len(swap_rates)
+
+    testCases.header("METHOD", "NUM_TRADES", "MAX_DIFF", "TIME")
+
+    for num_trades in [10, 100]:
+
+        book = build_book(value_date, num_trades)
+
+        start = time.time()
+        dv01_bumped = np.zeros((num_trades, num_quotes))
+        for q in range(0, num_quotes):
+            values = []
+            for shift in [0.0001, -0.0001]:
+                shifts = np.zeros(num_quotes)
+                shifts[q] = shift
+                depos, fras, swaps = build_instruments(value_date, shifts)
+                curve = IborSingleCurve(value_date, depos, fras, swaps,
+                                        interp_type)
+                values.append([swap.value(value_date, curve)
+                               for swap in book])
+            dv01_bumped[:, q] = (np.array(values[0]) -
+                                 np.array(values[1])) / 2.0
+        end = time.time()
+        bump_time = end - start
+
+        start = time.time()
+        depos, fras, swaps = build_instruments(value_date,
+                                               np.zeros(num_quotes))
+        curve = IborSingleCurve(value_date, depos, fras, swaps, interp_type)
+        sensitivities = [swap.df_sensitivities(value_date, curve)[1]
+                         for swap in book]
+        dv01 = curve.bucketed_dv01(sensitivities)
+        end = time.time()
+        jacobian_time = end - start
+
+        max_diff = round(np.max(np.abs(dv01 - dv01_bumped)), 2)
+
+        testCases.print("BUMP_AND_REBUILD", num_trades, 0.0, bump_time)
+        testCases.print("QUOTE_JACOBIAN", num_trades, max_diff,
+                        jacobian_time)
+
+        print("%5d TRADES BUMP %10.2f ms JACOBIAN %10.2f ms MAX DIFF %8.4f" %
+              (num_trades, bump_time * 1e3, jacobian_time * 1e3, max_diff))
+
+###############################################################################
+
+
+test_FinIborCurveRisk()
+testCases.compareTestCases()
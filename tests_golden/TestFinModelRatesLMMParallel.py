@@ -0,0 +1,72 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import sys
+sys.path.append("..")
+
+import time
+import numpy as np
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+from financepy.models.lmm_mc import lmm_simulate_fwds_mf
+from financepy.models.lmm_mc import lmm_simulate_fwds_mf_parallel
+from financepy.models.lmm_mc import lmm_sticky_caplet_pricer
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def test_FinModelRatesLMMParallel():
+    """ Compare the time taken by the serial and parallel multi-factor LMM
+    simulations and the sticky caplet prices computed from them. """
+
+    numFwds = 11
+    taus = np.array([1.0] * numFwds)
+    fwd0 = np.array([0.05127] * numFwds)
+    seed = 438
+    spread = 0.0025
+    numeraireIndex = 0
+    numFactors = 3
+
+    lambdas3F = np.array([[0.00, 0.1365, 0.1928, 0.1672, 0.1698, 0.1485,
+                           0.1395, 0.1261, 0.1290, 0.1197, 0.1097],
+                          [0.0, -0.0662, -0.0702, -0.0406, -0.0206, 0.00,
+                           0.0169, 0.0306, 0.0470, 0.0581, 0.0666],
+                          [0.0, 0.0319, 0.0225, 0.000, -0.0198, -0.0347,
+                           -0.0163, 0.000, 0.0151, 0.0280, 0.0384]])
+
+    # Compile the kernels before timing
+    for simulate_fwds in [lmm_simulate_fwds_mf, lmm_simulate_fwds_mf_parallel]:
+        simulate_fwds(numFwds, numFactors, 10, numeraireIndex, fwd0,
+                      lambdas3F, taus, 0, seed)
+
+    testCases.header("METHOD", "SOBOL", "NUM_PATHS", "LAST_CAPLET", "TIME")
+
+    for useSobol in [0, 1]:
+        for num_paths in [10000, 100000]:
+            for name, simulate_fwds in [("SERIAL", lmm_simulate_fwds_mf),
+                                        ("PARALLEL",
+                                         lmm_simulate_fwds_mf_parallel)]:
+
+                start = time.time()
+                fwds = simulate_fwds(numFwds, numFactors, num_paths,
+                                     numeraireIndex, fwd0, lambdas3F, taus,
+                                     useSobol, seed)
+                end = time.time()
+                elapsed = end - start
+
+                v = lmm_sticky_caplet_pricer(spread, numFwds, num_paths,
+                                             fwd0, fwds, taus) * 100.0
+
+                testCases.print(name, useSobol, num_paths, v[-1], elapsed)
+
+                print("%-8s SOBOL %d %7d PATHS %10.2f ms" %
+                      (name, useSobol, num_paths, elapsed * 1e3))
+
+###############################################################################
+
+
+test_FinModelRatesLMMParallel()
+testCases.compareTestCases()
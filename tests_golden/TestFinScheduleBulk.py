@@ -0,0 +1,117 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import sys
+sys.path.append("..")
+
+import time
+import numpy as np
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+from financepy.utils.date import Date, DateArray
+from financepy.utils.schedule import Schedule, BulkSchedule
+from financepy.utils.calendar import CalendarTypes
+from financepy.utils.calendar import BusDayAdjustTypes
+from financepy.utils.calendar import DateGenRuleTypes
+from financepy.utils.frequency import FrequencyTypes
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def build_trades(num_trades):
+
+    np.random.seed(1919)
+    start_date = Date(1, 1, 2015)
+    offsets = np.random.randint(0, 3000, num_trades)
+    effective_dates = DateArray.from_serials(int(start_date._excel_date) +
+                                             offsets)
+    tenors = np.random.choice([1, 2, 3, 5, 7, 10, 15, 20, 30], num_trades)
+    termination_dates = effective_dates.add_years(tenors)
+    return effective_dates, termination_dates
+
+###############################################################################
+
+
+def test_FinScheduleBulk():
+    """ Check that the bulk schedule generator gives the same dates as the
+    Schedule class and compare the number of schedules generated a second. """
+
+    freq_types = [FrequencyTypes.ANNUAL, FrequencyTypes.SEMI_ANNUAL,
+                  FrequencyTypes.QUARTERLY, FrequencyTypes.MONTHLY]
+
+    cal_types = [CalendarTypes.WEEKEND, CalendarTypes.TARGET,
+                 CalendarTypes.UNITED_KINGDOM, CalendarTypes.JAPAN]
+
+    effective_dates, termination_dates = build_trades(100)
+
+    testCases.header("DG_RULE", "BD_ADJUST", "NUM_TRADES", "NUM_DIFFS")
+
+    for dg_rule_type in DateGenRuleTypes:
+        for bd_adjust_type in BusDayAdjustTypes:
+
+            num_trades = len(effective_dates)
+            trade_freq_types = [freq_types[i % 4] for i in range(num_trades)]
+            trade_cal_types = [cal_types[(i // 4) % 4]
+                               for i in range(num_trades)]
+            trade_eom = [i % 3 == 0 for i in range(num_trades)]
+
+            schedules = BulkSchedule(effective_dates, termination_dates,
+                                     trade_freq_types, trade_cal_types,
+                                     bd_adjust_type, dg_rule_type,
+                                     True, trade_eom)
+
+            num_diffs = 0
+            for i in range(0, num_trades):
+                schedule = Schedule(effective_dates[i], termination_dates[i],
+                                    trade_freq_types[i], trade_cal_types[i],
+                                    bd_adjust_type, dg_rule_type,
+                                    True, trade_eom[i])
+
+                if schedule.schedule_dates().to_list() != \
+                        schedules.schedule_dates(i).to_list():
+                    num_diffs += 1
+
+            testCases.print(dg_rule_type, bd_adjust_type, num_trades,
+                            num_diffs)
+
+    testCases.header("METHOD", "NUM_TRADES", "TIME")
+
+    num_trades = 20000
+    effective_dates, termination_dates = build_trades(num_trades)
+
+    # Compile the numba kernels and build the calendar before timing
+    BulkSchedule(effective_dates[0:10], termination_dates[0:10],
+                 FrequencyTypes.QUARTERLY, CalendarTypes.TARGET,
+                 BusDayAdjustTypes.MODIFIED_FOLLOWING)
+
+    num_loop_trades = 2000
+
+    start = time.time()
+    for i in range(0, num_loop_trades):
+        Schedule(effective_dates[i], termination_dates[i],
+                 FrequencyTypes.QUARTERLY, CalendarTypes.TARGET,
+                 BusDayAdjustTypes.MODIFIED_FOLLOWING)
+    end = time.time()
+    loop_time = end - start
+
+    start = time.time()
+    BulkSchedule(effective_dates, termination_dates,
+                 FrequencyTypes.QUARTERLY, CalendarTypes.TARGET,
+                 BusDayAdjustTypes.MODIFIED_FOLLOWING)
+    end = time.time()
+    bulk_time = end - start
+
+    testCases.print("SCHEDULE", num_loop_trades, loop_time)
+    testCases.print("BULK", num_trades, bulk_time)
+
+    print("SCHEDULE %12.0f schedules/sec" % (num_loop_trades / loop_time))
+    print("BULK     %12.0f schedules/sec" % (num_trades / bulk_time))
+
+###############################################################################
+
+
+test_FinScheduleBulk()
+testCases.compareTestCases()
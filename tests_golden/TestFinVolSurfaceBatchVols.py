@@ -0,0 +1,243 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import sys
+sys.path.append("..")
+
+import time
+import numpy as np
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+from financepy.utils.date import Date, DateArray
+from financepy.utils.global_types import FinSolverTypes
+from financepy.models.volatility_fns import VolFuncTypes
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.market.volatility.equity_vol_surface import EquityVolSurface
+from financepy.market.volatility.swaption_vol_surface import SwaptionVolSurface
+from financepy.market.volatility.fx_vol_surface import FXVolSurface
+from financepy.market.volatility.fx_vol_surface import FinFXATMMethod
+from financepy.market.volatility.fx_vol_surface import FinFXDeltaMethod
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def build_equity_surface():
+
+    value_date = Date(11, 1, 2021)
+    stock_price = 3800.0
+
+    expiry_dates = [Date(11, 2, 2021), Date(11, 3, 2021),
+                    Date(11, 4, 2021), Date(11, 7, 2021),
+                    Date(11, 10, 2021), Date(11, 1, 2022),
+                    Date(11, 1, 2023)]
+
+    strikes = np.array([3037, 3418, 3608, 3703, 3798,
+                        3893, 3988, 4178, 4557])
+
+    volSurface = [[42.94, 31.30, 25.88, 22.94, 19.72, 16.90, 15.31, 17.54, 25.67],
+                  [37.01, 28.25, 24.19, 21.93, 19.57, 17.45, 15.89, 15.34, 21.15],
+                  [34.68, 27.38, 23.82, 21.85, 19.83, 17.98, 16.52, 15.31, 18.94],
+                  [31.41, 26.25, 23.51, 22.05, 20.61, 19.25, 18.03, 16.01, 15.90],
+                  [29.91, 25.58, 23.21, 22.01, 20.83, 19.70, 18.62, 16.63, 14.94],
+                  [29.26, 25.24, 23.03, 21.91, 20.81, 19.73, 18.69, 16.76, 14.63],
+                  [27.59, 24.33, 22.72, 21.93, 21.17, 20.43, 19.71, 18.36, 16.26]]
+
+    volSurface = np.array(volSurface) / 100.0
+
+    discount_curve = DiscountCurveFlat(value_date, 0.020)
+    dividend_curve = DiscountCurveFlat(value_date, 0.010)
+
+    surface = EquityVolSurface(value_date, stock_price,
+                               discount_curve, dividend_curve,
+                               expiry_dates, strikes, volSurface,
+                               VolFuncTypes.SVI,
+                               FinSolverTypes.LEVENBERG_MARQUARDT)
+
+    return surface, 2500.0, 5000.0
+
+###############################################################################
+
+
+def build_swaption_surface():
+
+    value_date = Date(12, 6, 2013)
+
+    exercise_dates = [Date(12, 9, 2013), Date(12, 6, 2014),
+                      Date(12, 6, 2015), Date(12, 6, 2016),
+                      Date(12, 6, 2017), Date(12, 6, 2018),
+                      Date(12, 6, 2020), Date(12, 6, 2023)]
+
+    marketVolatilities = [[57.6, 53.7, 49.4, 45.6, 44.1, 41.1, 35.2, 32.0],
+                          [46.6, 46.9, 44.8, 41.6, 39.8, 37.4, 33.4, 31.0],
+                          [35.9, 39.3, 39.6, 37.9, 37.2, 34.7, 30.5, 28.9],
+                          [34.1, 36.5, 37.8, 36.6, 35.0, 31.9, 28.1, 26.6],
+                          [41.0, 41.3, 39.5, 37.8, 36.0, 32.6, 29.0, 26.0],
+                          [45.8, 43.4, 41.9, 39.2, 36.9, 33.2, 29.6, 26.3],
+                          [50.3, 46.9, 44.0, 40.0, 37.5, 33.8, 30.2, 27.3]]
+
+    marketVolatilities = np.array(marketVolatilities) / 100.0
+
+    marketStrikes = [[1.00, 1.25, 1.68, 2.00, 2.26, 2.41, 2.58, 2.62],
+                     [1.50, 1.75, 2.18, 2.50, 2.76, 2.91, 3.08, 3.12],
+                     [2.00, 2.25, 2.68, 3.00, 3.26, 3.41, 3.58, 3.62],
+                     [2.50, 2.75, 3.18, 3.50, 3.76, 3.91, 4.08, 4.12],
+                     [3.00, 3.25, 3.68, 4.00, 4.26, 4.41, 4.58, 4.62],
+                     [3.50, 3.75, 4.18, 4.50, 4.76, 4.91, 5.08, 5.12],
+                     [4.00, 4.25, 4.68, 5.00, 5.26, 5.41, 5.58, 5.62]]
+
+    marketStrikes = np.array(marketStrikes) / 100.0
+
+    fwd_swap_rates = marketStrikes[3]
+
+    surface = SwaptionVolSurface(value_date,
+                                 exercise_dates,
+                                 fwd_swap_rates,
+                                 marketStrikes,
+                                 marketVolatilities,
+                                 VolFuncTypes.SABR_BETA_HALF,
+                                 FinSolverTypes.LEVENBERG_MARQUARDT)
+
+    return surface, 0.015, 0.050
+
+###############################################################################
+
+
+def build_fx_surface():
+
+    value_date = Date(10, 4, 2020)
+
+    dom_discount_curve = DiscountCurveFlat(value_date, 0.02940)
+    for_discount_curve = DiscountCurveFlat(value_date, 0.03460)
+
+    tenors = ['1M', '2M', '3M', '6M', '1Y', '2Y']
+    atm_vols = [21.00, 21.00, 20.750, 19.400, 18.250, 17.677]
+    marketStrangle25DeltaVols = [0.65, 0.75, 0.85, 0.90, 0.95, 0.85]
+    riskReversal25DeltaVols = [-0.20, -0.25, -0.30, -0.50, -0.60, -0.562]
+
+    surface = FXVolSurface(value_date,
+                           1.3465,
+                           "EURUSD",
+                           "EUR",
+                           dom_discount_curve,
+                           for_discount_curve,
+                           tenors,
+                           atm_vols,
+                           marketStrangle25DeltaVols,
+                           riskReversal25DeltaVols,
+                           FinFXATMMethod.FWD_DELTA_NEUTRAL,
+                           FinFXDeltaMethod.SPOT_DELTA,
+                           VolFuncTypes.CLARK,
+                           FinSolverTypes.LEVENBERG_MARQUARDT)
+
+    return surface, 1.10, 1.60
+
+###############################################################################
+
+
+def random_options(surface, low_strike, high_strike, num_options,
+                   num_expiries):
+    """ Return strikes and expiry dates for a book of options whose expiries
+    are drawn from num_expiries dates spread out to beyond the last expiry of
+    the surface. """
+
+    np.random.seed(1919)
+
+    value_date = surface._value_date
+    last_days = surface._expiry_dates[-1] - value_date
+    days = np.linspace(1, 1.25 * last_days, num_expiries).astype(np.int64)
+
+    expiry_dates = [value_date.add_days(int(d)) for d in days]
+
+    strikes = np.random.uniform(low_strike, high_strike, num_options)
+    choices = np.random.randint(0, num_expiries, num_options)
+    dates = [expiry_dates[i] for i in choices]
+
+    return strikes, dates
+
+###############################################################################
+
+
+def scalar_vols(surface, strikes, dates):
+
+    if isinstance(surface, FXVolSurface):
+        return np.array([surface.volatility(k, dt)
+                         for k, dt in zip(strikes, dates)])
+
+    return np.array([surface.volatility_from_strike_date(k, dt)
+                     for k, dt in zip(strikes, dates)])
+
+###############################################################################
+
+
+def array_vols(surface, strikes, dates):
+
+    if isinstance(surface, FXVolSurface):
+        return surface.volatility_array(strikes, dates)
+
+    return surface.volatility_from_strike_date_array(strikes, dates)
+
+###############################################################################
+
+
+def test_FinVolSurfaceBatchVols():
+    """ Compare the volatilities of a book of options looked up one at a time
+    on each vol surface with those from a single vectorised lookup and report
+    the number of options that each approach prices per second. """
+
+    surfaces = [build_equity_surface(),
+                build_swaption_surface(),
+                build_fx_surface()]
+
+    testCases.header("SURFACE", "NUM_OPTIONS", "MAX_DIFF")
+
+    for surface, low_strike, high_strike in surfaces:
+
+        strikes, dates = random_options(surface, low_strike, high_strike,
+                                        2000, 50)
+
+        vols_scalar = scalar_vols(surface, strikes, dates)
+        vols_array = array_vols(surface, strikes, DateArray(dates))
+
+        max_diff = np.max(np.abs(vols_scalar - vols_array))
+        testCases.print(type(surface).__name__, len(strikes),
+                        round(max_diff, 12))
+
+    testCases.header("SURFACE", "METHOD", "NUM_OPTIONS", "OPTIONS_PER_SEC")
+
+    num_options = 100000
+
+    for surface, low_strike, high_strike in surfaces:
+
+        strikes, dates = random_options(surface, low_strike, high_strike,
+                                        num_options, 250)
+
+        date_array = DateArray(dates)
+
+        # Compile the numba kernels before timing
+        array_vols(surface, strikes[0:10], date_array[0:10])
+
+        num_scalar = 5000
+        start = time.time()
+        scalar_vols(surface, strikes[0:num_scalar], dates[0:num_scalar])
+        end = time.time()
+        scalar_rate = num_scalar / (end - start)
+
+        start = time.time()
+        array_vols(surface, strikes, date_array)
+        end = time.time()
+        array_rate = num_options / (end - start)
+
+        name = type(surface).__name__
+        testCases.print(name, "SCALAR", num_scalar, scalar_rate)
+        testCases.print(name, "ARRAY", num_options, array_rate)
+
+        print("%-20s SPEEDUP %8.1fx" % (name, array_rate / scalar_rate))
+
+###############################################################################
+
+
+test_FinVolSurfaceBatchVols()
+testCases.compareTestCases()